@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark simulated-annealing placement on a scrambled synthetic board
+Reports move throughput and the cost terms before and after annealing
+"""
+
+import argparse
+import random
+
+from kicad_autoplace import Annealer, default_moves
+from kicad_placement import PlacementNetlist
+from kicad_synthetic_board import synthetic_board
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark auto_place move throughput")
+    parser.add_argument("--components", type=int, default=1000, help="Footprints on the synthetic board")
+    parser.add_argument("--moves", type=int, default=None, help="Moves to try (default: as auto_place)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the scrambled start and the annealer")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    model = synthetic_board(args.components, seed=args.seed)
+    rng = random.Random(args.seed)
+    x1, y1, x2, y2 = model.outline_bbox()
+    for fp in model.footprints:
+        fp.move_to(rng.uniform(x1, x2), rng.uniform(y1, y2), 0)
+
+    netlist = PlacementNetlist(model.footprints)
+    annealer = Annealer(netlist, model.footprints, range(len(model.footprints)), outline=model.outline_bbox(),
+                        seed=args.seed)
+    print(f"Synthetic board: {len(model.footprints)} components, {len(netlist.net_codes)} nets, "
+          f"grid cell {annealer.cell:.2f} mm")
+    print()
+
+    before = annealer.cost()
+    annealer.anneal(args.moves or default_moves(len(model.footprints)))
+    after = annealer.cost()
+    print(f"{'':>10} {'HPWL mm':>12} {'overlap mm²':>12} {'outside mm²':>12}")
+    print("-" * 49)
+    for label, cost in (("before", before), ("after", after)):
+        print(f"{label:>10} {cost['hpwl_mm']:>12,.1f} {cost['overlap_mm2']:>12,.2f} {cost['outside_mm2']:>12,.2f}")
+    print()
+    print(f"{annealer.moves:,} moves ({annealer.accepted:,} accepted) in {annealer.elapsed_s:.2f} s: "
+          f"{annealer.moves / annealer.elapsed_s:,.0f} moves/s")
+
+
+if __name__ == "__main__":
+    main()
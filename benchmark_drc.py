@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel DRC on a synthetic multilayer board
+Reports clearance run time and speedup over the serial engine for 1 to N worker processes
+"""
+
+import argparse
+import os
+import time
+
+from kicad_drc import DesignRules, DrcEngine
+from kicad_drc_parallel import run_parallel
+from kicad_synthetic_board import synthetic_board
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark process-parallel DRC scaling")
+    parser.add_argument("--components", type=int, default=10000, help="Footprints on the synthetic board")
+    parser.add_argument("--layers", type=int, default=8, help="Copper layers on the synthetic board")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Largest worker count to try")
+    parser.add_argument("--tiles", type=int, default=None, help="Tiles per side (default: about four tasks per worker)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count (best time is kept)")
+    parser.add_argument("--clearance", type=float, default=0.2, help="Clearance rule in mm")
+    return parser.parse_args()
+
+
+def best_time(run, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    args = parse_args()
+    model = synthetic_board(args.components, layers=args.layers)
+    rules = DesignRules(clearance_mm=args.clearance)
+    engine = DrcEngine(model, rules)
+
+    print(f"Synthetic board: {len(model.footprints)} components, {len(model.tracks)} tracks, "
+          f"{len(model.copper_layers)} copper layers, {len(engine.items)} copper items")
+    print(f"CPUs available: {os.cpu_count()}")
+    print()
+
+    serial, expected = best_time(engine.run, args.repeat)
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8} {'violations':>11} {'same':>5}")
+    print("-" * 46)
+    print(f"{'serial':>8} {serial:>10.3f} {1:>7.2f}x {len(expected):>11,} {'':>5}")
+
+    counts = sorted({args.workers} | {2 ** i for i in range(args.workers.bit_length()) if 2 ** i <= args.workers})
+    for workers in counts:
+        elapsed, found = best_time(lambda: run_parallel(engine, workers, args.tiles), args.repeat)
+        print(f"{workers:>8} {elapsed:>10.3f} {serial / elapsed:>7.2f}x {len(found):>11,} "
+              f"{'yes' if found == expected else 'NO':>5}")
+
+
+if __name__ == "__main__":
+    main()
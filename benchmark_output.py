@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark tool result encodings on a synthetic board
+Reports response size and serialization time per tool for each output mode
+"""
+
+import argparse
+import asyncio
+import time
+
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_output import OUTPUT_MODES, encode_result
+from kicad_synthetic_board import synthetic_board
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark MCP tool result encodings")
+    parser.add_argument("--components", type=int, default=10000, help="Footprints on the synthetic board")
+    parser.add_argument("--repeat", type=int, default=5, help="Encodings per tool and mode (best time is kept)")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    model = synthetic_board(args.components)
+    server = KiCadMCPServerExtended(backend="file", board_path=model.file_name)
+    server.model = model
+
+    tools = {
+        "list_components": server._list_components,
+        "read_netlist": server._read_netlist,
+        "get_track_info": server._get_track_info,
+        "get_board_info": server._get_board_info,
+    }
+
+    print(f"Synthetic board: {len(model.footprints)} components, {len(model.nets) - 1} nets, "
+          f"{len(model.tracks)} tracks")
+    print()
+    print(f"{'tool':<18} {'mode':<8} {'bytes':>12} {'vs pretty':>10} {'encode ms':>10}")
+    print("-" * 62)
+
+    for name, tool in tools.items():
+        result = await tool()
+        baseline = None
+        for mode in OUTPUT_MODES:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = encode_result(result, mode)
+                best = min(best, time.perf_counter() - start)
+            size = len(text.encode("utf-8"))
+            baseline = baseline or size
+            print(f"{name:<18} {mode:<8} {size:>12,} {size / baseline:>9.0%} {best * 1000:>10.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
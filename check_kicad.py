@@ -89,7 +89,7 @@ def check_flatpak_dependencies():
     """Check if MCP dependencies are installed in Flatpak"""
     print("\nChecking Flatpak dependencies...")
 
-    deps = ["mcp", "anthropic", "dotenv"]
+    deps = ["mcp", "anthropic", "dotenv", "numpy"]
     all_ok = True
 
     for dep in deps:
@@ -176,7 +176,7 @@ def check_dependencies():
     """Check if required packages are installed"""
     print("\nChecking Python dependencies...")
 
-    deps = ["mcp", "anthropic", "dotenv"]
+    deps = ["mcp", "anthropic", "dotenv", "numpy"]
     all_ok = True
 
     for dep in deps:
@@ -275,7 +275,7 @@ def main():
         if kicad_pythons:
             print(f"\nOption 2: Use KiCad's Python:")
             for kp in kicad_pythons:
-                print(f"   {kp} -m pip install mcp anthropic python-dotenv")
+                print(f"   {kp} -m pip install mcp anthropic python-dotenv numpy")
                 print(f"   {kp} kicad_mcp_server.py")
 
         if not flatpak_found:
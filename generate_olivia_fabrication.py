@@ -8,7 +8,6 @@ import sys
 import os
 from pathlib import Path
 from datetime import datetime
-import zipfile
 
 try:
     import pcbnew
@@ -18,6 +17,9 @@ except ImportError:
     print("  flatpak run --command=python3 org.kicad.KiCad generate_olivia_fabrication.py")
     sys.exit(1)
 
+from kicad_fab_zip import DeterministicZip
+from kicad_gerber_parallel import export_layers, write_job_file
+
 
 def main():
     # Paths
@@ -73,51 +75,6 @@ def main():
     # ========================================================================
     print("Generating Gerber files...")
 
-    pctl = pcbnew.PLOT_CONTROLLER(board)
-    popt = pctl.GetPlotOptions()
-
-    # Configure plot options - using only methods available in KiCad 9.x
-    popt.SetOutputDirectory(str(gerber_dir))
-
-    # Basic plot settings
-    try:
-        popt.SetPlotFrameRef(False)
-    except:
-        pass
-
-    try:
-        popt.SetPlotValue(True)
-        popt.SetPlotReference(True)
-    except:
-        pass
-
-    try:
-        popt.SetExcludeEdgeLayer(True)
-    except:
-        pass
-
-    try:
-        popt.SetScale(1)
-        popt.SetUseAuxOrigin(False)
-        popt.SetMirror(False)
-        popt.SetNegative(False)
-    except:
-        pass
-
-    # Gerber specific settings
-    try:
-        popt.SetFormat(1)  # Gerber format
-    except:
-        pass
-
-    try:
-        popt.SetUseGerberProtelExtensions(False)
-        popt.SetCreateGerberJobFile(True)
-        popt.SetSubtractMaskFromSilk(True)
-        popt.SetGerberPrecision(6)
-    except:
-        pass
-
     # Layers to export
     layers = [
         ("F.Cu", "Front Copper"),
@@ -131,22 +88,27 @@ def main():
         ("Edge.Cuts", "Board Outline"),
     ]
 
-    gerber_files = []
+    layer_names = []
     for layer_name, description in layers:
-        layer_id = board.GetLayerID(layer_name)
-        if layer_id < 0:
+        if board.GetLayerID(layer_name) < 0:
             print(f"  ⚠ Layer {layer_name} not found, skipping")
             continue
+        layer_names.append(layer_name)
+
+    # Each worker loads the PCB once and plots its share of the layers
+    workers = min(len(layer_names), os.cpu_count() or 1)
+    print(f"  Plotting on {workers} worker process(es)")
+    plotted = export_layers(board, str(gerber_dir), layer_names, workers, board_path=pcb_path)
 
-        pctl.SetLayer(layer_id)
-        pctl.OpenPlotfile(layer_name, pcbnew.PLOT_FORMAT_GERBER, description)
-        pctl.PlotLayer()
-        pctl.ClosePlot()
+    gerber_files = []
+    for _, _, filename in plotted:
+        gerber_files.append(os.path.basename(filename))
+        print(f"  ✓ {os.path.basename(filename)}")
 
-        filename = pctl.GetPlotFileName()
-        if os.path.exists(filename):
-            gerber_files.append(os.path.basename(filename))
-            print(f"  ✓ {os.path.basename(filename)}")
+    job_file = write_job_file(board, str(gerber_dir), plotted)
+    if job_file:
+        gerber_files.append(os.path.basename(job_file))
+        print(f"  ✓ {os.path.basename(job_file)}")
 
     print(f"✓ Generated {len(gerber_files)} Gerber files")
     print()
@@ -241,20 +203,15 @@ def main():
 
     zip_path = Path(output_base) / f"olivia_v0.2_fabrication_{timestamp}.zip"
 
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Add gerber files
-        for file in gerber_dir.glob("*"):
-            arcname = f"gerber/{file.name}"
-            zipf.write(file, arcname)
-
-        # Add drill files
-        for file in drill_dir.glob("*"):
-            arcname = f"drill/{file.name}"
-            zipf.write(file, arcname)
+    # Large Gerbers deflate in parallel; the same files always give the same ZIP bytes
+    with DeterministicZip() as package:
+        package.add_tree(gerber_dir, "gerber")
+        package.add_tree(drill_dir, "drill")
 
         # Add BOM and position
-        zipf.write(bom_file, "bom.csv")
-        zipf.write(pos_file, "position.csv")
+        package.add_file(bom_file, "bom.csv")
+        package.add_file(pos_file, "position.csv")
+        package.write(zip_path)
 
     zip_size = zip_path.stat().st_size / 1024  # KB
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+KiCad Arrange - Align, distribute and grid layouts for groups of footprints
+Pure geometry on courtyard boxes; the server applies the resulting moves as one batch
+"""
+
+import math
+from typing import List, Optional, Sequence
+
+from kicad_board_model import BBox, Point
+
+ALIGN_EDGES = ("left", "right", "top", "bottom", "center_x", "center_y")
+LAYOUTS = ("row", "column", "matrix")
+DEFAULT_GAP_MM = 0.5  # Courtyard gap used for the default arrange pitch
+
+
+def align_offsets(boxes: Sequence[BBox], edge: str, fixed: Sequence[bool] = ()) -> List[Point]:
+    """(dx, dy) bringing each box's edge (or centre) into line with the group's outermost one
+
+    When some boxes are fixed, the line is taken from those alone so the others line up with them.
+    """
+    if edge not in ALIGN_EDGES:
+        raise ValueError(f"Unknown edge '{edge}' (expected one of: {', '.join(ALIGN_EDGES)})")
+    anchors = [box for box, pinned in zip(boxes, fixed) if pinned] or list(boxes)
+    if edge == "left":
+        target = min(box[0] for box in anchors)
+        return [(target - box[0], 0.0) for box in boxes]
+    if edge == "right":
+        target = max(box[2] for box in anchors)
+        return [(target - box[2], 0.0) for box in boxes]
+    if edge == "top":
+        target = min(box[1] for box in anchors)
+        return [(0.0, target - box[1]) for box in boxes]
+    if edge == "bottom":
+        target = max(box[3] for box in anchors)
+        return [(0.0, target - box[3]) for box in boxes]
+    if edge == "center_x":
+        target = (min(box[0] for box in anchors) + max(box[2] for box in anchors)) / 2
+        return [(target - (box[0] + box[2]) / 2, 0.0) for box in boxes]
+    target = (min(box[1] for box in anchors) + max(box[3] for box in anchors)) / 2
+    return [(0.0, target - (box[1] + box[3]) / 2) for box in boxes]
+
+
+def distribute_offsets(boxes: Sequence[BBox], axis: str) -> List[Point]:
+    """(dx, dy) spacing the boxes with equal gaps along an axis; the first and last (by centre) stay put
+
+    Boxes keep their order along the axis. The gap is negative when the boxes do not fit between the ends.
+    """
+    if axis not in ("x", "y"):
+        raise ValueError(f"Unknown axis '{axis}' (expected 'x' or 'y')")
+    lo, hi = (0, 2) if axis == "x" else (1, 3)
+    order = sorted(range(len(boxes)), key=lambda i: (boxes[i][lo] + boxes[i][hi], i))
+    offsets = [(0.0, 0.0)] * len(boxes)
+    if len(boxes) < 3:
+        return offsets
+    first, last = boxes[order[0]], boxes[order[-1]]
+    sizes = sum(boxes[i][hi] - boxes[i][lo] for i in order)
+    gap = (last[hi] - first[lo] - sizes) / (len(boxes) - 1)
+    cursor = first[hi] + gap
+    for i in order[1:-1]:
+        shift = cursor - boxes[i][lo]
+        offsets[i] = (shift, 0.0) if axis == "x" else (0.0, shift)
+        cursor += boxes[i][hi] - boxes[i][lo] + gap
+    return offsets
+
+
+def distribution_gap(boxes: Sequence[BBox], axis: str) -> float:
+    """Gap between neighbouring boxes once they are distributed"""
+    lo, hi = (0, 2) if axis == "x" else (1, 3)
+    if len(boxes) < 2:
+        return 0.0
+    span = max(box[hi] for box in boxes) - min(box[lo] for box in boxes)
+    return (span - sum(box[hi] - box[lo] for box in boxes)) / (len(boxes) - 1)
+
+
+def grid_positions(count: int, layout: str, origin: Point, pitch_x: float, pitch_y: float,
+                   columns: Optional[int] = None) -> List[Point]:
+    """Row-major positions for `count` items: one row, one column, or a matrix of `columns` per row"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}' (expected one of: {', '.join(LAYOUTS)})")
+    if layout == "row":
+        columns = count
+    elif layout == "column":
+        columns = 1
+    elif columns is None:
+        columns = math.ceil(math.sqrt(count))
+    columns = max(int(columns), 1)
+    return [(origin[0] + (i % columns) * pitch_x, origin[1] + (i // columns) * pitch_y) for i in range(count)]
+
+
+def rotated_extent(box: BBox, turn_deg: float) -> Point:
+    """Width and height of a box's contents after turning them by an angle"""
+    a = math.radians(turn_deg)
+    c, s = abs(math.cos(a)), abs(math.sin(a))
+    w, h = box[2] - box[0], box[3] - box[1]
+    return w * c + h * s, w * s + h * c
+
+
+def mirror_axis(boxes: Sequence[BBox]) -> float:
+    """X of the vertical line through the middle of the group, which a left-right flip keeps in place"""
+    return (min(box[0] for box in boxes) + max(box[2] for box in boxes)) / 2
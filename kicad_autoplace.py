@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+KiCad Auto-Place - Simulated annealing of footprint positions and rotations
+Cost is HPWL plus courtyard overlap and board outline penalties, scored for whole batches of moves at once
+"""
+
+import math
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from kicad_board_model import BBox, Footprint, points_bbox, rotate_point
+from kicad_placement import PlacementNetlist, rotate_offsets, segment_hpwl
+
+# Cost of one mm² of courtyard overlap (or keepout intrusion), and of courtyard outside the outline, in mm of HPWL
+OVERLAP_WEIGHT = 5.0
+OUTSIDE_WEIGHT = 10.0
+
+MOVES_PER_PART = 500
+MAX_MOVES = 300_000
+BATCH_SIZE = 256
+ROTATE_PROBABILITY = 0.2
+INITIAL_ACCEPTANCE = 0.8  # Share of uphill moves accepted at the starting temperature
+COOLING_RANGE = 1e-4      # Final temperature relative to the starting one
+
+Keepout = Tuple[BBox, Tuple[bool, bool]]  # Box and whether it applies to the (top, bottom) side
+
+
+def default_moves(movable: int) -> int:
+    return min(MAX_MOVES, MOVES_PER_PART * movable)
+
+
+def concat_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + length) for each pair"""
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(int(lengths.sum()))
+
+
+def _intersection(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Overlap area of boxes given as (4, ...) arrays of min_x, min_y, max_x, max_y (broadcasting)"""
+    w = np.minimum(a[2], b[2]) - np.maximum(a[0], b[0])
+    h = np.minimum(a[3], b[3]) - np.maximum(a[1], b[1])
+    return np.clip(w, 0, None) * np.clip(h, 0, None)
+
+
+def local_box(fp: Footprint) -> Tuple[float, float, float, float]:
+    """Courtyard box at 0° relative to the footprint origin, as (centre x, centre y, half width, half height)"""
+    if len(fp.courtyard) >= 3:
+        points = fp.courtyard
+    else:
+        x1, y1, x2, y2 = fp.bbox()
+        points = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+    x1, y1, x2, y2 = points_bbox([rotate_point(px - fp.x_mm, py - fp.y_mm, -fp.rotation_deg) for px, py in points])
+    return (x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2, (y2 - y1) / 2
+
+
+class Annealer:
+    """Simulated annealing over a subset of footprints; every other footprint and each keepout is a fixed obstacle
+
+    Each step proposes a batch of moves (a shift or a quarter turn) for distinct footprints and scores them all
+    against the current placement in one pass: the moved parts' nets are re-reduced from their pad runs, and
+    overlaps are box intersections with the parts in the 3×3 cells of a uniform grid around each box. Accepted
+    moves that share a net with an earlier move of the same batch are dropped, so the running per-net HPWL
+    stays exact. Courtyards are taken as their bounding boxes, grown by half the spacing on every side.
+    """
+
+    def __init__(self, netlist: PlacementNetlist, footprints: Sequence[Footprint], movable: Sequence[int],
+                 outline: Optional[BBox] = None, keepouts: Sequence[Keepout] = (), spacing_mm: float = 0.25,
+                 allow_rotation: bool = True, overlap_weight: float = OVERLAP_WEIGHT,
+                 outside_weight: float = OUTSIDE_WEIGHT, seed: int = 0):
+        self.netlist = netlist
+        self.movable = np.array(sorted(set(movable)), dtype=np.int64)
+        self.outline = None if outline is None else np.array(outline, dtype=np.float64)
+        self.rotate_probability = ROTATE_PROBABILITY if allow_rotation else 0.0
+        self.overlap_weight = overlap_weight
+        self.outside_weight = outside_weight
+        self.rng = np.random.default_rng(seed)
+        self.moves = 0
+        self.accepted = 0
+        self.elapsed_s = 0.0
+
+        self.x, self.y, self.rotation = netlist.x.copy(), netlist.y.copy(), netlist.rotation.copy()
+        self.net_hpwl = netlist.net_hpwl.copy()
+
+        local = np.array([local_box(fp) for fp in footprints], dtype=np.float64).reshape(-1, 4)
+        self.box_cx, self.box_cy = local[:, 0], local[:, 1]
+        self.box_hw, self.box_hh = local[:, 2] + spacing_mm / 2, local[:, 3] + spacing_mm / 2
+        self.side = np.array([fp.layer == "B.Cu" for fp in footprints], dtype=np.int64)
+        everything = np.arange(len(footprints))
+        self.boxes = self._boxes(everything, self.x, self.y, self.rotation)
+
+        self.keepouts = np.array([box for box, _ in keepouts], dtype=np.float64).reshape(-1, 4).T
+        self.keepout_sides = np.array([sides for _, sides in keepouts], dtype=bool).reshape(-1, 2).T
+
+        # Net → pad runs (pads are sorted by net), component → nets and component → pads
+        self.pad_comp, self.pad_dx, self.pad_dy = netlist.pad_comp, netlist.pad_dx, netlist.pad_dy
+        self.net_start = netlist.starts
+        self.net_len = np.diff(np.append(netlist.starts, len(netlist.pad_net)))
+        counts = np.array([len(nets) for nets in netlist.comp_nets], dtype=np.int64)
+        self.comp_ptr = np.concatenate(([0], np.cumsum(counts)))
+        self.comp_net = (np.concatenate(netlist.comp_nets) if len(netlist.comp_nets) else np.zeros(0)).astype(np.int64)
+        self.comp_pads = np.argsort(self.pad_comp, kind="stable")
+        self.comp_pad_ptr = np.searchsorted(self.pad_comp[self.comp_pads], np.arange(len(footprints) + 1))
+        dx, dy = rotate_offsets(self.pad_dx, self.pad_dy, self.rotation[self.pad_comp])
+        self.px, self.py = self.x[self.pad_comp] + dx, self.y[self.pad_comp] + dy
+
+        # Grid cells at least twice the reach (box centre to farthest corner at any rotation) of all but the
+        # largest parts, so two of them can only overlap when their centres share or neighbour a cell.
+        # Parts reaching further are few and tested against everything.
+        reach = np.hypot(self.box_hw, self.box_hh)
+        if self.outline is None:
+            cx, cy = (self.boxes[0] + self.boxes[2]) / 2, (self.boxes[1] + self.boxes[3]) / 2
+            region = [cx.min(initial=0.0), cy.min(initial=0.0), cx.max(initial=0.0), cy.max(initial=0.0)]
+        else:
+            region = list(self.outline)
+        width, height = max(region[2] - region[0], 1e-3), max(region[3] - region[1], 1e-3)
+        if len(reach):
+            typical = float(np.percentile(reach, 95))
+            self.cell = max(2 * typical, math.sqrt(width * height / (4 * len(reach))), 1e-3)
+        else:
+            self.cell = 1.0
+        self.origin = np.array(region[:2])
+        self.columns, self.rows = int(width // self.cell) + 1, int(height // self.cell) + 1
+        self.large = np.flatnonzero(reach > self.cell / 2 + 1e-6)
+        self.is_large = np.zeros(len(reach), dtype=bool)
+        self.is_large[self.large] = True
+        self._index()
+
+    def _boxes(self, comps: np.ndarray, x: np.ndarray, y: np.ndarray, rotation: np.ndarray) -> np.ndarray:
+        """(4, len(comps)) courtyard boxes of the components at the given poses"""
+        cx, cy = rotate_offsets(self.box_cx[comps], self.box_cy[comps], rotation)
+        a = np.radians(rotation)
+        c, s = np.abs(np.cos(a)), np.abs(np.sin(a))
+        hw = self.box_hw[comps] * c + self.box_hh[comps] * s
+        hh = self.box_hw[comps] * s + self.box_hh[comps] * c
+        return np.stack([x + cx - hw, y + cy - hh, x + cx + hw, y + cy + hh])
+
+    def _cells(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Grid column and row of each box centre, clamped to the grid"""
+        column = np.floor(((boxes[0] + boxes[2]) / 2 - self.origin[0]) / self.cell).astype(np.int64)
+        row = np.floor(((boxes[1] + boxes[3]) / 2 - self.origin[1]) / self.cell).astype(np.int64)
+        return np.clip(column, 0, self.columns - 1), np.clip(row, 0, self.rows - 1)
+
+    def _index(self) -> None:
+        """Bucket the current boxes of all but the large parts by grid cell"""
+        small = np.flatnonzero(~self.is_large)
+        column, row = self._cells(self.boxes[:, small])
+        cell = column * self.rows + row
+        order = np.argsort(cell, kind="stable")
+        self.cell_members = small[order]
+        self.cell_ptr = np.concatenate(([0], np.cumsum(np.bincount(cell, minlength=self.columns * self.rows))))
+
+    def _overlap(self, comps: np.ndarray, boxes: np.ndarray, among: Optional[np.ndarray] = None) -> np.ndarray:
+        """Overlap of each box with the other footprints on its side (or only those flagged in `among`)
+
+        Uses the grid built by _index.
+        """
+        k = len(comps)
+        column, row = self._cells(boxes)
+        columns = column[:, None] + np.repeat([-1, 0, 1], 3)[None, :]
+        rows = row[:, None] + np.tile([-1, 0, 1], 3)[None, :]
+        valid = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+        valid &= ~self.is_large[comps][:, None]
+        cells = np.where(valid, columns * self.rows + rows, 0)
+        lengths = np.where(valid, self.cell_ptr[cells + 1] - self.cell_ptr[cells], 0).ravel()
+
+        moves = [np.repeat(np.repeat(np.arange(k), 9), lengths)]
+        others = [self.cell_members[concat_ranges(self.cell_ptr[cells].ravel(), lengths)]]
+        small_moves = np.flatnonzero(~self.is_large[comps])
+        moves.append(np.repeat(small_moves, len(self.large)))
+        others.append(np.tile(self.large, len(small_moves)))
+        large_moves = np.flatnonzero(self.is_large[comps])
+        moves.append(np.repeat(large_moves, len(self.x)))
+        others.append(np.tile(np.arange(len(self.x)), len(large_moves)))
+        move, other = np.concatenate(moves), np.concatenate(others)
+
+        area = _intersection(boxes[:, move], self.boxes[:, other])
+        area *= (self.side[other] == self.side[comps[move]]) & (other != comps[move])
+        if among is not None:
+            area *= among[other]
+        return np.bincount(move, area, minlength=k)
+
+    def _penalties(self, comps: np.ndarray, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per box: overlap with other footprints on its side, keepout intrusion and area outside the outline"""
+        side = self.side[comps]
+        overlap = self._overlap(comps, boxes)
+        keepout = np.zeros(len(comps))
+        if self.keepouts.shape[1]:
+            intrusion = _intersection(boxes[:, :, None], self.keepouts[:, None, :])
+            keepout = (intrusion * self.keepout_sides[side]).sum(axis=1)
+        outside = np.zeros(len(comps))
+        if self.outline is not None:
+            area = (boxes[2] - boxes[0]) * (boxes[3] - boxes[1])
+            outside = area - _intersection(boxes, self.outline[:, None])
+        return overlap, keepout, outside
+
+    def _penalty(self, comps: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        overlap, keepout, outside = self._penalties(comps, boxes)
+        return self.overlap_weight * (overlap + keepout) + self.outside_weight * outside
+
+    def _hpwl_delta(self, comps: np.ndarray, x: np.ndarray, y: np.ndarray,
+                    rotation: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """HPWL change of each move on its own, plus the (move, net, new HPWL) of every touched net"""
+        counts = self.comp_ptr[comps + 1] - self.comp_ptr[comps]
+        pair_move = np.repeat(np.arange(len(comps)), counts)
+        pair_net = self.comp_net[concat_ranges(self.comp_ptr[comps], counts)]
+        if not len(pair_net):
+            return np.zeros(len(comps)), pair_move, pair_net, np.zeros(0)
+
+        lengths = self.net_len[pair_net]
+        pads = concat_ranges(self.net_start[pair_net], lengths)
+        pad_move = np.repeat(pair_move, lengths)
+        px, py = self.px[pads], self.py[pads]
+        mine = self.pad_comp[pads] == comps[pad_move]
+        m = pad_move[mine]
+        dx, dy = rotate_offsets(self.pad_dx[pads[mine]], self.pad_dy[pads[mine]], rotation[m])
+        px[mine], py[mine] = x[m] + dx, y[m] + dy
+        after = segment_hpwl(px, py, np.cumsum(lengths) - lengths)
+        delta = np.bincount(pair_move, after - self.net_hpwl[pair_net], minlength=len(comps))
+        return delta, pair_move, pair_net, after
+
+    def _propose(self, size: int, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        comps = self.rng.choice(self.movable, size=size, replace=False)
+        turn = self.rng.random(size) < self.rotate_probability
+        x = self.x[comps] + np.where(turn, 0.0, self.rng.uniform(-radius, radius, size))
+        y = self.y[comps] + np.where(turn, 0.0, self.rng.uniform(-radius, radius, size))
+        quarter_turns = self.rng.integers(1, 4, size)
+        rotation = np.where(turn, (self.rotation[comps] + 90.0 * quarter_turns) % 360, self.rotation[comps])
+        if self.outline is not None:
+            x = np.clip(x, self.outline[0], self.outline[2])
+            y = np.clip(y, self.outline[1], self.outline[3])
+        return comps, x, y, rotation
+
+    def _evaluate(self, comps, x, y, rotation):
+        boxes = self._boxes(comps, x, y, rotation)
+        delta, pair_move, pair_net, after = self._hpwl_delta(comps, x, y, rotation)
+        delta = delta + self._penalty(comps, boxes) - self._penalty(comps, self.boxes[:, comps])
+        return delta, boxes, pair_move, pair_net, after
+
+    def _apply(self, comps, x, y, rotation, boxes) -> None:
+        self.x[comps], self.y[comps], self.rotation[comps] = x, y, rotation
+        self.boxes[:, comps] = boxes
+        first, last = self.comp_pad_ptr[comps], self.comp_pad_ptr[comps + 1]
+        pads = self.comp_pads[concat_ranges(first, last - first)]
+        owner = self.pad_comp[pads]
+        dx, dy = rotate_offsets(self.pad_dx[pads], self.pad_dy[pads], self.rotation[owner])
+        self.px[pads], self.py[pads] = self.x[owner] + dx, self.y[owner] + dy
+
+    def _step(self, size: int, radius: float, temperature: float) -> None:
+        self._index()
+        comps, x, y, rotation = self._propose(size, radius)
+        delta, boxes, pair_move, pair_net, after = self._evaluate(comps, x, y, rotation)
+        accept = delta <= 0
+        uphill = ~accept
+        accept[uphill] = self.rng.random(int(uphill.sum())) < np.exp(-delta[uphill] / temperature)
+
+        if accept.sum() > 1 and len(pair_net):
+            # Keep only the first accepted move on each net so the per-net results stay exact
+            live = accept[pair_move]
+            first = np.full(len(self.net_hpwl), size)
+            np.minimum.at(first, pair_net[live], pair_move[live])
+            clash = first[pair_net] != pair_move
+            accept &= ~(np.bincount(pair_move, clash & live, minlength=size) > 0)
+
+        kept = np.flatnonzero(accept)
+        self.moves += size
+        self.accepted += len(kept)
+        if len(kept):
+            self._apply(comps[kept], x[kept], y[kept], rotation[kept], boxes[:, kept])
+            applied = accept[pair_move]
+            self.net_hpwl[pair_net[applied]] = after[applied]
+
+    def cost(self) -> Dict[str, float]:
+        """HPWL, overlap with or between the movable parts, keepout intrusion and area outside the outline"""
+        overlap = keepout = outside = 0.0
+        movable = np.zeros(len(self.x), dtype=bool)
+        movable[self.movable] = True
+        for start in range(0, len(self.movable), BATCH_SIZE):
+            comps = self.movable[start:start + BATCH_SIZE]
+            boxes = self.boxes[:, comps]
+            pair, intrusion, out = self._penalties(comps, boxes)
+            # Pairs of two movable parts are seen from both sides
+            overlap += float(pair.sum() - self._overlap(comps, boxes, movable).sum() / 2)
+            keepout += float(intrusion.sum())
+            outside += float(out.sum())
+        hpwl = float(self.net_hpwl.sum())
+        weighted = hpwl + self.overlap_weight * (overlap + keepout) + self.outside_weight * outside
+        return {"hpwl_mm": hpwl, "overlap_mm2": overlap, "keepout_mm2": keepout,
+                "outside_mm2": outside, "cost": weighted}
+
+    def anneal(self, moves: Optional[int] = None) -> None:
+        """Run the schedule: temperature and move radius shrink geometrically over `moves` proposals
+
+        The placement is left as it was if the final cost is not lower than the starting one.
+        """
+        if not len(self.movable):
+            return
+        started = time.perf_counter()
+        moves = default_moves(len(self.movable)) if moves is None else int(moves)
+        size = max(1, min(BATCH_SIZE, len(self.movable) // 4))
+        batches = max(1, math.ceil(moves / size))
+
+        start_state = (self.x.copy(), self.y.copy(), self.rotation.copy(), self.boxes.copy(),
+                       self.px.copy(), self.py.copy(), self.net_hpwl.copy())
+        start_cost = self.cost()["cost"]
+
+        if self.outline is not None:
+            span = max(self.outline[2] - self.outline[0], self.outline[3] - self.outline[1])
+        else:
+            span = max(float(np.ptp(self.x)), float(np.ptp(self.y)), 1.0)
+        first_radius = span / 2
+        last_radius = min(first_radius, max(0.1, float(np.median(np.minimum(self.box_hw, self.box_hh)[self.movable]))))
+
+        self._index()
+        probe = self._evaluate(*self._propose(size, first_radius))[0]
+        uphill = probe[probe > 0]
+        first_temperature = float(uphill.mean()) / -math.log(INITIAL_ACCEPTANCE) if len(uphill) else 1.0
+
+        for b in range(batches):
+            f = b / max(batches - 1, 1)
+            self._step(size, first_radius * (last_radius / first_radius) ** f,
+                       first_temperature * COOLING_RANGE ** f)
+
+        if self.cost()["cost"] >= start_cost:
+            self.x, self.y, self.rotation, self.boxes, self.px, self.py, self.net_hpwl = start_state
+        self.elapsed_s = time.perf_counter() - started
+
+    def changed(self) -> np.ndarray:
+        """Indexes of the footprints whose pose differs from the netlist's"""
+        return np.flatnonzero((self.x != self.netlist.x) | (self.y != self.netlist.y) |
+                              (self.rotation != self.netlist.rotation))
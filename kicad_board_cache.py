@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+KiCad Board Cache - Persistent snapshots of parsed boards
+Stores BoardModel snapshots as compressed JSON in a SQLite file next to the board, keyed by content hash
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from kicad_board_model import MODEL_VERSION, BoardModel, Footprint, Net, Pad, Point, Track, Via, Zone
+from kicad_pcb_parser import load_kicad_pcb
+
+CACHE_FILE_NAME = ".kicad_mcp_cache.sqlite"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    board_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    data BLOB NOT NULL
+)
+"""
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_model(model: BoardModel) -> bytes:
+    """Compressed JSON of a board model's fields
+
+    Plain data rather than a pickle, so a cache file dropped next to a board can never run code when loaded.
+    """
+    data = json.dumps(model, default=vars, separators=(",", ":"))  # Dataclasses as their field dicts
+    return zlib.compress(data.encode("utf-8"), 6)
+
+
+def _points(values: List[Any]) -> List[Point]:
+    return [tuple(point) for point in values]
+
+
+def decode_model(data: bytes, file_name: str) -> BoardModel:
+    """Rebuild a board model from encode_model() output"""
+    raw: Dict[str, Any] = json.loads(zlib.decompress(data))
+    footprints = []
+    for fp in raw["footprints"]:
+        fp["pads"] = [Pad(**pad) for pad in fp["pads"]]
+        fp["courtyard"] = _points(fp["courtyard"])
+        footprints.append(Footprint(**fp))
+    tracks = []
+    for track in raw["tracks"]:
+        track["start"], track["end"] = tuple(track["start"]), tuple(track["end"])
+        if track["mid"] is not None:
+            track["mid"] = tuple(track["mid"])
+        tracks.append(Track(**track))
+    zones = []
+    for zone in raw["zones"]:
+        zone["outline"] = _points(zone["outline"])
+        zone["filled"] = {layer: [_points(polygon) for polygon in polygons]
+                          for layer, polygons in zone["filled"].items()}
+        zones.append(Zone(**zone))
+    return BoardModel(
+        file_name=file_name,
+        copper_layers=list(raw["copper_layers"]),
+        nets={int(code): Net(**net) for code, net in raw["nets"].items()},
+        footprints=footprints,
+        tracks=tracks,
+        vias=[Via(**via) for via in raw["vias"]],
+        zones=zones,
+        outline=[(tuple(a), tuple(b)) for a, b in raw["outline"]],
+    )
+
+
+class BoardSnapshotCache:
+    """SQLite-backed cache of parsed board models with stale-entry eviction and a size cap"""
+
+    def __init__(self, cache_path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def snapshot_key(digest: str) -> str:
+        return f"v{MODEL_VERSION}:json:{digest}"
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.cache_path, timeout=10)
+        try:
+            with conn:
+                conn.execute(_SCHEMA)
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, board_path: str, digest: Optional[str] = None) -> Optional[BoardModel]:
+        """Return the cached model for the board's current contents, or None"""
+        if not os.path.exists(self.cache_path):
+            return None
+        key = self.snapshot_key(digest or file_digest(board_path))
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM snapshots WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE snapshots SET last_used = ? WHERE key = ?", (time.time(), key))
+        return decode_model(row[0], board_path)
+
+    def store(self, board_path: str, model: BoardModel, digest: Optional[str] = None) -> None:
+        """Save a snapshot, evicting stale entries for the same board and enforcing the size cap"""
+        key = self.snapshot_key(digest or file_digest(board_path))
+        data = encode_model(model)
+        board_path = os.path.abspath(board_path)
+
+        with self._connect() as conn:
+            # Older contents of this board (or older model versions) can never be hit again
+            conn.execute("DELETE FROM snapshots WHERE board_path = ? AND key != ?", (board_path, key))
+            for (path,) in conn.execute("SELECT DISTINCT board_path FROM snapshots").fetchall():
+                if not os.path.exists(path):
+                    conn.execute("DELETE FROM snapshots WHERE board_path = ?", (path,))
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, board_path, size, last_used, data) VALUES (?, ?, ?, ?, ?)",
+                (key, board_path, len(data), time.time(), data)
+            )
+            self._enforce_size_cap(conn)
+
+    def _enforce_size_cap(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used snapshots until the cache fits in max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM snapshots").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM snapshots ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM snapshots WHERE key = ?", (key,))
+            total -= size
+
+    def load_or_parse(self, board_path: str) -> BoardModel:
+        """Load the board from the cache, parsing and storing it on a miss"""
+        digest = file_digest(board_path)
+        try:
+            model = self.load(board_path, digest)
+            if model is not None:
+                return model
+        except (sqlite3.Error, zlib.error, ValueError, TypeError, KeyError) as e:
+            print(f"Warning: ignoring unreadable board cache {self.cache_path}: {e}", file=sys.stderr)
+
+        model = load_kicad_pcb(board_path)
+        try:
+            self.store(board_path, model, digest)
+        except sqlite3.Error as e:
+            print(f"Warning: could not write board cache {self.cache_path}: {e}", file=sys.stderr)
+        return model
+
+
+def load_board_model(board_path: str) -> BoardModel:
+    """Load a .kicad_pcb file through the snapshot cache unless KICAD_MCP_CACHE=off
+
+    KICAD_MCP_CACHE may also name the cache file; KICAD_MCP_CACHE_MAX_MB sets the size cap.
+    """
+    setting = os.environ.get("KICAD_MCP_CACHE", "")
+    if setting.lower() in ("off", "0", "false", "no"):
+        return load_kicad_pcb(board_path)
+
+    cache_path = setting or str(Path(board_path).resolve().parent / CACHE_FILE_NAME)
+    max_mb = float(os.environ.get("KICAD_MCP_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+    return BoardSnapshotCache(cache_path, int(max_mb * 1024 * 1024)).load_or_parse(board_path)
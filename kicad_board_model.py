@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+KiCad Board Model - Backend-neutral description of a PCB
+Footprints, pads, nets, tracks, vias, zones and the board outline, in millimeters
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+Point = Tuple[float, float]
+BBox = Tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+
+BACKENDS = ("auto", "pcbnew", "file")
+
+# Bump whenever the model classes or the parser output change, so cached snapshots are discarded
+MODEL_VERSION = 3
+
+
+def select_backend(requested: str, board_path: Optional[str], pcbnew_available: bool) -> str:
+    """Resolve the requested backend to 'pcbnew', 'file' or 'mock'"""
+    if requested not in BACKENDS:
+        raise ValueError(f"Unknown backend '{requested}' (expected one of: {', '.join(BACKENDS)})")
+    if requested == "pcbnew" and not pcbnew_available:
+        raise ValueError("Backend 'pcbnew' requested but the pcbnew module is not available")
+    if requested == "file" and not board_path:
+        raise ValueError("Backend 'file' requires a .kicad_pcb path (--board or KICAD_MCP_BOARD)")
+
+    if requested == "auto":
+        if pcbnew_available:
+            return "pcbnew"
+        return "file" if board_path else "mock"
+    return requested
+
+
+def rotate_point(x: float, y: float, angle_deg: float) -> Point:
+    """Rotate a point using KiCad's convention (Y axis down, positive angle counter-clockwise on screen)"""
+    if not angle_deg:
+        return x, y
+    a = math.radians(angle_deg)
+    c, s = math.cos(a), math.sin(a)
+    return x * c + y * s, -x * s + y * c
+
+
+def arc_points(start: Point, mid: Point, end: Point, max_step_deg: float = 15.0) -> List[Point]:
+    """Approximate a three-point arc with a polyline (start and end included)"""
+    (x1, y1), (x2, y2), (x3, y3) = start, mid, end
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+    if abs(d) < 1e-12:
+        return [start, end]
+
+    s1, s2, s3 = x1 * x1 + y1 * y1, x2 * x2 + y2 * y2, x3 * x3 + y3 * y3
+    cx = (s1 * (y2 - y3) + s2 * (y3 - y1) + s3 * (y1 - y2)) / d
+    cy = (s1 * (x3 - x2) + s2 * (x1 - x3) + s3 * (x2 - x1)) / d
+    r = math.hypot(x1 - cx, y1 - cy)
+
+    a1 = math.atan2(y1 - cy, x1 - cx)
+    a2 = math.atan2(y2 - cy, x2 - cx)
+    a3 = math.atan2(y3 - cy, x3 - cx)
+    sweep = (a3 - a1) % (2 * math.pi)
+    if (a2 - a1) % (2 * math.pi) > sweep:
+        sweep -= 2 * math.pi
+
+    steps = max(2, int(math.ceil(abs(math.degrees(sweep)) / max_step_deg)))
+    return [
+        (cx + r * math.cos(a1 + sweep * i / steps), cy + r * math.sin(a1 + sweep * i / steps))
+        for i in range(steps + 1)
+    ]
+
+
+def points_bbox(points: List[Point]) -> Optional[BBox]:
+    """Axis-aligned bounding box of a list of points"""
+    if not points:
+        return None
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def polyline_length(points: List[Point]) -> float:
+    """Total length of a polyline"""
+    return sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(points, points[1:]))
+
+
+def copper_layer_match(layers: List[str], layer: str) -> bool:
+    """Check whether a KiCad layer list (which may use wildcards) contains a copper layer"""
+    if layer in layers:
+        return True
+    if layer.endswith(".Cu"):
+        return "*.Cu" in layers or (layer in ("F.Cu", "B.Cu") and "F&B.Cu" in layers)
+    return False
+
+
+def flip_layer(layer: str) -> str:
+    """Name of the matching layer on the other side (F.* <-> B.*); inner and wildcard layers are unchanged"""
+    if layer.startswith("F."):
+        return "B." + layer[2:]
+    if layer.startswith("B."):
+        return "F." + layer[2:]
+    return layer
+
+
+@dataclass
+class Net:
+    code: int
+    name: str
+
+
+@dataclass
+class Pad:
+    number: str
+    x_mm: float
+    y_mm: float
+    width_mm: float
+    height_mm: float
+    shape: str = "rect"
+    pad_type: str = "smd"
+    layers: List[str] = field(default_factory=list)
+    rotation_deg: float = 0.0
+    drill_mm: float = 0.0
+    net_code: int = 0
+    net_name: str = ""
+    roundrect_rratio: float = 0.0
+
+    def on_layer(self, layer: str) -> bool:
+        return copper_layer_match(self.layers, layer)
+
+    def bbox(self) -> BBox:
+        a = math.radians(self.rotation_deg)
+        c, s = abs(math.cos(a)), abs(math.sin(a))
+        hw = (self.width_mm * c + self.height_mm * s) / 2
+        hh = (self.width_mm * s + self.height_mm * c) / 2
+        return self.x_mm - hw, self.y_mm - hh, self.x_mm + hw, self.y_mm + hh
+
+
+@dataclass
+class Footprint:
+    reference: str
+    value: str
+    lib_id: str
+    x_mm: float
+    y_mm: float
+    rotation_deg: float = 0.0
+    layer: str = "F.Cu"
+    locked: bool = False
+    attributes: List[str] = field(default_factory=list)
+    pads: List[Pad] = field(default_factory=list)
+    courtyard: List[Point] = field(default_factory=list)
+
+    @property
+    def footprint_name(self) -> str:
+        """Library item name without the library nickname (matches FPID.GetLibItemName())"""
+        return self.lib_id.split(":", 1)[-1]
+
+    @property
+    def side(self) -> str:
+        return "Bottom" if self.layer == "B.Cu" else "Top"
+
+    def bbox(self) -> BBox:
+        """Courtyard bounding box, falling back to the pad extents"""
+        box = points_bbox(self.courtyard)
+        if box is not None:
+            return box
+        if self.pads:
+            boxes = [pad.bbox() for pad in self.pads]
+            return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                    max(b[2] for b in boxes), max(b[3] for b in boxes))
+        return self.x_mm, self.y_mm, self.x_mm, self.y_mm
+
+    def move_to(self, x_mm: float, y_mm: float, rotation_deg: float) -> None:
+        """Move the footprint origin, carrying pads and courtyard along"""
+        delta = rotation_deg - self.rotation_deg
+
+        def transform(px: float, py: float) -> Point:
+            rx, ry = rotate_point(px - self.x_mm, py - self.y_mm, delta)
+            return x_mm + rx, y_mm + ry
+
+        for pad in self.pads:
+            pad.x_mm, pad.y_mm = transform(pad.x_mm, pad.y_mm)
+            pad.rotation_deg = (pad.rotation_deg + delta) % 360
+        self.courtyard = [transform(px, py) for px, py in self.courtyard]
+        self.x_mm, self.y_mm, self.rotation_deg = x_mm, y_mm, rotation_deg
+
+    def flip(self, axis_x_mm: float) -> None:
+        """Move the footprint to the other side, mirrored about a vertical line (KiCad's left-right flip)"""
+        for pad in self.pads:
+            pad.x_mm = 2 * axis_x_mm - pad.x_mm
+            pad.rotation_deg = (180 - pad.rotation_deg) % 360
+            pad.layers = [flip_layer(layer) for layer in pad.layers]
+        self.courtyard = [(2 * axis_x_mm - px, py) for px, py in self.courtyard]
+        self.x_mm = 2 * axis_x_mm - self.x_mm
+        self.rotation_deg = (180 - self.rotation_deg) % 360
+        self.layer = flip_layer(self.layer)
+
+
+class FootprintSlots:
+    """Footprints by board position, so parts sharing a reference stay apart; the reference is only a label"""
+
+    def __init__(self, footprints: Iterable[Footprint]):
+        self.items: List[Footprint] = []
+        self._by_reference: Dict[str, List[int]] = {}
+        for fp in footprints:
+            self._append(fp)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, slot: int) -> Footprint:
+        return self.items[slot]
+
+    def _append(self, fp: Footprint) -> int:
+        self._by_reference.setdefault(fp.reference, []).append(len(self.items))
+        self.items.append(fp)
+        return len(self.items) - 1
+
+    def shared(self) -> Set[str]:
+        """References carried by more than one footprint"""
+        return {reference for reference, slots in self._by_reference.items() if len(slots) > 1}
+
+    def replace(self, footprints: Iterable[Footprint]) -> List[Tuple[int, Optional[Footprint]]]:
+        """Store moved (or re-snapshotted) footprints; returns (slot, footprint it replaced) for each
+
+        A footprint goes to the slot holding that very object, else to the first slot with its reference not
+        yet filled by this call, so copies of parts sharing a reference are matched in board order.
+        """
+        replaced, filled = [], set()
+        for fp in footprints:
+            slots = self._by_reference.get(fp.reference, [])
+            slot = next((s for s in slots if self.items[s] is fp), None)
+            if slot is None:
+                slot = next((s for s in slots if s not in filled), None)
+            if slot is None:
+                replaced.append((self._append(fp), None))
+            else:
+                replaced.append((slot, self.items[slot]))
+                self.items[slot] = fp
+            filled.add(replaced[-1][0])
+        return replaced
+
+
+@dataclass
+class Track:
+    start: Point
+    end: Point
+    width_mm: float
+    layer: str
+    net_code: int = 0
+    net_name: str = ""
+    mid: Optional[Point] = None  # Set for arc tracks
+
+    @property
+    def length_mm(self) -> float:
+        if self.mid is not None:
+            return polyline_length(arc_points(self.start, self.mid, self.end, max_step_deg=1.0))
+        return math.hypot(self.end[0] - self.start[0], self.end[1] - self.start[1])
+
+
+@dataclass
+class Via:
+    x_mm: float
+    y_mm: float
+    size_mm: float
+    drill_mm: float
+    layers: List[str] = field(default_factory=lambda: ["F.Cu", "B.Cu"])
+    net_code: int = 0
+    net_name: str = ""
+
+
+@dataclass
+class Zone:
+    net_code: int
+    net_name: str
+    layers: List[str]
+    outline: List[Point] = field(default_factory=list)
+    filled: Dict[str, List[List[Point]]] = field(default_factory=dict)
+    keepout: bool = False
+    keepout_footprints: bool = False  # Rule area that forbids footprints
+
+
+@dataclass
+class BoardModel:
+    """Parsed board contents, independent of the backend that produced them"""
+    file_name: str
+    copper_layers: List[str] = field(default_factory=lambda: ["F.Cu", "B.Cu"])
+    nets: Dict[int, Net] = field(default_factory=dict)
+    footprints: List[Footprint] = field(default_factory=list)
+    tracks: List[Track] = field(default_factory=list)
+    vias: List[Via] = field(default_factory=list)
+    zones: List[Zone] = field(default_factory=list)
+    outline: List[Tuple[Point, Point]] = field(default_factory=list)  # Edge.Cuts segments
+
+    @property
+    def layer_count(self) -> int:
+        return len(self.copper_layers)
+
+    def net_name(self, code: int) -> str:
+        net = self.nets.get(code)
+        return net.name if net else ""
+
+    def outline_bbox(self) -> Optional[BBox]:
+        """Bounding box of the Edge.Cuts outline"""
+        return points_bbox([p for segment in self.outline for p in segment])
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+KiCad Component Table - Columnar store of footprint placement data
+Reference, value, footprint, position, rotation and layer held in NumPy arrays
+"""
+
+import fnmatch
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from kicad_board_model import BoardModel
+
+COLUMNS = ("reference", "value", "footprint", "x_mm", "y_mm", "rotation_deg", "layer")
+
+
+class ComponentTable:
+    """One NumPy array per column, one row per footprint"""
+
+    def __init__(self, reference: Sequence[str], value: Sequence[str], footprint: Sequence[str],
+                 x_mm: Any, y_mm: Any, rotation_deg: Any, layer: Sequence[str]):
+        self.reference = np.asarray(reference, dtype=object)
+        self.value = np.asarray(value, dtype=object)
+        self.footprint = np.asarray(footprint, dtype=object)
+        self.x_mm = np.asarray(x_mm, dtype=np.float64)
+        self.y_mm = np.asarray(y_mm, dtype=np.float64)
+        self.rotation_deg = np.asarray(rotation_deg, dtype=np.float64)
+        self.layer = np.asarray(layer, dtype=object)
+        self._rows: Dict[str, int] = {ref: i for i, ref in enumerate(self.reference.tolist())}
+
+    @classmethod
+    def from_model(cls, model: BoardModel) -> "ComponentTable":
+        fps = model.footprints
+        return cls(
+            [fp.reference for fp in fps],
+            [fp.value for fp in fps],
+            [fp.footprint_name for fp in fps],
+            [fp.x_mm for fp in fps],
+            [fp.y_mm for fp in fps],
+            [fp.rotation_deg for fp in fps],
+            [fp.layer for fp in fps],
+        )
+
+    @classmethod
+    def from_pcbnew(cls, board: Any) -> "ComponentTable":
+        """Read every footprint once; positions stay in nanometers until one vectorized conversion"""
+        reference, value, footprint, x_nm, y_nm, rotation, layer = [], [], [], [], [], [], []
+        for fp in board.GetFootprints():
+            pos = fp.GetPosition()
+            reference.append(fp.GetReference())
+            value.append(fp.GetValue())
+            footprint.append(str(fp.GetFPID().GetLibItemName()))
+            x_nm.append(pos.x)
+            y_nm.append(pos.y)
+            rotation.append(fp.GetOrientationDegrees())
+            layer.append(fp.GetLayerName())
+        return cls(
+            reference, value, footprint,
+            np.asarray(x_nm, dtype=np.int64) / 1e6,
+            np.asarray(y_nm, dtype=np.int64) / 1e6,
+            rotation, layer,
+        )
+
+    def __len__(self) -> int:
+        return len(self.reference)
+
+    def __eq__(self, other: object) -> bool:
+        """Same rows in the same order"""
+        if not isinstance(other, ComponentTable) or len(self) != len(other):
+            return False
+        return all(np.array_equal(getattr(self, name), getattr(other, name)) for name in COLUMNS)
+
+    def row(self, reference: str) -> Optional[int]:
+        return self._rows.get(reference)
+
+    def update(self, reference: str, x_mm: float, y_mm: float, rotation_deg: float,
+               layer: Optional[str] = None) -> None:
+        """Keep a row in step with a footprint that was just moved (or flipped to `layer`)"""
+        i = self._rows.get(reference)
+        if i is not None:
+            self.x_mm[i] = x_mm
+            self.y_mm[i] = y_mm
+            self.rotation_deg[i] = rotation_deg
+            if layer is not None:
+                self.layer[i] = layer
+
+    def filter_rows(self, layer: Optional[str] = None, reference_glob: Optional[str] = None,
+                    value: Optional[str] = None) -> np.ndarray:
+        """Indices of rows matching every given filter (reference_glob is a case-sensitive shell pattern)"""
+        mask = np.ones(len(self), dtype=bool)
+        if layer is not None:
+            mask &= self.layer == layer
+        if value is not None:
+            mask &= self.value == value
+        if reference_glob is not None:
+            match = re.compile(fnmatch.translate(reference_glob)).match
+            mask &= np.fromiter((match(ref) is not None for ref in self.reference.tolist()),
+                                dtype=bool, count=len(self))
+        return np.flatnonzero(mask)
+
+    def side(self) -> np.ndarray:
+        """'Top'/'Bottom' per row, as used by pick-and-place files"""
+        return np.where(self.layer == "B.Cu", "Bottom", "Top").astype(object)
+
+    def records(self, fields: Sequence[str] = COLUMNS, rows: Optional[np.ndarray] = None) -> List[Dict]:
+        """Rows as JSON-ready dicts; columns are converted to Python values in bulk"""
+        columns = []
+        for name in fields:
+            column = getattr(self, name)
+            columns.append((column if rows is None else column[rows]).tolist())
+        return [dict(zip(fields, values)) for values in zip(*columns)]
+
+    def bom_groups(self) -> List[Dict]:
+        """Group rows by (value, footprint), ordered by value then first appearance"""
+        if not len(self):
+            return []
+
+        # Unit separator: NumPy strings drop trailing NULs, so a "\x00" separator would vanish from the keys
+        keys = np.char.add(np.char.add(self.value.astype(str), "\x1f"), self.footprint.astype(str))
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse, kind="stable")
+        members = np.split(self.reference[order], np.cumsum(counts)[:-1])
+
+        group_order = np.lexsort((first, self.value[first].astype(str)))
+        return [
+            {
+                "value": self.value[first[g]],
+                "footprint": self.footprint[first[g]],
+                "references": sorted(members[g].tolist()),
+                "quantity": int(counts[g]),
+            }
+            for g in group_order.tolist()
+        ]
+
+    def position_rows(self) -> List[tuple]:
+        """(reference, value, package, x_mm, y_mm, rotation_deg, side) for every row"""
+        return list(zip(
+            self.reference.tolist(), self.value.tolist(), self.footprint.tolist(),
+            self.x_mm.tolist(), self.y_mm.tolist(), self.rotation_deg.tolist(), self.side().tolist(),
+        ))
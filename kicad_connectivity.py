@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+KiCad Connectivity - Per-net islands of pads, tracks, vias and zone fills
+Union-find over the copper of each net, joined by shared endpoints, touching copper and fills
+"""
+
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from kicad_board_model import BoardModel, Footprint, FootprintSlots, Point, arc_points, points_bbox
+from kicad_drc import layer_span, pad_core
+from kicad_geometry import shape_distance
+from kicad_spatial_index import SpatialGrid
+
+ENDPOINT_GRID_MM = 1e-3  # Endpoints closer than this hash to the same key
+TOUCH_TOLERANCE_MM = 1e-6
+
+NodeKey = Tuple[Hashable, ...]
+
+
+class DisjointSet:
+    """Union-find with path halving and union by size"""
+
+    def __init__(self):
+        self.parent: Dict[Hashable, Hashable] = {}
+        self.size: Dict[Hashable, int] = {}
+
+    def add(self, key: Hashable) -> None:
+        if key not in self.parent:
+            self.parent[key] = key
+            self.size[key] = 1
+
+    def find(self, key: Hashable) -> Hashable:
+        parent = self.parent
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(self, a: Hashable, b: Hashable) -> bool:
+        """Merge the sets of a and b; False when they were already joined"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size.pop(root_b)
+        return True
+
+    def groups(self) -> List[List[Hashable]]:
+        members: Dict[Hashable, List[Hashable]] = {}
+        for key in self.parent:
+            members.setdefault(self.find(key), []).append(key)
+        return list(members.values())
+
+
+def _hash(layer: str, point: Point) -> Tuple[str, int, int]:
+    return layer, round(point[0] / ENDPOINT_GRID_MM), round(point[1] / ENDPOINT_GRID_MM)
+
+
+class _FillPolygon:
+    """One filled zone polygon with its edges in a grid, so many shapes can be tested against it cheaply"""
+
+    def __init__(self, polygon: List[Point]):
+        n = len(polygon)
+        self.box = points_bbox(polygon)
+        self.edges = [(polygon[i], polygon[(i + 1) % n]) for i in range(n)]
+        self.grid = SpatialGrid.build((i, points_bbox(list(edge))) for i, edge in enumerate(self.edges))
+
+    def contains(self, point: Point) -> bool:
+        """Even-odd test counting only the edges in the strip to the right of the point"""
+        x, y = point
+        inside = False
+        for i in self.grid.candidates((x, y, self.box[2], y)):
+            (x1, y1), (x2, y2) = self.edges[i]
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+    def touches(self, core: List[Point], radius: float) -> bool:
+        """Whether copper of this core and radius overlaps the fill, e.g. a pad reached by thermal spokes"""
+        reach = radius + TOUCH_TOLERANCE_MM
+        xs, ys = [p[0] for p in core], [p[1] for p in core]
+        box = (min(xs) - reach, min(ys) - reach, max(xs) + reach, max(ys) + reach)
+        for i in self.grid.candidates(box):
+            if shape_distance(core, self.edges[i])[0] <= reach:
+                return True
+        return self.contains(core[0])
+
+
+class ConnectivityEngine:
+    """Islands of every net, rebuilt per net when footprints on it move"""
+
+    def __init__(self, model: BoardModel):
+        self.model = model
+        self.footprints = FootprintSlots(model.footprints)  # Pads are keyed by slot, so shared references stay apart
+        self._pads: Dict[int, Set[Tuple[int, int]]] = {}
+        self._tracks: Dict[int, List[int]] = {}
+        self._vias: Dict[int, List[int]] = {}
+        self._zones: Dict[int, List[int]] = {}
+        self._nets: Dict[int, Dict] = {}
+
+        for slot, fp in enumerate(self.footprints.items):
+            self._add_footprint(slot, fp)
+        for i, track in enumerate(model.tracks):
+            self._tracks.setdefault(track.net_code, []).append(i)
+        for i, via in enumerate(model.vias):
+            self._vias.setdefault(via.net_code, []).append(i)
+        for i, zone in enumerate(model.zones):
+            if not zone.keepout:
+                self._zones.setdefault(zone.net_code, []).append(i)
+        self._dirty: Set[int] = (set(model.nets) | set(self._pads) | set(self._tracks) | set(self._vias)) - {0}
+        self.rebuilt = 0  # Nets rebuilt by the last nets() call
+
+    def _add_footprint(self, slot: int, fp: Footprint) -> None:
+        for i, pad in enumerate(fp.pads):
+            if pad.net_code:
+                self._pads.setdefault(pad.net_code, set()).add((slot, i))
+
+    def _remove_footprint(self, slot: int, fp: Footprint) -> Set[int]:
+        codes = {pad.net_code for pad in fp.pads if pad.net_code}
+        for code in codes:
+            self._pads[code] = {key for key in self._pads[code] if key[0] != slot}
+        return codes
+
+    def update_footprints(self, footprints: Iterable[Footprint]) -> Set[int]:
+        """Take moved (or re-snapshotted) footprints and mark their nets for rebuild
+
+        Footprints are matched as FootprintSlots.replace() does: pass every copy of a shared reference.
+        """
+        touched: Set[int] = set()
+        for slot, previous in self.footprints.replace(footprints):
+            fp = self.footprints[slot]
+            if previous is not None:
+                touched |= self._remove_footprint(slot, previous)
+            self._add_footprint(slot, fp)
+            touched |= {pad.net_code for pad in fp.pads if pad.net_code}
+        self._dirty |= touched
+        return touched
+
+    def mark_nets(self, codes: Iterable[int]) -> None:
+        self._dirty |= {code for code in codes if code}
+
+    # ------------------------------------------------------------------
+    # Per-net union-find
+    # ------------------------------------------------------------------
+
+    def _build_net(self, code: int) -> Dict:
+        """Join the net's copper items and group them into islands"""
+        model = self.model
+        layers_all = model.copper_layers
+        sets = DisjointSet()
+        shapes: Dict[str, SpatialGrid] = {}
+        shape_list: List[Tuple[NodeKey, str, List[Point], float]] = []
+        anchors: List[Tuple[NodeKey, str, Point]] = []  # Points that join whatever copper they land on
+
+        def add_shape(node: NodeKey, layer: str, core: List[Point], radius: float) -> None:
+            xs, ys = [p[0] for p in core], [p[1] for p in core]
+            grid = shapes.setdefault(layer, SpatialGrid(1.0))
+            index = len(shape_list)
+            shape_list.append((node, layer, core, radius))
+            grid.insert(index, (min(xs) - radius, min(ys) - radius, max(xs) + radius, max(ys) + radius))
+
+        pad_labels: Dict[NodeKey, str] = {}
+        for slot, i in sorted(self._pads.get(code, ())):
+            fp = self.footprints[slot]
+            pad = fp.pads[i]
+            node = ("pad", slot, i)
+            sets.add(node)
+            pad_labels[node] = f"{fp.reference}-{pad.number}"
+            core, radius = pad_core(pad)
+            for layer in layers_all:
+                if pad.on_layer(layer):
+                    add_shape(node, layer, core, radius)
+                    anchors.append((node, layer, (pad.x_mm, pad.y_mm)))
+
+        for i in self._tracks.get(code, ()):
+            track = model.tracks[i]
+            if track.layer not in layers_all:
+                continue
+            node = ("track", i)
+            sets.add(node)
+            points = arc_points(track.start, track.mid, track.end) if track.mid is not None else [track.start, track.end]
+            for a, b in zip(points, points[1:]):
+                add_shape(node, track.layer, [a, b], track.width_mm / 2)
+            anchors.extend(((node, track.layer, track.start), (node, track.layer, track.end)))
+
+        for i in self._vias.get(code, ()):
+            via = model.vias[i]
+            node = ("via", i)
+            sets.add(node)
+            for layer in layer_span(via.layers, layers_all):
+                add_shape(node, layer, [(via.x_mm, via.y_mm)], via.size_mm / 2)
+                anchors.append((node, layer, (via.x_mm, via.y_mm)))
+
+        # Endpoint hashing: coincident anchors on one layer share copper
+        seen: Dict[Tuple[str, int, int], NodeKey] = {}
+        for node, layer, point in anchors:
+            key = _hash(layer, point)
+            if key in seen:
+                sets.union(node, seen[key])
+            else:
+                seen[key] = node
+
+        # Anchors landing inside other copper: T-junctions, off-centre pad entries, vias in pads
+        for node, layer, (x, y) in anchors:
+            grid = shapes[layer]
+            for index in grid.candidates((x, y, x, y)):
+                other, _, core, radius = shape_list[index]
+                if other == node or sets.find(other) == sets.find(node):
+                    continue
+                if shape_distance([(x, y)], core)[0] <= radius + TOUCH_TOLERANCE_MM:
+                    sets.union(node, other)
+
+        # Filled zone polygons join all copper they overlap, including pads whose thermal relief leaves the
+        # centre outside the fill; separate fill islands stay separate
+        for i in self._zones.get(code, ()):
+            for layer, polygons in model.zones[i].filled.items():
+                grid = shapes.get(layer)
+                for k, polygon in enumerate(polygons):
+                    if len(polygon) < 3:
+                        continue
+                    node = ("zone", i, layer, k)
+                    sets.add(node)
+                    if grid is None:
+                        continue
+                    fill = _FillPolygon(polygon)
+                    for index in grid.candidates(fill.box):
+                        other, _, core, radius = shape_list[index]
+                        if sets.find(other) != sets.find(node) and fill.touches(core, radius):
+                            sets.union(node, other)
+
+        islands, dangling = [], 0
+        for group in sets.groups():
+            pads = sorted(pad_labels[node] for node in group if node in pad_labels)
+            if pads:
+                islands.append(pads)
+            else:
+                dangling += 1
+        islands.sort(key=lambda pads: (-len(pads), pads))
+        return {
+            "net_code": code,
+            "net_name": model.net_name(code),
+            "pad_count": len(pad_labels),
+            "island_count": len(islands),
+            "routed": len(islands) <= 1,
+            "islands": islands,
+            "unconnected_pads": [pad for island in islands[1:] for pad in island],
+            "dangling_islands": dangling,
+        }
+
+    def nets(self) -> Dict[int, Dict]:
+        """Connectivity of every net, rebuilding only nets marked since the last call"""
+        for code in self._dirty:
+            self._nets[code] = self._build_net(code)
+        self.rebuilt = len(self._dirty)
+        self._dirty = set()
+        return self._nets
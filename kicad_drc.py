@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+KiCad DRC - Design rule checks over the backend-neutral board model
+Copper clearance, track width, drill size and annular ring, using a per-layer spatial hash
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from kicad_board_model import BBox, BoardModel, Footprint, FootprintSlots, Pad, Point, Track, Via, arc_points, rotate_point
+from kicad_geometry import shape_distance
+from kicad_spatial_index import SpatialGrid, bboxes_overlap
+
+SEVERITY_LEVELS = ("error", "warning", "all")
+
+DEFAULT_SEVERITIES = {
+    "clearance": "error",
+    "track_width": "error",
+    "drill_size": "error",
+    "annular_ring": "warning",
+}
+
+ItemKey = Tuple[Hashable, ...]
+ViolationKey = Tuple[Hashable, ...]  # (type, item key[, item key])
+
+_SEVERITY_ORDER = {"error": 0, "warning": 1}
+
+
+@dataclass
+class DesignRules:
+    """Board-wide limits in millimeters"""
+    clearance_mm: float = 0.2
+    min_track_width_mm: float = 0.15
+    min_drill_mm: float = 0.3
+    min_annular_ring_mm: float = 0.1
+    severities: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_SEVERITIES))
+
+
+@dataclass
+class CopperItem:
+    """A piece of copper: a point, segment or convex polygon core grown by a radius"""
+    kind: str  # "track", "via" or "pad"
+    label: str
+    net_code: int
+    layers: Tuple[str, ...]
+    core: List[Point]
+    radius: float
+    group: Optional[Hashable] = None  # Pieces of one arc track share a group and are never tested together
+
+    def bbox(self) -> BBox:
+        xs = [p[0] for p in self.core]
+        ys = [p[1] for p in self.core]
+        r = self.radius
+        return min(xs) - r, min(ys) - r, max(xs) + r, max(ys) + r
+
+
+def filter_by_severity(violations: List[Dict], severity_level: str) -> List[Dict]:
+    """Keep violations at or above the given level ('error' drops warnings)"""
+    if severity_level not in SEVERITY_LEVELS:
+        raise ValueError(f"Unknown severity level '{severity_level}' (expected one of: {', '.join(SEVERITY_LEVELS)})")
+    if severity_level == "error":
+        return [v for v in violations if v["severity"] == "error"]
+    return violations
+
+
+def pad_core(pad: Pad) -> Tuple[List[Point], float]:
+    """Core shape and radius of a pad; rectangles and trapezoids use their bounding rectangle"""
+    w, h = pad.width_mm, pad.height_mm
+    if pad.shape == "circle":
+        return [(pad.x_mm, pad.y_mm)], w / 2
+
+    if pad.shape == "oval":
+        radius = min(w, h) / 2
+        hx, hy = (w / 2 - radius, 0.0) if w >= h else (0.0, h / 2 - radius)
+    elif pad.shape == "roundrect":
+        radius = pad.roundrect_rratio * min(w, h)
+        hx, hy = w / 2 - radius, h / 2 - radius
+    else:
+        radius = 0.0
+        hx, hy = w / 2, h / 2
+
+    local = [(-hx, -hy), (hx, -hy), (hx, hy), (-hx, hy)] if hx > 1e-9 and hy > 1e-9 else \
+        [(-hx, -hy), (hx, hy)]
+    core = []
+    for lx, ly in local:
+        rx, ry = rotate_point(lx, ly, pad.rotation_deg)
+        core.append((pad.x_mm + rx, pad.y_mm + ry))
+    return core, radius
+
+
+def layer_span(layers: Iterable[str], copper_layers: List[str]) -> Tuple[str, ...]:
+    """Copper layers between a via's two end layers"""
+    indexes = [copper_layers.index(layer) for layer in layers if layer in copper_layers]
+    if not indexes:
+        return ()
+    return tuple(copper_layers[min(indexes):max(indexes) + 1])
+
+
+class DrcEngine:
+    """Runs the checks and keeps the copper items, per-layer grids and violations between runs"""
+
+    def __init__(self, model: BoardModel, rules: Optional[DesignRules] = None):
+        self.model = model
+        self.rules = rules or DesignRules()
+        self.items: Dict[ItemKey, CopperItem] = {}
+        self.footprints = FootprintSlots(model.footprints)  # Pads are keyed by slot, so shared references stay apart
+        self._violations: Dict[ViolationKey, Dict] = {}
+        self._item_violations: Dict[ItemKey, Set[ViolationKey]] = {}
+        self._pad_keys: Dict[int, List[ItemKey]] = {}
+
+        for slot, fp in enumerate(self.footprints.items):
+            pads = self._pad_items(slot, fp)
+            self.items.update(pads)
+            self._pad_keys[slot] = list(pads)
+        for i, track in enumerate(model.tracks):
+            self.items.update(self._track_items(i, track))
+        for i, via in enumerate(model.vias):
+            self.items[("via", i)] = self._via_item(via)
+
+        boxes = {key: item.bbox() for key, item in self.items.items()}
+        extents = sorted(max(b[2] - b[0], b[3] - b[1]) for b in boxes.values())
+        cell = max(2 * extents[len(extents) // 2], 4 * self.rules.clearance_mm, 0.1) if extents else 1.0
+        self.grids: Dict[str, SpatialGrid] = {layer: SpatialGrid(cell) for layer in model.copper_layers}
+        for key, item in self.items.items():
+            for layer in item.layers:
+                self.grids[layer].insert(key, boxes[key])
+
+    # ------------------------------------------------------------------
+    # Copper items
+    # ------------------------------------------------------------------
+
+    def _pad_items(self, slot: int, fp: Footprint) -> Dict[ItemKey, CopperItem]:
+        items = {}
+        for i, pad in enumerate(fp.pads):
+            layers = tuple(layer for layer in self.model.copper_layers if pad.on_layer(layer))
+            if not layers or pad.width_mm <= 0 or pad.height_mm <= 0:
+                continue
+            core, radius = pad_core(pad)
+            net = f" [{pad.net_name}]" if pad.net_name else ""
+            items[("pad", slot, i)] = CopperItem("pad", f"pad {fp.reference}-{pad.number}{net}",
+                                                  pad.net_code, layers, core, radius)
+        return items
+
+    def _track_items(self, index: int, track: Track) -> Dict[ItemKey, CopperItem]:
+        if track.layer not in self.model.copper_layers:
+            return {}
+        points = arc_points(track.start, track.mid, track.end) if track.mid is not None else [track.start, track.end]
+        net = f" [{track.net_name}]" if track.net_name else ""
+        return {
+            ("track", index, j): CopperItem("track", f"track{net}", track.net_code, (track.layer,),
+                                            [a, b], track.width_mm / 2, group=("track", index))
+            for j, (a, b) in enumerate(zip(points, points[1:]))
+        }
+
+    def _via_item(self, via: Via) -> CopperItem:
+        net = f" [{via.net_name}]" if via.net_name else ""
+        return CopperItem("via", f"via{net}", via.net_code, layer_span(via.layers, self.model.copper_layers),
+                          [(via.x_mm, via.y_mm)], via.size_mm / 2)
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+
+    def _violation(self, kind: str, description: str, position: Point, items: List[str],
+                   layer: Optional[str] = None, **values) -> Dict:
+        violation = {
+            "type": kind,
+            "severity": self.rules.severities.get(kind, "error"),
+            "description": description,
+            "items": items,
+            "x_mm": round(position[0], 4),
+            "y_mm": round(position[1], 4),
+        }
+        if layer is not None:
+            violation["layer"] = layer
+        violation.update({name: round(value, 4) for name, value in values.items()})
+        return violation
+
+    def _record(self, key: ViolationKey, violation: Dict) -> None:
+        self._violations[key] = violation
+        for item_key in key[1:]:
+            self._item_violations.setdefault(item_key, set()).add(key)
+
+    def _forget(self, item_key: ItemKey) -> Dict[ViolationKey, Dict]:
+        """Drop and return every violation involving an item"""
+        dropped = {}
+        for key in self._item_violations.pop(item_key, ()):
+            violation = self._violations.pop(key, None)
+            if violation is None:
+                continue
+            dropped[key] = violation
+            for other in key[1:]:
+                if other != item_key and other in self._item_violations:
+                    self._item_violations[other].discard(key)
+        return dropped
+
+    def _check_item(self, key: ItemKey) -> None:
+        """Single-item rules: track width, drill size and annular ring"""
+        rules = self.rules
+        item = self.items[key]
+        position = item.core[0]
+
+        if item.kind == "track" and key[2] == 0:
+            width = self.model.tracks[key[1]].width_mm
+            if width < rules.min_track_width_mm - 1e-9:
+                self._record(("track_width", key), self._violation(
+                    "track_width", f"Track width {width:.3f} mm < {rules.min_track_width_mm:.3f} mm",
+                    position, [item.label], item.layers[0], actual_mm=width, required_mm=rules.min_track_width_mm))
+            return
+
+        if item.kind == "via":
+            via = self.model.vias[key[1]]
+            size, drill, plated = via.size_mm, via.drill_mm, True
+        elif item.kind == "pad":
+            pad = self._pad(key)
+            size, drill = min(pad.width_mm, pad.height_mm), pad.drill_mm
+            plated = pad.pad_type == "thru_hole"
+            if drill <= 0:
+                return
+        else:
+            return
+
+        if drill < rules.min_drill_mm - 1e-9:
+            self._record(("drill_size", key), self._violation(
+                "drill_size", f"Drill {drill:.3f} mm < {rules.min_drill_mm:.3f} mm",
+                position, [item.label], actual_mm=drill, required_mm=rules.min_drill_mm))
+        ring = (size - drill) / 2
+        if plated and ring < rules.min_annular_ring_mm - 1e-9:
+            self._record(("annular_ring", key), self._violation(
+                "annular_ring", f"Annular ring {ring:.3f} mm < {rules.min_annular_ring_mm:.3f} mm",
+                position, [item.label], actual_mm=ring, required_mm=rules.min_annular_ring_mm))
+
+    def _pad(self, key: ItemKey) -> Pad:
+        return self.footprints[key[1]].pads[key[2]]
+
+    def _check_pair(self, key_a: ItemKey, key_b: ItemKey, layer: str) -> None:
+        """Clearance between two items, reported once on the first copper layer they share"""
+        a, b = self.items[key_a], self.items[key_b]
+        if a.net_code and a.net_code == b.net_code:
+            return
+        if a.group is not None and a.group == b.group:
+            return
+        shared = next(l for l in self.model.copper_layers if l in a.layers and l in b.layers)
+        if shared != layer:
+            return
+
+        distance, pa, pb = shape_distance(a.core, b.core)
+        self.record_clearance(key_a, key_b, layer, max(distance - a.radius - b.radius, 0.0), pa, pb)
+
+    def record_clearance(self, key_a: ItemKey, key_b: ItemKey, layer: str, gap: float, pa: Point, pb: Point) -> None:
+        """Record a clearance violation for a measured gap (nothing when the gap is legal)"""
+        a, b = self.items[key_a], self.items[key_b]
+        clearance = self.rules.clearance_mm
+        if gap < clearance - 1e-9:
+            if (b.label, key_b) < (a.label, key_a):  # Reported in label order, whatever the footprints' slots
+                key_a, key_b, a, b = key_b, key_a, b, a
+            violation = self._violation(
+                "clearance", f"Clearance {gap:.3f} mm < {clearance:.3f} mm between {a.label} and {b.label}",
+                ((pa[0] + pb[0]) / 2, (pa[1] + pb[1]) / 2), [a.label, b.label], layer,
+                actual_mm=gap, required_mm=clearance)
+            violation["kind"] = "-".join(sorted((a.kind, b.kind)))
+            self._record(("clearance", key_a, key_b), violation)
+
+    def _neighbours(self, key: ItemKey, layer: str) -> List[ItemKey]:
+        grid = self.grids[layer]
+        box = grid.bbox(key)
+        c = self.rules.clearance_mm
+        inflated = (box[0] - c, box[1] - c, box[2] + c, box[3] + c)
+        return [other for other in grid.candidates(inflated)
+                if other != key and bboxes_overlap(grid.bbox(other), inflated)]
+
+    def check_items(self) -> None:
+        """Forget all violations and apply the single-item rules"""
+        self._violations = {}
+        self._item_violations = {}
+        for key in self.items:
+            self._check_item(key)
+
+    def run(self) -> List[Dict]:
+        """Check the whole board"""
+        self.check_items()
+        for layer, grid in self.grids.items():
+            for key, _ in grid.items():
+                for other in self._neighbours(key, layer):
+                    if key < other:
+                        self._check_pair(key, other, layer)
+        return self.violations()
+
+    def update_footprints(self, footprints: Iterable[Footprint]) -> Tuple[List[Dict], List[Dict]]:
+        """Re-check only moved footprints' pads against their neighbours
+
+        Returns (new violations, cleared violations). Footprints may be the already-moved model objects or
+        fresh copies of them, matched as FootprintSlots.replace() does: pass every copy of a shared reference.
+        """
+        before: Dict[ViolationKey, Dict] = {}
+        touched: List[ItemKey] = []
+        for slot, _ in self.footprints.replace(footprints):
+            for key in self._pad_keys.pop(slot, []):
+                before.update(self._forget(key))
+                for layer in self.items.pop(key).layers:
+                    self.grids[layer].remove(key)
+
+            pads = self._pad_items(slot, self.footprints[slot])
+            self._pad_keys[slot] = list(pads)
+            for key, item in pads.items():
+                self.items[key] = item
+                box = item.bbox()
+                for layer in item.layers:
+                    self.grids[layer].insert(key, box)
+            touched.extend(pads)
+
+        checked = set()
+        for key in touched:
+            self._check_item(key)
+            for layer in self.items[key].layers:
+                for other in self._neighbours(key, layer):
+                    pair = (key, other) if key < other else (other, key)
+                    if (pair, layer) not in checked:
+                        checked.add((pair, layer))
+                        self._check_pair(pair[0], pair[1], layer)
+
+        after = {key: self._violations[key] for item in touched for key in self._item_violations.get(item, ())}
+        added = [v for key, v in after.items() if key not in before]
+        cleared = [v for key, v in before.items() if key not in after]
+        return _sorted(added), _sorted(cleared)
+
+    def violations(self) -> List[Dict]:
+        """Current violations, errors first"""
+        return _sorted(self._violations.values())
+
+
+def _sorted(violations: Iterable[Dict]) -> List[Dict]:
+    return sorted(violations, key=lambda v: (_SEVERITY_ORDER.get(v["severity"], 2), v["type"], v["y_mm"], v["x_mm"]))
+
+
+def run_drc(model: BoardModel, rules: Optional[DesignRules] = None) -> List[Dict]:
+    """One-shot DRC of a board model"""
+    return DrcEngine(model, rules).run()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+KiCad Parallel DRC - Clearance checks split per copper layer and board tile
+Copper geometry is packed once into shared memory and checked on a process pool
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from kicad_board_model import BBox, Point
+from kicad_drc import DrcEngine, ItemKey
+from kicad_geometry import shape_distance
+from kicad_spatial_index import SpatialGrid, bboxes_overlap
+
+# (shared memory name, {field: (offset, shape, dtype)})
+SharedLayout = Tuple[str, Dict[str, Tuple[int, Tuple[int, ...], str]]]
+
+# (layer index, tile column, tile row, board origin, tile size, tile count per side)
+Tile = Tuple[int, int, int, Point, Tuple[float, float], Tuple[int, int]]
+
+# (item index a, item index b, layer index, gap, point on a, point on b)
+ClearanceHit = Tuple[int, int, int, float, Point, Point]
+
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]] = {}
+
+
+def default_workers() -> int:
+    """Worker count from KICAD_MCP_DRC_WORKERS, else 1 (serial)"""
+    value = os.environ.get("KICAD_MCP_DRC_WORKERS", "").strip()
+    if value.lower() == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value)) if value else 1
+
+
+def pack_items(engine: DrcEngine) -> Tuple[List[ItemKey], Dict[str, np.ndarray]]:
+    """Copper items as flat arrays, in key order so index order matches the serial pair order
+
+    Arrays: bbox (n x 4), radius, net, group (-1 outside arc tracks), layers (bit i for copper
+    layer i), core_start (n + 1 offsets) and points (core vertices, m x 2).
+    """
+    keys = sorted(engine.items)
+    layer_bits = {layer: 1 << i for i, layer in enumerate(engine.model.copper_layers)}
+    groups: Dict = {}
+    n = len(keys)
+    arrays = {
+        "bbox": np.empty((n, 4)),
+        "radius": np.empty(n),
+        "net": np.empty(n, dtype=np.int64),
+        "group": np.full(n, -1, dtype=np.int64),
+        "layers": np.zeros(n, dtype=np.int64),
+        "core_start": np.zeros(n + 1, dtype=np.int64),
+    }
+    points: List[Point] = []
+    for i, key in enumerate(keys):
+        item = engine.items[key]
+        arrays["bbox"][i] = item.bbox()
+        arrays["radius"][i] = item.radius
+        arrays["net"][i] = item.net_code
+        if item.group is not None:
+            arrays["group"][i] = groups.setdefault(item.group, len(groups))
+        arrays["layers"][i] = sum(layer_bits[layer] for layer in item.layers)
+        points.extend(item.core)
+        arrays["core_start"][i + 1] = len(points)
+    arrays["points"] = np.array(points, dtype=np.float64).reshape(-1, 2)
+    return keys, arrays
+
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, SharedLayout]:
+    """Copy arrays into one shared memory block; workers map them back without copying"""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = (offset + 7) // 8 * 8
+        layout[name] = (offset, array.shape, array.dtype.str)
+        offset += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        start, shape, dtype = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = array
+    return block, (block.name, layout)
+
+
+def _attach(shared: SharedLayout) -> Dict[str, np.ndarray]:
+    """Views over a shared block, mapped once per worker process"""
+    name, layout = shared
+    if name not in _attached:
+        block = shared_memory.SharedMemory(name=name)
+        views = {field: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+                 for field, (start, shape, dtype) in layout.items()}
+        _attached.clear()
+        _attached[name] = (block, views)
+    return _attached[name][1]
+
+
+def plan_tiles(bounds: BBox, layers: int, workers: int, tiles: Optional[int] = None) -> List[Tile]:
+    """Split every copper layer into a tiles x tiles grid (about four tasks per worker by default)"""
+    if tiles is None:
+        tiles = max(1, math.ceil(math.sqrt(4 * workers / max(layers, 1))))
+    x1, y1, x2, y2 = bounds
+    size = (max(x2 - x1, 1e-6) / tiles, max(y2 - y1, 1e-6) / tiles)
+    return [(layer, tx, ty, (x1, y1), size, (tiles, tiles))
+            for layer in range(layers) for ty in range(tiles) for tx in range(tiles)]
+
+
+def _owner(x: float, y: float, tile: Tile) -> Tuple[int, int]:
+    _, _, _, (ox, oy), (sx, sy), (nx, ny) = tile
+    return min(max(int((x - ox) // sx), 0), nx - 1), min(max(int((y - oy) // sy), 0), ny - 1)
+
+
+def check_tile(shared: SharedLayout, tile: Tile, clearance: float, cell_size: float) -> List[ClearanceHit]:
+    """Clearance hits for the pairs this tile owns on its layer
+
+    A pair belongs to the tile holding (max of the two left edges, max of the two top edges),
+    which lies inside both clearance-inflated boxes; pairs straddling a seam are measured once.
+    """
+    arrays = _attach(shared)
+    layer, tx, ty, (ox, oy), (sx, sy), _ = tile
+    bit = 1 << layer
+    box = arrays["bbox"]
+    left, top = ox + tx * sx - clearance, oy + ty * sy - clearance
+    right, bottom = left + sx + 2 * clearance, top + sy + 2 * clearance
+    mask = ((arrays["layers"] & bit) != 0) & (box[:, 0] <= right) & (box[:, 2] >= left) & \
+        (box[:, 1] <= bottom) & (box[:, 3] >= top)
+    selected = np.flatnonzero(mask)
+
+    # Plain lists for the tile's items: per-pair numpy scalar access would dominate
+    index = selected.tolist()
+    boxes = box[selected].tolist()
+    nets = arrays["net"][selected].tolist()
+    groups = arrays["group"][selected].tolist()
+    layers = arrays["layers"][selected].tolist()
+    radius = arrays["radius"][selected].tolist()
+    starts, points = arrays["core_start"], arrays["points"]
+
+    def core(k: int) -> List[Point]:
+        return [tuple(p) for p in points[starts[index[k]]:starts[index[k] + 1]].tolist()]
+
+    grid = SpatialGrid(cell_size)
+    for k, b in enumerate(boxes):
+        grid.insert(k, tuple(b))
+
+    hits = []
+    for a, ba in enumerate(boxes):
+        inflated = (ba[0] - clearance, ba[1] - clearance, ba[2] + clearance, ba[3] + clearance)
+        for b in grid.candidates(inflated):
+            if b <= a or not bboxes_overlap(boxes[b], inflated):
+                continue
+            if nets[a] and nets[a] == nets[b]:
+                continue
+            if groups[a] >= 0 and groups[a] == groups[b]:
+                continue
+            shared_layers = layers[a] & layers[b]
+            if shared_layers & -shared_layers != bit:
+                continue  # Reported on the first shared layer only
+            bb = boxes[b]
+            if _owner(max(ba[0], bb[0]), max(ba[1], bb[1]), tile) != (tx, ty):
+                continue
+            distance, pa, pb = shape_distance(core(a), core(b))
+            gap = max(distance - radius[a] - radius[b], 0.0)
+            if gap < clearance - 1e-9:
+                hits.append((index[a], index[b], layer, gap, pa, pb))
+    return hits
+
+
+def run_parallel(engine: DrcEngine, workers: int, tiles: Optional[int] = None) -> List[Dict]:
+    """Full DRC with the clearance pass spread over `workers` processes
+
+    Gives the same violations as DrcEngine.run(); single-item rules stay in this process. Workers are spawned
+    rather than forked, since a forked copy of a process holding pcbnew (and wx) state is not safe to use.
+    """
+    engine.check_items()
+    if not engine.items:
+        return engine.violations()
+
+    keys, arrays = pack_items(engine)
+    box = arrays["bbox"]
+    bounds = (float(box[:, 0].min()), float(box[:, 1].min()), float(box[:, 2].max()), float(box[:, 3].max()))
+    layers = engine.model.copper_layers
+    cell_size = next(iter(engine.grids.values())).cell_size if engine.grids else 1.0
+    plan = plan_tiles(bounds, len(layers), workers, tiles)
+
+    block, shared = share_arrays(arrays)
+    try:
+        clearance = engine.rules.clearance_mm
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [executor.submit(check_tile, shared, tile, clearance, cell_size) for tile in plan]
+            for future in futures:
+                for i, j, layer, gap, pa, pb in future.result():
+                    engine.record_clearance(keys[i], keys[j], layers[layer], gap, pa, pb)
+    finally:
+        block.close()
+        block.unlink()
+    return engine.violations()
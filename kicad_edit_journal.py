@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+KiCad Edit Journal - Undo/redo history of footprint pose changes
+Each step keeps only (reference, pose before, pose after) for the footprints it touched
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+MAX_STEPS = 100
+
+FootprintPose = Tuple[float, float, float, str]  # x_mm, y_mm, rotation_deg, side layer
+Change = Tuple[str, FootprintPose, FootprintPose]  # reference, before, after
+
+
+@dataclass
+class EditStep:
+    label: str
+    changes: List[Change]
+
+
+@dataclass
+class EditSession:
+    """An open begin_edit session: its label and the zone fills queued until commit"""
+    label: str
+    zone_fills: List[Optional[List[str]]] = field(default_factory=list)
+
+
+class EditJournal:
+    """Pending changes of the edit in progress plus undo and redo stacks of sealed steps
+
+    Recording the same footprint twice before a seal keeps its first `before` and last `after`, so a step
+    holds one diff per footprint however often it moved. Footprints that end where they started are dropped.
+    """
+
+    def __init__(self, max_steps: int = MAX_STEPS):
+        self.max_steps = max_steps
+        self.undo_steps: List[EditStep] = []
+        self.redo_steps: List[EditStep] = []
+        self._pending: Dict[str, List[FootprintPose]] = {}
+
+    def record(self, reference: str, before: FootprintPose, after: FootprintPose) -> None:
+        entry = self._pending.get(reference)
+        if entry is None:
+            self._pending[reference] = [before, after]
+        else:
+            entry[1] = after
+
+    def pending(self) -> List[Change]:
+        """Changes recorded since the last seal, in first-touched order"""
+        return [(reference, before, after) for reference, (before, after) in self._pending.items() if before != after]
+
+    def seal(self, label: str) -> Optional[EditStep]:
+        """Close the pending changes into an undo step (none when nothing changed); clears the redo stack"""
+        changes = self.pending()
+        self._pending.clear()
+        if not changes:
+            return None
+        step = EditStep(label, changes)
+        self.undo_steps.append(step)
+        del self.undo_steps[:-self.max_steps]
+        self.redo_steps.clear()
+        return step
+
+    def discard(self) -> List[Change]:
+        """Drop the pending changes, returning them so the caller can put the footprints back"""
+        changes = self.pending()
+        self._pending.clear()
+        return changes
+
+    def undo(self) -> Optional[EditStep]:
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        self.redo_steps.append(step)
+        return step
+
+    def redo(self) -> Optional[EditStep]:
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        return step
+
+    def clear(self) -> None:
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self._pending.clear()
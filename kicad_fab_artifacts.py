@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+KiCad Fabrication Artifacts - Content-addressed store of Gerber, job, drill, BOM and position outputs
+Each output is keyed by a hash of the board items it reads, so unchanged ones are copied instead of regenerated
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from kicad_pcb_parser import iter_sexpr
+
+ARTIFACT_VERSION = 1  # Bump when the plot, drill or CSV settings change
+STORE_DIR_NAME = ".kicad_mcp_artifacts"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Plotting a layer also reads these layers: silkscreen is clipped by the solder mask openings
+LAYER_DEPENDENCIES = {"F.SilkS": ("F.Mask",), "B.SilkS": ("B.Mask",)}
+
+# Top-level nodes that can change any output (stackup, plot settings, net names)
+COMMON_NODES = ("version", "generator", "generator_version", "general", "paper", "title_block", "layers",
+                "setup", "property", "net")
+
+
+def layer_matches(token: str, layer: str) -> bool:
+    """Whether a layer token of an item ('F.Cu', '*.Cu', 'F&B.Cu') covers a layer"""
+    if token == layer:
+        return True
+    if token.startswith("*."):
+        return layer.endswith(token[1:])
+    if token.startswith("F&B."):
+        return layer in ("F." + token[4:], "B." + token[4:])
+    return False
+
+
+def _layer_tokens(node: list) -> Set[str]:
+    """Atoms of every (layer ...) and (layers ...) node inside a node"""
+    tokens: Set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current and current[0] in ("layer", "layers"):
+            tokens.update(atom for atom in current[1:] if isinstance(atom, str))
+        stack.extend(child for child in current[1:] if isinstance(child, list))
+    return tokens
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def _has_drill(node: list) -> bool:
+    return any(isinstance(child, list) and child and child[0] == "drill" for child in node)
+
+
+class BoardItems:
+    """Top-level items of a .kicad_pcb grouped by the fabrication output that reads them
+
+    Footprints are split into their header (lib id, position, side, attributes) and their layered children
+    (pads, graphics, text), each child hashed together with the header, so a part only touches the keys of the
+    layers it draws on. Text fields alone feed the BOM; fields, position and side feed the position file.
+    """
+
+    def __init__(self):
+        self.common: List[str] = []
+        self.layered: List[Tuple[Set[str], str]] = []
+        self.holes: List[str] = []
+        self.fields: List[str] = []
+        self.placements: List[str] = []
+
+    @classmethod
+    def from_file(cls, path: str) -> "BoardItems":
+        items = cls()
+        with open(path, encoding="utf-8") as f:
+            nodes = iter_sexpr(f)
+            next(nodes, None)  # Root header
+            for node in nodes:
+                items.add(node)
+        return items
+
+    def add(self, node: list) -> None:
+        kind = node[0] if node else ""
+        if kind in ("footprint", "module"):
+            self._add_footprint(node)
+            return
+        tokens = {"*.Cu"} if kind == "via" else _layer_tokens(node)
+        if kind in COMMON_NODES or not tokens:
+            self.common.append(_digest(node))
+            return
+        digest = _digest(node)
+        self.layered.append((tokens, digest))
+        if kind == "via":
+            self.holes.append(digest)
+
+    def _add_footprint(self, node: list) -> None:
+        header, children = [], []
+        for child in node[1:]:
+            if isinstance(child, list) and child and child[0] != "layer" and _layer_tokens(child):
+                children.append(child)
+            else:
+                header.append(child)
+        header_digest = _digest(header)
+        for child in children:
+            digest = _digest(header_digest, child)
+            self.layered.append((_layer_tokens(child), digest))
+            if child[0] == "pad" and _has_drill(child):
+                self.holes.append(digest)
+
+        fields = [node[1] if len(node) > 1 else ""]
+        fields += [child[:3] for child in children + header
+                   if isinstance(child, list) and child and child[0] in ("property", "fp_text", "attr")]
+        placement = [child for child in header if isinstance(child, list) and child and child[0] in ("at", "layer")]
+        self.fields.append(_digest(fields))
+        self.placements.append(_digest(fields, placement))
+
+    def gerber_key(self, layer: str, board_name: str) -> str:
+        layers = (layer,) + LAYER_DEPENDENCIES.get(layer, ())
+        touching = [digest for tokens, digest in self.layered
+                    if any(layer_matches(token, name) for token in tokens for name in layers)]
+        return _digest(ARTIFACT_VERSION, "gerber", board_name, layer, self.common, touching)
+
+    def job_key(self, board_name: str, gerber_keys: Sequence[str]) -> str:
+        """The job file lists the plotted Gerbers, and reads the stackup and outline their keys already cover"""
+        return _digest(ARTIFACT_VERSION, "gbrjob", board_name, self.common, list(gerber_keys))
+
+    def drill_key(self, board_name: str) -> str:
+        return _digest(ARTIFACT_VERSION, "drill", board_name, self.common, self.holes)
+
+    def bom_key(self) -> str:
+        return _digest(ARTIFACT_VERSION, "bom", self.fields)
+
+    def position_key(self) -> str:
+        return _digest(ARTIFACT_VERSION, "position", self.placements)
+
+
+class ArtifactStore:
+    """Output files by key under <root>/<key[:2]>/<key>/, least recently used entries pruned past a size cap"""
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def restore(self, key: str, dest_dir: str) -> Optional[List[str]]:
+        """Copy a stored artifact's files into dest_dir and return their names, or None on a miss"""
+        entry = self._entry(key)
+        if not entry.is_dir():
+            return None
+        Path(dest_dir).mkdir(parents=True, exist_ok=True)
+        names = sorted(path.name for path in entry.iterdir())
+        for name in names:
+            shutil.copyfile(entry / name, Path(dest_dir) / name)
+        os.utime(entry)  # Mark as recently used
+        return names
+
+    def put(self, key: str, paths: Iterable[str]) -> None:
+        """Store files under a key; the entry appears whole or not at all"""
+        entry = self._entry(key)
+        if entry.is_dir():
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=entry.parent)
+        for path in paths:
+            shutil.copyfile(path, os.path.join(staging, os.path.basename(path)))
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)  # Another export stored the same key first
+
+    def prune(self) -> None:
+        """Drop least recently used entries until the store fits in max_bytes"""
+        entries = []
+        for entry in self.root.glob("??/*"):
+            if entry.is_dir() and not entry.name.startswith(".staging-"):
+                size = sum(path.stat().st_size for path in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def artifact_store(board_path: str) -> Optional[ArtifactStore]:
+    """Store next to the board unless KICAD_MCP_ARTIFACTS=off
+
+    KICAD_MCP_ARTIFACTS may also name the store directory; KICAD_MCP_ARTIFACTS_MAX_MB sets the size cap.
+    """
+    setting = os.environ.get("KICAD_MCP_ARTIFACTS", "")
+    if setting.lower() in ("off", "0", "false", "no"):
+        return None
+    root = setting or str(Path(board_path or ".").resolve().parent / STORE_DIR_NAME)
+    max_mb = float(os.environ.get("KICAD_MCP_ARTIFACTS_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+    return ArtifactStore(root, int(max_mb * 1024 * 1024))
+
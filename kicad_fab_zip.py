@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+KiCad Fabrication ZIP - Deterministic in-memory ZIP archives with parallel member compression
+Members are deflated on a thread pool as they are added, then written in name order with fixed metadata
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+COMPRESS_LEVEL = 6
+PARALLEL_THRESHOLD = 64 * 1024  # Members at least this big are deflated on the pool; smaller ones inline
+ZIP_STORED, ZIP_DEFLATED = 0, 8
+MAX_ZIP_SIZE = 0xFFFFFFFF  # No ZIP64: every size and offset must fit in 32 bits
+
+# Every member is dated 1980-01-01 00:00:00 (the DOS epoch) and marked as a regular rw-r--r-- file
+_DOS_TIME, _DOS_DATE = 0, (1 << 5) | 1
+_EXTERNAL_ATTR = 0o100644 << 16
+_VERSION = 20
+_MADE_BY = (3 << 8) | _VERSION  # Unix
+
+# (method, crc32, uncompressed size, payload)
+Member = Tuple[int, int, int, bytes]
+
+
+def deflate_member(data: bytes, level: int = COMPRESS_LEVEL) -> Member:
+    """Raw-deflate one member, keeping it stored when deflate would not make it smaller"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    payload = compressor.compress(data) + compressor.flush()
+    if len(payload) >= len(data):
+        return ZIP_STORED, zlib.crc32(data), len(data), data
+    return ZIP_DEFLATED, zlib.crc32(data), len(data), payload
+
+
+class DeterministicZip:
+    """ZIP archive assembled in memory; identical members give byte-identical archives
+
+    add() starts compressing right away (zlib releases the GIL, so large members deflate concurrently) and the
+    archive is laid out only when it is written: members in name order, fixed timestamps and permissions, no
+    extra fields and no comment.
+    """
+
+    def __init__(self, workers: Optional[int] = None, level: int = COMPRESS_LEVEL,
+                 threshold: int = PARALLEL_THRESHOLD):
+        self.level = level
+        self.threshold = threshold
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zip-deflate")
+        self._members: Dict[str, Union[Member, Future]] = {}
+
+    def __enter__(self) -> "DeterministicZip":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def add(self, arcname: str, data: bytes) -> None:
+        arcname = arcname.replace(os.sep, "/")
+        if arcname in self._members:
+            raise ValueError(f"Duplicate ZIP member '{arcname}'")
+        if len(data) >= self.threshold:
+            self._members[arcname] = self._executor.submit(deflate_member, data, self.level)
+        else:
+            self._members[arcname] = deflate_member(data, self.level)
+
+    def add_file(self, path: Union[str, Path], arcname: str) -> None:
+        self.add(arcname, Path(path).read_bytes())
+
+    def add_tree(self, directory: Union[str, Path], prefix: str) -> None:
+        """Add every file under a directory as prefix/<relative path>"""
+        directory = Path(directory)
+        for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+            self.add_file(path, f"{prefix}/{path.relative_to(directory).as_posix()}")
+
+    def getvalue(self) -> bytes:
+        local, central = bytearray(), bytearray()
+        for name in sorted(self._members):
+            member = self._members[name]
+            method, crc, size, payload = member.result() if isinstance(member, Future) else member
+            encoded = name.encode("utf-8")
+            flags = 0 if encoded.isascii() else 0x800  # UTF-8 names
+            offset = len(local)
+            if offset + len(payload) > MAX_ZIP_SIZE or size > MAX_ZIP_SIZE:
+                raise ValueError("Fabrication ZIP larger than 4 GB")
+            local += struct.pack("<IHHHHHIIIHH", 0x04034B50, _VERSION, flags, method, _DOS_TIME, _DOS_DATE,
+                                 crc, len(payload), size, len(encoded), 0)
+            local += encoded + payload
+            central += struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, _MADE_BY, _VERSION, flags, method,
+                                   _DOS_TIME, _DOS_DATE, crc, len(payload), size, len(encoded), 0, 0, 0, 0,
+                                   _EXTERNAL_ATTR, offset)
+            central += encoded
+        end = struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(self._members), len(self._members), len(central),
+                          len(local), 0)
+        return bytes(local + central + end)
+
+    def write(self, path: Union[str, Path]) -> str:
+        """Write the archive (through a temporary file, so readers never see half of it); returns its SHA-256"""
+        data = self.getvalue()
+        staging = f"{path}.partial"
+        with open(staging, "wb") as f:
+            f.write(data)
+        os.replace(staging, path)
+        return hashlib.sha256(data).hexdigest()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
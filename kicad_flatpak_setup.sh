@@ -83,13 +83,14 @@ echo "======================================================================"
 echo
 
 # Install required packages
-echo "Installing: mcp, anthropic, python-dotenv"
+echo "Installing: mcp, anthropic, python-dotenv, numpy"
 echo
 
 flatpak run --command=python3 "$FLATPAK_ID" -m pip install --user --upgrade \
     mcp \
     anthropic \
-    python-dotenv
+    python-dotenv \
+    numpy
 
 echo
 echo "======================================================================"
@@ -98,7 +99,7 @@ echo "======================================================================"
 echo
 
 # Verify each package
-PACKAGES=("mcp" "anthropic" "dotenv")
+PACKAGES=("mcp" "anthropic" "dotenv" "numpy")
 ALL_OK=true
 
 for pkg in "${PACKAGES[@]}"; do
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+KiCad Force Place - Draft placement from net clusters and a force-directed layout
+Groups components that share nets, spreads the groups over the board, then relaxes springs against overlap
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from kicad_autoplace import concat_ranges, local_box
+from kicad_board_model import BBox, Footprint
+from kicad_placement import PlacementNetlist, rotate_offsets
+
+# Nets spanning more components than this (supplies, ground) neither join clusters nor pull parts together
+MAX_NET_COMPONENTS = 16
+LABEL_ROUNDS = 30
+ITERATIONS = 150
+SETTLE_PASSES = 100
+CLUSTER_PULL = 0.5   # Spring to the cluster centroid, relative to a unit-weight net edge
+TARGET_DENSITY = 0.6      # Share of a bin that courtyards may cover before spreading widens it
+SEPARATION_MARGIN = 0.02  # mm added to each push so separated boxes do not stay in contact
+STEP = 0.5           # Fraction of the way to the spring equilibrium moved per iteration, fading to 0
+
+Edges = Tuple[np.ndarray, np.ndarray, np.ndarray]  # (component, component, weight) with the first index lower
+
+
+def weighted_bincount(index: np.ndarray, weights: np.ndarray, length: int) -> np.ndarray:
+    """np.bincount with weights, as floats even when there is nothing to count (bincount then gives integers)"""
+    return np.bincount(index, weights, minlength=length).astype(np.float64, copy=False)
+
+
+def component_graph(netlist: PlacementNetlist, max_net_components: int = MAX_NET_COMPONENTS) -> Edges:
+    """Clique model of the netlist: each net of k components adds 1/(k - 1) to every pair it joins"""
+    n = len(netlist.references)
+    keys = np.unique(netlist.pad_net * n + netlist.pad_comp)
+    net, comp = keys // n, keys % n
+    sizes = np.bincount(net, minlength=len(netlist.net_codes))
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    u, v, w = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0)]
+    for k in range(2, max_net_components + 1):
+        nets = np.flatnonzero(sizes == k)
+        if not len(nets):
+            continue
+        members = comp[starts[nets][:, None] + np.arange(k)[None, :]]  # (nets, k), sorted per row
+        a, b = np.triu_indices(k, 1)
+        u.append(members[:, a].ravel())
+        v.append(members[:, b].ravel())
+        w.append(np.full(len(nets) * len(a), 1.0 / (k - 1)))
+    u, v, w = np.concatenate(u), np.concatenate(v), np.concatenate(w)
+
+    pairs, inverse = np.unique(u * n + v, return_inverse=True)
+    return pairs // n, pairs % n, weighted_bincount(inverse, w, len(pairs))
+
+
+def detect_communities(n: int, edges: Edges, rounds: int = LABEL_ROUNDS, seed: int = 0) -> np.ndarray:
+    """Weighted label propagation: each component takes the label its neighbours carry the most weight for
+
+    Half of the components, chosen at random, update per round so labels do not oscillate. Returns
+    labels numbered from 0.
+    """
+    rng = np.random.default_rng(seed)
+    u, v, w = edges
+    source, target, weight = np.concatenate([u, v]), np.concatenate([v, u]), np.concatenate([w, w])
+    labels = np.arange(n)
+    for _ in range(rounds):
+        if not len(source):
+            break
+        keys, inverse = np.unique(source * n + labels[target], return_inverse=True)
+        score = np.bincount(inverse, weight) + rng.random(len(keys)) * 1e-9  # Random tie-break
+        node, label = keys // n, keys % n
+        order = np.lexsort((-score, node))
+        best = order[np.concatenate(([True], node[order][1:] != node[order][:-1]))]
+        proposal = labels.copy()
+        proposal[node[best]] = label[best]
+        if np.array_equal(proposal, labels):
+            break
+        labels = np.where(rng.random(n) < 0.5, proposal, labels)
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def candidate_pairs(cx: np.ndarray, cy: np.ndarray, reach: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index pairs (i < j) whose boxes may overlap, given box centres and centre-to-corner reach
+
+    A uniform grid with cells twice the typical reach finds neighbours in adjacent cells; the few parts
+    that reach further are paired with everything.
+    """
+    n = len(cx)
+    if n < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    cell = max(2 * float(np.percentile(reach, 95)), 1e-3)
+    large = reach > cell / 2 + 1e-6
+    small = np.flatnonzero(~large)
+
+    column = np.floor((cx - cx.min()) / cell).astype(np.int64)
+    row = np.floor((cy - cy.min()) / cell).astype(np.int64) + 1
+    height = int(row.max()) + 2  # Rows padded by one so row - 1 and row + 1 never wrap into a neighbour column
+    key = column[small] * height + row[small]
+    order = np.argsort(key, kind="stable")
+    members, sorted_key = small[order], key[order]
+
+    first, second = [], []
+    for dc, dr in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        wanted = sorted_key + dc * height + dr
+        lo, hi = np.searchsorted(sorted_key, wanted, "left"), np.searchsorted(sorted_key, wanted, "right")
+        if (dc, dr) == (0, 0):
+            lo = np.arange(len(members)) + 1  # Same cell: only later members, each pair once
+        lengths = np.maximum(hi - lo, 0)
+        first.append(np.repeat(members, lengths))
+        second.append(members[concat_ranges(lo, lengths)])
+
+    big = np.flatnonzero(large)
+    for i in big:
+        others = np.flatnonzero(~large | (np.arange(n) > i))
+        first.append(np.full(len(others), i))
+        second.append(others)
+    i, j = np.concatenate(first), np.concatenate(second)
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+class ForceLayout:
+    """Draft positions for a subset of footprints; the others stay where they are and pull on their nets
+
+    Clusters are found by label propagation on the component graph and laid out first as discs sized by
+    their parts' courtyard area. Parts start scattered over their cluster's disc, then each iteration moves
+    them part of the way to the weighted mean of their net neighbours and cluster centroid, and pushes
+    overlapping courtyard boxes apart along the shallower axis. Rotations are kept.
+    """
+
+    def __init__(self, netlist: PlacementNetlist, footprints: Sequence[Footprint], movable: Sequence[int],
+                 outline: Optional[BBox] = None, spacing_mm: float = 0.25, seed: int = 0):
+        self.netlist = netlist
+        self.n = len(footprints)
+        self.movable = np.zeros(self.n, dtype=bool)
+        self.movable[list(movable)] = True
+        self.rng = np.random.default_rng(seed)
+        self.x, self.y = netlist.x.copy(), netlist.y.copy()
+
+        local = np.array([local_box(fp) for fp in footprints], dtype=np.float64).reshape(-1, 4)
+        self.offset_x, self.offset_y = rotate_offsets(local[:, 0], local[:, 1], netlist.rotation)
+        a = np.radians(netlist.rotation)
+        c, s = np.abs(np.cos(a)), np.abs(np.sin(a))
+        hw, hh = local[:, 2] + spacing_mm / 2, local[:, 3] + spacing_mm / 2
+        self.hw, self.hh = hw * c + hh * s, hw * s + hh * c
+        self.side = np.array([fp.layer == "B.Cu" for fp in footprints], dtype=np.int64)
+
+        if outline is None:
+            area = max(float((4 * self.hw * self.hh).sum()) * 2, 1.0)
+            half = math.sqrt(area) / 2
+            cx, cy = (float(self.x.mean()), float(self.y.mean())) if self.n else (0.0, 0.0)
+            outline = (cx - half, cy - half, cx + half, cy + half)
+        self.outline = outline
+
+        self.edges = component_graph(netlist)
+        self.labels = detect_communities(self.n, self.edges, seed=seed)
+        self.cluster_count = int(self.labels.max()) + 1 if self.n else 0
+
+    def clusters(self) -> List[List[int]]:
+        """Movable members of each cluster, largest first"""
+        groups: Dict[int, List[int]] = {}
+        for i in np.flatnonzero(self.movable).tolist():
+            groups.setdefault(int(self.labels[i]), []).append(i)
+        return sorted(groups.values(), key=lambda g: (-len(g), g[0]))
+
+    def _clamp(self) -> None:
+        """Keep movable boxes inside the outline (centred when a box is wider than the board)"""
+        x1, y1, x2, y2 = self.outline
+        m = self.movable
+        lo_x, hi_x = x1 + self.hw[m] - self.offset_x[m], x2 - self.hw[m] - self.offset_x[m]
+        lo_y, hi_y = y1 + self.hh[m] - self.offset_y[m], y2 - self.hh[m] - self.offset_y[m]
+        self.x[m] = np.where(lo_x <= hi_x, np.clip(self.x[m], lo_x, hi_x), (lo_x + hi_x) / 2)
+        self.y[m] = np.where(lo_y <= hi_y, np.clip(self.y[m], lo_y, hi_y), (lo_y + hi_y) / 2)
+
+    def _seed_clusters(self) -> None:
+        """Lay the clusters out as non-overlapping discs, then scatter each cluster's parts over its disc"""
+        k = self.cluster_count
+        m = self.movable
+        area = np.bincount(self.labels[m], 4 * self.hw[m] * self.hh[m], minlength=k)
+        radius = np.sqrt(area / math.pi) * 1.2
+        x1, y1, x2, y2 = self.outline
+
+        # Clusters holding fixed parts sit at those parts; the rest start spread over the board
+        fixed = ~m
+        anchored = np.bincount(self.labels[fixed], minlength=k) > 0
+        centre_x = self.rng.uniform(x1, x2, k)
+        centre_y = self.rng.uniform(y1, y2, k)
+        if fixed.any():
+            count = np.maximum(np.bincount(self.labels[fixed], minlength=k), 1)
+            centre_x = np.where(anchored, np.bincount(self.labels[fixed], self.x[fixed], minlength=k) / count, centre_x)
+            centre_y = np.where(anchored, np.bincount(self.labels[fixed], self.y[fixed], minlength=k) / count, centre_y)
+
+        u, v, w = self.edges
+        lu, lv = self.labels[u], self.labels[v]
+        between = lu != lv
+        lu, lv, w = lu[between], lv[between], w[between]
+        for _ in range(ITERATIONS if k > 1 else 0):
+            # Springs between clusters that share nets
+            total = np.bincount(lu, w, minlength=k) + np.bincount(lv, w, minlength=k) + 1e-9
+            mean_x = (np.bincount(lu, w * centre_x[lv], minlength=k) + np.bincount(lv, w * centre_x[lu], minlength=k)) / total
+            mean_y = (np.bincount(lu, w * centre_y[lv], minlength=k) + np.bincount(lv, w * centre_y[lu], minlength=k)) / total
+            pulled = total > 1e-6
+            step = np.where(pulled & ~anchored, 0.1, 0.0)
+            centre_x += step * (mean_x - centre_x)
+            centre_y += step * (mean_y - centre_y)
+
+            # Discs that overlap push each other apart; pairs come from a grid, as k can be in the thousands
+            i, j = candidate_pairs(centre_x, centre_y, radius)
+            dx, dy = centre_x[j] - centre_x[i], centre_y[j] - centre_y[i]
+            distance = np.hypot(dx, dy)
+            depth = radius[i] + radius[j] - distance
+            hit = depth > 0
+            i, j, dx, dy, depth = i[hit], j[hit], dx[hit], dy[hit], depth[hit]
+            push = depth / np.maximum(distance[hit], 1e-9)
+            share_i = np.where(anchored[i], 0.0, np.where(anchored[j], 1.0, 0.5))
+            share_j = np.where(anchored[j], 0.0, np.where(anchored[i], 1.0, 0.5))
+            centre_x += weighted_bincount(j, share_j * push * dx, k) - weighted_bincount(i, share_i * push * dx, k)
+            centre_y += weighted_bincount(j, share_j * push * dy, k) - weighted_bincount(i, share_i * push * dy, k)
+            centre_x = np.clip(centre_x, x1, x2)
+            centre_y = np.clip(centre_y, y1, y2)
+
+        members = np.flatnonzero(m)
+        angle = self.rng.uniform(0, 2 * math.pi, len(members))
+        distance = radius[self.labels[members]] * np.sqrt(self.rng.random(len(members)))
+        self.x[members] = centre_x[self.labels[members]] + distance * np.cos(angle)
+        self.y[members] = centre_y[self.labels[members]] + distance * np.sin(angle)
+        self._clamp()
+
+    def _springs(self, step: float) -> None:
+        """Move each movable part `step` of the way to the weighted mean of its neighbours and cluster centroid"""
+        u, v, w = self.edges
+        n, k = self.n, self.cluster_count
+        m = self.movable
+        count = np.maximum(np.bincount(self.labels[m], minlength=k), 1)
+        centroid_x = np.bincount(self.labels[m], self.x[m], minlength=k) / count
+        centroid_y = np.bincount(self.labels[m], self.y[m], minlength=k) / count
+        pull = np.where(m, CLUSTER_PULL, 0.0)
+
+        total = weighted_bincount(u, w, n) + weighted_bincount(v, w, n) + pull
+        target_x = weighted_bincount(u, w * self.x[v], n) + weighted_bincount(v, w * self.x[u], n)
+        target_y = weighted_bincount(u, w * self.y[v], n) + weighted_bincount(v, w * self.y[u], n)
+        target_x += pull * centroid_x[self.labels]
+        target_y += pull * centroid_y[self.labels]
+        move = m & (total > 0)
+        self.x[move] += step * (target_x[move] / total[move] - self.x[move])
+        self.y[move] += step * (target_y[move] / total[move] - self.y[move])
+
+    def _spread(self) -> None:
+        """Cell shifting: per row (then column) of bins, stretch crowded bins and shrink sparse ones
+
+        Bin edges move so each bin's width follows its courtyard area (never below the target density),
+        and parts are carried along by linear interpolation, which keeps their order.
+        """
+        x1, y1, x2, y2 = self.outline
+        bins = int(np.clip(math.sqrt(self.movable.sum() / 4), 2, 64))
+        area = 4 * self.hw * self.hh
+        for axis in (0, 1):
+            pos, across = (self.x, self.y) if axis == 0 else (self.y, self.x)
+            lo, hi = (x1, x2) if axis == 0 else (y1, y2)
+            lo_across, hi_across = (y1, y2) if axis == 0 else (x1, x2)
+            size, size_across = (hi - lo) / bins, (hi_across - lo_across) / bins
+            edges = lo + size * np.arange(bins + 1)
+            column = np.clip(((pos - lo) / size).astype(np.int64), 0, bins - 1)
+            row = np.clip(((across - lo_across) / size_across).astype(np.int64), 0, bins - 1)
+            usage = np.bincount(row * bins + column, area, minlength=bins * bins).reshape(bins, bins)
+            density = np.maximum(usage / (size * size_across), TARGET_DENSITY)
+            widths = density / density.sum(axis=1, keepdims=True) * (hi - lo)
+            new_edges = lo + np.concatenate([np.zeros((bins, 1)), np.cumsum(widths, axis=1)], axis=1)
+            # Interpolate within each part's bin, from the old edges to that row's new ones
+            t = (np.clip(pos, lo, hi) - edges[column]) / size
+            shifted = new_edges[row, column] + t * (new_edges[row, column + 1] - new_edges[row, column])
+            pos[self.movable] += 0.5 * (shifted[self.movable] - pos[self.movable])
+
+    def _overlaps(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Overlapping same-side pairs with at least one movable part: (i, j, x depth, y depth, dx, dy)"""
+        cx, cy = self.x + self.offset_x, self.y + self.offset_y
+        i, j = candidate_pairs(cx, cy, np.hypot(self.hw, self.hh))
+        keep = (self.side[i] == self.side[j]) & (self.movable[i] | self.movable[j])
+        i, j = i[keep], j[keep]
+        dx, dy = cx[j] - cx[i], cy[j] - cy[i]
+        depth_x = self.hw[i] + self.hw[j] - np.abs(dx)
+        depth_y = self.hh[i] + self.hh[j] - np.abs(dy)
+        hit = (depth_x > 0) & (depth_y > 0)
+        return i[hit], j[hit], depth_x[hit], depth_y[hit], dx[hit], dy[hit]
+
+    def _separate(self) -> float:
+        """Push overlapping boxes apart along their shallower axis; returns the overlap area found"""
+        i, j, depth_x, depth_y, dx, dy = self._overlaps()
+        if not len(i):
+            return 0.0
+        along_x = depth_x < depth_y
+        sign_x = np.where(dx == 0, self.rng.choice([-1.0, 1.0], len(i)), np.sign(dx))
+        sign_y = np.where(dy == 0, self.rng.choice([-1.0, 1.0], len(i)), np.sign(dy))
+        push_x = np.where(along_x, (depth_x + SEPARATION_MARGIN) * sign_x, 0.0)
+        push_y = np.where(along_x, 0.0, (depth_y + SEPARATION_MARGIN) * sign_y)
+        # Split the push between two movable parts; a fixed part does not give way
+        share_i = np.where(self.movable[j], 0.5, 1.0) * self.movable[i]
+        share_j = np.where(self.movable[i], 0.5, 1.0) * self.movable[j]
+        self.x -= np.bincount(i, share_i * push_x, minlength=self.n)
+        self.y -= np.bincount(i, share_i * push_y, minlength=self.n)
+        self.x += np.bincount(j, share_j * push_x, minlength=self.n)
+        self.y += np.bincount(j, share_j * push_y, minlength=self.n)
+        self._clamp()
+        return float((depth_x * depth_y).sum())
+
+    def overlap_area(self) -> float:
+        i, j, depth_x, depth_y, _, _ = self._overlaps()
+        return float((depth_x * depth_y).sum())
+
+    def run(self, iterations: int = ITERATIONS) -> None:
+        """Seed from clusters, relax springs against overlap, then settle the remaining overlaps"""
+        if not self.movable.any():
+            return
+        self._seed_clusters()
+        for t in range(iterations):
+            self._springs(STEP * (1 - t / iterations))  # Springs fade so the last iterations mostly separate
+            self._spread()
+            self._separate()
+            self._separate()
+        for _ in range(SETTLE_PASSES):
+            if not self._separate():
+                break
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+KiCad Geometry - Exact 2D tests on board outlines and shapes
+Polygon areas, clipping, overlap and distance measurement, in millimeters
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from kicad_board_model import BBox, Point
+
+
+def polygon_area(polygon: Sequence[Point]) -> float:
+    """Signed shoelace area (positive when counter-clockwise in a Y-up frame)"""
+    area = 0.0
+    n = len(polygon)
+    for i in range(n):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % n]
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+def is_convex(polygon: Sequence[Point]) -> bool:
+    """True when every turn along the polygon has the same direction"""
+    sign = 0
+    n = len(polygon)
+    for i in range(n):
+        (x1, y1), (x2, y2), (x3, y3) = polygon[i], polygon[(i + 1) % n], polygon[(i + 2) % n]
+        cross = (x2 - x1) * (y3 - y2) - (y2 - y1) * (x3 - x2)
+        if abs(cross) > 1e-12:
+            if sign and (cross > 0) != (sign > 0):
+                return False
+            sign = 1 if cross > 0 else -1
+    return True
+
+
+def rectangle(box: BBox) -> List[Point]:
+    """Corners of a bounding box as a polygon"""
+    x1, y1, x2, y2 = box
+    return [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+
+
+def clip_polygon(subject: Sequence[Point], clip: Sequence[Point]) -> List[Point]:
+    """Sutherland-Hodgman clip of any polygon by a convex one
+
+    A concave subject may come back with zero-width bridges, which do not change its area.
+    """
+    orientation = 1.0 if polygon_area(clip) >= 0 else -1.0
+    output = list(subject)
+    n = len(clip)
+    for i in range(n):
+        if not output:
+            break
+        (ax, ay), (bx, by) = clip[i], clip[(i + 1) % n]
+
+        def side(p: Point) -> float:
+            return orientation * ((bx - ax) * (p[1] - ay) - (by - ay) * (p[0] - ax))
+
+        def crossing(p: Point, q: Point) -> Point:
+            sp, sq = side(p), side(q)
+            t = sp / (sp - sq)
+            return p[0] + t * (q[0] - p[0]), p[1] + t * (q[1] - p[1])
+
+        points, output = output, []
+        for j, current in enumerate(points):
+            previous = points[j - 1]
+            if side(current) >= 0:
+                if side(previous) < 0:
+                    output.append(crossing(previous, current))
+                output.append(current)
+            elif side(previous) >= 0:
+                output.append(crossing(previous, current))
+    return output
+
+
+def overlap_area(a: Sequence[Point], b: Sequence[Point]) -> float:
+    """Area of the intersection of two simple polygons
+
+    A concave `b` is split into a fan of signed triangles around its first vertex; the signed
+    clipped areas sum to the exact intersection.
+    """
+    if len(a) < 3 or len(b) < 3:
+        return 0.0
+    if is_convex(b):
+        return abs(polygon_area(clip_polygon(a, b)))
+    if is_convex(a):
+        return abs(polygon_area(clip_polygon(b, a)))
+
+    total = 0.0
+    reference = 1.0 if polygon_area(b) >= 0 else -1.0
+    for i in range(1, len(b) - 1):
+        triangle = (b[0], b[i], b[i + 1])
+        signed = polygon_area(triangle)
+        if abs(signed) < 1e-12:
+            continue
+        piece = abs(polygon_area(clip_polygon(a, triangle)))
+        total += piece if (signed > 0) == (reference > 0) else -piece
+    return abs(total)
+
+
+def point_in_polygon(point: Point, polygon: Sequence[Point]) -> bool:
+    """Even-odd ray casting test (points on the boundary may land either way)"""
+    x, y = point
+    inside = False
+    n = len(polygon)
+    for i in range(n):
+        (x1, y1), (x2, y2) = polygon[i], polygon[(i + 1) % n]
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def closest_point_on_segment(p: Point, a: Point, b: Point) -> Point:
+    """Point of segment a-b nearest to p"""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return a
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length2))
+    return a[0] + t * dx, a[1] + t * dy
+
+
+def segment_intersection(a1: Point, a2: Point, b1: Point, b2: Point) -> Optional[Point]:
+    """Crossing point of two segments, or None (collinear overlaps report a shared endpoint)"""
+    d1x, d1y = a2[0] - a1[0], a2[1] - a1[1]
+    d2x, d2y = b2[0] - b1[0], b2[1] - b1[1]
+    denom = d1x * d2y - d1y * d2x
+    ex, ey = b1[0] - a1[0], b1[1] - a1[1]
+    if abs(denom) < 1e-18:
+        if abs(ex * d1y - ey * d1x) > 1e-12:
+            return None
+        for p in (b1, b2):
+            if closest_point_on_segment(p, a1, a2) == p:
+                return p
+        for p in (a1, a2):
+            if closest_point_on_segment(p, b1, b2) == p:
+                return p
+        return None
+    t = (ex * d2y - ey * d2x) / denom
+    u = (ex * d1y - ey * d1x) / denom
+    if 0 <= t <= 1 and 0 <= u <= 1:
+        return a1[0] + t * d1x, a1[1] + t * d1y
+    return None
+
+
+def segment_distance(a1: Point, a2: Point, b1: Point, b2: Point) -> Tuple[float, Point, Point]:
+    """Distance between two segments and the closest points on each"""
+    crossing = segment_intersection(a1, a2, b1, b2)
+    if crossing is not None:
+        return 0.0, crossing, crossing
+
+    best = None
+    for p, (q1, q2), p_on_a in ((a1, (b1, b2), True), (a2, (b1, b2), True),
+                                (b1, (a1, a2), False), (b2, (a1, a2), False)):
+        q = closest_point_on_segment(p, q1, q2)
+        d = math.hypot(p[0] - q[0], p[1] - q[1])
+        if best is None or d < best[0]:
+            best = (d, p, q) if p_on_a else (d, q, p)
+    return best
+
+
+def shape_distance(a: Sequence[Point], b: Sequence[Point]) -> Tuple[float, Point, Point]:
+    """Distance between two shape cores: a point, a segment or a polygon (0 when they overlap)
+
+    Returns the closest points on each, or a shared point when the shapes overlap.
+    """
+    if len(a) >= 3 and point_in_polygon(b[0], a):
+        return 0.0, b[0], b[0]
+    if len(b) >= 3 and point_in_polygon(a[0], b):
+        return 0.0, a[0], a[0]
+
+    best = None
+    for a1, a2 in _edges(a):
+        for b1, b2 in _edges(b):
+            candidate = segment_distance(a1, a2, b1, b2)
+            if best is None or candidate[0] < best[0]:
+                best = candidate
+                if best[0] == 0.0:
+                    return best
+    return best
+
+
+def _edges(core: Sequence[Point]) -> List[Tuple[Point, Point]]:
+    if len(core) == 1:
+        return [(core[0], core[0])]
+    if len(core) == 2:
+        return [(core[0], core[1])]
+    return [(core[i], core[(i + 1) % len(core)]) for i in range(len(core))]
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+KiCad Parallel Gerber - Layer plotting split across worker processes
+Each worker loads the board once and plots its share; the parent merges the files into one list and job file
+"""
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+try:
+    import pcbnew
+except ImportError:
+    pcbnew = None
+
+DEFAULT_LAYERS = ("F.Cu", "B.Cu", "F.Mask", "B.Mask", "F.SilkS", "B.SilkS", "F.Paste", "B.Paste", "Edge.Cuts")
+
+# (layer name, layer id, plotted file path)
+PlottedLayer = Tuple[str, int, str]
+
+
+def default_plot_workers() -> int:
+    """Worker count from KICAD_MCP_PLOT_WORKERS, else 1 (serial)"""
+    value = os.environ.get("KICAD_MCP_PLOT_WORKERS", "").strip()
+    if value.lower() == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value)) if value else 1
+
+
+def configure_plot_options(popt, output_dir: str, create_job_file: bool = True) -> None:
+    """Fabrication Gerber settings shared by the serial plot and every worker"""
+    popt.SetOutputDirectory(output_dir)
+    popt.SetPlotFrameRef(False)
+    popt.SetPlotValue(True)
+    popt.SetPlotReference(True)
+    popt.SetPlotInvisibleText(False)
+    popt.SetPlotViaOnMaskLayer(False)
+    popt.SetExcludeEdgeLayer(True)
+    popt.SetScale(1)
+    popt.SetUseAuxOrigin(False)
+    popt.SetMirror(False)
+    popt.SetNegative(False)
+
+    # Gerber specific
+    popt.SetFormat(1)  # Gerber
+    popt.SetUseGerberProtelExtensions(False)
+    popt.SetCreateGerberJobFile(create_job_file)
+    popt.SetSubtractMaskFromSilk(True)
+    popt.SetGerberPrecision(6)
+
+
+def plot_layers(board, output_dir: str, layers: Sequence[str], create_job_file: bool = True,
+                on_plotted: Optional[Callable[[str], None]] = None) -> List[PlottedLayer]:
+    """Plot layers one after another through a single PLOT_CONTROLLER; unknown layers are skipped
+
+    on_plotted(layer) is called after each requested layer, skipped ones included.
+    """
+    output_dir = os.path.abspath(output_dir)  # A relative directory would resolve against the board's folder
+    pctl = pcbnew.PLOT_CONTROLLER(board)
+    configure_plot_options(pctl.GetPlotOptions(), output_dir, create_job_file)
+
+    plotted = []
+    for layer_name in layers:
+        layer_id = board.GetLayerID(layer_name)
+        if layer_id < 0:
+            if on_plotted is not None:
+                on_plotted(layer_name)
+            continue
+
+        pctl.SetLayer(layer_id)
+        pctl.OpenPlotfile(layer_name, pcbnew.PLOT_FORMAT_GERBER, layer_name)
+        pctl.PlotLayer()
+        pctl.ClosePlot()
+
+        filename = pctl.GetPlotFileName()
+        if os.path.exists(filename):
+            plotted.append((layer_name, layer_id, filename))
+        if on_plotted is not None:
+            on_plotted(layer_name)
+    return plotted
+
+
+_board = None  # The board loaded by this worker process
+
+
+def _load_board(board_path: str) -> None:
+    """Worker initializer: load the board once, however many layers the worker ends up plotting"""
+    global _board
+    _board = pcbnew.LoadBoard(board_path)
+
+
+def _plot_layer(output_dir: str, layer: str) -> List[PlottedLayer]:
+    return plot_layers(_board, output_dir, [layer], create_job_file=False)
+
+
+def plot_parallel(board_path: str, output_dir: str, layers: Sequence[str], workers: int,
+                  on_plotted: Optional[Callable[[str], None]] = None) -> List[PlottedLayer]:
+    """Plot the layers of a saved board on a process pool, merged back into the requested layer order
+
+    Layers are handed out one at a time, so a worker stuck on a dense copper layer does not hold up the
+    others. Workers are spawned rather than forked, since a forked copy of a process holding pcbnew (and wx)
+    state is not safe to use.
+    """
+    output_dir = os.path.abspath(output_dir)
+    layers = list(dict.fromkeys(layers))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(layers)), mp_context=context,
+                             initializer=_load_board, initargs=(board_path,)) as executor:
+        results = []
+        try:
+            for layer, plotted in zip(layers, executor.map(_plot_layer, [output_dir] * len(layers), layers)):
+                results += plotted
+                if on_plotted is not None:
+                    on_plotted(layer)
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)  # Do not plot the rest of an abandoned export
+            raise
+        return results
+
+
+def snapshot_board(board, directory: str) -> str:
+    """Save the live board, unsaved edits included, under its own file name in `directory` for the workers
+
+    Keeping the name keeps the plotted file names; project settings are left alone so the open project
+    does not move to the snapshot's folder.
+    """
+    name = Path(board.GetFileName()).name or "board.kicad_pcb"
+    path = os.path.join(directory, name)
+    pcbnew.SaveBoard(path, board, True)
+    return path
+
+
+def export_layers(board, output_dir: str, layers: Sequence[str], workers: int = 1,
+                  board_path: Optional[str] = None,
+                  on_plotted: Optional[Callable[[str], None]] = None) -> List[PlottedLayer]:
+    """Plot serially, or split across `workers` processes loading `board_path` (a snapshot of `board` if None)"""
+    if workers <= 1 or len(layers) < 2:
+        return plot_layers(board, output_dir, layers, create_job_file=False, on_plotted=on_plotted)
+    if board_path is not None:
+        return plot_parallel(board_path, output_dir, layers, workers, on_plotted)
+    with tempfile.TemporaryDirectory(prefix="kicad_mcp_plot_") as snapshot_dir:
+        return plot_parallel(snapshot_board(board, snapshot_dir), output_dir, layers, workers, on_plotted)
+
+
+def write_job_file(board, output_dir: str, plotted: Sequence[PlottedLayer]) -> Optional[str]:
+    """Write one Gerber job file (.gbrjob) listing every plotted layer; None when nothing was plotted"""
+    if not plotted:
+        return None
+    writer = pcbnew.GERBER_JOBFILE_WRITER(board)
+    for _, layer_id, filename in plotted:
+        writer.AddGbrFile(layer_id, os.path.basename(filename))
+    stem = Path(board.GetFileName()).stem or "board"
+    path = os.path.join(os.path.abspath(output_dir), f"{stem}-job.gbrjob")
+    writer.CreateJobFile(path)
+    return path if os.path.exists(path) else None
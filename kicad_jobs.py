@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+KiCad Jobs - Background queue for long-running tools
+Jobs run one at a time off the MCP loop, reporting progress as they go and stopping when cancelled
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+
+JOB_STATES = ("queued", "running", "completed", "failed", "cancelled")
+MAX_FINISHED_JOBS = 100  # Oldest finished jobs are forgotten past this
+
+
+class JobCancelled(BaseException):
+    """Raised at a progress checkpoint of a cancelled job
+
+    A BaseException, like asyncio.CancelledError, so the tools' `except Exception` error handling lets it through.
+    """
+
+
+class Progress:
+    """Steps of a tool call counted towards an expected total, each one reported as it finishes
+
+    Tools call expect() with the steps they are about to take and advance() after each; nested tools add their
+    own steps to the same counter. Each advance() is a cancellation checkpoint unless it says otherwise, as a
+    step reported after the board was changed must. Without a report callback it only counts.
+    """
+
+    def __init__(self, report: Optional[Callable[["Progress", bool], None]] = None, background: bool = False):
+        self.background = background  # Running as a job: leave the board to other tool calls where possible
+        self.done = 0
+        self.total: Optional[int] = None
+        self.message: Optional[str] = None
+        self._report = report
+
+    def expect(self, steps: int) -> None:
+        self.total = (self.total or 0) + steps
+
+    def advance(self, message: str, steps: int = 1, checkpoint: bool = True) -> None:
+        self.done += steps
+        self.message = message
+        if self._report is not None:
+            self._report(self, checkpoint)
+
+
+class Job:
+    """One queued tool call: its state, latest progress and, once finished, its result"""
+
+    def __init__(self, tool: str, on_progress: Optional[Callable[["Job"], None]] = None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.tool = tool
+        self.state = "queued"
+        self.progress = Progress(self._report, background=True)
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created = time.monotonic()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.future: Optional[Future] = None
+        self._cancel = threading.Event()
+        self._on_progress = on_progress
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def _report(self, progress: Progress, checkpoint: bool = True) -> None:
+        if checkpoint and self._cancel.is_set():
+            raise JobCancelled()
+        if self._on_progress is not None:
+            self._on_progress(self)
+
+    def status(self) -> Dict:
+        end = self.finished or time.monotonic()
+        status = {
+            "job_id": self.job_id,
+            "tool": self.tool,
+            "state": self.state,
+            "progress": self.progress.done,
+            "total": self.progress.total,
+            "message": self.progress.message,
+            "elapsed_s": round(end - (self.started or end), 3),
+        }
+        if self.state == "running" and self.cancel_requested:
+            status["cancel_requested"] = True
+        if self.result is not None:
+            status["result"] = self.result
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+
+class JobQueue:
+    """Tool calls run in the background, one after another, so the MCP loop keeps answering other requests
+
+    A single worker keeps jobs from touching the board at the same time. Queued jobs cancel at once; running
+    ones stop at their next progress checkpoint. runner(coroutine) runs a job to completion on the worker
+    thread: a fresh event loop by default, or a hand-off to the thread that owns pcbnew.
+    """
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS,
+                 runner: Callable[[Coroutine[Any, Any, Dict]], Dict] = asyncio.run):
+        self.max_finished = max_finished
+        self.runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kicad-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, tool: str, run: Callable[[Progress], Coroutine[Any, Any, Dict]],
+               on_progress: Optional[Callable[[Job], None]] = None) -> Job:
+        """Queue run(progress) and return its job; run is a coroutine function awaited on the worker thread"""
+        job = Job(tool, on_progress)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._forget_finished()
+        job.future = self._executor.submit(self._run, job, run)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def pending(self) -> int:
+        """Jobs queued or running"""
+        return sum(1 for job in self.jobs() if job.state in ("queued", "running"))
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.state not in ("queued", "running"):
+            return job
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            job.state = "cancelled"
+            job.finished = time.monotonic()
+        return job
+
+    def shutdown(self) -> None:
+        """Cancel every job and wait for the running one to reach a checkpoint"""
+        for job in self.jobs():
+            self.cancel(job.job_id)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, job: Job, run: Callable[[Progress], Coroutine[Any, Any, Dict]]) -> None:
+        if job.cancel_requested:
+            job.state = "cancelled"
+            job.finished = time.monotonic()
+            return
+        job.state = "running"
+        job.started = time.monotonic()
+        try:
+            result = self.runner(run(job.progress))
+            if "error" in result:
+                job.state, job.error = "failed", result["error"]
+            else:
+                job.state, job.result = "completed", result
+        except JobCancelled:
+            job.state = "cancelled"
+        except Exception as e:
+            job.state, job.error = "failed", str(e)
+        finally:
+            job.finished = time.monotonic()
+
+    def _forget_finished(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished is not None]
+        for job in sorted(finished, key=lambda j: j.finished)[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.job_id]
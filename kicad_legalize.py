@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+KiCad Legalize - Grid snapping and minimal-displacement overlap removal
+Tetris-style greedy legalization: each part takes the nearest free grid position around its current spot
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from kicad_autoplace import Keepout, local_box
+from kicad_board_model import BBox, Footprint
+from kicad_force_place import candidate_pairs
+from kicad_placement import PlacementNetlist, rotate_offsets
+from kicad_spatial_index import SpatialGrid
+
+DEFAULT_GRID_MM = 0.1
+ABUT_MARGIN = 1e-3  # mm left between abutting boxes when there is no grid, so rounding cannot make them overlap
+TOLERANCE = 1e-6    # Intersections thinner than this (mm) are boxes that merely touch
+
+
+def _snap(values: np.ndarray, grid: float) -> np.ndarray:
+    return np.round(values / grid) * grid if grid > 0 else values
+
+
+def _snap_up(values: np.ndarray, grid: float) -> np.ndarray:
+    """Smallest grid position at or above each value"""
+    return np.ceil(values / grid - 1e-9) * grid if grid > 0 else values + ABUT_MARGIN
+
+
+def _snap_down(values: np.ndarray, grid: float) -> np.ndarray:
+    """Largest grid position at or below each value"""
+    return np.floor(values / grid + 1e-9) * grid if grid > 0 else values - ABUT_MARGIN
+
+
+class Legalizer:
+    """Snap a subset of footprints to a grid and move each overlapping one to the nearest free spot
+
+    Fixed footprints, keepouts and the board outline are obstacles. Movable parts are settled one at a time:
+    first those already free at their snapped position, then the rest, largest first, and every settled part
+    becomes an obstacle for the next. The nearest free position has each coordinate either at the snapped
+    target or against the edge of an obstacle (or the outline), rounded away from it onto the grid, so only
+    those coordinates are tried. Obstacles come from a spatial grid within a search window that doubles until
+    a free position turns up. Courtyards are taken as their bounding boxes, rotations are kept.
+    """
+
+    def __init__(self, netlist: PlacementNetlist, footprints: Sequence[Footprint], movable: Sequence[int],
+                 outline: Optional[BBox] = None, keepouts: Sequence[Keepout] = (), grid_mm: float = DEFAULT_GRID_MM,
+                 spacing_mm: float = 0.0):
+        self.n = len(footprints)
+        self.grid = max(float(grid_mm), 0.0)
+        self.movable = np.zeros(self.n, dtype=bool)
+        self.movable[list(movable)] = True
+        self.outline = outline
+        self.keepouts = list(keepouts)
+        self.start_x, self.start_y = netlist.x.copy(), netlist.y.copy()
+
+        local = np.array([local_box(fp) for fp in footprints], dtype=np.float64).reshape(-1, 4)
+        self.offset_x, self.offset_y = rotate_offsets(local[:, 0], local[:, 1], netlist.rotation)
+        a = np.radians(netlist.rotation)
+        c, s = np.abs(np.cos(a)), np.abs(np.sin(a))
+        hw, hh = local[:, 2] + spacing_mm / 2, local[:, 3] + spacing_mm / 2
+        self.hw, self.hh = hw * c + hh * s, hw * s + hh * c
+        self.side = np.array([fp.layer == "B.Cu" for fp in footprints], dtype=np.int64)
+
+        self.x = np.where(self.movable, _snap(self.start_x, self.grid), self.start_x)
+        self.y = np.where(self.movable, _snap(self.start_y, self.grid), self.start_y)
+        self.unresolved: List[int] = []
+
+    def _box(self, i: int, x: float, y: float) -> BBox:
+        cx, cy = x + self.offset_x[i], y + self.offset_y[i]
+        return cx - self.hw[i], cy - self.hh[i], cx + self.hw[i], cy + self.hh[i]
+
+    def _fits(self, i: int) -> Optional[BBox]:
+        """Range of positions keeping the part inside the outline, None without an outline or when it is too big"""
+        if self.outline is None:
+            return None
+        x1, y1, x2, y2 = self.outline
+        lo_x, hi_x = x1 + self.hw[i] - self.offset_x[i], x2 - self.hw[i] - self.offset_x[i]
+        lo_y, hi_y = y1 + self.hh[i] - self.offset_y[i], y2 - self.hh[i] - self.offset_y[i]
+        if lo_x > hi_x or lo_y > hi_y:
+            return None
+        return lo_x, lo_y, hi_x, hi_y
+
+    def _conflicts(self) -> np.ndarray:
+        """Movable parts whose snapped box overlaps another part, a keepout or the outside of the board"""
+        cx, cy = self.x + self.offset_x, self.y + self.offset_y
+        i, j = candidate_pairs(cx, cy, np.hypot(self.hw, self.hh))
+        hit = ((self.side[i] == self.side[j]) &
+               (self.hw[i] + self.hw[j] - np.abs(cx[j] - cx[i]) > TOLERANCE) &
+               (self.hh[i] + self.hh[j] - np.abs(cy[j] - cy[i]) > TOLERANCE))
+        conflict = np.zeros(self.n, dtype=bool)
+        conflict[i[hit]] = True
+        conflict[j[hit]] = True
+        for (k1, k2, k3, k4), sides in self.keepouts:
+            conflict |= (np.array(sides)[self.side] &
+                         (np.minimum(cx + self.hw, k3) - np.maximum(cx - self.hw, k1) > TOLERANCE) &
+                         (np.minimum(cy + self.hh, k4) - np.maximum(cy - self.hh, k2) > TOLERANCE))
+        for i in np.flatnonzero(self.movable).tolist():
+            fits = self._fits(i)
+            if fits is not None and not (fits[0] - TOLERANCE <= self.x[i] <= fits[2] + TOLERANCE and
+                                         fits[1] - TOLERANCE <= self.y[i] <= fits[3] + TOLERANCE):
+                conflict[i] = True
+        return conflict & self.movable
+
+    def _nearest_free(self, i: int, obstacles: List[SpatialGrid], limit: float) -> Optional[Tuple[float, float]]:
+        """Closest grid position to the snapped target where the part overlaps no obstacle, or None"""
+        tx, ty = float(self.x[i]), float(self.y[i])
+        hw, hh, ox, oy = self.hw[i], self.hh[i], self.offset_x[i], self.offset_y[i]
+        fits = self._fits(i)
+        grid = obstacles[self.side[i]]
+        target = self._box(i, tx, ty)
+        window = max(hw, hh, self.grid)
+        while True:
+            # Any position displaced by at most `window` can only touch obstacles in this box
+            reach = (target[0] - window, target[1] - window, target[2] + window, target[3] + window)
+            boxes = np.array([grid.bbox(key) for key in grid.query(reach)], dtype=np.float64).reshape(-1, 4).T
+            xs = [np.array([tx]), _snap_up(boxes[2] + hw - ox, self.grid), _snap_down(boxes[0] - hw - ox, self.grid)]
+            ys = [np.array([ty]), _snap_up(boxes[3] + hh - oy, self.grid), _snap_down(boxes[1] - hh - oy, self.grid)]
+            if fits is not None:
+                xs += [_snap_up(np.array([fits[0]]), self.grid), _snap_down(np.array([fits[2]]), self.grid)]
+                ys += [_snap_up(np.array([fits[1]]), self.grid), _snap_down(np.array([fits[3]]), self.grid)]
+            xs, ys = np.unique(np.concatenate(xs)), np.unique(np.concatenate(ys))
+            xs, ys = xs[np.abs(xs - tx) <= window], ys[np.abs(ys - ty) <= window]
+            if fits is not None:
+                xs = xs[(xs >= fits[0] - TOLERANCE) & (xs <= fits[2] + TOLERANCE)]
+                ys = ys[(ys >= fits[1] - TOLERANCE) & (ys <= fits[3] + TOLERANCE)]
+
+            cand_x, cand_y = (a.ravel() for a in np.meshgrid(xs, ys))
+            distance = np.hypot(cand_x - tx, cand_y - ty)
+            near = distance <= window
+            cand_x, cand_y, distance = cand_x[near], cand_y[near], distance[near]
+            if len(cand_x):
+                cx, cy = cand_x + ox, cand_y + oy
+                w = np.minimum(cx[:, None] + hw, boxes[2][None, :]) - np.maximum(cx[:, None] - hw, boxes[0][None, :])
+                h = np.minimum(cy[:, None] + hh, boxes[3][None, :]) - np.maximum(cy[:, None] - hh, boxes[1][None, :])
+                free = ~((w > TOLERANCE) & (h > TOLERANCE)).any(axis=1)
+                if free.any():
+                    best = np.flatnonzero(free)[np.argmin(distance[free])]
+                    return float(cand_x[best]), float(cand_y[best])
+            if window >= limit:
+                return None
+            window = min(window * 2, limit)
+
+    def run(self) -> None:
+        """Settle every movable part, nearest free position first for the ones in conflict"""
+        movable = np.flatnonzero(self.movable)
+        if not len(movable):
+            return
+        boxes = [self._box(i, self.x[i], self.y[i]) for i in range(self.n)]
+        cell = max(2 * float(np.median(np.maximum(self.hw, self.hh))), 0.1)
+        obstacles = [SpatialGrid(cell), SpatialGrid(cell)]  # Per side of the board
+        for i in np.flatnonzero(~self.movable).tolist():
+            obstacles[self.side[i]].insert(i, boxes[i])
+        for k, (box, sides) in enumerate(self.keepouts):
+            for side in (0, 1):
+                if sides[side]:
+                    obstacles[side].insert(-k - 1, tuple(box))
+
+        # Search far enough to leave every obstacle (and the outline) behind
+        everything = np.array(boxes + [tuple(box) for box, _ in self.keepouts] +
+                              ([tuple(self.outline)] if self.outline is not None else []))
+        extent = everything[:, 2:].max(axis=0) - everything[:, :2].min(axis=0)
+        limit = float(math.hypot(*extent) + 2 * np.hypot(self.hw, self.hh).max() + self.grid)
+
+        conflict = self._conflicts()
+        area = self.hw * self.hh
+        for i in sorted(movable.tolist(), key=lambda k: (bool(conflict[k]), -area[k], k)):
+            position = self._nearest_free(i, obstacles, limit)
+            if position is None:
+                self.unresolved.append(i)
+            else:
+                self.x[i], self.y[i] = position
+            obstacles[self.side[i]].insert(i, self._box(i, self.x[i], self.y[i]))
+
+    def displacement(self) -> np.ndarray:
+        return np.hypot(self.x - self.start_x, self.y - self.start_y)
+
+    def changed(self) -> np.ndarray:
+        """Indexes of the parts whose position changed"""
+        return np.flatnonzero((self.x != self.start_x) | (self.y != self.start_y))
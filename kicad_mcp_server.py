@@ -3,10 +3,12 @@
 KiCad MCP Server - Provides AI access to KiCad PCB design via MCP
 """
 
+import argparse
 import asyncio
 import json
+import os
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -19,28 +21,79 @@ from mcp.types import (
     GetPromptResult,
 )
 
+from kicad_board_cache import load_board_model
+from kicad_board_model import BACKENDS, BoardModel, select_backend
+from kicad_output import OUTPUT_MODES, OUTPUT_PROPERTY, encode_result, select_output_mode
+from kicad_reference_index import ReferenceIndex
+
 try:
     import pcbnew
 except ImportError:
     pcbnew = None
-    print("Warning: pcbnew module not available. Server will run in mock mode.", file=sys.stderr)
+    print("Warning: pcbnew module not available. Server will run headless or in mock mode.", file=sys.stderr)
 
 
 class KiCadMCPServer:
     """MCP Server for KiCad automation"""
 
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None, board_path: Optional[str] = None,
+                 output_mode: Optional[str] = None):
         self.server = Server("kicad-mcp-server")
         self.board: Optional[Any] = None
+        self.board_path = board_path or os.environ.get("KICAD_MCP_BOARD")
+        self.backend = select_backend(
+            backend or os.environ.get("KICAD_MCP_BACKEND", "auto"), self.board_path, pcbnew is not None
+        )
+        self.output_mode = select_output_mode(output_mode or os.environ.get("KICAD_MCP_OUTPUT"))
+        self.model: Optional[BoardModel] = None
+        self._ref_index: Optional[ReferenceIndex] = None
+        self._ref_index_source: Optional[Any] = None
         self._setup_handlers()
 
+    def _get_model(self) -> BoardModel:
+        """Board model for the headless file backend, loaded from the snapshot cache or parsed on first use"""
+        if self.model is None:
+            self.model = load_board_model(self.board_path)
+        return self.model
+
+    def _footprint_index(self) -> ReferenceIndex:
+        """Reference → footprint index, rebuilt whenever the board (or board model) object changes
+
+        On pcbnew it holds the references only: a SWIG proxy kept between calls outlives a footprint deleted
+        in the KiCad GUI, so _find_footprint() always fetches the live footprint from the board.
+        """
+        source = self._get_model() if self.backend == "file" else self.board
+        if self._ref_index is None or self._ref_index_source is not source:
+            if self.backend == "file":
+                self._ref_index = ReferenceIndex(source.footprints, lambda fp: fp.reference)
+            else:
+                self._ref_index = ReferenceIndex([fp.GetReference() for fp in source.GetFootprints()], str)
+            self._ref_index_source = source
+        return self._ref_index
+
+    def _find_footprint(self, reference: str) -> Tuple[Optional[Any], List[str]]:
+        """Look up a footprint by reference, returning suggestions when it does not exist"""
+        if self.backend == "pcbnew":
+            # Searched on the live board (in C++), so parts added, renamed or deleted in the KiCad GUI are seen
+            footprint = self.board.FindFootprintByReference(reference)
+            if footprint is not None:
+                return footprint, []
+            self._ref_index = None  # Suggest from the board as it is now
+            return None, self._footprint_index().suggest(reference)
+
+        index = self._footprint_index()
+        footprint = index.get(reference)
+        if footprint is None:
+            return None, index.suggest(reference)
+        return footprint, []
+
     def _setup_handlers(self):
         """Register MCP protocol handlers"""
 
         # List available tools
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
-            return [
+            tools = [
                 Tool(
                     name="place_component",
                     description="Move a component to a specific position on the PCB board",
@@ -93,11 +146,17 @@ class KiCadMCPServer:
                     }
                 ),
             ]
+            for tool in tools:
+                tool.inputSchema.setdefault("properties", {})["output"] = OUTPUT_PROPERTY
+            return tools
 
         # Handle tool calls
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Any) -> List[TextContent]:
+            arguments = dict(arguments or {})
+            mode = self.output_mode
             try:
+                mode = select_output_mode(arguments.pop("output", None) or self.output_mode)
                 if name == "place_component":
                     result = await self._place_component(
                         arguments["reference"],
@@ -116,12 +175,12 @@ class KiCadMCPServer:
 
                 return [TextContent(
                     type="text",
-                    text=json.dumps(result, indent=2)
+                    text=encode_result(result, mode)
                 )]
             except Exception as e:
                 return [TextContent(
                     type="text",
-                    text=json.dumps({"error": str(e)}, indent=2)
+                    text=encode_result({"error": str(e)}, mode)
                 )]
 
         # List available resources
@@ -147,10 +206,10 @@ class KiCadMCPServer:
         async def read_resource(uri: str) -> str:
             if uri == "board://schematic":
                 components = await self._list_components()
-                return json.dumps(components, indent=2)
+                return encode_result(components, self.output_mode)
             elif uri == "board://info":
                 info = await self._get_board_info()
-                return json.dumps(info, indent=2)
+                return encode_result(info, self.output_mode)
             else:
                 raise ValueError(f"Unknown resource: {uri}")
 
@@ -247,13 +306,32 @@ Standard practices:
     async def _place_component(self, reference: str, x_mm: float, y_mm: float, rotation_deg: float = 0) -> Dict:
         """Place/move a component on the board"""
 
-        if pcbnew is None:
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "message": f"Mock: Would place {reference} at ({x_mm}, {y_mm}) mm, rotation {rotation_deg}°"
             }
 
         try:
+            if self.backend == "file":
+                self._get_model()
+                footprint, suggestions = self._find_footprint(reference)
+                if footprint is None:
+                    return {
+                        "error": f"Component '{reference}' not found",
+                        "suggestions": suggestions
+                    }
+
+                footprint.move_to(x_mm, y_mm, rotation_deg)
+                return {
+                    "status": "success",
+                    "reference": reference,
+                    "position": {"x_mm": x_mm, "y_mm": y_mm},
+                    "rotation_deg": rotation_deg,
+                    "message": f"Placed {reference} at ({x_mm}, {y_mm}) mm with {rotation_deg}° rotation",
+                    "note": "Headless backend: change applied to the in-memory board model only"
+                }
+
             # Load board if not loaded
             if self.board is None:
                 self.board = pcbnew.GetBoard()
@@ -261,17 +339,11 @@ Standard practices:
                     return {"error": "No PCB board is currently open in KiCad"}
 
             # Find the footprint
-            footprint = None
-            for fp in self.board.GetFootprints():
-                if fp.GetReference() == reference:
-                    footprint = fp
-                    break
-
+            footprint, suggestions = self._find_footprint(reference)
             if footprint is None:
-                available = [fp.GetReference() for fp in self.board.GetFootprints()]
                 return {
                     "error": f"Component '{reference}' not found",
-                    "available_components": available
+                    "suggestions": suggestions
                 }
 
             # Convert mm to KiCad internal units (nanometers)
@@ -302,7 +374,7 @@ Standard practices:
     async def _list_components(self) -> Dict:
         """List all components on the board"""
 
-        if pcbnew is None:
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "components": [
@@ -313,6 +385,24 @@ Standard practices:
             }
 
         try:
+            if self.backend == "file":
+                components = [
+                    {
+                        "reference": fp.reference,
+                        "value": fp.value,
+                        "x_mm": fp.x_mm,
+                        "y_mm": fp.y_mm,
+                        "rotation_deg": fp.rotation_deg,
+                        "layer": fp.layer
+                    }
+                    for fp in self._get_model().footprints
+                ]
+                return {
+                    "status": "success",
+                    "count": len(components),
+                    "components": components
+                }
+
             if self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
@@ -342,7 +432,7 @@ Standard practices:
     async def _read_netlist(self) -> Dict:
         """Read netlist information from the board"""
 
-        if pcbnew is None:
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "nets": [
@@ -353,6 +443,18 @@ Standard practices:
             }
 
         try:
+            if self.backend == "file":
+                nets = [
+                    {"name": net.name, "code": net.code}
+                    for net in self._get_model().nets.values()
+                    if net.name  # Skip empty net names
+                ]
+                return {
+                    "status": "success",
+                    "count": len(nets),
+                    "nets": nets
+                }
+
             if self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
@@ -380,7 +482,7 @@ Standard practices:
     async def _get_board_info(self) -> Dict:
         """Get general board information"""
 
-        if pcbnew is None:
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "board_name": "example_board",
@@ -389,6 +491,21 @@ Standard practices:
             }
 
         try:
+            if self.backend == "file":
+                model = self._get_model()
+                min_x, min_y, max_x, max_y = model.outline_bbox() or (0, 0, 0, 0)
+                return {
+                    "status": "success",
+                    "board_name": model.file_name,
+                    "size": {
+                        "width_mm": max_x - min_x,
+                        "height_mm": max_y - min_y,
+                    },
+                    "layer_count": model.layer_count,
+                    "component_count": len(model.footprints),
+                    "backend": "file",
+                }
+
             if self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
@@ -420,9 +537,24 @@ Standard practices:
             )
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="KiCad MCP Server")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="Board backend: pcbnew (live KiCad), file (headless .kicad_pcb parser) "
+                             "or auto (default, or KICAD_MCP_BACKEND)")
+    parser.add_argument("--board", default=None,
+                        help="Path to a .kicad_pcb file for the file backend (or KICAD_MCP_BOARD)")
+    parser.add_argument("--output", choices=OUTPUT_MODES, default=None,
+                        help="Tool result encoding: pretty (default, or KICAD_MCP_OUTPUT), compact JSON, "
+                             "or table (lists of records as columns + rows)")
+    return parser.parse_args()
+
+
 async def main():
     """Main entry point"""
-    server = KiCadMCPServer()
+    args = parse_args()
+    server = KiCadMCPServer(backend=args.backend, board_path=args.board, output_mode=args.output)
     await server.run()
 
 
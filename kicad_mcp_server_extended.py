@@ -4,15 +4,17 @@ KiCad MCP Server Extended - Provides AI access to KiCad PCB design via MCP
 Includes fabrication tools: Gerber export, DRC, drill files, BOM, etc.
 """
 
+import argparse
 import asyncio
 import json
 import sys
 import os
-import zipfile
-from typing import Any, Dict, List, Optional
+import tempfile
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import (
@@ -24,28 +26,440 @@ from mcp.types import (
     GetPromptResult,
 )
 
+from kicad_arrange import (ALIGN_EDGES, DEFAULT_GAP_MM, LAYOUTS, align_offsets, distribute_offsets, distribution_gap,
+                            grid_positions, mirror_axis, rotated_extent)
+from kicad_autoplace import Annealer, Keepout
+from kicad_board_cache import load_board_model
+from kicad_board_model import (BACKENDS, BBox, BoardModel, Footprint, Point, copper_layer_match, points_bbox,
+                               select_backend)
+from kicad_component_table import COLUMNS, ComponentTable
+from kicad_connectivity import ConnectivityEngine
+from kicad_drc import SEVERITY_LEVELS, DesignRules, DrcEngine, filter_by_severity
+from kicad_drc_parallel import default_workers, run_parallel
+from kicad_edit_journal import Change, EditJournal, EditSession, FootprintPose
+from kicad_fab_artifacts import ArtifactStore, BoardItems, artifact_store
+from kicad_fab_zip import DeterministicZip
+from kicad_force_place import ForceLayout, component_graph, detect_communities
+from kicad_geometry import rectangle
+from kicad_gerber_parallel import (DEFAULT_LAYERS, PlottedLayer, default_plot_workers, plot_layers, plot_parallel,
+                                   snapshot_board, write_job_file)
+from kicad_jobs import Job, JobQueue, Progress
+from kicad_legalize import DEFAULT_GRID_MM, Legalizer
+from kicad_overlaps import CourtyardOverlaps
+from kicad_output import OUTPUT_MODES, OUTPUT_PROPERTY, encode_result, select_output_mode
+from kicad_pcb_parser import load_kicad_pcb
+from kicad_pcbnew_executor import PcbnewExecutor
+from kicad_pcbnew_model import footprint_from_pcbnew, model_from_pcbnew
+from kicad_placement import PlacementNetlist, Pose
+from kicad_ratsnest import Ratsnest
+from kicad_reference_index import ReferenceIndex
+from kicad_spatial_index import SpatialGrid
+
 try:
     import pcbnew
 except ImportError:
     pcbnew = None
-    print("Warning: pcbnew module not available. Server will run in mock mode.", file=sys.stderr)
+    print("Warning: pcbnew module not available. Server will run headless or in mock mode.", file=sys.stderr)
+
+
+T = TypeVar("T")
+
+HEADLESS_EDIT_NOTE = "Headless backend: change applied to the in-memory board model only"
+LIST_FIELDS = ("reference", "value", "x_mm", "y_mm", "rotation_deg", "layer")
+TRACK_FIELDS = ("net", "width_mm", "length_mm", "layer")
+BACKGROUND_TOOLS = ("export_gerber", "export_fabrication_package", "fill_zones")
+JOB_TOOLS = ("get_job_status", "cancel_job")
+
+PAGINATION_PROPERTIES = {
+    "limit": {"type": "integer", "minimum": 1, "description": "Maximum number of records to return"},
+    "cursor": {"type": "string", "description": "Value of next_cursor from the previous page"},
+}
+
+BACKGROUND_PROPERTY = {
+    "type": "boolean",
+    "description": "Return a job_id at once and run in the background; poll get_job_status, stop with cancel_job",
+    "default": False
+}
+
+HYPOTHETICAL_POSE = {
+    "type": "object",
+    "properties": {
+        "reference": {"type": "string", "description": "Component reference (e.g., 'R1')"},
+        "x_mm": {"type": "number", "description": "X position in millimeters"},
+        "y_mm": {"type": "number", "description": "Y position in millimeters"},
+        "rotation_deg": {"type": "number", "description": "Rotation in degrees (default: current rotation)"}
+    },
+    "required": ["reference", "x_mm", "y_mm"]
+}
 
 
 class KiCadMCPServerExtended:
     """Extended MCP Server for KiCad automation with fabrication tools"""
 
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None, board_path: Optional[str] = None,
+                 output_mode: Optional[str] = None):
         self.server = Server("kicad-mcp-server-extended")
         self.board: Optional[Any] = None
+        self.board_path = board_path or os.environ.get("KICAD_MCP_BOARD")
+        self.backend = select_backend(
+            backend or os.environ.get("KICAD_MCP_BACKEND", "auto"), self.board_path, pcbnew is not None
+        )
+        self.output_mode = select_output_mode(output_mode or os.environ.get("KICAD_MCP_OUTPUT"))
+        self.drc_workers = default_workers()
+        self.plot_workers = default_plot_workers()
+        self.pcbnew_executor = PcbnewExecutor()
+        self.jobs = JobQueue(runner=self._run_job)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # MCP loop that file backend jobs run on
+        self.model: Optional[BoardModel] = None
+        self._ref_index: Optional[ReferenceIndex] = None
+        self._ref_index_source: Optional[Any] = None
+        self._components: Optional[ComponentTable] = None
+        self._components_source: Optional[Any] = None
+        self._board_checked_by: Optional[asyncio.Task] = None  # Request that last looked for KiCad GUI edits
+        self._snapshot: Optional[BoardModel] = None  # pcbnew board copied for the engines of one request
+        self._snapshot_source: Optional[Any] = None
+        self._snapshot_request: Optional[asyncio.Task] = None
+        self._board_edits = 0  # Bumped by every edit, so work done off the board's thread can tell it went stale
+        self._spatial: Optional[SpatialGrid] = None
+        self._spatial_source: Optional[Any] = None
+        self._overlaps: Optional[CourtyardOverlaps] = None
+        self._drc: Optional[DrcEngine] = None
+        self._drc_source: Optional[Any] = None
+        self._drc_moved: Set[str] = set()
+        self._connectivity: Optional[ConnectivityEngine] = None
+        self._connectivity_source: Optional[Any] = None
+        self._connectivity_moved: Set[str] = set()
+        self._ratsnest: Optional[Ratsnest] = None
+        self._ratsnest_source: Optional[Any] = None
+        self._placement: Optional[PlacementNetlist] = None
+        self._placement_source: Optional[Any] = None
+        self._journal = EditJournal()
+        self._session: Optional[EditSession] = None
+        self._replaying = False  # Undo, redo and rollback moves are not journaled
+        self._deferred_index: Set[str] = set()  # Moved during a session or replay, not yet in the spatial index
         self._setup_handlers()
 
+    def _get_model(self) -> BoardModel:
+        """Board model for the headless file backend, loaded from the snapshot cache or parsed on first use"""
+        if self.model is None:
+            self.model = load_board_model(self.board_path)
+        return self.model
+
+    def _board_model(self) -> BoardModel:
+        """Board model for the Python engines: the parsed file, or a snapshot of the live pcbnew board
+
+        The pcbnew snapshot is shared by every engine built during one request and taken again after an edit,
+        so a tool needing the ratsnest, placement netlist and board outline converts the footprints once.
+        """
+        if self.backend == "file":
+            return self._get_model()
+        request = self._current_request()
+        if (self._snapshot is None or self._snapshot_source is not self.board or request is None
+                or self._snapshot_request is not request):
+            self._snapshot = model_from_pcbnew(self.board)
+            self._snapshot_source, self._snapshot_request = self.board, request
+        return self._snapshot
+
+    async def _on_board_thread(self, coro: Awaitable[T]) -> T:
+        """Await a tool coroutine on the thread that owns the board: the pcbnew thread, or this loop for a file"""
+        if self.backend == "pcbnew":
+            return await self.pcbnew_executor.run(coro)
+        return await coro
+
+    def _run_job(self, coro: Coroutine[Any, Any, Dict]) -> Dict:
+        """Job runner: block the job worker until the tool coroutine finishes where board access is allowed"""
+        if self.backend == "pcbnew":
+            return self.pcbnew_executor.run_sync(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _in_worker(self, work: Callable[[], T]) -> T:
+        """Run pure-Python work on a worker thread, leaving the board's thread to other tool calls meanwhile
+
+        The work reads a snapshot taken before; if a tool call edited the board in the meantime the result is
+        stale, so it is refused rather than applied.
+        """
+        edits = self._board_edits
+        result = await asyncio.to_thread(work)
+        if self._board_edits != edits:
+            raise RuntimeError("The board was edited while this tool was running; run it again")
+        return result
+
+    async def _build_engines(self, ratsnest: bool = False, placement: bool = False,
+                             connectivity: bool = False) -> None:
+        """Build the missing board-model engines on a worker thread from one snapshot
+
+        The snapshot is read here, on the board's thread. Engines are only kept when no edit landed while they
+        were built; otherwise the synchronous builders make them again when asked.
+        """
+        def net_names(model: BoardModel) -> Dict[int, str]:
+            return {code: net.name for code, net in model.nets.items()}
+
+        builders = {
+            "_ratsnest": (ratsnest, lambda model: Ratsnest(model.footprints, net_names(model))),
+            "_placement": (placement, lambda model: PlacementNetlist(model.footprints, net_names(model))),
+            "_connectivity": (connectivity, ConnectivityEngine),
+        }
+        self._check_live_board()
+        source = self._get_model() if self.backend == "file" else self.board
+        wanted = {name: build for name, (needed, build) in builders.items()
+                  if needed and (getattr(self, name) is None or getattr(self, f"{name}_source") is not source)}
+        if not wanted:
+            return
+
+        model = self._board_model()
+        edits = self._board_edits
+        built = await asyncio.to_thread(lambda: {name: build(model) for name, build in wanted.items()})
+        if self._board_edits != edits:
+            return
+        for name, engine in built.items():
+            setattr(self, name, engine)
+            setattr(self, f"{name}_source", source)
+        if "_connectivity" in built:
+            self._connectivity_moved.clear()
+
+    @staticmethod
+    def _current_request() -> Optional[asyncio.Task]:
+        """Task of the tool call being served, None outside an event loop"""
+        try:
+            return asyncio.current_task()
+        except RuntimeError:
+            return None
+
+    def _check_live_board(self) -> None:
+        """Once per request on pcbnew, re-read the footprints and drop every index built before a KiCad GUI edit
+
+        pcbnew gives no notice when the board is edited in the GUI, so the component table is read again and
+        compared with the one the indexes were built alongside.
+        """
+        if self.backend != "pcbnew" or self.board is None:
+            return
+        request = self._current_request()  # None outside an event loop: check every time
+        if request is not None and request is self._board_checked_by:
+            return
+        table = ComponentTable.from_pcbnew(self.board)
+        if self._components is None or self._components_source is not self.board or self._components != table:
+            self._drop_indexes()
+            self._components, self._components_source = table, self.board
+        self._board_checked_by = request
+
+    def _drop_indexes(self) -> None:
+        """Forget every index and engine built from the board"""
+        self._ref_index = None
+        self._components = None
+        self._spatial = None
+        self._overlaps = None
+        self._drc = None
+        self._connectivity = None
+        self._ratsnest = None
+        self._placement = None
+        self._snapshot = None
+        self._board_edits += 1
+        self._drc_moved.clear()
+        self._connectivity_moved.clear()
+        self._deferred_index.clear()
+
+    def _footprint_index(self) -> ReferenceIndex:
+        """Reference → footprint index, rebuilt when the board (or board model) is reloaded
+
+        On pcbnew it holds the references only: a SWIG proxy kept between calls outlives a footprint deleted
+        in the KiCad GUI, so _find_footprint() always fetches the live footprint from the board.
+        """
+        self._check_live_board()
+        source = self._get_model() if self.backend == "file" else self.board
+        if self._ref_index is None or self._ref_index_source is not source:
+            if self.backend == "file":
+                self._ref_index = ReferenceIndex(source.footprints, lambda fp: fp.reference)
+            else:
+                self._ref_index = ReferenceIndex([fp.GetReference() for fp in source.GetFootprints()], str)
+            self._ref_index_source = source
+        return self._ref_index
+
+    def _component_table(self) -> ComponentTable:
+        """Columnar component store, rebuilt when the board (or board model) is reloaded or edited in KiCad"""
+        self._check_live_board()
+        source = self._get_model() if self.backend == "file" else self.board
+        if self._components is None or self._components_source is not source:
+            if self.backend == "file":
+                self._components = ComponentTable.from_model(source)
+            else:
+                self._components = ComponentTable.from_pcbnew(source)
+            self._components_source = source
+        return self._components
+
+    def _footprint_bbox(self, footprint: Any) -> BBox:
+        """Courtyard bounding box in mm, falling back to the footprint body without text"""
+        if self.backend == "file":
+            return footprint.bbox()
+
+        layer = pcbnew.B_CrtYd if footprint.IsFlipped() else pcbnew.F_CrtYd
+        courtyard = footprint.GetCourtyard(layer)
+        box = courtyard.BBox() if courtyard.OutlineCount() else footprint.GetBoundingBox(False, False)
+        return box.GetLeft() / 1e6, box.GetTop() / 1e6, box.GetRight() / 1e6, box.GetBottom() / 1e6
+
+    def _spatial_index(self) -> SpatialGrid:
+        """Reference → footprint bbox grid, rebuilt when the board (or board model) is reloaded"""
+        self._check_live_board()
+        source = self._get_model() if self.backend == "file" else self.board
+        if self._spatial is None or self._spatial_source is not source:
+            if self.backend == "file":
+                items = [(fp.reference, fp.bbox()) for fp in source.footprints]
+            else:
+                items = [(fp.GetReference(), self._footprint_bbox(fp)) for fp in source.GetFootprints()]
+            self._spatial = SpatialGrid.build(items)
+            self._spatial_source = source
+            self._deferred_index.clear()
+        elif self._deferred_index:
+            self._flush_deferred_index()
+        return self._spatial
+
+    def _footprint_courtyard(self, footprint: Any) -> Tuple[str, List[Point]]:
+        """Side layer and courtyard polygon in mm, falling back to the bounding box rectangle"""
+        if self.backend == "file":
+            if len(footprint.courtyard) >= 3:
+                return footprint.layer, footprint.courtyard
+            return footprint.layer, rectangle(footprint.bbox())
+
+        layer = pcbnew.B_CrtYd if footprint.IsFlipped() else pcbnew.F_CrtYd
+        courtyard = footprint.GetCourtyard(layer)
+        if courtyard.OutlineCount():
+            chain = courtyard.Outline(0)
+            points = [chain.CPoint(i) for i in range(chain.PointCount())]
+            if len(points) >= 3:
+                return footprint.GetLayerName(), [(p.x / 1e6, p.y / 1e6) for p in points]
+        return footprint.GetLayerName(), rectangle(self._footprint_bbox(footprint))
+
+    def _overlap_checker(self) -> CourtyardOverlaps:
+        """Courtyard overlap pairs sharing the spatial index, rebuilt along with it"""
+        index = self._spatial_index()
+        if self._overlaps is None or self._overlaps.grid is not index:
+            if self.backend == "file":
+                items = [(fp.reference, fp) for fp in self._get_model().footprints]
+            else:
+                items = [(fp.GetReference(), fp) for fp in self.board.GetFootprints()]
+            self._overlaps = CourtyardOverlaps(index, {ref: self._footprint_courtyard(fp) for ref, fp in items})
+        return self._overlaps
+
+    def _moved_footprints(self, references: Iterable[str], shared: Set[str]) -> List[Footprint]:
+        """Board-model footprints for the incremental engines, one per moved reference
+
+        A reference the engine holds on several footprints (its `shared` set) brings all of them, in board
+        order, since which one moved is not known.
+        """
+        moved = []
+        for reference in sorted(references):
+            if reference in shared:
+                footprints = [fp for fp in self._get_model().footprints if fp.reference == reference] \
+                    if self.backend == "file" else \
+                    [fp for fp in self.board.GetFootprints() if fp.GetReference() == reference]
+            else:
+                footprint, _ = self._find_footprint(reference)
+                footprints = [footprint] if footprint is not None else []
+            moved.extend(fp if self.backend == "file" else footprint_from_pcbnew(self.board, fp) for fp in footprints)
+        return moved
+
+    def _connectivity_engine(self) -> ConnectivityEngine:
+        """Per-net islands, rebuilt with the board and refreshed only for the nets of moved footprints"""
+        self._check_live_board()
+        source = self._get_model() if self.backend == "file" else self.board
+        if self._connectivity is None or self._connectivity_source is not source:
+            self._connectivity = ConnectivityEngine(self._board_model())
+            self._connectivity_source = source
+        elif self._connectivity_moved:
+            shared = self._connectivity.footprints.shared()
+            self._connectivity.update_footprints(self._moved_footprints(self._connectivity_moved, shared))
+        self._connectivity_moved.clear()
+        return self._connectivity
+
+    def _ratsnest_engine(self) -> Ratsnest:
+        """Per-net airwire trees, rebuilt when the board (or board model) is reloaded"""
+        self._check_live_board()
+        source = self._get_model() if self.backend == "file" else self.board
+        if self._ratsnest is None or self._ratsnest_source is not source:
+            model = self._board_model()
+            self._ratsnest = Ratsnest(model.footprints, {code: net.name for code, net in model.nets.items()})
+            self._ratsnest_source = source
+        return self._ratsnest
+
+    def _built_ratsnest(self) -> Optional[Ratsnest]:
+        """The ratsnest if a tool has already built it, brought up to date with KiCad GUI edits; None otherwise
+
+        Moves report their effect on the airwires only then, rather than building every net's tree for one edit.
+        """
+        if self._ratsnest is not None:
+            self._check_live_board()
+        return self._ratsnest
+
+    @staticmethod
+    def _ratsnest_change(ratsnest: Optional[Ratsnest], delta: float) -> Dict:
+        """ratsnest_delta_mm/ratsnest_length_mm result fields, empty when the ratsnest has not been built"""
+        if ratsnest is None:
+            return {}
+        return {"ratsnest_delta_mm": round(delta, 4), "ratsnest_length_mm": round(ratsnest.total_mm, 4)}
+
+    def _placement_netlist(self) -> PlacementNetlist:
+        """Pad-net incidence arrays for HPWL scoring, rebuilt when the board (or board model) is reloaded"""
+        self._check_live_board()
+        source = self._get_model() if self.backend == "file" else self.board
+        if self._placement is None or self._placement_source is not source:
+            model = self._board_model()
+            self._placement = PlacementNetlist(model.footprints, {code: net.name for code, net in model.nets.items()})
+            self._placement_source = source
+        return self._placement
+
+    @staticmethod
+    def _page(total: int, limit: Optional[int], cursor: Optional[str]) -> Tuple[int, int, Optional[str]]:
+        """Start/stop offsets of the requested page and the cursor of the next one"""
+        try:
+            start = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        if not 0 <= start <= total:
+            raise ValueError(f"Cursor out of range: {cursor!r}")
+        if limit is not None and int(limit) < 1:
+            raise ValueError("limit must be at least 1")
+
+        stop = total if limit is None else min(total, start + int(limit))
+        return start, stop, str(stop) if stop < total else None
+
+    @staticmethod
+    def _check_fields(fields: Optional[List[str]], allowed: Tuple[str, ...], default: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Validate a field projection"""
+        if not fields:
+            return default
+        unknown = [f for f in fields if f not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(allowed)})")
+        return tuple(fields)
+
+    def _find_footprint(self, reference: str) -> Tuple[Optional[Any], List[str]]:
+        """Look up a footprint by reference, returning suggestions when it does not exist"""
+        if self.backend == "pcbnew":
+            # Searched on the live board (in C++), so parts added, renamed or deleted in the KiCad GUI are seen
+            footprint = self.board.FindFootprintByReference(reference)
+            if footprint is not None:
+                return footprint, []
+            self._ref_index = None  # Suggest from the board as it is now
+            return None, self._footprint_index().suggest(reference)
+
+        index = self._footprint_index()
+        footprint = index.get(reference)
+        if footprint is None:
+            return None, index.suggest(reference)
+        return footprint, []
+
+    def _require_pcbnew(self, tool: str) -> Optional[Dict]:
+        """Error result for tools that only the pcbnew backend can serve"""
+        if self.backend == "file":
+            return {"error": f"{tool} requires the pcbnew backend (running headless from {self.board_path})"}
+        return None
+
     def _setup_handlers(self):
         """Register MCP protocol handlers"""
 
         # List available tools
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
-            return [
+            tools = [
                 # Basic tools
                 Tool(
                     name="place_component",
@@ -62,20 +476,117 @@ class KiCadMCPServerExtended:
                     }
                 ),
                 Tool(
-                    name="list_components",
-                    description="List all components on the PCB with their positions",
+                    name="place_components",
+                    description="Move many components in one batch with a single board refresh",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "placements": {
+                                "type": "array",
+                                "description": "Moves to apply, in order",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "reference": {"type": "string", "description": "Component reference (e.g., 'R1')"},
+                                        "x_mm": {"type": "number", "description": "X position in millimeters"},
+                                        "y_mm": {"type": "number", "description": "Y position in millimeters"},
+                                        "rotation_deg": {"type": "number", "description": "Rotation in degrees", "default": 0}
+                                    },
+                                    "required": ["reference", "x_mm", "y_mm"]
+                                }
+                            }
+                        },
+                        "required": ["placements"]
+                    }
+                ),
+                Tool(
+                    name="begin_edit",
+                    description="Open an edit session: moves stay undoable as one step, board refresh, index updates and zone fills wait for commit_edit",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "label": {"type": "string", "description": "Name for the undo step", "default": "edit"}
+                        }
+                    }
+                ),
+                Tool(
+                    name="commit_edit",
+                    description="Close the edit session as one undo step, run queued zone fills and refresh once",
                     inputSchema={"type": "object", "properties": {}}
                 ),
+                Tool(
+                    name="rollback_edit",
+                    description="Put every footprint moved in the edit session back and drop queued zone fills",
+                    inputSchema={"type": "object", "properties": {}}
+                ),
+                Tool(
+                    name="undo_edit",
+                    description="Undo the last committed edits (tool calls or sessions), restoring the footprint poses",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "steps": {"type": "integer", "minimum": 1, "description": "Number of steps to undo", "default": 1}
+                        }
+                    }
+                ),
+                Tool(
+                    name="redo_edit",
+                    description="Redo edits undone with undo_edit",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "steps": {"type": "integer", "minimum": 1, "description": "Number of steps to redo", "default": 1}
+                        }
+                    }
+                ),
+                Tool(
+                    name="list_components",
+                    description="List components on the PCB with their positions (filterable and paginated)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": list(COLUMNS)},
+                                "description": "Fields to return (default: reference, value, x_mm, y_mm, rotation_deg, layer)"
+                            },
+                            "layer": {"type": "string", "description": "Only components on this layer ('F.Cu' or 'B.Cu')"},
+                            "reference_glob": {"type": "string", "description": "Shell pattern for references (e.g., 'C*', 'U1?')"},
+                            "value": {"type": "string", "description": "Only components with this exact value"},
+                            **PAGINATION_PROPERTIES
+                        }
+                    }
+                ),
                 Tool(
                     name="read_netlist",
                     description="Read netlist information from the PCB",
                     inputSchema={"type": "object", "properties": {}}
                 ),
+                Tool(
+                    name="get_connectivity",
+                    description="Report connected copper islands per net and the pads still unconnected",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "net_name": {"type": "string", "description": "Only report this net"},
+                            "include_routed": {
+                                "type": "boolean",
+                                "description": "Also list fully routed nets (default: only nets with unconnected pads)",
+                                "default": False
+                            }
+                        }
+                    }
+                ),
                 Tool(
                     name="get_board_info",
                     description="Get general PCB information (size, layers, etc.)",
                     inputSchema={"type": "object", "properties": {}}
                 ),
+                Tool(
+                    name="reload_board",
+                    description="Reload the board (after edits made outside this server) and rebuild lookup indexes",
+                    inputSchema={"type": "object", "properties": {}}
+                ),
 
                 # Fabrication tools
                 Tool(
@@ -97,7 +608,13 @@ class KiCadMCPServerExtended:
                                 "type": "boolean",
                                 "description": "Create Gerber job file (.gbrjob)",
                                 "default": True
-                            }
+                            },
+                            "workers": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "description": "Processes to plot the layers on, each loading the board once (default: KICAD_MCP_PLOT_WORKERS or 1)"
+                            },
+                            "background": BACKGROUND_PROPERTY
                         },
                         "required": ["output_dir"]
                     }
@@ -130,7 +647,13 @@ class KiCadMCPServerExtended:
                                 "enum": ["jlcpcb", "pcbway", "oshpark", "generic"],
                                 "description": "Manufacturer preset for naming conventions",
                                 "default": "generic"
-                            }
+                            },
+                            "incremental": {
+                                "type": "boolean",
+                                "description": "Reuse stored Gerber, drill, BOM and position outputs whose board items are unchanged",
+                                "default": True
+                            },
+                            "background": BACKGROUND_PROPERTY
                         },
                         "required": ["output_dir"]
                     }
@@ -167,14 +690,39 @@ class KiCadMCPServerExtended:
                         "properties": {
                             "severity_level": {
                                 "type": "string",
-                                "enum": ["error", "warning", "all"],
+                                "enum": list(SEVERITY_LEVELS),
                                 "description": "Minimum severity level to report",
                                 "default": "all"
+                            },
+                            "clearance_mm": {"type": "number", "description": "Copper clearance (default: 0.2)"},
+                            "min_track_width_mm": {"type": "number", "description": "Minimum track width (default: 0.15)"},
+                            "min_drill_mm": {"type": "number", "description": "Minimum drill diameter (default: 0.3)"},
+                            "min_annular_ring_mm": {"type": "number", "description": "Minimum annular ring (default: 0.1)"},
+                            "incremental": {
+                                "type": "boolean",
+                                "description": "Re-check only components moved since the previous run and return new/cleared violations",
+                                "default": False
+                            },
+                            "workers": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "description": "Processes for the clearance pass of a full check (default: KICAD_MCP_DRC_WORKERS or 1)"
                             }
                         }
                     }
                 ),
 
+                Tool(
+                    name="check_overlaps",
+                    description="Find pairs of components whose courtyards overlap on the same side of the board",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "layer": {"type": "string", "description": "Only check this side ('F.Cu' or 'B.Cu')"}
+                        }
+                    }
+                ),
+
                 # Layout tools
                 Tool(
                     name="fill_zones",
@@ -186,7 +734,8 @@ class KiCadMCPServerExtended:
                                 "type": "array",
                                 "items": {"type": "string"},
                                 "description": "Specific zone net names to fill (optional)"
-                            }
+                            },
+                            "background": BACKGROUND_PROPERTY
                         }
                     }
                 ),
@@ -199,67 +748,273 @@ class KiCadMCPServerExtended:
                             "net_name": {
                                 "type": "string",
                                 "description": "Filter by net name (optional)"
+                            },
+                            "layer": {"type": "string", "description": "Only tracks on this copper layer"},
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": list(TRACK_FIELDS)},
+                                "description": "Fields to return (default: all)"
+                            },
+                            **PAGINATION_PROPERTIES
+                        }
+                    }
+                ),
+                Tool(
+                    name="get_ratsnest",
+                    description="Airwire (minimum spanning tree) length per net and for the whole board, longest nets first",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "net_name": {"type": "string", "description": "Only report this net"},
+                            "include_airwires": {
+                                "type": "boolean",
+                                "description": "List each net's airwires as pad pairs with lengths",
+                                "default": False
+                            },
+                            **PAGINATION_PROPERTIES
+                        }
+                    }
+                ),
+                Tool(
+                    name="score_placement",
+                    description="Half-perimeter wirelength (HPWL) of the board, or of hypothetical positions without moving anything",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "placements": {
+                                "type": "array",
+                                "description": "Hypothetical positions for any subset of components",
+                                "items": HYPOTHETICAL_POSE
+                            },
+                            "candidates": {
+                                "type": "array",
+                                "description": "Alternative sets of hypothetical positions, each scored independently",
+                                "items": {"type": "array", "items": HYPOTHETICAL_POSE}
+                            },
+                            "include_nets": {
+                                "type": "boolean",
+                                "description": "List per-net HPWL (nets touched by placements, or all nets)",
+                                "default": False
                             }
                         }
                     }
                 ),
+                Tool(
+                    name="auto_place",
+                    description="Optimize positions and rotations of components by simulated annealing on wirelength, courtyard overlap and the board outline, applied in one batch",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "references": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Components to place (default: every unlocked component); locked ones are skipped"
+                            },
+                            "moves": {"type": "integer", "minimum": 1, "description": "Moves to try (default: 500 per component, at most 300000)"},
+                            "allow_rotation": {"type": "boolean", "description": "Also try quarter turns", "default": True},
+                            "spacing_mm": {"type": "number", "minimum": 0, "description": "Gap to keep between courtyards", "default": 0.25},
+                            "seed": {"type": "integer", "description": "Random seed (same seed, same result)", "default": 0}
+                        }
+                    }
+                ),
+                Tool(
+                    name="draft_placement",
+                    description="Fast first-draft placement: cluster components that share nets, then run a force-directed layout (rougher than auto_place)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "references": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Components to place (default: every unlocked component); locked ones are skipped"
+                            },
+                            "spacing_mm": {"type": "number", "minimum": 0, "description": "Gap to keep between courtyards", "default": 0.25},
+                            "seed": {"type": "integer", "description": "Random seed (same seed, same result)", "default": 0}
+                        }
+                    }
+                ),
+                Tool(
+                    name="legalize_placement",
+                    description="Snap footprints to a grid and clear courtyard overlaps, moving each part as little as possible",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "references": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Components to legalize (default: every unlocked component); locked ones are skipped"
+                            },
+                            "grid_mm": {"type": "number", "minimum": 0, "description": "Placement grid, 0 to keep positions off-grid", "default": DEFAULT_GRID_MM},
+                            "spacing_mm": {"type": "number", "minimum": 0, "description": "Gap to keep between courtyards", "default": 0}
+                        }
+                    }
+                ),
+                Tool(
+                    name="align_components",
+                    description="Line up the courtyard edges or centres of many components in one batch",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "references": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "minItems": 2,
+                                "description": "Components to align; locked ones stay put and set the line"
+                            },
+                            "edge": {
+                                "type": "string",
+                                "enum": list(ALIGN_EDGES),
+                                "description": "Edge to line up; center_x gives a common centre X (a vertical line), center_y a common centre Y"
+                            }
+                        },
+                        "required": ["references", "edge"]
+                    }
+                ),
+                Tool(
+                    name="distribute_components",
+                    description="Space components with equal courtyard gaps along an axis; the outermost two stay put",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "references": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "minItems": 3,
+                                "description": "Components to distribute; locked ones are left out"
+                            },
+                            "axis": {"type": "string", "enum": ["x", "y"], "description": "Axis to distribute along", "default": "x"}
+                        },
+                        "required": ["references"]
+                    }
+                ),
+                Tool(
+                    name="arrange_components",
+                    description="Arrange components into a row, column or matrix at a fixed pitch, in the order given",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "references": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "minItems": 1,
+                                "description": "Components to arrange, in placement order; locked ones are left out"
+                            },
+                            "layout": {"type": "string", "enum": list(LAYOUTS), "description": "Row, column or matrix (filled row by row)", "default": "row"},
+                            "pitch_x_mm": {"type": "number", "description": "Spacing between columns (default: widest courtyard plus 0.5 mm)"},
+                            "pitch_y_mm": {"type": "number", "description": "Spacing between rows (default: tallest courtyard plus 0.5 mm)"},
+                            "columns": {"type": "integer", "minimum": 1, "description": "Columns of a matrix (default: square-ish)"},
+                            "x_mm": {"type": "number", "description": "X of the first position (default: where the first component is)"},
+                            "y_mm": {"type": "number", "description": "Y of the first position (default: where the first component is)"},
+                            "rotation_deg": {"type": "number", "description": "Common rotation to apply (default: keep each rotation)"}
+                        },
+                        "required": ["references"]
+                    }
+                ),
+                Tool(
+                    name="mirror_components",
+                    description="Flip a group of components to the other side of the board, mirrored about the group's centre line",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "references": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "minItems": 1,
+                                "description": "Components to flip; locked ones are left out"
+                            },
+                        },
+                        "required": ["references"]
+                    }
+                ),
+                Tool(
+                    name="query_region",
+                    description="Find components whose courtyards overlap a rectangle or lie within a radius of a point",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "x_min": {"type": "number", "description": "Rectangle left edge in millimeters"},
+                            "y_min": {"type": "number", "description": "Rectangle top edge in millimeters"},
+                            "x_max": {"type": "number", "description": "Rectangle right edge in millimeters"},
+                            "y_max": {"type": "number", "description": "Rectangle bottom edge in millimeters"},
+                            "x_mm": {"type": "number", "description": "Circle center X in millimeters"},
+                            "y_mm": {"type": "number", "description": "Circle center Y in millimeters"},
+                            "radius_mm": {"type": "number", "description": "Circle radius in millimeters"},
+                            "layer": {"type": "string", "description": "Only components on this layer ('F.Cu' or 'B.Cu')"},
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": list(COLUMNS)},
+                                "description": "Fields to return (default: reference, value, x_mm, y_mm, rotation_deg, layer)"
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="nearest_components",
+                    description="Find the components whose courtyards are closest to a point",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "x_mm": {"type": "number", "description": "X position in millimeters"},
+                            "y_mm": {"type": "number", "description": "Y position in millimeters"},
+                            "count": {"type": "integer", "minimum": 1, "description": "Number of components", "default": 5},
+                            "layer": {"type": "string", "description": "Only components on this layer ('F.Cu' or 'B.Cu')"},
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": list(COLUMNS)},
+                                "description": "Fields to return (default: reference, value, x_mm, y_mm, rotation_deg, layer)"
+                            }
+                        },
+                        "required": ["x_mm", "y_mm"]
+                    }
+                ),
+
+                # Background jobs
+                Tool(
+                    name="get_job_status",
+                    description="State, progress and (once finished) result of a background job; every recent job without job_id",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "job_id": {"type": "string", "description": "Job id returned by a background tool call"}
+                        }
+                    }
+                ),
+                Tool(
+                    name="cancel_job",
+                    description="Cancel a background job: queued jobs at once, running ones at their next progress step",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "job_id": {"type": "string", "description": "Job id returned by a background tool call"}
+                        },
+                        "required": ["job_id"]
+                    }
+                ),
             ]
+            for tool in tools:
+                tool.inputSchema.setdefault("properties", {})["output"] = OUTPUT_PROPERTY
+            return tools
 
         # Handle tool calls
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Any) -> List[TextContent]:
+            arguments = dict(arguments or {})
+            mode = self.output_mode
             try:
-                # Basic tools
-                if name == "place_component":
-                    result = await self._place_component(
-                        arguments["reference"], arguments["x_mm"], arguments["y_mm"],
-                        arguments.get("rotation_deg", 0)
-                    )
-                elif name == "list_components":
-                    result = await self._list_components()
-                elif name == "read_netlist":
-                    result = await self._read_netlist()
-                elif name == "get_board_info":
-                    result = await self._get_board_info()
-
-                # Fabrication tools
-                elif name == "export_gerber":
-                    result = await self._export_gerber(
-                        arguments["output_dir"],
-                        arguments.get("layers"),
-                        arguments.get("create_job_file", True)
-                    )
-                elif name == "export_drill_files":
-                    result = await self._export_drill_files(
-                        arguments["output_dir"],
-                        arguments.get("merge_pth_npth", False)
-                    )
-                elif name == "export_fabrication_package":
-                    result = await self._export_fabrication_package(
-                        arguments["output_dir"],
-                        arguments.get("manufacturer_preset", "generic")
-                    )
-                elif name == "export_bom":
-                    result = await self._export_bom(arguments["output_file"])
-                elif name == "export_position_file":
-                    result = await self._export_position_file(arguments["output_file"])
-
-                # Verification tools
-                elif name == "run_drc":
-                    result = await self._run_drc(arguments.get("severity_level", "all"))
-
-                # Layout tools
-                elif name == "fill_zones":
-                    result = await self._fill_zones(arguments.get("zone_names"))
-                elif name == "get_track_info":
-                    result = await self._get_track_info(arguments.get("net_name"))
-
+                mode = select_output_mode(arguments.pop("output", None) or self.output_mode)
+                if name in JOB_TOOLS:
+                    # Job bookkeeping is answered here, even while the pcbnew thread is busy
+                    result = await (self._get_job_status(arguments.get("job_id")) if name == "get_job_status"
+                                    else self._cancel_job(arguments["job_id"]))
+                elif arguments.pop("background", False) and name in BACKGROUND_TOOLS:
+                    result = self._start_job(name, arguments)
                 else:
-                    result = {"error": f"Unknown tool: {name}"}
+                    # A live board's tools run on the pcbnew thread; encoding the result stays on this loop
+                    result = await self._on_board_thread(self._call_tool(name, arguments))
 
-                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+                return [TextContent(type="text", text=encode_result(result, mode))]
             except Exception as e:
-                return [TextContent(type="text", text=json.dumps({"error": str(e)}, indent=2))]
+                return [TextContent(type="text", text=encode_result({"error": str(e)}, mode))]
 
         # List available resources
         @self.server.list_resources()
@@ -282,20 +1037,27 @@ class KiCadMCPServerExtended:
                     name="PCB Netlist",
                     mimeType="application/json",
                     description="All nets on the board"
+                ),
+                Resource(
+                    uri="board://connectivity",
+                    name="PCB Connectivity",
+                    mimeType="application/json",
+                    description="Routing status: unrouted nets, their islands and unconnected pads"
                 )
             ]
 
         # Handle resource reads
         @self.server.read_resource()
         async def read_resource(uri: str) -> str:
-            if uri == "board://schematic":
-                return json.dumps(await self._list_components(), indent=2)
-            elif uri == "board://info":
-                return json.dumps(await self._get_board_info(), indent=2)
-            elif uri == "board://nets":
-                return json.dumps(await self._read_netlist(), indent=2)
-            else:
+            readers = {
+                "board://schematic": self._list_components,
+                "board://info": self._get_board_info,
+                "board://nets": self._read_netlist,
+                "board://connectivity": self._get_connectivity,
+            }
+            if uri not in readers:
                 raise ValueError(f"Unknown resource: {uri}")
+            return encode_result(await self._on_board_thread(readers[uri]()), self.output_mode)
 
         # List available prompts
         @self.server.list_prompts()
@@ -322,8 +1084,12 @@ class KiCadMCPServerExtended:
         async def get_prompt(name: str, arguments: Optional[Dict[str, str]] = None) -> GetPromptResult:
             if name == "simple_circuit":
                 circuit_type = arguments.get("type", "LED") if arguments else "LED"
-                components = await self._list_components()
-                guidance = self._get_circuit_guidance(circuit_type, components)
+
+                async def circuit_guidance() -> str:
+                    components = await self._list_components()
+                    return self._get_circuit_guidance(circuit_type, components, self._component_groups())
+
+                guidance = await self._on_board_thread(circuit_guidance())
                 return GetPromptResult(
                     description=f"Layout guidance for {circuit_type} circuit",
                     messages=[PromptMessage(
@@ -332,7 +1098,7 @@ class KiCadMCPServerExtended:
                     )]
                 )
             elif name == "fabrication_checklist":
-                checklist = await self._get_fabrication_checklist()
+                checklist = await self._on_board_thread(self._get_fabrication_checklist())
                 return GetPromptResult(
                     description="Pre-fabrication checklist",
                     messages=[PromptMessage(
@@ -343,54 +1109,407 @@ class KiCadMCPServerExtended:
             else:
                 raise ValueError(f"Unknown prompt: {name}")
 
+    async def _call_tool(self, name: str, arguments: Dict, progress: Optional[Progress] = None) -> Dict:
+        """Dispatch one tool call; runs on the pcbnew thread (progress is given to background jobs)"""
+        # Basic tools
+        if name == "place_component":
+            result = await self._place_component(
+                arguments["reference"], arguments["x_mm"], arguments["y_mm"],
+                arguments.get("rotation_deg", 0)
+            )
+        elif name == "place_components":
+            result = await self._place_components(arguments["placements"])
+        elif name == "list_components":
+            result = await self._list_components(
+                fields=arguments.get("fields"),
+                limit=arguments.get("limit"),
+                cursor=arguments.get("cursor"),
+                layer=arguments.get("layer"),
+                reference_glob=arguments.get("reference_glob"),
+                value=arguments.get("value")
+            )
+        elif name == "read_netlist":
+            result = await self._read_netlist()
+        elif name == "get_connectivity":
+            result = await self._get_connectivity(
+                arguments.get("net_name"),
+                include_routed=arguments.get("include_routed", False)
+            )
+        elif name == "get_board_info":
+            result = await self._get_board_info()
+        elif name == "reload_board":
+            result = await self._reload_board()
+
+        # Fabrication tools
+        elif name == "export_gerber":
+            result = await self._export_gerber(
+                arguments["output_dir"],
+                arguments.get("layers"),
+                arguments.get("create_job_file", True),
+                arguments.get("workers"),
+                progress=progress
+            )
+        elif name == "export_drill_files":
+            result = await self._export_drill_files(
+                arguments["output_dir"],
+                arguments.get("merge_pth_npth", False)
+            )
+        elif name == "export_fabrication_package":
+            result = await self._export_fabrication_package(
+                arguments["output_dir"],
+                arguments.get("manufacturer_preset", "generic"),
+                arguments.get("incremental", True),
+                progress=progress
+            )
+        elif name == "export_bom":
+            result = await self._export_bom(arguments["output_file"])
+        elif name == "export_position_file":
+            result = await self._export_position_file(arguments["output_file"])
+
+        # Verification tools
+        elif name == "run_drc":
+            result = await self._run_drc(
+                arguments.get("severity_level", "all"),
+                clearance_mm=arguments.get("clearance_mm"),
+                min_track_width_mm=arguments.get("min_track_width_mm"),
+                min_drill_mm=arguments.get("min_drill_mm"),
+                min_annular_ring_mm=arguments.get("min_annular_ring_mm"),
+                incremental=arguments.get("incremental", False),
+                workers=arguments.get("workers")
+            )
+        elif name == "check_overlaps":
+            result = await self._check_overlaps(arguments.get("layer"))
+
+        # Layout tools
+        elif name == "fill_zones":
+            result = await self._fill_zones(
+                arguments.get("zone_names"),
+                progress=progress
+            )
+        elif name == "get_track_info":
+            result = await self._get_track_info(
+                arguments.get("net_name"),
+                layer=arguments.get("layer"),
+                fields=arguments.get("fields"),
+                limit=arguments.get("limit"),
+                cursor=arguments.get("cursor")
+            )
+        elif name == "get_ratsnest":
+            result = await self._get_ratsnest(
+                arguments.get("net_name"),
+                include_airwires=arguments.get("include_airwires", False),
+                limit=arguments.get("limit"),
+                cursor=arguments.get("cursor")
+            )
+        elif name == "score_placement":
+            result = await self._score_placement(
+                arguments.get("placements"),
+                candidates=arguments.get("candidates"),
+                include_nets=arguments.get("include_nets", False)
+            )
+        elif name == "auto_place":
+            result = await self._auto_place(
+                arguments.get("references"),
+                moves=arguments.get("moves"),
+                allow_rotation=arguments.get("allow_rotation", True),
+                spacing_mm=arguments.get("spacing_mm", 0.25),
+                seed=arguments.get("seed", 0)
+            )
+        elif name == "draft_placement":
+            result = await self._draft_placement(
+                arguments.get("references"),
+                spacing_mm=arguments.get("spacing_mm", 0.25),
+                seed=arguments.get("seed", 0)
+            )
+        elif name == "legalize_placement":
+            result = await self._legalize_placement(
+                arguments.get("references"),
+                grid_mm=arguments.get("grid_mm", DEFAULT_GRID_MM),
+                spacing_mm=arguments.get("spacing_mm", 0.0)
+            )
+        elif name == "begin_edit":
+            result = await self._begin_edit(arguments.get("label", "edit"))
+        elif name == "commit_edit":
+            result = await self._commit_edit()
+        elif name == "rollback_edit":
+            result = await self._rollback_edit()
+        elif name == "undo_edit":
+            result = await self._undo_edit(arguments.get("steps", 1))
+        elif name == "redo_edit":
+            result = await self._redo_edit(arguments.get("steps", 1))
+        elif name == "align_components":
+            result = await self._align_components(arguments["references"], arguments["edge"])
+        elif name == "distribute_components":
+            result = await self._distribute_components(arguments["references"], axis=arguments.get("axis", "x"))
+        elif name == "arrange_components":
+            result = await self._arrange_components(
+                arguments["references"],
+                layout=arguments.get("layout", "row"),
+                pitch_x_mm=arguments.get("pitch_x_mm"),
+                pitch_y_mm=arguments.get("pitch_y_mm"),
+                columns=arguments.get("columns"),
+                x_mm=arguments.get("x_mm"),
+                y_mm=arguments.get("y_mm"),
+                rotation_deg=arguments.get("rotation_deg")
+            )
+        elif name == "mirror_components":
+            result = await self._mirror_components(arguments["references"])
+        elif name == "query_region":
+            result = await self._query_region(
+                x_min=arguments.get("x_min"),
+                y_min=arguments.get("y_min"),
+                x_max=arguments.get("x_max"),
+                y_max=arguments.get("y_max"),
+                x_mm=arguments.get("x_mm"),
+                y_mm=arguments.get("y_mm"),
+                radius_mm=arguments.get("radius_mm"),
+                layer=arguments.get("layer"),
+                fields=arguments.get("fields")
+            )
+        elif name == "nearest_components":
+            result = await self._nearest_components(
+                arguments["x_mm"], arguments["y_mm"],
+                count=arguments.get("count", 5),
+                layer=arguments.get("layer"),
+                fields=arguments.get("fields")
+            )
+
+        else:
+            result = {"error": f"Unknown tool: {name}"}
+        return result
+
     # ============================================================================
     # BASIC TOOLS (from original server)
     # ============================================================================
 
     async def _place_component(self, reference: str, x_mm: float, y_mm: float, rotation_deg: float = 0) -> Dict:
         """Place/move a component on the board"""
-        if pcbnew is None:
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "message": f"Mock: Would place {reference} at ({x_mm}, {y_mm}) mm, rotation {rotation_deg}°"
             }
 
         try:
-            if self.board is None:
+            if self.backend == "file":
+                self._get_model()
+            elif self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is currently open in KiCad"}
 
-            footprint = None
-            for fp in self.board.GetFootprints():
-                if fp.GetReference() == reference:
-                    footprint = fp
-                    break
-
+            footprint, suggestions = self._find_footprint(reference)
             if footprint is None:
-                available = [fp.GetReference() for fp in self.board.GetFootprints()]
-                return {"error": f"Component '{reference}' not found", "available_components": available}
+                return {"error": f"Component '{reference}' not found", "suggestions": suggestions}
 
-            x_nm = int(x_mm * 1e6)
-            y_nm = int(y_mm * 1e6)
+            ratsnest = self._built_ratsnest()
+            delta = self._move_footprint(footprint, reference, x_mm, y_mm, rotation_deg)
 
-            footprint.SetPosition(pcbnew.VECTOR2I(x_nm, y_nm))
-            footprint.SetOrientationDegrees(rotation_deg)
-
-            pcbnew.Refresh()
-
-            return {
+            result = {
                 "status": "success",
                 "reference": reference,
                 "position": {"x_mm": x_mm, "y_mm": y_mm},
-                "rotation_deg": rotation_deg
+                "rotation_deg": rotation_deg,
+                **self._ratsnest_change(ratsnest, delta)
             }
+            return self._finish_edit(result, f"place_component {reference}", changed=True)
         except Exception as e:
             return {"error": f"Failed to place component: {str(e)}"}
 
-    async def _list_components(self) -> Dict:
-        """List all components"""
-        if pcbnew is None:
+    async def _place_components(self, placements: List[Dict]) -> Dict:
+        """Place/move many components in one pass with a single refresh"""
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "message": f"Mock: Would place {len(placements)} components",
+                "results": [{"reference": item.get("reference"), "status": "mock"} for item in placements]
+            }
+
+        try:
+            if self.backend == "file":
+                self._get_model()
+            elif self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is currently open in KiCad"}
+
+            ratsnest = self._built_ratsnest()
+            results = []
+            placed = 0
+            delta = 0.0
+            for item in placements:
+                reference = item.get("reference")
+                try:
+                    if not isinstance(reference, str):
+                        raise ValueError("'reference' must be a string")
+                    x_mm = float(item["x_mm"])
+                    y_mm = float(item["y_mm"])
+                    rotation_deg = float(item.get("rotation_deg", 0))
+                except (KeyError, TypeError, ValueError) as e:
+                    results.append({"reference": reference, "status": "error", "error": f"Invalid placement: {e}"})
+                    continue
+
+                footprint, suggestions = self._find_footprint(reference)
+                if footprint is None:
+                    results.append({
+                        "reference": reference,
+                        "status": "error",
+                        "error": f"Component '{reference}' not found",
+                        "suggestions": suggestions
+                    })
+                    continue
+
+                try:
+                    delta += self._move_footprint(footprint, reference, x_mm, y_mm, rotation_deg)
+                except Exception as e:
+                    results.append({"reference": reference, "status": "error", "error": str(e)})
+                    continue
+
+                results.append({
+                    "reference": reference,
+                    "status": "success",
+                    "position": {"x_mm": x_mm, "y_mm": y_mm},
+                    "rotation_deg": rotation_deg
+                })
+                placed += 1
+
+            result = {
+                "status": "success",
+                "placed": placed,
+                "failed": len(placements) - placed,
+                **self._ratsnest_change(ratsnest, delta),
+                "results": results
+            }
+            return self._finish_edit(result, "place_components", changed=placed > 0)
+        except Exception as e:
+            return {"error": f"Failed to place components: {str(e)}"}
+
+    def _move_footprint(self, footprint: Any, reference: str, x_mm: float, y_mm: float, rotation_deg: float) -> float:
+        """Apply a position and rotation to a pcbnew or board-model footprint (no refresh)
+
+        Returns the change in ratsnest length, 0 when the ratsnest has not been built.
+        """
+        before = self._footprint_state(footprint)
+        if self.backend == "file":
+            footprint.move_to(x_mm, y_mm, rotation_deg)
+        else:
+            footprint.SetPosition(pcbnew.VECTOR2I(int(x_mm * 1e6), int(y_mm * 1e6)))
+            footprint.SetOrientationDegrees(rotation_deg)
+        if not self._replaying:
+            self._journal.record(reference, before, (x_mm, y_mm, rotation_deg, before[3]))
+        return self._footprint_changed(footprint, reference, x_mm, y_mm, rotation_deg)
+
+    def _flip_footprint(self, footprint: Any, reference: str, axis_x_mm: float) -> float:
+        """Flip a footprint to the other side, mirrored about a vertical line (no refresh)
+
+        Returns the change in ratsnest length, 0 when the ratsnest has not been built.
+        """
+        before = self._footprint_state(footprint)
+        if self.backend == "file":
+            footprint.flip(axis_x_mm)
+        else:
+            centre = pcbnew.VECTOR2I(int(round(axis_x_mm * 1e6)), footprint.GetPosition().y)
+            footprint.Flip(centre, pcbnew.FLIP_DIRECTION_LEFT_RIGHT)
+        self._placement = None  # Pad offsets are mirrored; rebuilt on next use
+        after = self._footprint_state(footprint)
+        if not self._replaying:
+            self._journal.record(reference, before, after)
+        return self._footprint_changed(footprint, reference, *after)
+
+    def _footprint_pose(self, footprint: Any) -> Tuple[float, float, float]:
+        """Position in mm and rotation in degrees of a pcbnew or board-model footprint"""
+        if self.backend == "file":
+            return footprint.x_mm, footprint.y_mm, footprint.rotation_deg
+        position = footprint.GetPosition()
+        return position.x / 1e6, position.y / 1e6, footprint.GetOrientationDegrees()
+
+    def _footprint_state(self, footprint: Any) -> FootprintPose:
+        """Pose plus side layer, as kept in the edit journal"""
+        return (*self._footprint_pose(footprint), footprint.layer if self.backend == "file" else footprint.GetLayerName())
+
+    def _footprint_changed(self, footprint: Any, reference: str, x_mm: float, y_mm: float, rotation_deg: float,
+                           layer: Optional[str] = None) -> float:
+        """Bring every cache in step with a footprint that was just moved or flipped; returns the ratsnest delta"""
+        self._snapshot = None
+        self._board_edits += 1
+        if self._components is not None:
+            self._components.update(reference, x_mm, y_mm, rotation_deg, layer)
+        if self._spatial is not None:
+            if self._session is not None or self._replaying:
+                self._deferred_index.add(reference)
+            else:
+                self._spatial.update(reference, self._footprint_bbox(footprint))
+                if self._overlaps is not None and self._overlaps.grid is self._spatial:
+                    self._overlaps.update(reference, *self._footprint_courtyard(footprint))
+        if self._drc is not None:
+            self._drc_moved.add(reference)
+        if self._connectivity is not None:
+            self._connectivity_moved.add(reference)
+        if self._placement is not None and reference in self._placement.index:
+            self._placement.move(reference, x_mm, y_mm, rotation_deg)
+        elif self._placement is not None and reference in self._placement.duplicates:
+            self._placement = None  # Which of the footprints moved is unknown; rebuilt on next use
+        if self._ratsnest is not None:
+            shared = self._ratsnest.footprints.shared()
+            if reference in shared:
+                moved = self._moved_footprints([reference], shared)
+            else:
+                moved = [footprint if self.backend == "file" else footprint_from_pcbnew(self.board, footprint)]
+            return sum(self._ratsnest.update_footprints(moved).values())
+        return 0.0
+
+    def _flush_deferred_index(self) -> None:
+        """Bring the spatial index and courtyard overlaps up to date with the footprints moved meanwhile"""
+        if self._spatial is not None:
+            for reference in self._deferred_index:
+                footprint, _ = self._find_footprint(reference)
+                if footprint is None:
+                    continue
+                self._spatial.update(reference, self._footprint_bbox(footprint))
+                if self._overlaps is not None and self._overlaps.grid is self._spatial:
+                    self._overlaps.update(reference, *self._footprint_courtyard(footprint))
+        self._deferred_index.clear()
+
+    def _refresh_view(self, result: Dict, changed: bool) -> Dict:
+        """Note a headless edit, or refresh the KiCad view once when anything changed"""
+        if self.backend == "file":
+            result["note"] = HEADLESS_EDIT_NOTE
+        elif changed:
+            pcbnew.Refresh()
+        return result
+
+    def _finish_edit(self, result: Dict, label: str, changed: bool) -> Dict:
+        """End a mutating tool call: one undo step and one refresh, both deferred while an edit session is open"""
+        if self._session is not None:
+            result["edit_session"] = self._session.label
+            return result
+        self._journal.seal(label)
+        return self._refresh_view(result, changed)
+
+    def _replay(self, changes: List[Change], undo: bool) -> float:
+        """Put footprints back to their poses before (undo) or after (redo) a list of changes; returns the ratsnest delta"""
+        delta = 0.0
+        self._replaying = True
+        try:
+            for reference, before, after in (reversed(changes) if undo else changes):
+                x_mm, y_mm, rotation_deg, layer = before if undo else after
+                footprint, _ = self._find_footprint(reference)
+                if footprint is None:
+                    continue
+                if self._footprint_state(footprint)[3] != layer:
+                    delta += self._flip_footprint(footprint, reference, self._footprint_pose(footprint)[0])
+                delta += self._move_footprint(footprint, reference, x_mm, y_mm, rotation_deg)
+        finally:
+            self._replaying = False
+        if self._session is None:
+            self._flush_deferred_index()
+        return delta
+
+    async def _list_components(self, fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                               cursor: Optional[str] = None, layer: Optional[str] = None,
+                               reference_glob: Optional[str] = None, value: Optional[str] = None) -> Dict:
+        """List components, filtered and projected before serialization"""
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "components": [
@@ -400,57 +1519,102 @@ class KiCadMCPServerExtended:
             }
 
         try:
-            if self.board is None:
+            if self.backend == "pcbnew" and self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is open"}
 
-            components = []
-            for fp in self.board.GetFootprints():
-                pos = fp.GetPosition()
-                components.append({
-                    "reference": fp.GetReference(),
-                    "value": fp.GetValue(),
-                    "x_mm": pos.x / 1e6,
-                    "y_mm": pos.y / 1e6,
-                    "rotation_deg": fp.GetOrientationDegrees(),
-                    "layer": fp.GetLayerName()
-                })
+            fields = self._check_fields(fields, COLUMNS, LIST_FIELDS)
+            table = self._component_table()
+            rows = table.filter_rows(layer=layer, reference_glob=reference_glob, value=value)
+            start, stop, next_cursor = self._page(len(rows), limit, cursor)
 
-            return {"status": "success", "count": len(components), "components": components}
+            components = table.records(fields, rows[start:stop])
+            result = {"status": "success", "count": len(components), "total": len(rows), "components": components}
+            if next_cursor is not None:
+                result["next_cursor"] = next_cursor
+            return result
         except Exception as e:
             return {"error": f"Failed to list components: {str(e)}"}
 
-    async def _read_netlist(self) -> Dict:
-        """Read netlist"""
-        if pcbnew is None:
+    async def _read_netlist(self) -> Dict:
+        """Read netlist"""
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "nets": [
+                    {"name": "GND", "code": 0},
+                    {"name": "+5V", "code": 1},
+                ]
+            }
+
+        try:
+            if self.backend == "file":
+                nets = [{"name": net.name, "code": net.code} for net in self._get_model().nets.values() if net.name]
+                return {"status": "success", "count": len(nets), "nets": nets}
+
+            if self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            nets = []
+            netinfo = self.board.GetNetInfo()
+            for net_name, net in netinfo.NetsByName().items():
+                if net_name:
+                    nets.append({"name": net_name, "code": net.GetNetCode()})
+
+            return {"status": "success", "count": len(nets), "nets": nets}
+        except Exception as e:
+            return {"error": f"Failed to read netlist: {str(e)}"}
+
+    async def _get_connectivity(self, net_name: Optional[str] = None, include_routed: bool = False) -> Dict:
+        """Islands and unconnected pads per net; after moves only the moved parts' nets are rebuilt"""
+        if self.backend == "mock":
             return {
                 "status": "mock",
+                "fully_routed": False,
+                "unrouted_net_count": 1,
                 "nets": [
-                    {"name": "GND", "code": 0},
-                    {"name": "+5V", "code": 1},
+                    {"net_name": "GND", "island_count": 2, "islands": [["C1-2", "U1-4"], ["R1-2"]],
+                     "unconnected_pads": ["R1-2"]}
                 ]
             }
 
         try:
-            if self.board is None:
+            if self.backend == "pcbnew" and self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is open"}
 
-            nets = []
-            netinfo = self.board.GetNetInfo()
-            for net_name, net in netinfo.NetsByName().items():
-                if net_name:
-                    nets.append({"name": net_name, "code": net.GetNetCode()})
+            await self._build_engines(connectivity=True)
+            engine = self._connectivity_engine()
+            nets = sorted(engine.nets().values(), key=lambda n: n["net_name"])
+            unrouted = [n for n in nets if not n["routed"]]
+            if net_name is not None:
+                listed = [n for n in nets if n["net_name"] == net_name]
+                if not listed:
+                    return {"error": f"Net '{net_name}' not found"}
+            else:
+                listed = nets if include_routed else unrouted
 
-            return {"status": "success", "count": len(nets), "nets": nets}
+            return {
+                "status": "success",
+                "fully_routed": not unrouted,
+                "net_count": len(nets),
+                "routed_net_count": len(nets) - len(unrouted),
+                "unrouted_net_count": len(unrouted),
+                "unconnected_pad_count": sum(len(n["unconnected_pads"]) for n in nets),
+                "dangling_island_count": sum(n["dangling_islands"] for n in nets),
+                "rebuilt_nets": engine.rebuilt,
+                "nets": listed,
+            }
         except Exception as e:
-            return {"error": f"Failed to read netlist: {str(e)}"}
+            return {"error": f"Failed to get connectivity: {str(e)}"}
 
     async def _get_board_info(self) -> Dict:
         """Get board info"""
-        if pcbnew is None:
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "board_name": "example_board.kicad_pcb",
@@ -459,6 +1623,21 @@ class KiCadMCPServerExtended:
             }
 
         try:
+            if self.backend == "file":
+                model = self._get_model()
+                min_x, min_y, max_x, max_y = model.outline_bbox() or (0, 0, 0, 0)
+                return {
+                    "status": "success",
+                    "board_name": model.file_name,
+                    "size": {
+                        "width_mm": max_x - min_x,
+                        "height_mm": max_y - min_y,
+                    },
+                    "layer_count": model.layer_count,
+                    "component_count": len(self._component_table()),
+                    "backend": "file",
+                }
+
             if self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
@@ -473,14 +1652,53 @@ class KiCadMCPServerExtended:
                     "height_mm": bbox.GetHeight() / 1e6,
                 },
                 "layer_count": self.board.GetCopperLayerCount(),
-                "component_count": len(list(self.board.GetFootprints())),
+                "component_count": len(self._component_table()),
             }
         except Exception as e:
             return {"error": f"Failed to get board info: {str(e)}"}
 
-    def _get_circuit_guidance(self, circuit_type: str, components: Dict) -> str:
+    async def _reload_board(self) -> Dict:
+        """Drop the cached board and indexes, then load the board again"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": "Mock: Would reload the board"}
+
+        self.board = None
+        self.model = None
+        self._drop_indexes()
+        self._journal.clear()
+        self._session = None
+        info = await self._get_board_info()
+        if "error" in info:
+            return info
+        return {"status": "success", "message": "Board reloaded", "board": info}
+
+    def _component_groups(self) -> List[List[str]]:
+        """References of components clustered by shared nets (groups of two or more), largest first"""
+        if self.backend == "mock":
+            return []
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return []
+            netlist = self._placement_netlist()
+            labels = detect_communities(len(netlist.references), component_graph(netlist))
+            groups: Dict[int, List[str]] = {}
+            for reference, label in zip(netlist.references, labels.tolist()):
+                groups.setdefault(label, []).append(reference)
+            return sorted((g for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+        except Exception:
+            return []
+
+    def _get_circuit_guidance(self, circuit_type: str, components: Dict,
+                              groups: Optional[List[List[str]]] = None) -> str:
         """Generate layout guidance"""
         base = f"Components:\n{json.dumps(components, indent=2)}\n\n"
+        if groups:
+            lines = "\n".join(f"- {', '.join(group)}" for group in groups)
+            base += (f"Component groups (components sharing nets, keep each group together):\n{lines}\n\n"
+                     "For a freshly imported board, call draft_placement for a first draft, then auto_place "
+                     "to refine it and legalize_placement to snap it to the grid and clear any overlaps left.\n\n")
 
         if circuit_type.lower() == "led":
             return base + """Layout guidance for LED circuit:
@@ -500,9 +1718,10 @@ class KiCadMCPServerExtended:
     # ============================================================================
 
     async def _export_gerber(self, output_dir: str, layers: Optional[List[str]] = None,
-                            create_job_file: bool = True) -> Dict:
-        """Export Gerber files"""
-        if pcbnew is None:
+                            create_job_file: bool = True, workers: Optional[int] = None,
+                            progress: Optional[Progress] = None) -> Dict:
+        """Export Gerber files, splitting the layers across worker processes when workers > 1"""
+        if self.backend == "mock":
             Path(output_dir).mkdir(parents=True, exist_ok=True)
             return {
                 "status": "mock",
@@ -510,6 +1729,10 @@ class KiCadMCPServerExtended:
                 "files": ["F_Cu.gbr", "B_Cu.gbr", "F_Mask.gbr", "B_Mask.gbr", "Edge_Cuts.gbr"]
             }
 
+        unsupported = self._require_pcbnew("export_gerber")
+        if unsupported:
+            return unsupported
+
         try:
             if self.board is None:
                 self.board = pcbnew.GetBoard()
@@ -520,61 +1743,50 @@ class KiCadMCPServerExtended:
 
             # Default layers for fabrication
             if layers is None:
-                layers = ["F.Cu", "B.Cu", "F.Mask", "B.Mask", "F.SilkS", "B.SilkS",
-                         "F.Paste", "B.Paste", "Edge.Cuts"]
-
-            pctl = pcbnew.PLOT_CONTROLLER(self.board)
-            popt = pctl.GetPlotOptions()
-
-            # Configure plot options
-            popt.SetOutputDirectory(output_dir)
-            popt.SetPlotFrameRef(False)
-            popt.SetPlotValue(True)
-            popt.SetPlotReference(True)
-            popt.SetPlotInvisibleText(False)
-            popt.SetPlotViaOnMaskLayer(False)
-            popt.SetExcludeEdgeLayer(True)
-            popt.SetScale(1)
-            popt.SetUseAuxOrigin(False)
-            popt.SetMirror(False)
-            popt.SetNegative(False)
-
-            # Gerber specific
-            popt.SetFormat(1)  # Gerber
-            popt.SetUseGerberProtelExtensions(False)
-            popt.SetCreateGerberJobFile(create_job_file)
-            popt.SetSubtractMaskFromSilk(True)
-            popt.SetGerberPrecision(6)
-
-            exported_files = []
-
-            for layer_name in layers:
-                layer_id = self.board.GetLayerID(layer_name)
-                if layer_id < 0:
-                    continue
+                layers = list(DEFAULT_LAYERS)
 
-                pctl.SetLayer(layer_id)
-                pctl.OpenPlotfile(layer_name, pcbnew.PLOT_FORMAT_GERBER, layer_name)
-                pctl.PlotLayer()
-                pctl.ClosePlot()
-
-                filename = pctl.GetPlotFileName()
-                if os.path.exists(filename):
-                    exported_files.append(os.path.basename(filename))
+            workers = workers or self.plot_workers
+            progress = progress or Progress()
+            progress.expect(len(layers) + int(create_job_file))
+            plotted = await self._plot_gerbers(output_dir, layers, workers, progress)
+            exported_files = [os.path.basename(filename) for _, _, filename in plotted]
+            job_file = write_job_file(self.board, output_dir, plotted) if create_job_file else None
+            if create_job_file:
+                progress.advance("Wrote Gerber job file")
 
             return {
                 "status": "success",
                 "output_dir": output_dir,
                 "files": exported_files,
-                "count": len(exported_files)
+                "count": len(exported_files),
+                "job_file": os.path.basename(job_file) if job_file else None,
+                "workers": max(1, min(workers, len(exported_files)))
             }
 
         except Exception as e:
             return {"error": f"Failed to export Gerber: {str(e)}"}
 
+    async def _plot_gerbers(self, output_dir: str, layers: List[str], workers: int, progress: Progress,
+                            snapshot: Optional[str] = None) -> List[PlottedLayer]:
+        """Plot on the pcbnew thread, or from a saved snapshot in worker processes while it serves other calls
+
+        Background jobs always plot from a snapshot, with a single worker if need be, so the board stays
+        available (and unchanged for the plot) however long the layers take.
+        """
+        def on_plotted(layer: str) -> None:
+            progress.advance(f"Plotted {layer}")
+
+        if not progress.background and (workers <= 1 or len(layers) < 2):
+            return plot_layers(self.board, output_dir, layers, create_job_file=False, on_plotted=on_plotted)
+        if snapshot is not None:
+            return await asyncio.to_thread(plot_parallel, snapshot, output_dir, layers, workers, on_plotted)
+        with tempfile.TemporaryDirectory(prefix="kicad_mcp_plot_") as snapshot_dir:
+            snapshot = snapshot_board(self.board, snapshot_dir)
+            return await asyncio.to_thread(plot_parallel, snapshot, output_dir, layers, workers, on_plotted)
+
     async def _export_drill_files(self, output_dir: str, merge_pth_npth: bool = False) -> Dict:
         """Export drill files"""
-        if pcbnew is None:
+        if self.backend == "mock":
             Path(output_dir).mkdir(parents=True, exist_ok=True)
             files = ["project.drl"] if merge_pth_npth else ["project.drl", "project-NPTH.drl"]
             return {
@@ -584,6 +1796,10 @@ class KiCadMCPServerExtended:
                 "merged": merge_pth_npth
             }
 
+        unsupported = self._require_pcbnew("export_drill_files")
+        if unsupported:
+            return unsupported
+
         try:
             if self.board is None:
                 self.board = pcbnew.GetBoard()
@@ -622,8 +1838,19 @@ class KiCadMCPServerExtended:
         except Exception as e:
             return {"error": f"Failed to export drill files: {str(e)}"}
 
-    async def _export_fabrication_package(self, output_dir: str, manufacturer_preset: str = "generic") -> Dict:
-        """Export complete fabrication package"""
+    async def _export_fabrication_package(self, output_dir: str, manufacturer_preset: str = "generic",
+                                          incremental: bool = True, progress: Optional[Progress] = None) -> Dict:
+        """Export complete fabrication package
+
+        On the pcbnew backend each output is keyed by the board items it reads and reused from the artifact
+        store when that key was exported before (incremental=False regenerates everything). Outputs go into
+        the ZIP as soon as each one is ready, deflated in the background, and identical outputs always give
+        a byte-identical ZIP. Drill files, BOM and position file are written before the Gerbers, so a
+        background export has read everything it needs from the board by the time it waits on the plot.
+        """
+        package = DeterministicZip()
+        progress = progress or Progress()
+        progress.expect(4)  # Drill files, BOM, position file, ZIP; the Gerber export adds its layers
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             fab_dir = Path(output_dir) / f"fabrication_{timestamp}"
@@ -631,37 +1858,58 @@ class KiCadMCPServerExtended:
 
             gerber_dir = fab_dir / "gerber"
             drill_dir = fab_dir / "drill"
-
-            # Export Gerber
-            gerber_result = await self._export_gerber(str(gerber_dir))
-            if "error" in gerber_result:
-                return gerber_result
-
-            # Export drill files
-            drill_result = await self._export_drill_files(str(drill_dir))
-            if "error" in drill_result:
-                return drill_result
-
-            # Export BOM
             bom_file = fab_dir / "bom.csv"
-            bom_result = await self._export_bom(str(bom_file))
-
-            # Export position file
             pos_file = fab_dir / "position.csv"
-            pos_result = await self._export_position_file(str(pos_file))
+
+            store = None
+            if incremental and self.backend == "pcbnew":
+                if self.board is None:
+                    self.board = pcbnew.GetBoard()
+                    if self.board is None:
+                        return {"error": "No PCB board is open"}
+                store = artifact_store(self.board.GetFileName())
+
+            if store is not None:
+                artifacts = await self._export_artifacts(fab_dir, store, package, progress)
+                if "error" in artifacts:
+                    return artifacts
+                gerber_result, drill_result = artifacts["gerber"], artifacts["drill"]
+            else:
+                artifacts = None
+
+                # Export drill files
+                drill_result = await self._export_drill_files(str(drill_dir))
+                if "error" in drill_result:
+                    return drill_result
+                package.add_tree(drill_dir, "drill")
+                progress.advance("Wrote drill files")
+
+                # Export BOM
+                bom_result = await self._export_bom(str(bom_file))
+                progress.advance("Wrote BOM")
+
+                # Export position file
+                pos_result = await self._export_position_file(str(pos_file))
+                progress.advance("Wrote position file")
+                for csv_file in (bom_file, pos_file):
+                    if csv_file.exists():
+                        package.add_file(csv_file, csv_file.name)
+
+                # Export Gerber
+                gerber_result = await self._export_gerber(str(gerber_dir), progress=progress)
+                if "error" in gerber_result:
+                    return gerber_result
+                package.add_tree(gerber_dir, "gerber")
 
             # Create ZIP
             zip_path = Path(output_dir) / f"fabrication_{manufacturer_preset}_{timestamp}.zip"
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, dirs, files in os.walk(fab_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, fab_dir)
-                        zipf.write(file_path, arcname)
+            zip_sha256 = await asyncio.to_thread(package.write, zip_path)  # Waits on the deflate workers
+            progress.advance("Wrote ZIP")
 
-            return {
+            result = {
                 "status": "success",
                 "zip_file": str(zip_path),
+                "zip_sha256": zip_sha256,
                 "contents": {
                     "gerber_files": gerber_result.get("files", []),
                     "drill_files": drill_result.get("files", []),
@@ -670,100 +1918,206 @@ class KiCadMCPServerExtended:
                 },
                 "manufacturer": manufacturer_preset
             }
+            if artifacts is not None:
+                result["reused"] = artifacts["reused"]
+                result["regenerated"] = artifacts["regenerated"]
+                result["artifact_store"] = str(store.root)
+            return result
 
         except Exception as e:
             return {"error": f"Failed to create fabrication package: {str(e)}"}
+        finally:
+            package.close()
+
+    async def _export_artifacts(self, fab_dir: Path, store: ArtifactStore, package: DeterministicZip,
+                                progress: Progress) -> Dict:
+        """Gerber, drill, BOM and position outputs of a package, copying stored ones whose inputs are unchanged
+
+        Keys come from a saved snapshot of the open board, which the plot workers load as well; the BOM and
+        position file are written from it too, so each matches its key. Each output is added to the package
+        as soon as it is in place, so restored files deflate while the rest plot.
+        """
+        gerber_dir, drill_dir = fab_dir / "gerber", fab_dir / "drill"
+        gerber_dir.mkdir(parents=True, exist_ok=True)
+        drill_dir.mkdir(parents=True, exist_ok=True)
+        board_name = Path(self.board.GetFileName()).stem
+        reused: List[str] = []
+        regenerated: List[str] = []
+
+        with tempfile.TemporaryDirectory(prefix="kicad_mcp_fab_") as snapshot_dir:
+            snapshot = snapshot_board(self.board, snapshot_dir)
+            items = BoardItems.from_file(snapshot)
+
+            drill_key = items.drill_key(board_name)
+            drill_files = store.restore(drill_key, str(drill_dir))
+            if drill_files is None:
+                drill_result = await self._export_drill_files(str(drill_dir))
+                if "error" in drill_result:
+                    return drill_result
+                drill_files = drill_result["files"]
+                store.put(drill_key, [str(drill_dir / name) for name in drill_files])
+                regenerated += [f"drill/{name}" for name in drill_files]
+            else:
+                reused += [f"drill/{name}" for name in drill_files]
+            for name in drill_files:
+                package.add_file(drill_dir / name, f"drill/{name}")
+            progress.advance("Wrote drill files")
+
+            table: Optional[ComponentTable] = None
+            for key, name, write in ((items.bom_key(), "bom.csv", self._write_bom),
+                                     (items.position_key(), "position.csv", self._write_position_file)):
+                if store.restore(key, str(fab_dir)) is not None:
+                    reused.append(name)
+                else:
+                    if table is None:
+                        table = ComponentTable.from_model(load_kicad_pcb(snapshot))
+                    write(table, str(fab_dir / name))
+                    store.put(key, [str(fab_dir / name)])
+                    regenerated.append(name)
+                package.add_file(fab_dir / name, name)
+                progress.advance(f"Wrote {name}")
+
+            plotted = {}
+            gerber_keys = {}
+            missing = []
+            progress.expect(len(DEFAULT_LAYERS) + 1)  # Every layer, then the job file
+            for layer in DEFAULT_LAYERS:
+                layer_id = self.board.GetLayerID(layer)
+                if layer_id < 0:
+                    progress.advance(f"Skipped {layer}")
+                    continue
+                gerber_keys[layer] = items.gerber_key(layer, board_name)
+                names = store.restore(gerber_keys[layer], str(gerber_dir))
+                if names is None:
+                    missing.append(layer)
+                    continue
+                for name in names:
+                    plotted[layer] = (layer, layer_id, str(gerber_dir / name))
+                    reused.append(f"gerber/{name}")
+                    package.add_file(gerber_dir / name, f"gerber/{name}")
+                progress.advance(f"Reused {layer}")
+            if missing:
+                for entry in await self._plot_gerbers(str(gerber_dir), missing, self.plot_workers, progress, snapshot):
+                    store.put(gerber_keys[entry[0]], [entry[2]])
+                    plotted[entry[0]] = entry
+                    regenerated.append(f"gerber/{os.path.basename(entry[2])}")
+                    package.add_file(entry[2], f"gerber/{os.path.basename(entry[2])}")
+
+        # KiCad dates the job file, so a rewritten one would differ from the last package's even for the same Gerbers
+        ordered = [plotted[layer] for layer in DEFAULT_LAYERS if layer in plotted]
+        job_key = items.job_key(board_name, [gerber_keys[layer] for layer, _, _ in ordered])
+        job_names = store.restore(job_key, str(gerber_dir)) if ordered else None
+        if job_names:
+            job_file = str(gerber_dir / job_names[0])
+            reused.append(f"gerber/{job_names[0]}")
+        else:
+            job_file = write_job_file(self.board, str(gerber_dir), ordered)
+            if job_file:
+                store.put(job_key, [job_file])
+                regenerated.append(f"gerber/{os.path.basename(job_file)}")
+        if job_file:
+            package.add_file(job_file, f"gerber/{os.path.basename(job_file)}")
+        progress.advance("Wrote Gerber job file")
+
+        store.prune()
+        return {
+            "gerber": {"files": [os.path.basename(filename) for _, _, filename in ordered]},
+            "drill": {"files": drill_files},
+            "reused": reused,
+            "regenerated": regenerated,
+        }
 
     async def _export_bom(self, output_file: str) -> Dict:
         """Export Bill of Materials"""
-        if pcbnew is None:
+        if self.backend == "mock":
             return {"status": "mock", "message": f"Mock: Would export BOM to {output_file}"}
 
         try:
-            if self.board is None:
+            if self.backend == "pcbnew" and self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is open"}
 
-            # Collect component data
-            bom_data = {}
-            for fp in self.board.GetFootprints():
-                value = fp.GetValue()
-                footprint = str(fp.GetFPID().GetLibItemName())
-
-                key = (value, footprint)
-                if key not in bom_data:
-                    bom_data[key] = {
-                        "value": value,
-                        "footprint": footprint,
-                        "references": [],
-                        "quantity": 0
-                    }
-
-                bom_data[key]["references"].append(fp.GetReference())
-                bom_data[key]["quantity"] += 1
-
-            # Write CSV
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w') as f:
-                f.write("Reference,Value,Footprint,Quantity\n")
-                for item in sorted(bom_data.values(), key=lambda x: x["value"]):
-                    refs = " ".join(sorted(item["references"]))
-                    f.write(f'"{refs}","{item["value"]}","{item["footprint"]}",{item["quantity"]}\n')
-
-            return {
-                "status": "success",
-                "file": output_file,
-                "unique_parts": len(bom_data),
-                "total_components": sum(item["quantity"] for item in bom_data.values())
-            }
+            return self._write_bom(self._component_table(), output_file)
 
         except Exception as e:
             return {"error": f"Failed to export BOM: {str(e)}"}
 
+    @staticmethod
+    def _write_bom(table: ComponentTable, output_file: str) -> Dict:
+        """Write the BOM CSV of a component table"""
+        # Group component data by (value, footprint)
+        bom_data = table.bom_groups()
+
+        # Write CSV
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w') as f:
+            f.write("Reference,Value,Footprint,Quantity\n")
+            for item in bom_data:
+                refs = " ".join(item["references"])
+                f.write(f'"{refs}","{item["value"]}","{item["footprint"]}",{item["quantity"]}\n')
+
+        return {
+            "status": "success",
+            "file": output_file,
+            "unique_parts": len(bom_data),
+            "total_components": sum(item["quantity"] for item in bom_data)
+        }
+
     async def _export_position_file(self, output_file: str) -> Dict:
         """Export position file for pick-and-place"""
-        if pcbnew is None:
+        if self.backend == "mock":
             return {"status": "mock", "message": f"Mock: Would export position file to {output_file}"}
 
         try:
-            if self.board is None:
+            if self.backend == "pcbnew" and self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is open"}
 
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            return self._write_position_file(self._component_table(), output_file)
+
+        except Exception as e:
+            return {"error": f"Failed to export position file: {str(e)}"}
 
-            with open(output_file, 'w') as f:
-                f.write("Designator,Val,Package,Mid X,Mid Y,Rotation,Layer\n")
+    @staticmethod
+    def _write_position_file(table: ComponentTable, output_file: str) -> Dict:
+        """Write the pick-and-place CSV of a component table"""
+        rows = table.position_rows()
 
-                for fp in self.board.GetFootprints():
-                    pos = fp.GetPosition()
-                    layer = "Top" if fp.GetLayer() == pcbnew.F_Cu else "Bottom"
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
 
-                    f.write(f'"{fp.GetReference()}","{fp.GetValue()}",'
-                           f'"{fp.GetFPID().GetLibItemName()}",'
-                           f'{pos.x/1e6:.4f},{pos.y/1e6:.4f},'
-                           f'{fp.GetOrientationDegrees():.2f},{layer}\n')
+        with open(output_file, 'w') as f:
+            f.write("Designator,Val,Package,Mid X,Mid Y,Rotation,Layer\n")
 
-            component_count = len(list(self.board.GetFootprints()))
+            for reference, value, package, x_mm, y_mm, rotation_deg, layer in rows:
+                f.write(f'"{reference}","{value}","{package}",'
+                       f'{x_mm:.4f},{y_mm:.4f},{rotation_deg:.2f},{layer}\n')
 
-            return {
-                "status": "success",
-                "file": output_file,
-                "component_count": component_count
-            }
+        component_count = len(rows)
 
-        except Exception as e:
-            return {"error": f"Failed to export position file: {str(e)}"}
+        return {
+            "status": "success",
+            "file": output_file,
+            "component_count": component_count
+        }
 
     # ============================================================================
     # VERIFICATION TOOLS
     # ============================================================================
 
-    async def _run_drc(self, severity_level: str = "all") -> Dict:
-        """Run Design Rule Check"""
-        if pcbnew is None:
+    async def _run_drc(self, severity_level: str = "all", clearance_mm: Optional[float] = None,
+                       min_track_width_mm: Optional[float] = None, min_drill_mm: Optional[float] = None,
+                       min_annular_ring_mm: Optional[float] = None, incremental: bool = False,
+                       workers: Optional[int] = None) -> Dict:
+        """Run Design Rule Check: clearance, track width, drill size and annular ring
+
+        With incremental=True the engine from the previous run is kept and only footprints moved
+        through this server since then are re-checked; the result lists new and cleared violations.
+        Full checks with more than one worker split the clearance pass by layer and board tile
+        across processes.
+        """
+        if self.backend == "mock":
             return {
                 "status": "mock",
                 "violations": [
@@ -775,40 +2129,99 @@ class KiCadMCPServerExtended:
             }
 
         try:
-            if self.board is None:
+            if self.backend == "pcbnew" and self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is open"}
 
-            # Note: Full DRC integration requires KiCad 7+
-            # This is a simplified version
-            violations = []
-            error_count = 0
-            warning_count = 0
-
-            # Access DRC violations if available
-            # In KiCad 7+, you can use board.GetDRCViolations()
-            # For now, return basic info
-
-            return {
+            rules = DesignRules()
+            overrides = {
+                "clearance_mm": clearance_mm,
+                "min_track_width_mm": min_track_width_mm,
+                "min_drill_mm": min_drill_mm,
+                "min_annular_ring_mm": min_annular_ring_mm,
+            }
+            for name, value in overrides.items():
+                if value is not None:
+                    setattr(rules, name, float(value))
+
+            self._check_live_board()
+            source = self._get_model() if self.backend == "file" else self.board
+            reuse = incremental and self._drc is not None and self._drc_source is source and self._drc.rules == rules
+            if reuse:
+                engine = self._drc
+                moved = self._moved_footprints(self._drc_moved, engine.footprints.shared())
+                self._drc_moved.clear()
+                added, cleared = engine.update_footprints(moved)
+            else:
+                model = self._board_model()
+                self._drc = None  # Nothing to reuse until this pass is done
+                self._drc_moved.clear()
+                edits = self._board_edits
+                workers = workers or self.drc_workers
+                # The engine keeps its own copy of the copper items, so building and running it can leave the board's thread
+                engine = await asyncio.to_thread(DrcEngine, model, rules)
+                added = await asyncio.to_thread(run_parallel, engine, workers) if workers > 1 else \
+                    await asyncio.to_thread(engine.run)
+                if self._board_edits == edits:  # Moves made meanwhile are missing from it, so it is not kept then
+                    self._drc, self._drc_source = engine, source
+                cleared = []
+
+            violations = filter_by_severity(engine.violations(), severity_level)
+            result = {
                 "status": "success",
                 "message": "DRC check completed",
-                "violations": violations,
-                "error_count": error_count,
-                "warning_count": warning_count,
-                "note": "Full DRC support requires KiCad 7+ with proper API access"
+                "error_count": sum(1 for v in violations if v["severity"] == "error"),
+                "warning_count": sum(1 for v in violations if v["severity"] == "warning"),
+                "rules": {name: getattr(rules, name) for name in overrides},
             }
+            if incremental:
+                result.update({
+                    "incremental": reuse,
+                    "new_violations": filter_by_severity(added, severity_level),
+                    "cleared_violations": filter_by_severity(cleared, severity_level),
+                    "rechecked_components": len(moved) if reuse else len(engine.footprints),
+                })
+            else:
+                result["violations"] = violations
+            return result
 
         except Exception as e:
             return {"error": f"Failed to run DRC: {str(e)}"}
 
+    async def _check_overlaps(self, layer: Optional[str] = None) -> Dict:
+        """Find overlapping courtyards; after the first call only moved footprints are re-tested"""
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "overlaps": [
+                    {"reference_a": "C1", "reference_b": "R1", "layer": "F.Cu", "overlap_mm2": 0.42}
+                ],
+                "count": 1
+            }
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            overlaps = [
+                {"reference_a": a, "reference_b": b, "layer": side, "overlap_mm2": round(area, 4)}
+                for a, b, side, area in self._overlap_checker().pairs()
+                if layer is None or side == layer
+            ]
+            return {"status": "success", "overlaps": overlaps, "count": len(overlaps)}
+        except Exception as e:
+            return {"error": f"Failed to check overlaps: {str(e)}"}
+
     # ============================================================================
     # LAYOUT TOOLS
     # ============================================================================
 
-    async def _fill_zones(self, zone_names: Optional[List[str]] = None) -> Dict:
+    async def _fill_zones(self, zone_names: Optional[List[str]] = None, progress: Optional[Progress] = None) -> Dict:
         """Fill copper zones"""
-        if pcbnew is None:
+        if self.backend == "mock":
             zones = zone_names if zone_names else ["GND", "VCC"]
             return {
                 "status": "mock",
@@ -817,12 +2230,27 @@ class KiCadMCPServerExtended:
                 "count": len(zones)
             }
 
+        unsupported = self._require_pcbnew("fill_zones")
+        if unsupported:
+            return unsupported
+
+        if self._session is not None:
+            self._session.zone_fills.append(zone_names)
+            return {
+                "status": "queued",
+                "message": "Zone fill deferred until commit_edit",
+                "zones": zone_names if zone_names else "all",
+                "edit_session": self._session.label
+            }
+
         try:
             if self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is open"}
 
+            progress = progress or Progress()
+            progress.expect(2)
             filled_zones = []
             filler = pcbnew.ZONE_FILLER(self.board)
 
@@ -833,10 +2261,16 @@ class KiCadMCPServerExtended:
                 if zone_names is None or zone_net_name in zone_names:
                     zones_to_fill.append(zone)
                     filled_zones.append(zone_net_name)
+            progress.advance(f"Filling {len(zones_to_fill)} zones")
 
             if zones_to_fill:
                 filler.Fill(zones_to_fill)
                 pcbnew.Refresh()
+                self._connectivity = None
+                self._snapshot = None
+                self._board_edits += 1
+            # The board is filled now, so a cancel arriving here must not turn the job into "cancelled"
+            progress.advance(f"Filled {len(zones_to_fill)} zones", checkpoint=False)
 
             return {
                 "status": "success",
@@ -847,9 +2281,11 @@ class KiCadMCPServerExtended:
         except Exception as e:
             return {"error": f"Failed to fill zones: {str(e)}"}
 
-    async def _get_track_info(self, net_name: Optional[str] = None) -> Dict:
-        """Get track information"""
-        if pcbnew is None:
+    async def _get_track_info(self, net_name: Optional[str] = None, layer: Optional[str] = None,
+                              fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                              cursor: Optional[str] = None) -> Dict:
+        """Get track information, filtered and projected before serialization"""
+        if self.backend == "mock":
             all_tracks = [
                 {"net": "GND", "width_mm": 0.5, "length_mm": 25.4},
                 {"net": "VCC", "width_mm": 0.3, "length_mm": 18.2}
@@ -866,32 +2302,854 @@ class KiCadMCPServerExtended:
             }
 
         try:
-            if self.board is None:
+            fields = self._check_fields(fields, TRACK_FIELDS, TRACK_FIELDS)
+
+            if self.backend == "file":
+                matches = [
+                    track for track in self._get_model().tracks
+                    if (net_name is None or track.net_name == net_name)
+                    and (layer is None or track.layer == layer)
+                ]
+                getters = {
+                    "net": lambda t: t.net_name,
+                    "width_mm": lambda t: t.width_mm,
+                    "length_mm": lambda t: t.length_mm,
+                    "layer": lambda t: t.layer,
+                }
+            else:
+                if self.board is None:
+                    self.board = pcbnew.GetBoard()
+                    if self.board is None:
+                        return {"error": "No PCB board is open"}
+
+                matches = [
+                    track for track in self.board.GetTracks()
+                    if (net_name is None or track.GetNetname() == net_name)
+                    and (layer is None or track.GetLayerName() == layer)
+                ]
+                getters = {
+                    "net": lambda t: t.GetNetname(),
+                    "width_mm": lambda t: t.GetWidth() / 1e6,
+                    "length_mm": lambda t: t.GetLength() / 1e6,
+                    "layer": lambda t: t.GetLayerName(),
+                }
+
+            # Only the requested page and fields are materialized
+            start, stop, next_cursor = self._page(len(matches), limit, cursor)
+            selected = [getters[f] for f in fields]
+            track_info = [
+                dict(zip(fields, (get(track) for get in selected)))
+                for track in matches[start:stop]
+            ]
+
+            result = {
+                "status": "success",
+                "tracks": track_info,
+                "count": len(track_info),
+                "total": len(matches)
+            }
+            if next_cursor is not None:
+                result["next_cursor"] = next_cursor
+            return result
+
+        except Exception as e:
+            return {"error": f"Failed to get track info: {str(e)}"}
+
+    async def _get_ratsnest(self, net_name: Optional[str] = None, include_airwires: bool = False,
+                            limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """Per-net MST airwire lengths; place_component keeps them current and reports the delta"""
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "total_length_mm": 42.5,
+                "nets": [{"net_name": "GND", "pad_count": 4, "length_mm": 30.1},
+                         {"net_name": "+5V", "pad_count": 2, "length_mm": 12.4}]
+            }
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
                 self.board = pcbnew.GetBoard()
                 if self.board is None:
                     return {"error": "No PCB board is open"}
 
-            track_info = []
+            await self._build_engines(ratsnest=True)
+            ratsnest = self._ratsnest_engine()
+            codes = sorted(ratsnest.lengths, key=lambda code: (-ratsnest.lengths[code], ratsnest.net_names.get(code, "")))
+            if net_name is not None:
+                codes = [code for code in codes if ratsnest.net_names.get(code) == net_name]
+                if not codes:
+                    return {"error": f"Net '{net_name}' not found"}
+            start, stop, next_cursor = self._page(len(codes), limit, cursor)
 
-            for track in self.board.GetTracks():
-                track_net_name = track.GetNetname()
+            nets = []
+            for code in codes[start:stop]:
+                labels = ratsnest.pad_labels(code)
+                record = {
+                    "net_name": ratsnest.net_names.get(code, ""),
+                    "net_code": code,
+                    "pad_count": len(labels),
+                    "length_mm": round(ratsnest.lengths[code], 4),
+                }
+                if include_airwires:
+                    record["airwires"] = [{"from": labels[a], "to": labels[b], "length_mm": round(length, 4)}
+                                          for a, b, length in ratsnest.airwires[code]]
+                nets.append(record)
+
+            result = {
+                "status": "success",
+                "total_length_mm": round(ratsnest.total_mm, 4),
+                "net_count": len(ratsnest.lengths),
+                "count": len(nets),
+                "total": len(codes),
+                "nets": nets,
+            }
+            if next_cursor is not None:
+                result["next_cursor"] = next_cursor
+            return result
+        except Exception as e:
+            return {"error": f"Failed to get ratsnest: {str(e)}"}
+
+    def _hypothetical_poses(self, netlist: PlacementNetlist, placements: List[Dict]) -> Dict[str, Pose]:
+        """Validate {reference, x_mm, y_mm[, rotation_deg]} items; rotation defaults to the current one"""
+        poses = {}
+        for item in placements:
+            reference = item.get("reference")
+            i = netlist.index.get(reference)
+            if reference in netlist.duplicates:
+                raise ValueError(f"Reference '{reference}' is shared by several footprints")
+            if i is None:
+                suggestions = self._footprint_index().suggest(reference) if isinstance(reference, str) else []
+                raise ValueError(f"Component '{reference}' not found"
+                                 + (f" (did you mean: {', '.join(suggestions)})" if suggestions else ""))
+            rotation = item.get("rotation_deg")
+            poses[reference] = (float(item["x_mm"]), float(item["y_mm"]),
+                                float(netlist.rotation[i] if rotation is None else rotation))
+        return poses
+
+    async def _score_placement(self, placements: Optional[List[Dict]] = None,
+                               candidates: Optional[List[List[Dict]]] = None, include_nets: bool = False) -> Dict:
+        """Score current or hypothetical positions by HPWL; only the moved parts' nets are recomputed"""
+        if self.backend == "mock":
+            return {"status": "mock", "current_hpwl_mm": 120.5, "hpwl_mm": 98.25, "delta_mm": -22.25}
 
-                if net_name is None or track_net_name == net_name:
-                    track_info.append({
-                        "net": track_net_name,
-                        "width_mm": track.GetWidth() / 1e6,
-                        "length_mm": track.GetLength() / 1e6,
-                        "layer": track.GetLayerName()
-                    })
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
 
+            await self._build_engines(placement=True)
+            netlist = self._placement_netlist()
+            current = netlist.total
+            result = {"status": "success", "current_hpwl_mm": round(current, 4), "net_count": len(netlist.net_codes)}
+
+            def net_records(nets, before, after) -> List[Dict]:
+                records = [{"net_name": netlist.net_names[k], "hpwl_mm": round(float(a), 4),
+                            "delta_mm": round(float(a - b), 4)} for k, b, a in zip(nets.tolist(), before, after)]
+                return sorted(records, key=lambda r: (-r["hpwl_mm"], r["net_name"]))
+
+            if placements:
+                total, nets, after = netlist.score(self._hypothetical_poses(netlist, placements))
+                result.update({"hpwl_mm": round(total, 4), "delta_mm": round(total - current, 4)})
+                if include_nets:
+                    result["nets"] = net_records(nets, netlist.net_hpwl[nets], after)
+            elif include_nets:
+                everything = np.arange(len(netlist.net_codes))
+                result["nets"] = net_records(everything, netlist.net_hpwl, netlist.net_hpwl)
+
+            if candidates:
+                scores = []
+                for index, candidate in enumerate(candidates):
+                    total = netlist.score(self._hypothetical_poses(netlist, candidate))[0]
+                    scores.append({"index": index, "hpwl_mm": round(total, 4), "delta_mm": round(total - current, 4)})
+                result["candidates"] = scores
+                result["best_candidate"] = min(scores, key=lambda c: c["hpwl_mm"])["index"]
+            return result
+        except Exception as e:
+            return {"error": f"Failed to score placement: {str(e)}"}
+
+    def _unknown_reference(self, netlist: PlacementNetlist, references: Optional[List[str]]) -> Optional[Dict]:
+        """Not-found error result, with suggestions, for the first reference that is on no footprint"""
+        for reference in references or []:
+            if reference not in netlist.index and reference not in netlist.duplicates:
+                suggestions = self._footprint_index().suggest(reference) if isinstance(reference, str) else []
+                return {"error": f"Component '{reference}' not found", "suggestions": suggestions}
+        return None
+
+    def _placement_selection(self, netlist: PlacementNetlist, model: BoardModel,
+                             references: Optional[List[str]]) -> Tuple[List[Any], List[int], List[str], List[str]]:
+        """Model footprints in netlist order, netlist indexes of the unlocked chosen ones, and the locked and
+        duplicated references among the chosen
+
+        All footprints are chosen when `references` is empty. Footprints sharing a reference stay where they are:
+        the move could not be applied to the right one.
+        """
+        by_reference: Dict[str, List[Any]] = {}
+        for fp in model.footprints:
+            by_reference.setdefault(fp.reference, []).append(fp)
+        footprints = [by_reference[ref].pop(0) if ref in netlist.duplicates else by_reference[ref][0]
+                      for ref in netlist.references]
+        for reference in references or []:
+            if reference not in netlist.index and reference not in netlist.duplicates:
+                suggestions = self._footprint_index().suggest(reference) if isinstance(reference, str) else []
+                raise ValueError(f"Component '{reference}' not found"
+                                 + (f" (did you mean: {', '.join(suggestions)})" if suggestions else ""))
+        chosen = list(dict.fromkeys(references or netlist.references))
+        duplicates = [ref for ref in chosen if ref in netlist.duplicates]
+        chosen = [ref for ref in chosen if ref in netlist.index]
+        locked = [ref for ref in chosen if footprints[netlist.index[ref]].locked]
+        movable = [netlist.index[ref] for ref in chosen if not footprints[netlist.index[ref]].locked]
+        return footprints, movable, locked, duplicates
+
+    def _keepouts(self, model: BoardModel) -> List[Keepout]:
+        """Footprint keepout zones as boxes, with whether each applies to the (top, bottom) side"""
+        return [
+            (points_bbox(zone.outline), (copper_layer_match(zone.layers, "F.Cu"), copper_layer_match(zone.layers, "B.Cu")))
+            for zone in model.zones if zone.keepout_footprints and zone.outline
+        ]
+
+    async def _auto_place(self, references: Optional[List[str]] = None, moves: Optional[int] = None,
+                          allow_rotation: bool = True, spacing_mm: float = 0.25, seed: int = 0) -> Dict:
+        """Anneal the chosen footprints against the fixed ones, then move them all with a single refresh"""
+        if self.backend == "mock":
             return {
+                "status": "mock",
+                "message": f"Mock: Would auto-place {len(references) if references else 'all unlocked'} components",
+                "hpwl_before_mm": 120.5,
+                "hpwl_after_mm": 64.0
+            }
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            await self._build_engines(ratsnest=True, placement=True)
+            netlist = self._placement_netlist()
+            missing = self._unknown_reference(netlist, references)
+            if missing is not None:
+                return missing
+            model = self._board_model()
+            footprints, movable, locked, duplicates = self._placement_selection(netlist, model, references)
+            if not movable:
+                return {"error": "No unlocked components to place", "skipped_locked": locked,
+                        "skipped_duplicate": duplicates}
+
+            outline, keepouts = model.outline_bbox(), self._keepouts(model)
+
+            def anneal() -> Tuple[Annealer, Dict, Dict]:
+                annealer = Annealer(netlist, footprints, movable, outline=outline, keepouts=keepouts,
+                                    spacing_mm=float(spacing_mm), allow_rotation=allow_rotation, seed=int(seed))
+                before = annealer.cost()
+                annealer.anneal(moves)
+                return annealer, before, annealer.cost()
+
+            annealer, before, after = await self._in_worker(anneal)
+
+            ratsnest = self._ratsnest_engine()
+            delta = 0.0
+            placements = []
+            for i in annealer.changed().tolist():
+                reference = netlist.references[i]
+                x_mm, y_mm = round(float(annealer.x[i]), 4), round(float(annealer.y[i]), 4)
+                rotation_deg = round(float(annealer.rotation[i]), 4)
+                footprint, _ = self._find_footprint(reference)
+                delta += self._move_footprint(footprint, reference, x_mm, y_mm, rotation_deg)
+                placements.append({"reference": reference, "x_mm": x_mm, "y_mm": y_mm, "rotation_deg": rotation_deg})
+
+            result = {
                 "status": "success",
-                "tracks": track_info,
-                "count": len(track_info)
+                "moved": len(placements),
+                "placements": placements,
+                "skipped_locked": locked,
+                "skipped_duplicate": duplicates,
+                "moves_tried": annealer.moves,
+                "moves_accepted": annealer.accepted,
+                "moves_per_second": round(annealer.moves / annealer.elapsed_s) if annealer.elapsed_s else None,
+                "elapsed_s": round(annealer.elapsed_s, 3),
+                "hpwl_before_mm": round(before["hpwl_mm"], 4),
+                "hpwl_after_mm": round(after["hpwl_mm"], 4),
+                "overlap_before_mm2": round(before["overlap_mm2"], 4),
+                "overlap_after_mm2": round(after["overlap_mm2"], 4),
+                "keepout_after_mm2": round(after["keepout_mm2"], 4),
+                "outside_after_mm2": round(after["outside_mm2"], 4),
+                "ratsnest_delta_mm": round(delta, 4),
+                "ratsnest_length_mm": round(ratsnest.total_mm, 4)
+            }
+            return self._finish_edit(result, "auto_place", changed=bool(placements))
+        except Exception as e:
+            return {"error": f"Failed to auto-place components: {str(e)}"}
+
+    async def _draft_placement(self, references: Optional[List[str]] = None, spacing_mm: float = 0.25,
+                               seed: int = 0) -> Dict:
+        """Cluster by shared nets and lay the chosen footprints out by forces, then move them with a single refresh"""
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "message": f"Mock: Would draft a placement for {len(references) if references else 'all unlocked'} components",
+                "cluster_count": 2
             }
 
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            started = datetime.now()
+            await self._build_engines(ratsnest=True, placement=True)
+            netlist = self._placement_netlist()
+            missing = self._unknown_reference(netlist, references)
+            if missing is not None:
+                return missing
+            model = self._board_model()
+            footprints, movable, locked, duplicates = self._placement_selection(netlist, model, references)
+            if not movable:
+                return {"error": "No unlocked components to place", "skipped_locked": locked,
+                        "skipped_duplicate": duplicates}
+
+            hpwl_before = netlist.total
+            outline = model.outline_bbox()
+
+            def draft() -> ForceLayout:
+                layout = ForceLayout(netlist, footprints, movable, outline=outline,
+                                     spacing_mm=float(spacing_mm), seed=int(seed))
+                layout.run()
+                return layout
+
+            layout = await self._in_worker(draft)
+            clusters = [[netlist.references[i] for i in cluster] for cluster in layout.clusters()]
+
+            ratsnest = self._ratsnest_engine()
+            delta = 0.0
+            placements = []
+            for i in movable:
+                reference = netlist.references[i]
+                x_mm, y_mm = round(float(layout.x[i]), 4), round(float(layout.y[i]), 4)
+                if (x_mm, y_mm) == (netlist.x[i], netlist.y[i]):
+                    continue
+                rotation_deg = float(netlist.rotation[i])
+                footprint, _ = self._find_footprint(reference)
+                delta += self._move_footprint(footprint, reference, x_mm, y_mm, rotation_deg)
+                placements.append({"reference": reference, "x_mm": x_mm, "y_mm": y_mm, "rotation_deg": rotation_deg})
+
+            result = {
+                "status": "success",
+                "moved": len(placements),
+                "placements": placements,
+                "skipped_locked": locked,
+                "skipped_duplicate": duplicates,
+                "cluster_count": len(clusters),
+                "clusters": clusters,
+                "hpwl_before_mm": round(hpwl_before, 4),
+                "hpwl_after_mm": round(netlist.total, 4),
+                "overlap_after_mm2": round(layout.overlap_area(), 4),
+                "elapsed_s": round((datetime.now() - started).total_seconds(), 3),
+                "ratsnest_delta_mm": round(delta, 4),
+                "ratsnest_length_mm": round(ratsnest.total_mm, 4)
+            }
+            return self._finish_edit(result, "draft_placement", changed=bool(placements))
         except Exception as e:
-            return {"error": f"Failed to get track info: {str(e)}"}
+            return {"error": f"Failed to draft placement: {str(e)}"}
+
+    async def _legalize_placement(self, references: Optional[List[str]] = None, grid_mm: float = DEFAULT_GRID_MM,
+                                  spacing_mm: float = 0.0) -> Dict:
+        """Snap the chosen footprints to the grid and move overlapping ones to the nearest free spot, one refresh"""
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "message": f"Mock: Would legalize {len(references) if references else 'all unlocked'} components",
+                "overlaps_before": 1,
+                "overlaps_after": 0
+            }
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            started = datetime.now()
+            await self._build_engines(ratsnest=True, placement=True)
+            netlist = self._placement_netlist()
+            model = self._board_model()
+            footprints, movable, locked, duplicates = self._placement_selection(netlist, model, references)
+            if not movable:
+                return {"error": "No unlocked components to legalize", "skipped_locked": locked,
+                        "skipped_duplicate": duplicates}
+
+            overlaps_before = len(self._overlap_checker().pairs())
+            hpwl_before = netlist.total
+            outline, keepouts = model.outline_bbox(), self._keepouts(model)
+
+            def legalize() -> Legalizer:
+                legalizer = Legalizer(netlist, footprints, movable, outline=outline, keepouts=keepouts,
+                                      grid_mm=float(grid_mm), spacing_mm=float(spacing_mm))
+                legalizer.run()
+                return legalizer
+
+            legalizer = await self._in_worker(legalize)
+            displacement = legalizer.displacement()
+
+            ratsnest = self._ratsnest_engine()
+            delta = 0.0
+            placements = []
+            for i in legalizer.changed().tolist():
+                reference = netlist.references[i]
+                x_mm, y_mm = round(float(legalizer.x[i]), 4), round(float(legalizer.y[i]), 4)
+                rotation_deg = float(netlist.rotation[i])
+                footprint, _ = self._find_footprint(reference)
+                delta += self._move_footprint(footprint, reference, x_mm, y_mm, rotation_deg)
+                placements.append({"reference": reference, "x_mm": x_mm, "y_mm": y_mm, "rotation_deg": rotation_deg,
+                                   "displacement_mm": round(float(displacement[i]), 4)})
+
+            result = {
+                "status": "success",
+                "moved": len(placements),
+                "placements": placements,
+                "skipped_locked": locked,
+                "skipped_duplicate": duplicates,
+                "unresolved": [netlist.references[i] for i in legalizer.unresolved],
+                "overlaps_before": overlaps_before,
+                "overlaps_after": len(self._overlap_checker().pairs()),
+                "total_displacement_mm": round(float(displacement.sum()), 4),
+                "max_displacement_mm": round(float(displacement.max(initial=0.0)), 4),
+                "hpwl_before_mm": round(hpwl_before, 4),
+                "hpwl_after_mm": round(netlist.total, 4),
+                "elapsed_s": round((datetime.now() - started).total_seconds(), 3),
+                "ratsnest_delta_mm": round(delta, 4),
+                "ratsnest_length_mm": round(ratsnest.total_mm, 4)
+            }
+            return self._finish_edit(result, "legalize_placement", changed=bool(placements))
+        except Exception as e:
+            return {"error": f"Failed to legalize placement: {str(e)}"}
+
+    def _footprint_group(self, references: List[str]) -> Tuple[List[Tuple[str, Any]], List[str]]:
+        """(reference, footprint) for each named component in order, and the references of the locked ones"""
+        if not references:
+            raise ValueError("No components given")
+        group, locked = [], []
+        for reference in dict.fromkeys(references):
+            footprint, suggestions = self._find_footprint(reference)
+            if footprint is None:
+                raise ValueError(f"Component '{reference}' not found"
+                                 + (f" (did you mean: {', '.join(suggestions)})" if suggestions else ""))
+            group.append((reference, footprint))
+            if (footprint.locked if self.backend == "file" else footprint.IsLocked()):
+                locked.append(reference)
+        return group, locked
+
+    def _apply_moves(self, moves: List[Tuple[str, Any, float, float, float]]) -> Dict:
+        """Move footprints as one batch (no refresh), skipping those already in place"""
+        ratsnest = self._built_ratsnest()
+        delta = 0.0
+        placements = []
+        for reference, footprint, x_mm, y_mm, rotation_deg in moves:
+            x_mm, y_mm, rotation_deg = round(x_mm, 4), round(y_mm, 4), round(rotation_deg, 4)
+            if (x_mm, y_mm, rotation_deg) == tuple(round(v, 4) for v in self._footprint_pose(footprint)):
+                continue
+            delta += self._move_footprint(footprint, reference, x_mm, y_mm, rotation_deg)
+            placements.append({"reference": reference, "x_mm": x_mm, "y_mm": y_mm, "rotation_deg": rotation_deg})
+        return {
+            "moved": len(placements),
+            "placements": placements,
+            **self._ratsnest_change(ratsnest, delta)
+        }
+
+    async def _align_components(self, references: List[str], edge: str) -> Dict:
+        """Line up courtyard edges or centres of a group with a single refresh"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": f"Mock: Would align {len(references)} components to {edge}"}
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            group, locked = self._footprint_group(references)
+            boxes = [self._footprint_bbox(footprint) for _, footprint in group]
+            offsets = align_offsets(boxes, edge, [reference in locked for reference, _ in group])
+            moves = []
+            for (reference, footprint), (dx, dy) in zip(group, offsets):
+                if reference not in locked:
+                    x_mm, y_mm, rotation_deg = self._footprint_pose(footprint)
+                    moves.append((reference, footprint, x_mm + dx, y_mm + dy, rotation_deg))
+            result = {"status": "success", "edge": edge, **self._apply_moves(moves), "skipped_locked": locked}
+            return self._finish_edit(result, "align_components", changed=bool(result["moved"]))
+        except Exception as e:
+            return {"error": f"Failed to align components: {str(e)}"}
+
+    async def _distribute_components(self, references: List[str], axis: str = "x") -> Dict:
+        """Space a group with equal courtyard gaps along an axis with a single refresh"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": f"Mock: Would distribute {len(references)} components along {axis}"}
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            group, locked = self._footprint_group(references)
+            group = [(reference, footprint) for reference, footprint in group if reference not in locked]
+            if len(group) < 3:
+                return {"error": "Distributing needs at least 3 unlocked components", "skipped_locked": locked}
+
+            boxes = [self._footprint_bbox(footprint) for _, footprint in group]
+            moves = []
+            for (reference, footprint), (dx, dy) in zip(group, distribute_offsets(boxes, axis)):
+                x_mm, y_mm, rotation_deg = self._footprint_pose(footprint)
+                moves.append((reference, footprint, x_mm + dx, y_mm + dy, rotation_deg))
+            result = {
+                "status": "success",
+                "axis": axis,
+                "gap_mm": round(distribution_gap(boxes, axis), 4),
+                **self._apply_moves(moves),
+                "skipped_locked": locked
+            }
+            return self._finish_edit(result, "distribute_components", changed=bool(result["moved"]))
+        except Exception as e:
+            return {"error": f"Failed to distribute components: {str(e)}"}
+
+    async def _arrange_components(self, references: List[str], layout: str = "row",
+                                  pitch_x_mm: Optional[float] = None, pitch_y_mm: Optional[float] = None,
+                                  columns: Optional[int] = None, x_mm: Optional[float] = None,
+                                  y_mm: Optional[float] = None, rotation_deg: Optional[float] = None) -> Dict:
+        """Place a group on a row, column or matrix pitch in the given order with a single refresh"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": f"Mock: Would arrange {len(references)} components in a {layout}"}
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            group, locked = self._footprint_group(references)
+            group = [(reference, footprint) for reference, footprint in group if reference not in locked]
+            if not group:
+                return {"error": "No unlocked components to arrange", "skipped_locked": locked}
+
+            poses = [self._footprint_pose(footprint) for _, footprint in group]
+            rotations = [pose[2] if rotation_deg is None else float(rotation_deg) for pose in poses]
+            extents = [rotated_extent(self._footprint_bbox(footprint), rotation - pose[2])
+                       for (_, footprint), pose, rotation in zip(group, poses, rotations)]
+            pitch_x = float(pitch_x_mm) if pitch_x_mm is not None else max(w for w, _ in extents) + DEFAULT_GAP_MM
+            pitch_y = float(pitch_y_mm) if pitch_y_mm is not None else max(h for _, h in extents) + DEFAULT_GAP_MM
+            origin = (poses[0][0] if x_mm is None else float(x_mm), poses[0][1] if y_mm is None else float(y_mm))
+            positions = grid_positions(len(group), layout, origin, pitch_x, pitch_y, columns)
+
+            moves = [(reference, footprint, x, y, rotation)
+                     for (reference, footprint), (x, y), rotation in zip(group, positions, rotations)]
+            result = {
+                "status": "success",
+                "layout": layout,
+                "pitch_x_mm": round(pitch_x, 4),
+                "pitch_y_mm": round(pitch_y, 4),
+                **self._apply_moves(moves),
+                "skipped_locked": locked
+            }
+            return self._finish_edit(result, "arrange_components", changed=bool(result["moved"]))
+        except Exception as e:
+            return {"error": f"Failed to arrange components: {str(e)}"}
+
+    async def _mirror_components(self, references: List[str]) -> Dict:
+        """Flip a group to the other side about its centre line with a single refresh"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": f"Mock: Would flip {len(references)} components to the other side"}
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            group, locked = self._footprint_group(references)
+            group = [(reference, footprint) for reference, footprint in group if reference not in locked]
+            if not group:
+                return {"error": "No unlocked components to flip", "skipped_locked": locked}
+
+            axis_x_mm = mirror_axis([self._footprint_bbox(footprint) for _, footprint in group])
+            ratsnest = self._built_ratsnest()
+            delta = 0.0
+            placements = []
+            for reference, footprint in group:
+                delta += self._flip_footprint(footprint, reference, axis_x_mm)
+                x_mm, y_mm, rotation_deg = self._footprint_pose(footprint)
+                placements.append({
+                    "reference": reference,
+                    "x_mm": round(x_mm, 4),
+                    "y_mm": round(y_mm, 4),
+                    "rotation_deg": round(rotation_deg, 4),
+                    "layer": footprint.layer if self.backend == "file" else footprint.GetLayerName()
+                })
+
+            result = {
+                "status": "success",
+                "axis_x_mm": round(axis_x_mm, 4),
+                "moved": len(placements),
+                "placements": placements,
+                **self._ratsnest_change(ratsnest, delta),
+                "skipped_locked": locked
+            }
+            return self._finish_edit(result, "mirror_components", changed=bool(result["moved"]))
+        except Exception as e:
+            return {"error": f"Failed to flip components: {str(e)}"}
+
+    # ============================================================================
+    # EDIT SESSIONS
+    # ============================================================================
+
+    async def _begin_edit(self, label: str = "edit") -> Dict:
+        """Open an edit session; mutating tools defer their refresh and journal into one step"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": f"Mock: Would begin edit session '{label}'"}
+        if self._session is not None:
+            return {"error": f"Edit session '{self._session.label}' is already open (commit_edit or rollback_edit it first)"}
+
+        self._journal.seal("edit")  # Anything left over from a failed call stays its own step
+        self._session = EditSession(label)
+        return {"status": "success", "label": label, "undo_depth": len(self._journal.undo_steps)}
+
+    async def _commit_edit(self) -> Dict:
+        """Close the session as one undo step, catch the indexes up, run queued fills and refresh once"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": "Mock: Would commit the edit session"}
+        if self._session is None:
+            return {"error": "No edit session is open (call begin_edit first)"}
+
+        session, self._session = self._session, None
+        step = self._journal.seal(session.label)
+        self._flush_deferred_index()
+        result = {
+            "status": "success",
+            "label": session.label,
+            "changes": len(step.changes) if step else 0,
+            "undo_depth": len(self._journal.undo_steps)
+        }
+        if session.zone_fills:
+            # One fill for everything queued; a fill of all zones covers the named ones
+            names = None if any(z is None for z in session.zone_fills) else sorted({n for z in session.zone_fills for n in z})
+            result["zone_fill"] = await self._fill_zones(names)
+            if result["zone_fill"].get("count"):
+                return result  # The fill refreshed the view
+        return self._refresh_view(result, step is not None)
+
+    async def _rollback_edit(self) -> Dict:
+        """Put the session's footprints back where they were and drop its queued fills, with one refresh"""
+        if self.backend == "mock":
+            return {"status": "mock", "message": "Mock: Would roll back the edit session"}
+        if self._session is None:
+            return {"error": "No edit session is open (call begin_edit first)"}
+
+        try:
+            changes = self._journal.discard()
+            ratsnest = self._built_ratsnest()
+            delta = self._replay(changes, undo=True)
+            session, self._session = self._session, None
+            self._flush_deferred_index()
+            result = {
+                "status": "success",
+                "label": session.label,
+                "reverted": len(changes),
+                "discarded_zone_fills": len(session.zone_fills),
+                **self._ratsnest_change(ratsnest, delta)
+            }
+            return self._refresh_view(result, bool(changes))
+        except Exception as e:
+            return {"error": f"Failed to roll back edit session: {str(e)}"}
+
+    async def _undo_edit(self, steps: int = 1) -> Dict:
+        """Undo committed steps, newest first, with one refresh"""
+        return await self._step_journal(steps, undo=True)
+
+    async def _redo_edit(self, steps: int = 1) -> Dict:
+        """Redo undone steps, oldest first, with one refresh"""
+        return await self._step_journal(steps, undo=False)
+
+    async def _step_journal(self, steps: int, undo: bool) -> Dict:
+        """Replay journal steps in either direction"""
+        action = "undo" if undo else "redo"
+        if self.backend == "mock":
+            return {"status": "mock", "message": f"Mock: Would {action} {steps} step(s)"}
+        if self._session is not None:
+            return {"error": f"Commit or roll back edit session '{self._session.label}' before {action}"}
+
+        try:
+            ratsnest = self._built_ratsnest()
+            labels = []
+            moved: Set[str] = set()
+            delta = 0.0
+            for _ in range(max(int(steps), 1)):
+                step = self._journal.undo() if undo else self._journal.redo()
+                if step is None:
+                    break
+                delta += self._replay(step.changes, undo=undo)
+                labels.append(step.label)
+                moved.update(reference for reference, _, _ in step.changes)
+            if not labels:
+                return {"error": f"Nothing to {action}"}
+
+            result = {
+                "status": "success",
+                "undone" if undo else "redone": labels,
+                "moved": len(moved),
+                **self._ratsnest_change(ratsnest, delta),
+                "undo_depth": len(self._journal.undo_steps),
+                "redo_depth": len(self._journal.redo_steps)
+            }
+            return self._refresh_view(result, True)
+        except Exception as e:
+            return {"error": f"Failed to {action}: {str(e)}"}
+
+    def _spatial_records(self, hits: List[Tuple[str, Optional[float]]], layer: Optional[str],
+                         fields: Tuple[str, ...]) -> List[Dict]:
+        """Component records for spatial hits, with distance_mm when the query has one"""
+        table = self._component_table()
+        rows = []
+        distances = []
+        for reference, distance in hits:
+            row = table.row(reference)
+            if layer is None or table.layer[row] == layer:
+                rows.append(row)
+                distances.append(distance)
+
+        components = table.records(fields, np.asarray(rows, dtype=np.intp))
+        for record, distance in zip(components, distances):
+            if distance is not None:
+                record["distance_mm"] = round(distance, 4)
+        return components
+
+    async def _query_region(self, x_min: Optional[float] = None, y_min: Optional[float] = None,
+                            x_max: Optional[float] = None, y_max: Optional[float] = None,
+                            x_mm: Optional[float] = None, y_mm: Optional[float] = None,
+                            radius_mm: Optional[float] = None, layer: Optional[str] = None,
+                            fields: Optional[List[str]] = None) -> Dict:
+        """Components overlapping a rectangle or within a radius, served from the spatial index"""
+        region = (x_min, y_min, x_max, y_max)
+        circle = (x_mm, y_mm, radius_mm)
+        if all(v is not None for v in region) == all(v is not None for v in circle):
+            return {"error": "Give either x_min, y_min, x_max and y_max, or x_mm, y_mm and radius_mm"}
+
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "components": [
+                    {"reference": "R1", "value": "10k", "x_mm": 10, "y_mm": 20, "rotation_deg": 0},
+                ],
+                "count": 1
+            }
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            fields = self._check_fields(fields, COLUMNS, LIST_FIELDS)
+            index = self._spatial_index()
+            if radius_mm is not None:
+                hits = index.query_radius(x_mm, y_mm, radius_mm)
+            else:
+                box = (min(x_min, x_max), min(y_min, y_max), max(x_min, x_max), max(y_min, y_max))
+                table = self._component_table()
+                hits = sorted(((ref, None) for ref in index.query(box)), key=lambda hit: table.row(hit[0]))
+
+            components = self._spatial_records(hits, layer, fields)
+            return {"status": "success", "count": len(components), "components": components}
+        except Exception as e:
+            return {"error": f"Failed to query region: {str(e)}"}
+
+    async def _nearest_components(self, x_mm: float, y_mm: float, count: int = 5, layer: Optional[str] = None,
+                                  fields: Optional[List[str]] = None) -> Dict:
+        """Components closest to a point (distance to the courtyard, 0 when inside it)"""
+        if self.backend == "mock":
+            return {
+                "status": "mock",
+                "components": [
+                    {"reference": "R1", "value": "10k", "x_mm": 10, "y_mm": 20, "rotation_deg": 0, "distance_mm": 0},
+                ],
+                "count": 1
+            }
+
+        try:
+            if self.backend == "pcbnew" and self.board is None:
+                self.board = pcbnew.GetBoard()
+                if self.board is None:
+                    return {"error": "No PCB board is open"}
+
+            fields = self._check_fields(fields, COLUMNS, LIST_FIELDS)
+            table = self._component_table()
+            accept = None
+            if layer is not None:
+                accept = lambda ref: table.layer[table.row(ref)] == layer
+            hits = self._spatial_index().nearest(x_mm, y_mm, int(count), accept)
+
+            components = self._spatial_records(hits, None, fields)
+            return {"status": "success", "count": len(components), "components": components}
+        except Exception as e:
+            return {"error": f"Failed to find nearest components: {str(e)}"}
+
+    # ============================================================================
+    # BACKGROUND JOBS
+    # ============================================================================
+
+    def _start_job(self, tool: str, arguments: Dict) -> Dict:
+        """Queue a tool call as a background job and return its id
+
+        When the request carried a progressToken, every step of the job is sent to it as a progress notification.
+        """
+        notify = None
+        try:
+            context = self.server.request_context
+        except LookupError:  # Called directly rather than through call_tool
+            context = None
+        token = context.meta.progressToken if context is not None and context.meta is not None else None
+        if token is not None:
+            loop = asyncio.get_running_loop()
+            session = context.session
+
+            def notify(job: Job) -> None:
+                asyncio.run_coroutine_threadsafe(session.send_progress_notification(
+                    token, job.progress.done, job.progress.total, job.progress.message), loop)
+
+        self._loop = asyncio.get_running_loop()
+        ahead = self.jobs.pending()
+        job = self.jobs.submit(tool, lambda progress: self._call_tool(tool, arguments, progress), on_progress=notify)
+        return {
+            "status": "queued",
+            "job_id": job.job_id,
+            "tool": tool,
+            "jobs_ahead": ahead,
+            "message": "Running in the background: poll get_job_status with this job_id"
+        }
+
+    async def _get_job_status(self, job_id: Optional[str] = None) -> Dict:
+        """Status of one job, with its result once finished, or a summary of every recent job"""
+        if job_id is None:
+            jobs = []
+            for job in self.jobs.jobs():
+                status = job.status()
+                status.pop("result", None)
+                jobs.append(status)
+            return {"status": "success", "count": len(jobs), "jobs": jobs}
+
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job '{job_id}'"}
+        return {"status": "success", **job.status()}
+
+    async def _cancel_job(self, job_id: str) -> Dict:
+        """Cancel a queued job, or ask a running one to stop at its next progress step"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job '{job_id}'"}
+        if job.state not in ("queued", "running"):
+            return {"error": f"Job '{job_id}' already {job.state}"}
+        self.jobs.cancel(job_id)
+        return {"status": "success", **job.status()}
 
     async def _get_fabrication_checklist(self) -> str:
         """Generate pre-fabrication checklist"""
@@ -944,17 +3202,36 @@ Use the export_fabrication_package tool to generate all required files automatic
 
     async def run(self):
         """Run the MCP server"""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                self.server.create_initialization_options()
-            )
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options()
+                )
+        finally:
+            await asyncio.to_thread(self.jobs.shutdown)  # A file backend job may still need this loop to stop
+            self.pcbnew_executor.shutdown()
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="KiCad MCP Server Extended")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="Board backend: pcbnew (live KiCad), file (headless .kicad_pcb parser) "
+                             "or auto (default, or KICAD_MCP_BACKEND)")
+    parser.add_argument("--board", default=None,
+                        help="Path to a .kicad_pcb file for the file backend (or KICAD_MCP_BOARD)")
+    parser.add_argument("--output", choices=OUTPUT_MODES, default=None,
+                        help="Tool result encoding: pretty (default, or KICAD_MCP_OUTPUT), compact JSON, "
+                             "or table (lists of records as columns + rows)")
+    return parser.parse_args()
 
 
 async def main():
     """Main entry point"""
-    server = KiCadMCPServerExtended()
+    args = parse_args()
+    server = KiCadMCPServerExtended(backend=args.backend, board_path=args.board, output_mode=args.output)
     await server.run()
 
 
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+KiCad Output Encoding - How tool results are rendered for MCP clients
+Pretty JSON, compact JSON, or a columnar table encoding for lists of records
+"""
+
+import json
+from typing import Any, Optional
+
+OUTPUT_MODES = ("pretty", "compact", "table")
+
+OUTPUT_PROPERTY = {
+    "type": "string",
+    "enum": list(OUTPUT_MODES),
+    "description": "Result encoding for this call: pretty, compact or table (default: server setting)",
+}
+
+
+def select_output_mode(requested: Optional[str]) -> str:
+    """Validate an output mode, defaulting to pretty"""
+    mode = requested or "pretty"
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode '{mode}' (expected one of: {', '.join(OUTPUT_MODES)})")
+    return mode
+
+
+def tabulate(value: Any) -> Any:
+    """Replace every list of dicts with {"columns": [...], "rows": [[...], ...]}
+
+    Columns are the union of the record keys in first-seen order; missing values become null.
+    """
+    if isinstance(value, dict):
+        return {key: tabulate(item) for key, item in value.items()}
+    if not isinstance(value, list):
+        return value
+    if not value or not all(isinstance(item, dict) for item in value):
+        return [tabulate(item) for item in value]
+
+    columns = {}
+    for record in value:
+        for key in record:
+            columns.setdefault(key, None)
+    columns = list(columns)
+    return {
+        "columns": columns,
+        "rows": [[_cell(record.get(key)) for key in columns] for record in value],
+    }
+
+
+def _cell(value: Any) -> Any:
+    return tabulate(value) if isinstance(value, (dict, list)) else value
+
+
+def encode_result(result: Any, mode: str = "pretty") -> str:
+    """Serialize a tool result in the given output mode"""
+    if mode == "pretty":
+        return json.dumps(result, indent=2)
+    if mode == "table":
+        result = tabulate(result)
+    return json.dumps(result, separators=(",", ":"))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+KiCad Courtyard Overlaps - Footprint pairs whose courtyards intersect
+Grid broad phase plus exact polygon overlap, kept current as footprints move
+"""
+
+from typing import Dict, List, Sequence, Set, Tuple
+
+from kicad_board_model import Point
+from kicad_geometry import overlap_area
+from kicad_spatial_index import SpatialGrid, bboxes_overlap
+
+# Intersections smaller than this (mm²) are treated as courtyards that merely touch
+MIN_OVERLAP_MM2 = 1e-6
+
+Pair = Tuple[str, str]
+
+
+class CourtyardOverlaps:
+    """Overlapping courtyard pairs on the same side of the board
+
+    Shares the caller's SpatialGrid of courtyard boxes; the grid must already hold a moved
+    footprint's new box when `update` is called.
+    """
+
+    def __init__(self, grid: SpatialGrid, courtyards: Dict[str, Tuple[str, Sequence[Point]]]):
+        self.grid = grid
+        self.courtyards = dict(courtyards)  # reference -> (side layer, polygon)
+        self._pairs: Dict[Pair, float] = {}
+        self._partners: Dict[str, Set[str]] = {}
+        for reference in self.courtyards:
+            self._test(reference, only_after=True)
+
+    def _test(self, reference: str, only_after: bool = False) -> None:
+        """Record every overlap between one footprint and its grid neighbours"""
+        side, polygon = self.courtyards[reference]
+        box = self.grid.bbox(reference)
+        if box is None:
+            return
+        for other in self.grid.candidates(box):
+            if other == reference or (only_after and other < reference) or other not in self.courtyards:
+                continue
+            other_side, other_polygon = self.courtyards[other]
+            if other_side != side or not bboxes_overlap(box, self.grid.bbox(other)):
+                continue
+            area = overlap_area(polygon, other_polygon)
+            if area > MIN_OVERLAP_MM2:
+                pair = (reference, other) if reference < other else (other, reference)
+                self._pairs[pair] = area
+                self._partners.setdefault(reference, set()).add(other)
+                self._partners.setdefault(other, set()).add(reference)
+
+    def update(self, reference: str, side: str, polygon: Sequence[Point]) -> None:
+        """Re-test one footprint after it moved; only its neighbourhood is examined"""
+        for other in self._partners.pop(reference, set()):
+            self._pairs.pop((reference, other) if reference < other else (other, reference), None)
+            partners = self._partners.get(other)
+            if partners is not None:
+                partners.discard(reference)
+        self.courtyards[reference] = (side, polygon)
+        self._test(reference)
+
+    def pairs(self) -> List[Tuple[str, str, str, float]]:
+        """(reference_a, reference_b, side layer, overlap area in mm²), sorted by reference"""
+        return [(a, b, self.courtyards[a][0], area) for (a, b), area in sorted(self._pairs.items())]
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+KiCad PCB Parser - Headless reader for .kicad_pcb files
+Streams the S-expression file and builds a BoardModel without needing pcbnew
+"""
+
+import math
+import re
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from kicad_board_model import (
+    BoardModel,
+    Footprint,
+    Net,
+    Pad,
+    Point,
+    Track,
+    Via,
+    Zone,
+    arc_points,
+    rotate_point,
+)
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))')
+_ESCAPE_RE = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+COURTYARD_LAYERS = ("F.CrtYd", "B.CrtYd")
+
+
+# ============================================================================
+# S-EXPRESSION READER
+# ============================================================================
+
+def iter_sexpr(stream: TextIO, chunk_size: int = 1 << 20) -> Iterator[list]:
+    """Yield the root node header, then each top-level child of the root node as it completes
+
+    Nodes are lists whose first element is the node name; atoms are left as strings.
+    """
+    buf = ""
+    stack: List[list] = []
+    eof = False
+
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+
+        # Only tokenize up to the last ')' so atoms are never split across chunks
+        limit = len(buf) if eof else buf.rfind(")") + 1
+        pos = 0
+        for m in _TOKEN_RE.finditer(buf, 0, limit):
+            if m.start() != pos:
+                break  # String straddling the limit; wait for more data
+            pos = m.end()
+
+            if m.group(1):
+                node: list = []
+                if stack and len(stack) > 1:
+                    stack[-1].append(node)
+                stack.append(node)
+            elif m.group(2):
+                if not stack:
+                    raise ValueError("Unbalanced ')' in S-expression")
+                node = stack.pop()
+                if len(stack) == 1:
+                    yield node
+                elif not stack:
+                    return
+            else:
+                atom = m.group(3)
+                if atom is not None:
+                    if "\\" in atom:
+                        atom = _ESCAPE_RE.sub(lambda e: _ESCAPES.get(e.group(1), e.group(1)), atom)
+                else:
+                    atom = m.group(4)
+                if stack:
+                    stack[-1].append(atom)
+                    if len(stack) == 1 and len(stack[0]) == 1:
+                        yield stack[0]
+        buf = buf[pos:]
+
+    if buf.strip() or stack:
+        raise ValueError("Unexpected end of S-expression")
+
+
+def _child(node: list, name: str) -> Optional[list]:
+    for item in node[1:]:
+        if isinstance(item, list) and item and item[0] == name:
+            return item
+    return None
+
+
+def _children(node: list, name: str) -> Iterator[list]:
+    for item in node[1:]:
+        if isinstance(item, list) and item and item[0] == name:
+            yield item
+
+
+def _value(node: list, name: str, default: Optional[str] = None) -> Optional[str]:
+    child = _child(node, name)
+    return child[1] if child is not None and len(child) > 1 else default
+
+
+def _xy(node: list, name: str) -> Optional[Point]:
+    child = _child(node, name)
+    if child is None or len(child) < 3:
+        return None
+    return float(child[1]), float(child[2])
+
+
+def _pts(node: list) -> List[Point]:
+    pts = _child(node, "pts")
+    if pts is None:
+        return []
+    points: List[Point] = []
+    for item in pts[1:]:
+        if not isinstance(item, list):
+            continue
+        if item[0] == "xy":
+            points.append((float(item[1]), float(item[2])))
+        elif item[0] == "arc":
+            start, mid, end = _xy(item, "start"), _xy(item, "mid"), _xy(item, "end")
+            if start and mid and end:
+                points.extend(arc_points(start, mid, end))
+    return points
+
+
+def _layers(node: list) -> List[str]:
+    layers = _child(node, "layers")
+    if layers is not None:
+        return [str(layer) for layer in layers[1:] if not isinstance(layer, list)]
+    layer = _value(node, "layer")
+    return [layer] if layer else []
+
+
+def _net(node: list) -> Tuple[int, str]:
+    net = _child(node, "net")
+    if net is None or len(net) < 2:
+        return 0, ""
+    try:
+        return int(net[1]), net[2] if len(net) > 2 else ""
+    except ValueError:
+        return 0, net[1]  # Name-only net reference
+
+
+def _flag(node: list, name: str) -> bool:
+    if name in node[1:]:
+        return True
+    return _value(node, name) == "yes"
+
+
+# ============================================================================
+# GRAPHICS
+# ============================================================================
+
+def _shape_segments(node: list) -> List[Tuple[Point, Point]]:
+    """Line segments of a gr_*/fp_* graphic item, in the item's own coordinates"""
+    kind = node[0].split("_", 1)[-1]
+    if kind == "line":
+        start, end = _xy(node, "start"), _xy(node, "end")
+        return [(start, end)] if start and end else []
+    if kind == "rect":
+        start, end = _xy(node, "start"), _xy(node, "end")
+        if not (start and end):
+            return []
+        corners = [start, (end[0], start[1]), end, (start[0], end[1])]
+        return list(zip(corners, corners[1:] + corners[:1]))
+    if kind == "arc":
+        start, mid, end = _xy(node, "start"), _xy(node, "mid"), _xy(node, "end")
+        if not (start and end):
+            return []
+        points = arc_points(start, mid, end) if mid else [start, end]
+        return list(zip(points, points[1:]))
+    if kind == "circle":
+        center, end = _xy(node, "center"), _xy(node, "end")
+        if not (center and end):
+            return []
+        r = math.hypot(end[0] - center[0], end[1] - center[1])
+        points = [(center[0] + r * math.cos(2 * math.pi * i / 32),
+                   center[1] + r * math.sin(2 * math.pi * i / 32)) for i in range(33)]
+        return list(zip(points, points[1:]))
+    if kind == "poly":
+        points = _pts(node)
+        return list(zip(points, points[1:] + points[:1])) if len(points) > 2 else []
+    return []
+
+
+def _chain_polygon(segments: List[Tuple[Point, Point]], tol: float = 1e-3) -> List[Point]:
+    """Join segments into a closed outline; fall back to the convex hull if they do not chain"""
+    if not segments:
+        return []
+
+    def same(a: Point, b: Point) -> bool:
+        return abs(a[0] - b[0]) <= tol and abs(a[1] - b[1]) <= tol
+
+    remaining = list(segments[1:])
+    polygon = [segments[0][0], segments[0][1]]
+    while remaining:
+        for i, (a, b) in enumerate(remaining):
+            if same(a, polygon[-1]):
+                polygon.append(b)
+                break
+            if same(b, polygon[-1]):
+                polygon.append(a)
+                break
+        else:
+            return _convex_hull([p for segment in segments for p in segment])
+        remaining.pop(i)
+
+    if same(polygon[0], polygon[-1]):
+        polygon.pop()
+    return polygon
+
+
+def _convex_hull(points: List[Point]) -> List[Point]:
+    pts = sorted(set(points))
+    if len(pts) < 3:
+        return pts
+
+    def cross(o: Point, a: Point, b: Point) -> float:
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower: List[Point] = []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper: List[Point] = []
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+# ============================================================================
+# BOARD ITEMS
+# ============================================================================
+
+def _parse_footprint(node: list, outline: List[Tuple[Point, Point]]) -> Footprint:
+    at = _child(node, "at")
+    fx, fy = float(at[1]), float(at[2])
+    angle = float(at[3]) if len(at) > 3 else 0.0
+
+    def to_board(p: Point) -> Point:
+        rx, ry = rotate_point(p[0], p[1], angle)
+        return fx + rx, fy + ry
+
+    reference, value = "", ""
+    for prop in _children(node, "property"):  # KiCad 8+
+        if prop[1] == "Reference":
+            reference = prop[2]
+        elif prop[1] == "Value":
+            value = prop[2]
+    for text in _children(node, "fp_text"):  # KiCad 6/7
+        if text[1] == "reference" and not reference:
+            reference = text[2]
+        elif text[1] == "value" and not value:
+            value = text[2]
+
+    attr = _child(node, "attr")
+    footprint = Footprint(
+        reference=reference,
+        value=value,
+        lib_id=node[1] if len(node) > 1 and not isinstance(node[1], list) else "",
+        x_mm=fx,
+        y_mm=fy,
+        rotation_deg=angle,
+        layer=_value(node, "layer", "F.Cu"),
+        locked=_flag(node, "locked"),
+        attributes=[a for a in attr[1:] if not isinstance(a, list)] if attr else [],
+    )
+
+    courtyard: List[Tuple[Point, Point]] = []
+    for item in node[1:]:
+        if not isinstance(item, list) or not item:
+            continue
+        head = item[0]
+        if head == "pad":
+            footprint.pads.append(_parse_pad(item, to_board))
+        elif head.startswith("fp_") and head != "fp_text":
+            layer = _value(item, "layer")
+            if layer in COURTYARD_LAYERS:
+                courtyard.extend(_shape_segments(item))
+            elif layer == "Edge.Cuts":
+                outline.extend((to_board(a), to_board(b)) for a, b in _shape_segments(item))
+
+    footprint.courtyard = [to_board(p) for p in _chain_polygon(courtyard)]
+    return footprint
+
+
+def _parse_pad(node: list, to_board) -> Pad:
+    at = _child(node, "at")
+    x, y = to_board((float(at[1]), float(at[2])))
+    size = _child(node, "size")
+    drill = _child(node, "drill")
+    drill_mm = 0.0
+    if drill is not None:
+        sizes = [d for d in drill[1:] if not isinstance(d, list) and d != "oval"]
+        drill_mm = float(sizes[0]) if sizes else 0.0
+    net_code, net_name = _net(node)
+    return Pad(
+        number=str(node[1]),
+        x_mm=x,
+        y_mm=y,
+        width_mm=float(size[1]) if size else 0.0,
+        height_mm=float(size[2]) if size and len(size) > 2 else 0.0,
+        shape=str(node[3]) if len(node) > 3 and not isinstance(node[3], list) else "rect",
+        pad_type=str(node[2]) if len(node) > 2 and not isinstance(node[2], list) else "smd",
+        layers=_layers(node),
+        rotation_deg=float(at[3]) if len(at) > 3 else 0.0,
+        drill_mm=drill_mm,
+        net_code=net_code,
+        net_name=net_name,
+        roundrect_rratio=float(_value(node, "roundrect_rratio", "0")),
+    )
+
+
+def _parse_track(node: list) -> Track:
+    net_code, net_name = _net(node)
+    return Track(
+        start=_xy(node, "start"),
+        end=_xy(node, "end"),
+        width_mm=float(_value(node, "width", "0")),
+        layer=_value(node, "layer", ""),
+        net_code=net_code,
+        net_name=net_name,
+        mid=_xy(node, "mid") if node[0] == "arc" else None,
+    )
+
+
+def _parse_via(node: list) -> Via:
+    at = _xy(node, "at")
+    net_code, net_name = _net(node)
+    return Via(
+        x_mm=at[0],
+        y_mm=at[1],
+        size_mm=float(_value(node, "size", "0")),
+        drill_mm=float(_value(node, "drill", "0")),
+        layers=_layers(node) or ["F.Cu", "B.Cu"],
+        net_code=net_code,
+        net_name=net_name,
+    )
+
+
+def _parse_zone(node: list) -> Zone:
+    net_code, _ = _net(node)
+    keepout = _child(node, "keepout")
+    zone = Zone(
+        net_code=net_code,
+        net_name=_value(node, "net_name", ""),
+        layers=_layers(node),
+        keepout=keepout is not None,
+        keepout_footprints=keepout is not None and _value(keepout, "footprints") == "not_allowed",
+    )
+    polygon = _child(node, "polygon")
+    if polygon is not None:
+        zone.outline = _pts(polygon)
+    for filled in _children(node, "filled_polygon"):
+        layer = _value(filled, "layer", zone.layers[0] if zone.layers else "")
+        zone.filled.setdefault(layer, []).append(_pts(filled))
+    return zone
+
+
+# ============================================================================
+# ENTRY POINTS
+# ============================================================================
+
+def parse_kicad_pcb(stream: TextIO, file_name: str = "") -> BoardModel:
+    """Build a BoardModel from a .kicad_pcb text stream"""
+    model = BoardModel(file_name=file_name, copper_layers=[])
+    items = iter_sexpr(stream)
+
+    root = next(items, None)
+    if root is None or root[0] != "kicad_pcb":
+        raise ValueError(f"Not a KiCad PCB file: {file_name or '<stream>'}")
+
+    for node in items:
+        head = node[0]
+        if head in ("footprint", "module"):
+            model.footprints.append(_parse_footprint(node, model.outline))
+        elif head in ("segment", "arc"):
+            model.tracks.append(_parse_track(node))
+        elif head == "via":
+            model.vias.append(_parse_via(node))
+        elif head == "zone":
+            model.zones.append(_parse_zone(node))
+        elif head == "net":
+            code = int(node[1])
+            model.nets[code] = Net(code=code, name=node[2] if len(node) > 2 else "")
+        elif head == "layers":
+            model.copper_layers = [
+                layer[1] for layer in node[1:]
+                if isinstance(layer, list) and len(layer) > 1 and str(layer[1]).endswith(".Cu")
+            ]
+        elif head.startswith("gr_") and _value(node, "layer") == "Edge.Cuts":
+            model.outline.extend(_shape_segments(node))
+
+    if not model.copper_layers:
+        model.copper_layers = ["F.Cu", "B.Cu"]
+
+    # Tracks and vias only carry the net code
+    for item in model.tracks + model.vias:
+        if not item.net_name:
+            item.net_name = model.net_name(item.net_code)
+    for zone in model.zones:
+        if not zone.net_name:
+            zone.net_name = model.net_name(zone.net_code)
+
+    return model
+
+
+def load_kicad_pcb(path: str) -> BoardModel:
+    """Parse a .kicad_pcb file from disk"""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_kicad_pcb(f, file_name=path)
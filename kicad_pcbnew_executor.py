@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+KiCad pcbnew Executor - The one thread allowed to touch pcbnew
+Tool coroutines run on this thread's own event loop, one at a time, while the MCP loop stays free for I/O
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class PcbnewExecutor:
+    """Single thread with an event loop that every board access goes through
+
+    pcbnew is not thread-safe, so tool code for the pcbnew backend runs here. Coroutines only give the thread up
+    where they await work handed to other threads or processes (plotting a snapshot, writing a ZIP, DRC or
+    placement on a board copy), and other tool calls run in those gaps. Cancelling the awaiting request cancels the coroutine at its next await.
+    """
+
+    def __init__(self, name: str = "pcbnew"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                # Daemon, so an interpreter exiting without shutdown() is not held up by the loop
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def in_thread(self) -> bool:
+        """Whether the caller is already running on the pcbnew thread"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        """Schedule a coroutine on the pcbnew thread from any other thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self._start())
+
+    async def run(self, coro: Awaitable[T]) -> T:
+        """Await a coroutine on the pcbnew thread from another event loop (directly when already on it)"""
+        if self.in_thread():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def run_sync(self, coro: Awaitable[T]) -> T:
+        """Block a worker thread until a coroutine finishes on the pcbnew thread"""
+        if self.in_thread():
+            raise RuntimeError("run_sync() would deadlock on the pcbnew thread; await run() instead")
+        return self.submit(coro).result()
+
+    def shutdown(self) -> None:
+        """Stop the loop once the running coroutine step returns"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join()
+            loop.close()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+KiCad pcbnew Model - BoardModel snapshots of a live pcbnew board
+Lets the Python engines (DRC and friends) run on the board open in KiCad
+"""
+
+from functools import lru_cache
+from typing import Dict, List
+
+from kicad_board_model import BoardModel, Footprint, Net, Pad, Point, Track, Via, Zone
+
+try:
+    import pcbnew
+except ImportError:
+    pcbnew = None
+
+
+def _mm(value: int) -> float:
+    return value / 1e6
+
+
+def _point(vector) -> Point:
+    return vector.x / 1e6, vector.y / 1e6
+
+
+@lru_cache(maxsize=None)
+def _pad_shape_names() -> Dict[int, str]:
+    names = {}
+    for name in ("rect", "circle", "oval", "roundrect", "trapezoid", "chamfered_rect", "custom"):
+        constant = getattr(pcbnew, f"PAD_SHAPE_{name.upper()}", None)
+        if constant is not None:
+            names[constant] = name
+    return names
+
+
+@lru_cache(maxsize=None)
+def _pad_type_names() -> Dict[int, str]:
+    names = {}
+    for constant, name in (("PAD_ATTRIB_PTH", "thru_hole"), ("PAD_ATTRIB_SMD", "smd"),
+                           ("PAD_ATTRIB_CONN", "connect"), ("PAD_ATTRIB_NPTH", "np_thru_hole")):
+        if hasattr(pcbnew, constant):
+            names[getattr(pcbnew, constant)] = name
+    return names
+
+
+def _outline_points(poly_set) -> List[Point]:
+    if not poly_set.OutlineCount():
+        return []
+    chain = poly_set.Outline(0)
+    return [_point(chain.CPoint(i)) for i in range(chain.PointCount())]
+
+
+def _all_outlines(poly_set) -> List[List[Point]]:
+    outlines = []
+    for i in range(poly_set.OutlineCount()):
+        chain = poly_set.Outline(i)
+        outlines.append([_point(chain.CPoint(j)) for j in range(chain.PointCount())])
+    return outlines
+
+
+def _layer_names(board, layer_set) -> List[str]:
+    return [board.GetLayerName(layer) for layer in layer_set.CuStack()]
+
+
+def footprint_from_pcbnew(board, fp) -> Footprint:
+    """Copy one pcbnew FOOTPRINT with its pads and courtyard"""
+    shapes = _pad_shape_names()
+    pad_types = _pad_type_names()
+    x, y = _point(fp.GetPosition())
+    courtyard_layer = pcbnew.B_CrtYd if fp.IsFlipped() else pcbnew.F_CrtYd
+    footprint = Footprint(
+        reference=fp.GetReference(),
+        value=fp.GetValue(),
+        lib_id=fp.GetFPIDAsString(),
+        x_mm=x,
+        y_mm=y,
+        rotation_deg=fp.GetOrientationDegrees(),
+        layer=fp.GetLayerName(),
+        locked=fp.IsLocked(),
+        courtyard=_outline_points(fp.GetCourtyard(courtyard_layer)),
+    )
+    for pad in fp.Pads():
+        px, py = _point(pad.GetPosition())
+        shape = shapes.get(pad.GetShape(), "rect")
+        footprint.pads.append(Pad(
+            number=pad.GetNumber(),
+            x_mm=px,
+            y_mm=py,
+            width_mm=_mm(pad.GetSize().x),
+            height_mm=_mm(pad.GetSize().y),
+            shape=shape,
+            pad_type=pad_types.get(pad.GetAttribute(), "smd"),
+            layers=_layer_names(board, pad.GetLayerSet()),
+            rotation_deg=pad.GetOrientationDegrees(),
+            drill_mm=_mm(pad.GetDrillSize().x),
+            net_code=pad.GetNetCode(),
+            net_name=pad.GetNetname(),
+            roundrect_rratio=pad.GetRoundRectRadiusRatio() if shape == "roundrect" else 0.0,
+        ))
+    return footprint
+
+
+def model_from_pcbnew(board) -> BoardModel:
+    """Copy the footprints, pads, tracks, vias, zones (with fills) and outline box of a pcbnew BOARD"""
+    model = BoardModel(
+        file_name=board.GetFileName(),
+        copper_layers=_layer_names(board, board.GetEnabledLayers()),
+        nets={code: Net(code, net.GetNetname()) for code, net in board.GetNetInfo().NetsByNetcode().items()},
+    )
+
+    model.footprints = [footprint_from_pcbnew(board, fp) for fp in board.GetFootprints()]
+
+    for item in board.GetTracks():
+        kind = item.GetClass()
+        if kind == "PCB_VIA":
+            x, y = _point(item.GetPosition())
+            model.vias.append(Via(
+                x_mm=x,
+                y_mm=y,
+                size_mm=_mm(item.GetWidth()),
+                drill_mm=_mm(item.GetDrillValue()),
+                layers=[board.GetLayerName(item.TopLayer()), board.GetLayerName(item.BottomLayer())],
+                net_code=item.GetNetCode(),
+                net_name=item.GetNetname(),
+            ))
+        else:
+            model.tracks.append(Track(
+                start=_point(item.GetStart()),
+                end=_point(item.GetEnd()),
+                width_mm=_mm(item.GetWidth()),
+                layer=item.GetLayerName(),
+                net_code=item.GetNetCode(),
+                net_name=item.GetNetname(),
+                mid=_point(item.GetMid()) if kind == "PCB_ARC" else None,
+            ))
+
+    for zone in board.Zones():
+        keepout = zone.GetIsRuleArea()
+        filled = {}
+        if not keepout and zone.IsFilled():
+            filled = {board.GetLayerName(layer): _all_outlines(zone.GetFilledPolysList(layer))
+                      for layer in zone.GetLayerSet().CuStack()}
+        model.zones.append(Zone(
+            net_code=zone.GetNetCode(),
+            net_name=zone.GetNetname(),
+            layers=_layer_names(board, zone.GetLayerSet()),
+            outline=_outline_points(zone.Outline()),
+            filled=filled,
+            keepout=keepout,
+            keepout_footprints=keepout and zone.GetDoNotAllowFootprints(),
+        ))
+
+    box = board.GetBoardEdgesBoundingBox()
+    if box.GetWidth() and box.GetHeight():
+        corners = [(_mm(box.GetLeft()), _mm(box.GetTop())), (_mm(box.GetRight()), _mm(box.GetTop())),
+                   (_mm(box.GetRight()), _mm(box.GetBottom())), (_mm(box.GetLeft()), _mm(box.GetBottom()))]
+        model.outline = list(zip(corners, corners[1:] + corners[:1]))
+    return model
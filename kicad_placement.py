@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+KiCad Placement - Half-perimeter wirelength over a pad-net incidence array
+Scores the board or hypothetical footprint positions without touching the board
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from kicad_board_model import Footprint, rotate_point
+
+Pose = Tuple[float, float, float]  # x_mm, y_mm, rotation_deg
+
+
+def rotate_offsets(dx: np.ndarray, dy: np.ndarray, rotation_deg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized rotate_point: KiCad convention, Y axis down"""
+    a = np.radians(rotation_deg)
+    c, s = np.cos(a), np.sin(a)
+    return dx * c + dy * s, -dx * s + dy * c
+
+
+def segment_hpwl(px: np.ndarray, py: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """(max - min) of x plus y over each run of pads along the last axis (runs begin at `starts`)"""
+    if not len(starts):
+        return np.zeros(px.shape[:-1] + (0,))
+    return (np.maximum.reduceat(px, starts, axis=-1) - np.minimum.reduceat(px, starts, axis=-1) +
+            np.maximum.reduceat(py, starts, axis=-1) - np.minimum.reduceat(py, starts, axis=-1))
+
+
+class PlacementNetlist:
+    """Footprint poses and the pads of every multi-pad net, as flat arrays sorted by net
+
+    Each pad keeps its offset from the footprint origin at 0°, so any pose can be scored by
+    rotating and translating the offsets, then reducing min/max per net segment.
+    """
+
+    def __init__(self, footprints: Sequence[Footprint], net_names: Optional[Dict[int, str]] = None):
+        self.references: List[str] = [fp.reference for fp in footprints]
+        counts = Counter(self.references)
+        # References shared by several footprints can't be told apart, so they stay out of the index
+        self.duplicates: List[str] = sorted(ref for ref, count in counts.items() if count > 1)
+        self.index: Dict[str, int] = {ref: i for i, ref in enumerate(self.references) if counts[ref] == 1}
+        self.x = np.array([fp.x_mm for fp in footprints], dtype=np.float64)
+        self.y = np.array([fp.y_mm for fp in footprints], dtype=np.float64)
+        self.rotation = np.array([fp.rotation_deg for fp in footprints], dtype=np.float64)
+
+        members: Dict[int, List[Tuple[int, float, float]]] = {}
+        for i, fp in enumerate(footprints):
+            for pad in fp.pads:
+                if pad.net_code:
+                    dx, dy = rotate_point(pad.x_mm - fp.x_mm, pad.y_mm - fp.y_mm, -fp.rotation_deg)
+                    members.setdefault(pad.net_code, []).append((i, dx, dy))
+        codes = sorted(code for code, pads in members.items() if len(pads) > 1)
+        self.net_codes = np.array(codes, dtype=np.int64)
+        self.net_names = [(net_names or {}).get(code, "") for code in codes]
+        self.net_index: Dict[int, int] = {code: k for k, code in enumerate(codes)}
+
+        pads = [(k, *pad) for k, code in enumerate(codes) for pad in members[code]]
+        self.pad_net = np.array([p[0] for p in pads], dtype=np.int64)
+        self.pad_comp = np.array([p[1] for p in pads], dtype=np.int64)
+        self.pad_dx = np.array([p[2] for p in pads], dtype=np.float64)
+        self.pad_dy = np.array([p[3] for p in pads], dtype=np.float64)
+        self.starts = np.searchsorted(self.pad_net, np.arange(len(codes)))
+
+        comp_nets: List[set] = [set() for _ in self.references]
+        for k, comp in zip(self.pad_net.tolist(), self.pad_comp.tolist()):
+            comp_nets[comp].add(k)
+        self.comp_nets = [np.array(sorted(nets), dtype=np.int64) for nets in comp_nets]
+        self.net_hpwl = self.hpwl()
+
+    @property
+    def total(self) -> float:
+        return float(self.net_hpwl.sum())
+
+    def hpwl(self, x: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None,
+             rotation: Optional[np.ndarray] = None) -> np.ndarray:
+        """HPWL per net for the given component poses (default: current)
+
+        Pose arrays may carry leading batch dimensions, e.g. (candidates, components), to score
+        many full placements in one call; the result then has shape (candidates, nets).
+        """
+        x = self.x if x is None else x
+        y = self.y if y is None else y
+        rotation = self.rotation if rotation is None else rotation
+        comp = self.pad_comp
+        dx, dy = rotate_offsets(self.pad_dx, self.pad_dy, rotation[..., comp])
+        return segment_hpwl(x[..., comp] + dx, y[..., comp] + dy, self.starts)
+
+    def touched_nets(self, components: Iterable[int]) -> np.ndarray:
+        nets = [self.comp_nets[i] for i in components]
+        return np.unique(np.concatenate(nets)) if nets else np.zeros(0, dtype=np.int64)
+
+    def score(self, moves: Dict[str, Pose]) -> Tuple[float, np.ndarray, np.ndarray]:
+        """Total HPWL with some footprints at hypothetical poses
+
+        Only the nets of the moved footprints are recomputed. Returns (total, touched net
+        indexes, their new HPWL); the stored poses are left unchanged.
+        """
+        comps = [self.index[ref] for ref in moves]
+        nets = self.touched_nets(comps)
+        if not len(nets):
+            return self.total, nets, np.zeros(0)
+
+        x, y, rotation = self.x.copy(), self.y.copy(), self.rotation.copy()
+        for i, (px, py, pr) in zip(comps, moves.values()):
+            x[i], y[i], rotation[i] = px, py, pr
+
+        # Gather the touched nets' pad runs into one short array with its own segment starts
+        lengths = np.append(self.starts, len(self.pad_net))[nets + 1] - self.starts[nets]
+        pads = np.concatenate([np.arange(s, s + n) for s, n in zip(self.starts[nets], lengths)])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        comp = self.pad_comp[pads]
+        dx, dy = rotate_offsets(self.pad_dx[pads], self.pad_dy[pads], rotation[comp])
+        after = segment_hpwl(x[comp] + dx, y[comp] + dy, starts)
+        return self.total - float(self.net_hpwl[nets].sum()) + float(after.sum()), nets, after
+
+    def move(self, reference: str, x_mm: float, y_mm: float, rotation_deg: float) -> float:
+        """Commit a pose; returns the change in total HPWL"""
+        before = self.total
+        total, nets, after = self.score({reference: (x_mm, y_mm, rotation_deg)})
+        i = self.index[reference]
+        self.x[i], self.y[i], self.rotation[i] = x_mm, y_mm, rotation_deg
+        self.net_hpwl[nets] = after
+        return total - before
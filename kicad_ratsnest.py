@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+KiCad Ratsnest - Per-net minimum spanning trees over pad positions
+Airwire length per net and for the board, recomputed only for the nets of moved footprints
+"""
+
+import math
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from kicad_board_model import Footprint, FootprintSlots
+
+Airwire = Tuple[int, int, float]  # (pad index, pad index, length) within one net
+
+
+def minimum_spanning_tree(points: np.ndarray) -> Tuple[float, List[Airwire]]:
+    """Euclidean MST by Prim's algorithm on a dense distance row (O(n^2), vectorized per step)"""
+    n = len(points)
+    if n < 2:
+        return 0.0, []
+    if n == 2:
+        length = float(math.hypot(*(points[1] - points[0])))
+        return length, [(0, 1, length)]
+
+    # Points not yet in the tree live in the first `m` slots; a joined point swaps with the last one
+    index = np.arange(1, n)
+    xs, ys = points[1:, 0].copy(), points[1:, 1].copy()
+    best = (xs - points[0, 0]) ** 2 + (ys - points[0, 1]) ** 2  # Squared distance to the tree
+    parent = np.zeros(n - 1, dtype=np.int64)
+    total, edges = 0.0, []
+    m = n - 1
+    while m:
+        k = int(np.argmin(best[:m]))
+        length = math.sqrt(best[k])
+        j, x, y = int(index[k]), xs[k], ys[k]
+        edges.append((int(parent[k]), j, length))
+        total += length
+        m -= 1
+        for array in (index, xs, ys, best, parent):
+            array[k] = array[m]
+        d = (xs[:m] - x) ** 2 + (ys[:m] - y) ** 2
+        closer = d < best[:m]
+        best[:m][closer] = d[closer]
+        parent[:m][closer] = j
+    return total, edges
+
+
+class Ratsnest:
+    """Airwires of every net; moving footprints re-solves only the nets their pads are on"""
+
+    def __init__(self, footprints: Iterable[Footprint], net_names: Dict[int, str]):
+        self.net_names = net_names
+        self.footprints = FootprintSlots(footprints)  # Pads are keyed by slot, so shared references stay apart
+        self._pads: Dict[int, List[Tuple[int, int]]] = {}
+        self.lengths: Dict[int, float] = {}
+        self.airwires: Dict[int, List[Airwire]] = {}
+        self.total_mm = 0.0
+
+        for slot, fp in enumerate(self.footprints.items):
+            for i, pad in enumerate(fp.pads):
+                if pad.net_code:
+                    self._pads.setdefault(pad.net_code, []).append((slot, i))
+        for code in self._pads:
+            self._solve(code)
+        self.total_mm = sum(self.lengths.values())
+
+    def _solve(self, code: int) -> float:
+        """Recompute one net's tree; returns the change in its length"""
+        pads = [self.footprints[slot].pads[i] for slot, i in self._pads[code]]
+        length, edges = minimum_spanning_tree(np.array([(p.x_mm, p.y_mm) for p in pads], dtype=np.float64))
+        delta = length - self.lengths.get(code, 0.0)
+        self.lengths[code] = length
+        self.airwires[code] = edges
+        return delta
+
+    def pad_labels(self, code: int) -> List[str]:
+        labels = []
+        for slot, i in self._pads.get(code, []):
+            fp = self.footprints[slot]
+            labels.append(f"{fp.reference}-{fp.pads[i].number}")
+        return labels
+
+    def update_footprints(self, footprints: Iterable[Footprint]) -> Dict[int, float]:
+        """Take moved (or re-snapshotted) footprints; returns the length change of each touched net
+
+        Footprints must keep their pads and nets; only positions are expected to change. They are matched as
+        FootprintSlots.replace() does: pass every copy of a shared reference.
+        """
+        touched = set()
+        for slot, _ in self.footprints.replace(footprints):
+            touched |= {pad.net_code for pad in self.footprints[slot].pads if pad.net_code}
+        deltas = {code: self._solve(code) for code in sorted(touched) if code in self._pads}
+        self.total_mm += sum(deltas.values())
+        return deltas
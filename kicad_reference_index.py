@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+KiCad Reference Index - O(1) reference designator lookups
+Maps references to footprints and serves "did you mean" suggestions without rescanning the board
+"""
+
+import bisect
+import difflib
+import re
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_REFERENCE_RE = re.compile(r"^(\D*)(\d*)(.*)$")
+
+
+def split_reference(reference: str) -> Tuple[str, Optional[int], str]:
+    """Split 'R12' into ('R', 12, ''), 'U3A' into ('U', 3, 'A') and 'TP' into ('TP', None, '')"""
+    prefix, number, suffix = _REFERENCE_RE.match(reference).groups()
+    return prefix.upper(), int(number) if number else None, suffix
+
+
+class ReferenceIndex(Generic[T]):
+    """Reference → item map with a per-prefix sorted index for suggestions"""
+
+    def __init__(self, items: Iterable[T], key: Callable[[T], str]):
+        self._items: Dict[str, T] = {}
+        self._casefold: Dict[str, str] = {}
+        self._by_prefix: Dict[str, List[Tuple[int, str]]] = {}
+
+        for item in items:
+            reference = key(item)
+            self._items[reference] = item
+            self._casefold.setdefault(reference.casefold(), reference)
+            prefix, number, _ = split_reference(reference)
+            self._by_prefix.setdefault(prefix, []).append((number if number is not None else -1, reference))
+
+        for entries in self._by_prefix.values():
+            entries.sort()
+        self._prefixes = list(self._by_prefix)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, reference: str) -> bool:
+        return reference in self._items
+
+    def get(self, reference: str) -> Optional[T]:
+        return self._items.get(reference)
+
+    def references(self) -> List[str]:
+        return list(self._items)
+
+    def suggest(self, reference: str, limit: int = 5) -> List[str]:
+        """Closest existing references: case-insensitive match, then nearest numbers under the same prefix"""
+        exact = self._casefold.get(reference.casefold())
+        if exact is not None:
+            return [exact]
+
+        prefix, number, _ = split_reference(reference)
+        entries = self._by_prefix.get(prefix)
+        if entries is None:
+            close = difflib.get_close_matches(prefix, self._prefixes, n=1, cutoff=0.5)
+            if not close:
+                return []
+            entries = self._by_prefix[close[0]]
+
+        if number is None:
+            return [ref for _, ref in entries[:limit]]
+
+        # Window around the insertion point holds the `limit` nearest numbers
+        i = bisect.bisect_left(entries, (number, ""))
+        window = entries[max(0, i - limit):i + limit]
+        window.sort(key=lambda entry: (abs(entry[0] - number), entry[0]))
+        return [ref for _, ref in window[:limit]]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+KiCad Spatial Index - Uniform grid over item bounding boxes
+Rectangle, radius and nearest-neighbour queries that only visit nearby cells
+"""
+
+import heapq
+import math
+import statistics
+from typing import Callable, Dict, Generic, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from kicad_board_model import BBox
+
+K = TypeVar("K", bound=Hashable)
+
+Cell = Tuple[int, int]
+
+
+def bbox_distance(box: BBox, x: float, y: float) -> float:
+    """Distance from a point to a box (0 when the point is inside)"""
+    dx = max(box[0] - x, 0.0, x - box[2])
+    dy = max(box[1] - y, 0.0, y - box[3])
+    return math.hypot(dx, dy)
+
+
+def bboxes_overlap(a: BBox, b: BBox) -> bool:
+    """Closed-interval overlap test (touching boxes overlap)"""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class SpatialGrid(Generic[K]):
+    """Key → bounding box map bucketed into square cells; each key is listed in every cell its box touches"""
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._boxes: Dict[K, BBox] = {}
+        self._cells: Dict[Cell, Set[K]] = {}
+        self._extent: Optional[Tuple[int, int, int, int]] = None  # Cell index range ever occupied
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[K, BBox]], cell_size: Optional[float] = None) -> "SpatialGrid[K]":
+        """Index (key, bbox) pairs; the default cell size is twice the median item extent"""
+        items = list(items)
+        if cell_size is None:
+            extents = [max(box[2] - box[0], box[3] - box[1]) for _, box in items]
+            cell_size = max(2 * statistics.median(extents), 0.1) if extents else 1.0
+        grid = cls(cell_size)
+        for key, box in items:
+            grid.insert(key, box)
+        return grid
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._boxes
+
+    def bbox(self, key: K) -> Optional[BBox]:
+        return self._boxes.get(key)
+
+    def items(self) -> Iterator[Tuple[K, BBox]]:
+        return iter(self._boxes.items())
+
+    def _cell_range(self, box: BBox) -> Tuple[int, int, int, int]:
+        s = self.cell_size
+        return math.floor(box[0] / s), math.floor(box[1] / s), math.floor(box[2] / s), math.floor(box[3] / s)
+
+    def _cells_of(self, box: BBox) -> Iterator[Cell]:
+        x1, y1, x2, y2 = self._cell_range(box)
+        for cx in range(x1, x2 + 1):
+            for cy in range(y1, y2 + 1):
+                yield cx, cy
+
+    def insert(self, key: K, box: BBox) -> None:
+        if key in self._boxes:
+            self.remove(key)
+        self._boxes[key] = box
+        for cell in self._cells_of(box):
+            self._cells.setdefault(cell, set()).add(key)
+
+        x1, y1, x2, y2 = self._cell_range(box)
+        if self._extent is None:
+            self._extent = (x1, y1, x2, y2)
+        else:
+            ex1, ey1, ex2, ey2 = self._extent
+            self._extent = (min(ex1, x1), min(ey1, y1), max(ex2, x2), max(ey2, y2))
+
+    def remove(self, key: K) -> None:
+        box = self._boxes.pop(key, None)
+        if box is None:
+            return
+        for cell in self._cells_of(box):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def update(self, key: K, box: BBox) -> None:
+        """Move a key to a new box, touching only the cells that changed"""
+        old = self._boxes.get(key)
+        if old is not None and self._cell_range(old) == self._cell_range(box):
+            self._boxes[key] = box
+            return
+        self.insert(key, box)
+
+    def candidates(self, box: BBox) -> Set[K]:
+        """Keys listed in any cell the box touches (a superset of the overlapping keys)"""
+        found: Set[K] = set()
+        for cell in self._cells_of(box):
+            bucket = self._cells.get(cell)
+            if bucket:
+                found |= bucket
+        return found
+
+    def query(self, box: BBox) -> List[K]:
+        """Keys whose boxes overlap the given box"""
+        return [key for key in self.candidates(box) if bboxes_overlap(self._boxes[key], box)]
+
+    def query_radius(self, x: float, y: float, radius: float) -> List[Tuple[K, float]]:
+        """(key, distance) for boxes within radius of a point, nearest first"""
+        hits = []
+        for key in self.candidates((x - radius, y - radius, x + radius, y + radius)):
+            distance = bbox_distance(self._boxes[key], x, y)
+            if distance <= radius:
+                hits.append((distance, key))
+        hits.sort(key=lambda hit: hit[0])
+        return [(key, distance) for distance, key in hits]
+
+    def nearest(self, x: float, y: float, count: int,
+                accept: Optional[Callable[[K], bool]] = None) -> List[Tuple[K, float]]:
+        """The `count` boxes closest to a point, searching rings of cells outwards"""
+        if count < 1 or self._extent is None:
+            return []
+
+        s = self.cell_size
+        cx, cy = math.floor(x / s), math.floor(y / s)
+        ex1, ey1, ex2, ey2 = self._extent
+        max_ring = max(cx - ex1, ex2 - cx, cy - ey1, ey2 - cy, 0)
+
+        seen: Set[K] = set()
+        best: List[Tuple[float, int, K]] = []  # Max-heap of the current best, as negated distances
+        order = 0
+        for ring in range(max_ring + 1):
+            for cell in self._ring(cx, cy, ring):
+                for key in self._cells.get(cell, ()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if accept is not None and not accept(key):
+                        continue
+                    distance = bbox_distance(self._boxes[key], x, y)
+                    order += 1
+                    if len(best) < count:
+                        heapq.heappush(best, (-distance, -order, key))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, -order, key))
+            # Every box not yet seen is at least `ring` cells away
+            if len(best) == count and -best[0][0] <= ring * s:
+                break
+
+        return [(key, -neg) for neg, _, key in sorted(best, key=lambda entry: (-entry[0], -entry[1]))]
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int) -> Iterator[Cell]:
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+KiCad Synthetic Board - Deterministic generated boards for benchmarks
+A grid of two-pad parts chained by nets and tracks, built directly as a BoardModel
+"""
+
+import math
+import random
+
+from kicad_board_model import BoardModel, Footprint, Net, Pad, Track
+
+PITCH_MM = 4.0
+PAD_OFFSET_MM = 0.825
+COURTYARD_HALF_MM = (1.5, 0.75)
+
+_PARTS = (
+    ("R", "Resistor_SMD:R_0603_1608Metric", ("10k", "4k7", "330", "1k")),
+    ("C", "Capacitor_SMD:C_0603_1608Metric", ("100nF", "1uF", "10nF")),
+    ("D", "LED_SMD:LED_0603_1608Metric", ("RED", "GREEN")),
+)
+
+
+def synthetic_board(components: int = 10000, seed: int = 0, layers: int = 2) -> BoardModel:
+    """Board with `components` two-pad footprints on a square grid
+
+    Pad 2 of each part shares a net with pad 1 of the next, joined by an F.Cu track; every
+    tenth part sits on B.Cu. With more than two layers, every inner layer carries a short
+    segment per part between its row and the next. The same arguments always produce the
+    same board.
+    """
+    rng = random.Random(seed)
+    columns = max(1, math.ceil(math.sqrt(components)))
+    rows = max(1, math.ceil(components / columns))
+    model = BoardModel(
+        file_name=f"synthetic_{components}.kicad_pcb",
+        nets={0: Net(0, "")},
+        outline=_rectangle(0.0, 0.0, (columns + 1) * PITCH_MM, (rows + 1) * PITCH_MM),
+        copper_layers=["F.Cu"] + [f"In{i}.Cu" for i in range(1, layers - 1)] + ["B.Cu"],
+    )
+
+    counters = {}
+    for i in range(components):
+        prefix, lib_id, values = _PARTS[rng.randrange(len(_PARTS))]
+        counters[prefix] = counters.get(prefix, 0) + 1
+        x = (i % columns + 1) * PITCH_MM
+        y = (i // columns + 1) * PITCH_MM
+        layer = "B.Cu" if i % 10 == 9 else "F.Cu"
+
+        in_net = i  # Shared with the previous part's pad 2 (net 0 stays unconnected)
+        out_net = i + 1 if i + 1 < components else 0
+        for code in (in_net, out_net):
+            if code and code not in model.nets:
+                model.nets[code] = Net(code, f"Net-{code}")
+
+        pads = [
+            Pad("1", x - PAD_OFFSET_MM, y, 0.8, 0.95, "roundrect", "smd", [layer],
+                net_code=in_net, net_name=model.net_name(in_net)),
+            Pad("2", x + PAD_OFFSET_MM, y, 0.8, 0.95, "roundrect", "smd", [layer],
+                net_code=out_net, net_name=model.net_name(out_net)),
+        ]
+        hx, hy = COURTYARD_HALF_MM
+        model.footprints.append(Footprint(
+            reference=f"{prefix}{counters[prefix]}",
+            value=rng.choice(values),
+            lib_id=lib_id,
+            x_mm=x,
+            y_mm=y,
+            layer=layer,
+            pads=pads,
+            courtyard=[(x - hx, y - hy), (x + hx, y - hy), (x + hx, y + hy), (x - hx, y + hy)],
+        ))
+
+    # Join consecutive parts on the same side
+    for prev, fp in zip(model.footprints, model.footprints[1:]):
+        if prev.layer == fp.layer:
+            start, end = prev.pads[1], fp.pads[0]
+            model.tracks.append(Track((start.x_mm, start.y_mm), (end.x_mm, end.y_mm), 0.25, fp.layer,
+                                      start.net_code, start.net_name))
+
+    # Inner layer routing: one segment per part, between its row and the next, on the part's input net
+    for layer in model.copper_layers[1:-1]:
+        for fp in model.footprints:
+            x, y = fp.x_mm, fp.y_mm + PITCH_MM / 2
+            net = fp.pads[0].net_code
+            model.tracks.append(Track((x - 1.5, y), (x + 1.5, y), 0.2, layer, net, model.net_name(net)))
+    return model
+
+
+def _rectangle(x1: float, y1: float, x2: float, y2: float):
+    corners = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+    return list(zip(corners, corners[1:] + corners[:1]))
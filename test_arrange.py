@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk align, distribute, arrange and mirror
+Box geometry, footprint flips and the batch tools on the fixture board
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from kicad_arrange import align_offsets, distribute_offsets, grid_positions
+from kicad_board_model import Footprint, Pad
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_placement import PlacementNetlist
+from kicad_ratsnest import Ratsnest
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def test_geometry():
+    """Test the box offsets, grid positions and a model footprint flip"""
+    print("=" * 70)
+    print("Testing arrange geometry")
+    print("=" * 70)
+
+    boxes = [(0, 0, 2, 1), (5, 3, 6, 5), (10, -1, 14, 2), (20, 0, 21, 1)]
+
+    print("\n1. Testing align...")
+    assert align_offsets(boxes, "left") == [(0, 0), (-5, 0), (-10, 0), (-20, 0)]
+    assert align_offsets(boxes, "bottom") == [(0, 4), (0, 0), (0, 3), (0, 4)]
+    assert align_offsets(boxes, "center_y", fixed=[False, True, False, False])[0] == (0, 3.5)
+    print("✓ Edges line up with the outermost box, or with the fixed ones")
+
+    print("\n2. Testing distribute...")
+    offsets = distribute_offsets(boxes, "x")
+    moved = [(b[0] + dx, b[2] + dx) for b, (dx, _) in zip(boxes, offsets)]
+    gaps = [moved[i + 1][0] - moved[i][1] for i in range(3)]
+    assert offsets[0] == offsets[3] == (0.0, 0.0) and max(gaps) - min(gaps) < 1e-9 and abs(gaps[0] - 13 / 3) < 1e-9
+    print(f"✓ Outer boxes fixed, equal {gaps[0]:.3f} mm gaps between the others")
+
+    print("\n3. Testing grid positions...")
+    assert grid_positions(3, "row", (1, 2), 5, 7) == [(1, 2), (6, 2), (11, 2)]
+    assert grid_positions(3, "column", (1, 2), 5, 7) == [(1, 2), (1, 9), (1, 16)]
+    assert grid_positions(5, "matrix", (0, 0), 2, 3) == [(0, 0), (2, 0), (4, 0), (0, 3), (2, 3)]
+    print("✓ Row, column and 3-wide matrix")
+
+    print("\n4. Testing a footprint flip...")
+    fp = Footprint("U1", "", "", 10, 5, rotation_deg=30, courtyard=[(9, 4), (12, 4), (12, 6), (9, 6)],
+                   pads=[Pad("1", 11, 5, 1, 0.5, layers=["F.Cu", "F.Paste", "F.Mask"], rotation_deg=30, net_code=1)])
+    fp.flip(8.0)
+    assert (fp.x_mm, fp.y_mm, fp.rotation_deg, fp.layer) == (6.0, 5, 150, "B.Cu")
+    assert (fp.pads[0].x_mm, fp.pads[0].layers) == (5.0, ["B.Cu", "B.Paste", "B.Mask"])
+    assert fp.bbox() == (4, 4, 7, 6)
+    fp.move_to(6.0, 6.0, 150)
+    assert (fp.pads[0].x_mm, fp.pads[0].y_mm) == (5.0, 6.0)
+    fp.flip(8.0)
+    assert (fp.x_mm, fp.rotation_deg, fp.layer, fp.pads[0].layers[0]) == (10.0, 30, "F.Cu", "F.Cu")
+    print("✓ Mirrored about x = 8, moved to B.Cu with 180° − θ, and back again")
+    print()
+
+
+def bbox(server, reference: str):
+    footprint, _ = server._find_footprint(reference)
+    return footprint.bbox()
+
+
+async def test_server_batches():
+    """Test the batch tools on the file backend"""
+    print("=" * 70)
+    print("Testing align, distribute, arrange and mirror headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_arrange_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+        await server._get_ratsnest()
+        await server._check_overlaps()
+
+        print("\n1. Testing align...")
+        result = await server._align_components(["R1", "D1", "J1"], "top")
+        assert result["status"] == "success" and result["moved"] >= 1
+        assert len({round(bbox(server, ref)[1], 4) for ref in ("R1", "D1", "J1")}) == 1
+        result = await server._align_components(["R1", "C1"], "left")
+        assert result["skipped_locked"] == ["C1"] and abs(bbox(server, "R1")[0] - bbox(server, "C1")[0]) < 1e-4
+        print("✓ Tops lined up; R1 lined up with locked C1, which stays put")
+
+        print("\n2. Testing distribute and arrange...")
+        result = await server._distribute_components(["R1", "D1", "J1", "C1"], axis="x")
+        assert result["skipped_locked"] == ["C1"]
+        boxes = sorted(bbox(server, ref) for ref in ("R1", "D1", "J1"))
+        assert abs((boxes[1][0] - boxes[0][2]) - (boxes[2][0] - boxes[1][2])) < 1e-3
+        result = await server._arrange_components(["J1", "R1", "D1"], layout="row", pitch_x_mm=8, x_mm=10, y_mm=40,
+                                                  rotation_deg=0)
+        footprints = {fp.reference: fp for fp in server._get_model().footprints}
+        assert [(footprints[ref].x_mm, footprints[ref].y_mm) for ref in ("J1", "R1", "D1")] == [(10, 40), (18, 40), (26, 40)]
+        assert footprints["D1"].rotation_deg == 0 and result["pitch_x_mm"] == 8
+        print(f"✓ Equal gaps after distribute; {result['pitch_x_mm']} mm pitch row at y = 40 with D1 turned to 0°")
+
+        print("\n3. Testing mirror...")
+        before = {ref: (fp.x_mm, fp.y_mm, fp.rotation_deg) for ref, fp in footprints.items()}
+        result = await server._mirror_components(["R1", "D1"])
+        assert {p["layer"] for p in result["placements"]} == {"B.Cu"}
+        axis = result["axis_x_mm"]
+        assert all(abs(footprints[ref].x_mm - (2 * axis - before[ref][0])) < 1e-9 for ref in ("R1", "D1"))
+        components = (await server._list_components(layer="B.Cu"))["components"]
+        assert {c["reference"] for c in components} == {"R1", "D1", "C1"}
+        model = server._get_model()
+        fresh = Ratsnest(model.footprints, {code: net.name for code, net in model.nets.items()})
+        assert abs((await server._get_ratsnest())["total_length_mm"] - fresh.total_mm) < 1e-3
+        assert abs((await server._score_placement())["current_hpwl_mm"] - PlacementNetlist(model.footprints).total) < 1e-3
+        await server._mirror_components(["R1", "D1"])
+        assert all(abs(a - b) < 1e-9 for ref in ("R1", "D1") for a, b in zip(before[ref], (
+            footprints[ref].x_mm, footprints[ref].y_mm, footprints[ref].rotation_deg)))
+        print(f"✓ Flipped to B.Cu about x = {result['axis_x_mm']}, caches follow, and flipped back")
+
+        print("\n4. Testing errors...")
+        assert "error" in await server._align_components(["R1", "R9"], "left")
+        assert "error" in await server._align_components(["R1", "D1"], "middle")
+        assert "error" in await server._distribute_components(["R1", "D1"])
+        assert "error" in await server._mirror_components(["C1"])
+        print("✓ Unknown parts, bad edges, short groups and only-locked groups rejected")
+
+        print("\n5. Testing each tool as the first call on a fresh server...")
+        calls = {
+            "_align_components": (["R1", "D1"], "left"),
+            "_distribute_components": (["R1", "D1", "J1"],),
+            "_arrange_components": (["R1", "D1"],),
+            "_mirror_components": (["R1"],),
+        }
+        for name, arguments in calls.items():
+            fresh_server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+            result = await getattr(fresh_server, name)(*arguments)
+            assert result["status"] == "success", (name, result)
+        print(f"✓ {len(calls)} tools load the board themselves")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_geometry()
+    asyncio.run(test_server_batches())
+    print("✅ Bulk arrange tools tested and working!\n")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test script for simulated-annealing placement
+Batched move scoring against brute force, locked parts, keepouts and the auto_place tool
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from kicad_autoplace import Annealer, _intersection
+from kicad_board_model import Footprint, Pad
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_placement import PlacementNetlist
+from kicad_synthetic_board import synthetic_board
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def scrambled_board(components: int, seed: int):
+    """Synthetic board with every part dropped at a random spot inside the outline, plus one large connector"""
+    rng = random.Random(seed)
+    board = synthetic_board(components, seed=seed)
+    x1, y1, x2, y2 = board.outline_bbox()
+    for fp in board.footprints:
+        fp.move_to(rng.uniform(x1 + 2, x2 - 2), rng.uniform(y1 + 2, y2 - 2), rng.choice([0, 90]))
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    board.footprints.append(Footprint(
+        "J1", "CONN", "Connector:Big", cx, cy,
+        pads=[Pad("1", cx - 8, cy, 1.5, 1.5, net_code=1, net_name="Net-1")],
+        courtyard=[(cx - 10, cy - 3), (cx + 10, cy - 3), (cx + 10, cy + 3), (cx - 10, cy + 3)],
+    ))
+    return board
+
+
+def test_batched_scoring():
+    """Grid overlaps and incremental HPWL must match a brute-force evaluation"""
+    print("=" * 70)
+    print("Testing batched move scoring")
+    print("=" * 70)
+
+    board = scrambled_board(400, seed=3)
+    netlist = PlacementNetlist(board.footprints)
+    annealer = Annealer(netlist, board.footprints, range(len(board.footprints)), outline=board.outline_bbox())
+    assert len(annealer.large) == 1
+
+    print("\n1. Testing overlaps against every footprint...")
+    for radius in (0.5, 5.0, 40.0):
+        comps, x, y, rotation = annealer._propose(64, radius)
+        comps[0] = len(board.footprints) - 1  # Always include the connector
+        boxes = annealer._boxes(comps, x, y, rotation)
+        dense = _intersection(boxes[:, :, None], annealer.boxes[:, None, :])
+        dense *= annealer.side[comps][:, None] == annealer.side[None, :]
+        dense[np.arange(len(comps)), comps] = 0
+        assert np.allclose(annealer._overlap(comps, boxes), dense.sum(axis=1))
+    print(f"✓ 3×3-cell grid (cell {annealer.cell:.2f} mm) finds every overlap, large connector included")
+
+    print("\n2. Testing HPWL deltas...")
+    comps, x, y, rotation = annealer._propose(64, 5.0)
+    delta = annealer._hpwl_delta(comps, x, y, rotation)[0]
+    for k in range(0, 64, 8):
+        ref = netlist.references[comps[k]]
+        total = netlist.score({ref: (x[k], y[k], rotation[k])})[0]
+        assert abs(delta[k] - (total - netlist.total)) < 1e-6
+    print("✓ Each move's delta matches PlacementNetlist.score")
+    print()
+
+
+def test_annealing():
+    """Annealing must lower the cost, keep its HPWL exact and leave fixed parts alone"""
+    print("=" * 70)
+    print("Testing simulated annealing")
+    print("=" * 70)
+
+    board = scrambled_board(300, seed=5)
+    netlist = PlacementNetlist(board.footprints)
+    fixed = set(range(0, len(board.footprints), 7))
+    movable = [i for i in range(len(board.footprints)) if i not in fixed]
+    x1, y1, x2, y2 = board.outline_bbox()
+    keepout = ((x1, y1, x1 + 15, y1 + 15), (True, True))
+    annealer = Annealer(netlist, board.footprints, movable, outline=board.outline_bbox(), keepouts=[keepout])
+
+    print("\n1. Testing the schedule...")
+    before = annealer.cost()
+    annealer.anneal(60000)
+    after = annealer.cost()
+    assert after["hpwl_mm"] < 0.5 * before["hpwl_mm"] and after["overlap_mm2"] < before["overlap_mm2"]
+    assert abs(netlist.hpwl(annealer.x, annealer.y, annealer.rotation).sum() - after["hpwl_mm"]) < 1e-6
+    print(f"✓ HPWL {before['hpwl_mm']:.0f} → {after['hpwl_mm']:.0f} mm, overlap {before['overlap_mm2']:.1f} → "
+          f"{after['overlap_mm2']:.1f} mm², {annealer.moves / annealer.elapsed_s:,.0f} moves/s")
+
+    print("\n2. Testing fixed parts and keepouts...")
+    changed = set(annealer.changed().tolist())
+    assert changed and not changed & fixed
+    assert after["keepout_mm2"] < 0.5 and after["outside_mm2"] < 0.5
+    assert np.all(annealer.rotation % 90 == 0)
+    print(f"✓ {len(changed)} parts moved, fixed parts untouched, keepout and outline respected")
+    print()
+
+
+async def test_server_auto_place():
+    """Test auto_place on the file backend"""
+    print("=" * 70)
+    print("Testing auto_place headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_place_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+        print("\n1. Testing the fixture board...")
+        result = await server._auto_place(["R1", "D1", "C1"], moves=2000, seed=1)
+        assert result["status"] == "success" and result["skipped_locked"] == ["C1"]
+        assert {p["reference"] for p in result["placements"]} <= {"R1", "D1"}
+        assert result["hpwl_after_mm"] < result["hpwl_before_mm"] and result["overlap_after_mm2"] < 0.05
+        footprints = {fp.reference: fp for fp in server._get_model().footprints}
+        assert (footprints["C1"].x_mm, footprints["C1"].y_mm) == (20.0, 26.0)
+        assert (footprints["J1"].x_mm, footprints["J1"].y_mm) == (10.0, 20.0)
+        print(f"✓ HPWL {result['hpwl_before_mm']} → {result['hpwl_after_mm']} mm; locked C1 and unselected J1 stay put")
+
+        print("\n2. Testing that the caches followed...")
+        score = await server._score_placement()
+        assert abs(score["current_hpwl_mm"] - result["hpwl_after_mm"]) < 1e-3
+        ratsnest = await server._get_ratsnest()
+        assert abs(ratsnest["total_length_mm"] - result["ratsnest_length_mm"]) < 1e-3
+        assert (await server._check_overlaps())["count"] == 0
+        print("✓ Scores, ratsnest and overlaps reflect the new positions")
+
+        print("\n3. Testing errors...")
+        unknown = await server._auto_place(["R9"])
+        assert unknown["error"] == "Component 'R9' not found" and "R1" in unknown["suggestions"]
+        assert "error" in await server._auto_place(["C1"])
+        print("✓ Unknown and only-locked selections rejected")
+
+        print("\n4. Testing duplicate references...")
+        text = Path(BOARD_PATH).read_text()
+        for reference in ("R1", "D1"):
+            text = text.replace(f'(property "Reference" "{reference}"', '(property "Reference" "X"')
+        duplicated = Path(temp_dir) / "duplicated.kicad_pcb"
+        duplicated.write_text(text)
+        server = KiCadMCPServerExtended(backend="file", board_path=str(duplicated))
+        before = [(fp.x_mm, fp.y_mm) for fp in server._get_model().footprints if fp.reference == "X"]
+        result = await server._auto_place(moves=2000, seed=1)
+        assert result["status"] == "success" and result["skipped_duplicate"] == ["X"]
+        assert "X" not in {p["reference"] for p in result["placements"]}
+        assert [(fp.x_mm, fp.y_mm) for fp in server._get_model().footprints if fp.reference == "X"] == before
+        rejected = await server._auto_place(["X"])
+        assert "error" in rejected and rejected["skipped_duplicate"] == ["X"]
+        scored = await server._score_placement([{"reference": "X", "x_mm": 0, "y_mm": 0}])
+        assert "shared by several footprints" in scored["error"]
+        print("✓ Both footprints named X left in place and listed in skipped_duplicate")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_batched_scoring()
+    test_annealing()
+    asyncio.run(test_server_auto_place())
+    print("✅ Auto-placement tested and working!\n")
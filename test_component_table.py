@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar component table
+Backs list_components, get_board_info, BOM and position export, also on a live board edited in place
+(the pcbnew stand-in in test_data/pcbnew_stub)
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+TEST_DATA = Path(__file__).parent / "test_data"
+sys.path.insert(0, str(TEST_DATA / "pcbnew_stub"))
+
+import pcbnew  # noqa: E402  (the stand-in)
+from mcp.types import CallToolRequest, CallToolRequestParams  # noqa: E402
+
+from kicad_component_table import ComponentTable  # noqa: E402
+from kicad_mcp_server_extended import KiCadMCPServerExtended  # noqa: E402
+from kicad_pcb_parser import load_kicad_pcb  # noqa: E402
+
+BOARD_PATH = str(TEST_DATA / "led_blinker.kicad_pcb")
+
+
+def make_table() -> ComponentTable:
+    refs = ["R2", "C1", "R1", "U1", "R3"]
+    return ComponentTable(
+        refs,
+        ["10k", "100nF", "10k", "LM358", "10k"],
+        ["R_0603", "C_0603", "R_0603", "SOIC-8", "R_0805"],
+        [1.0, 2.0, 3.0, 4.0, 5.0],
+        [10.0, 20.0, 30.0, 40.0, 50.0],
+        [0, 90, 180, 270, 0],
+        ["F.Cu", "F.Cu", "B.Cu", "F.Cu", "F.Cu"],
+    )
+
+
+def test_component_table():
+    """Test columnar records, BOM grouping and position rows"""
+    print("=" * 70)
+    print("Testing columnar component table")
+    print("=" * 70)
+
+    table = make_table()
+
+    print("\n1. Testing records...")
+    records = table.records(("reference", "x_mm", "layer"))
+    assert records[0] == {"reference": "R2", "x_mm": 1.0, "layer": "F.Cu"}
+    assert type(records[0]["x_mm"]) is float
+    print("✓ Records are plain Python values")
+
+    print("\n2. Testing BOM grouping...")
+    groups = table.bom_groups()
+    assert [(g["value"], g["footprint"], g["quantity"]) for g in groups] == [
+        ("100nF", "C_0603", 1), ("10k", "R_0603", 2), ("10k", "R_0805", 1), ("LM358", "SOIC-8", 1)
+    ]
+    assert groups[1]["references"] == ["R1", "R2"]
+    unassigned = ComponentTable(["R1", "R2", "R3"], ["10k", "10kR_0603", "10k"], ["R_0603", "", ""],
+                                [0.0] * 3, [0.0] * 3, [0.0] * 3, ["F.Cu"] * 3)
+    assert [(g["value"], g["footprint"], g["references"]) for g in unassigned.bom_groups()] == [
+        ("10k", "R_0603", ["R1"]), ("10k", "", ["R3"]), ("10kR_0603", "", ["R2"])
+    ]
+    print("✓ Parts grouped by value and footprint, empty footprints included")
+
+    print("\n3. Testing vectorized filters...")
+    assert table.filter_rows(layer="F.Cu").tolist() == [0, 1, 3, 4]
+    assert table.filter_rows(reference_glob="R*", value="10k", layer="F.Cu").tolist() == [0, 4]
+    assert table.filter_rows(reference_glob="r*").tolist() == []
+    print("✓ Layer, value and reference glob filters combine")
+
+    print("\n4. Testing updates and position rows...")
+    table.update("R1", 7.5, 8.5, 45)
+    rows = table.position_rows()
+    assert rows[2] == ("R1", "10k", "R_0603", 7.5, 8.5, 45.0, "Bottom")
+    print("✓ Moved rows are reflected in position data")
+
+    print("\n5. Testing board model source...")
+    table = ComponentTable.from_model(load_kicad_pcb(BOARD_PATH))
+    assert len(table) == 4
+    assert table.footprint[table.row("R1")] == "R_0603_1608Metric"
+    assert table.side().tolist() == ["Top", "Top", "Bottom", "Top"]
+    assert ComponentTable([], [], [], [], [], [], []).bom_groups() == []
+    print("✓ Table built from a parsed board")
+    print()
+
+
+async def test_live_board():
+    """Edits made in the KiCad GUI show up in the next call, on the same board object"""
+    print("=" * 70)
+    print("Testing the component table on a live board")
+    print("=" * 70)
+
+    server = KiCadMCPServerExtended()
+    server.board = board = pcbnew.LoadBoard(BOARD_PATH)
+    handler = server.server.request_handlers[CallToolRequest]
+
+    async def call(name, arguments):
+        request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments))
+        return json.loads((await handler(request)).root.content[0].text)
+
+    def r1(listed):
+        return next(c for c in listed["components"] if c["reference"] == "R1")
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="kicad_mcp_table_") as temp_dir:
+            print("\n1. Testing a move made in the GUI...")
+            assert r1(await call("list_components", {}))["x_mm"] == 20.0
+            board.text = board.text.replace('(at 20 20)\n\t\t(property "Reference" "R1"',
+                                            '(at 30 20)\n\t\t(property "Reference" "R1"')
+            assert r1(await call("list_components", {}))["x_mm"] == 30.0
+            position_file = str(Path(temp_dir) / "position.csv")
+            assert (await call("export_position_file", {"output_file": position_file}))["status"] == "success"
+            row = next(line for line in Path(position_file).read_text().splitlines() if line.startswith('"R1"'))
+            assert ",30.0000,20.0000," in row
+            print("✓ list_components and the position file follow R1 to x=30")
+
+            print("\n2. Testing a value change made in the GUI...")
+            board.text = board.text.replace('"Value" "330"', '"Value" "470"')
+            bom_file = str(Path(temp_dir) / "bom.csv")
+            assert (await call("export_bom", {"output_file": bom_file}))["status"] == "success"
+            assert '"470"' in Path(bom_file).read_text() and '"330"' not in Path(bom_file).read_text()
+            print("✓ The BOM lists the new value")
+            print()
+    finally:
+        server.pcbnew_executor.shutdown()
+
+
+if __name__ == "__main__":
+    test_component_table()
+    asyncio.run(test_live_board())
+    print("✅ Component table tests passed!\n")
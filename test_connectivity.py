@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for the connectivity engine
+Islands, unconnected pads and per-net rebuilds after moves
+"""
+
+import asyncio
+import copy
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+from kicad_board_model import BoardModel, Footprint, Net, Pad, Track, Via, Zone
+from kicad_connectivity import ConnectivityEngine
+from kicad_geometry import rectangle
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_synthetic_board import synthetic_board
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def make_pad(number: str, x: float, y: float, layers=("F.Cu",), net_code: int = 1) -> Pad:
+    return Pad(number, x, y, 1.0, 1.0, "rect", "smd", list(layers), net_code=net_code, net_name="GND")
+
+
+def test_islands():
+    """Test joins by shared endpoints, touching copper, vias and zone fills"""
+    print("=" * 70)
+    print("Testing connectivity islands")
+    print("=" * 70)
+
+    board = BoardModel(file_name="conn.kicad_pcb", nets={0: Net(0, ""), 1: Net(1, "GND")})
+    board.footprints = [
+        Footprint("U1", "", "", 0, 0, pads=[make_pad("1", 0, 0)]),
+        Footprint("U2", "", "", 5, 5, pads=[make_pad("1", 5, 5.3)]),     # Track ends off the pad centre
+        Footprint("U3", "", "", 30, 0, pads=[make_pad("1", 30, 0, ("*.Cu",))]),
+        Footprint("U4", "", "", 0, 20, pads=[make_pad("1", 0, 20)]),     # Nothing reaches it
+    ]
+    board.tracks = [
+        Track((0, 0), (10, 0), 0.25, "F.Cu", 1, "GND"),
+        Track((5, 0), (5, 5), 0.25, "F.Cu", 1, "GND"),                  # T-junction mid-track
+        Track((40, 40), (45, 40), 0.25, "F.Cu", 1, "GND"),              # Floating copper
+    ]
+    board.vias = [Via(10, 0, 0.6, 0.3, net_code=1, net_name="GND")]
+    board.zones = [Zone(1, "GND", ["B.Cu"], filled={"B.Cu": [rectangle((8, -5, 35, 5))]})]
+
+    print("\n1. Testing a partly routed net...")
+    net = ConnectivityEngine(board).nets()[1]
+    assert net["islands"] == [["U1-1", "U2-1", "U3-1"], ["U4-1"]], net["islands"]
+    assert net["unconnected_pads"] == ["U4-1"] and not net["routed"] and net["dangling_islands"] == 1
+    print("✓ Track T-junction, off-centre pad entry, via and B.Cu fill all join; U4 and floating track reported")
+
+    print("\n2. Testing an empty fill...")
+    board.zones[0].filled = {}
+    net = ConnectivityEngine(board).nets()[1]
+    assert net["islands"] == [["U1-1", "U2-1"], ["U3-1"], ["U4-1"]]
+    print("✓ Unfilled zones connect nothing")
+
+    print("\n3. Testing a thermal relief...")
+    # Fill with a cut-out around U1's pad, entered by a slit from the left; one spoke reaches into the pad
+    spoke = [(1, 0.2), (0.3, 0.2), (0.3, -0.2), (1, -0.2)]
+    relief = [(-5, -5), (5, -5), (5, 5), (-5, 5), (-5, 0), (-1, 0), (-1, 1), (1, 1), *spoke,
+              (1, -1), (-1, -1), (-1, 0), (-5, 0)]
+    board = BoardModel(file_name="thermal.kicad_pcb", nets={0: Net(0, ""), 1: Net(1, "GND")})
+    board.footprints = [
+        Footprint("U1", "", "", 0, 0, pads=[make_pad("1", 0, 0)]),       # Centre in the cut-out
+        Footprint("U2", "", "", 3, 3, pads=[make_pad("1", 3, 3)]),       # Solidly connected
+    ]
+    board.zones = [Zone(1, "GND", ["F.Cu"], filled={"F.Cu": [relief]})]
+    assert ConnectivityEngine(board).nets()[1]["islands"] == [["U1-1", "U2-1"]]
+    board.zones[0].filled = {"F.Cu": [[p for p in relief if p not in spoke]]}
+    assert ConnectivityEngine(board).nets()[1]["islands"] == [["U1-1"], ["U2-1"]]
+    print("✓ A spoke reaching the pad joins it to the fill; a cut-out without spokes leaves it apart")
+
+    print("\n4. Testing parts sharing a reference...")
+    board = BoardModel(file_name="shared.kicad_pcb", nets={0: Net(0, ""), 1: Net(1, "GND")})
+    board.footprints = [
+        Footprint("U1", "", "", 0, 0, pads=[make_pad("1", 0, 0)]),
+        Footprint("U2", "", "", 5, 0, pads=[make_pad("1", 5, 0)]),
+        Footprint("U1", "", "", 40, 40, pads=[make_pad("1", 40, 40)]),   # Same reference, far away
+    ]
+    board.tracks = [Track((0, 0), (5, 0), 0.25, "F.Cu", 1, "GND")]
+    net = ConnectivityEngine(board).nets()[1]
+    assert net["islands"] == [["U1-1", "U2-1"], ["U1-1"]] and net["pad_count"] == 3
+    print("✓ Each U1 keeps its own pad: the routed one joins U2, the far one stays apart")
+    print()
+
+
+def test_incremental():
+    """Rebuilding the nets of moved parts must match a fresh engine"""
+    print("=" * 70)
+    print("Testing incremental connectivity")
+    print("=" * 70)
+
+    rng = random.Random(13)
+    board = synthetic_board(900, seed=13)
+    engine = ConnectivityEngine(board)
+    engine.nets()
+
+    print("\n1. Testing random moves...")
+    for _ in range(5):
+        moved = rng.sample(board.footprints, 5)
+        for fp in moved:
+            fp.move_to(fp.x_mm + rng.choice([0, 0.5, 4]), fp.y_mm, fp.rotation_deg)
+        touched = engine.update_footprints(moved)
+        assert engine.nets() == ConnectivityEngine(board).nets()
+        assert engine.rebuilt == len(touched) <= 10
+    print("✓ Only the moved parts' nets rebuilt, same islands as a full build")
+
+    print("\n2. Testing copies of parts sharing a reference...")
+    first, second = board.footprints[0], board.footprints[1]
+    second.reference = first.reference
+    engine = ConnectivityEngine(board)
+    engine.nets()
+    for _ in range(5):
+        copies = [copy.deepcopy(first), copy.deepcopy(second)]
+        copies[1].move_to(second.x_mm + rng.choice([0.5, 4]), second.y_mm, second.rotation_deg)
+        board.footprints[:2] = first, second = copies
+        engine.update_footprints(copies)
+        assert engine.nets() == ConnectivityEngine(board).nets()
+    print(f"✓ Fresh copies of both {first.reference} parts land on their own slots, same islands as a full build")
+    print()
+
+
+async def test_server_connectivity():
+    """Test get_connectivity on the file backend"""
+    print("=" * 70)
+    print("Testing get_connectivity headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_conn_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+        print("\n1. Testing the fixture board...")
+        result = await server._get_connectivity()
+        assert result["status"] == "success" and not result["fully_routed"]
+        assert [n["net_name"] for n in result["nets"]] == ["+5V"]
+        assert result["nets"][0]["unconnected_pads"] == ["C1-1"]
+        result = await server._get_connectivity("GND")
+        assert result["nets"][0]["islands"] == [["C1-2", "D1-1", "J1-2"]]
+        print("✓ +5V misses C1-1; GND joined through the via and B.Cu fill")
+
+        print("\n2. Testing a move...")
+        await server._place_component("R1", 40.0, 40.0)
+        result = await server._get_connectivity()
+        assert result["rebuilt_nets"] == 2 and result["unrouted_net_count"] == 2
+        assert sorted(result["nets"][1]["unconnected_pads"]) == ["R1-2"]
+        await server._place_component("R1", 20.0, 20.0)
+        result = await server._get_connectivity(include_routed=True)
+        assert result["unrouted_net_count"] == 1 and len(result["nets"]) == 3
+        print("✓ Only the moved part's nets rebuilt")
+
+        print("\n3. Testing an unknown net...")
+        assert "error" in await server._get_connectivity("NOPE")
+        print("✓ Unknown net reported")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_islands()
+    test_incremental()
+    asyncio.run(test_server_connectivity())
+    print("✅ Connectivity engine tested and working!\n")
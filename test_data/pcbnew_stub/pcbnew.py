@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+pcbnew stand-in for plotting tests - just enough of the KiCad API to plot a .kicad_pcb without KiCad
+Put this folder first on sys.path; worker processes inherit it. Each plotted file is a tiny Gerber whose body
+depends only on the board text and the layer, with a comment naming the process and board load that made it.
+Gerbers and job files carry a creation date, as KiCad's do.
+PCBNEW_STUB_PLOT_DELAY (seconds per layer) stands in for the time KiCad takes to plot. Footprints come from
+the headless parser, so the repository root must be importable too.
+"""
+
+import io
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from kicad_pcb_parser import parse_kicad_pcb
+
+PLOT_FORMAT_GERBER = 1
+
+# KiCad 8 layer ids
+LAYER_IDS = {
+    "F.Cu": 0, "B.Cu": 31, "B.Adhes": 32, "F.Adhes": 33, "B.Paste": 34, "F.Paste": 35, "B.SilkS": 36,
+    "F.SilkS": 37, "B.Mask": 38, "F.Mask": 39, "Dwgs.User": 40, "Cmts.User": 41, "Edge.Cuts": 44,
+}
+LAYER_NAMES = {layer_id: name for name, layer_id in LAYER_IDS.items()}
+
+loads = 0  # Boards loaded by this process
+
+
+class VECTOR2I:
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+
+class LIB_ID:
+    def __init__(self, lib_id: str):
+        self.lib_id = lib_id
+
+    def GetLibItemName(self) -> str:
+        return self.lib_id.split(":", 1)[-1]
+
+
+class FOOTPRINT:
+    """Read-only view of a parsed footprint"""
+
+    def __init__(self, footprint):
+        self.footprint = footprint
+
+    def GetReference(self) -> str:
+        return self.footprint.reference
+
+    def GetValue(self) -> str:
+        return self.footprint.value
+
+    def GetFPID(self) -> LIB_ID:
+        return LIB_ID(self.footprint.lib_id)
+
+    def GetPosition(self) -> VECTOR2I:
+        return VECTOR2I(round(self.footprint.x_mm * 1e6), round(self.footprint.y_mm * 1e6))
+
+    def GetOrientationDegrees(self) -> float:
+        return self.footprint.rotation_deg
+
+    def GetLayerName(self) -> str:
+        return self.footprint.layer
+
+
+class BOARD:
+    def __init__(self, file_name: str, text: str):
+        self._file_name = file_name
+        self.text = text
+        self.load = loads
+
+    def GetFileName(self) -> str:
+        return self._file_name
+
+    def GetLayerID(self, name: str) -> int:
+        return LAYER_IDS.get(name, -1)
+
+    def GetFootprints(self):
+        return [FOOTPRINT(fp) for fp in parse_kicad_pcb(io.StringIO(self.text), self._file_name).footprints]
+
+    def FindFootprintByReference(self, reference: str):
+        return next((fp for fp in self.GetFootprints() if fp.GetReference() == reference), None)
+
+
+def LoadBoard(path: str) -> BOARD:
+    global loads
+    loads += 1
+    return BOARD(os.path.abspath(path), Path(path).read_text())
+
+
+def SaveBoard(path: str, board: BOARD, skip_settings: bool = False) -> bool:
+    Path(path).write_text(board.text)
+    return True
+
+
+def GetBoard():
+    return None
+
+
+class PCB_PLOT_PARAMS:
+    """Records every Set* call"""
+
+    def __init__(self):
+        self.values = {}
+
+    def __getattr__(self, name):
+        if not name.startswith("Set"):
+            raise AttributeError(name)
+        return lambda value: self.values.__setitem__(name[3:], value)
+
+
+class PLOT_CONTROLLER:
+    def __init__(self, board: BOARD):
+        self.board = board
+        self.options = PCB_PLOT_PARAMS()
+        self.layer = -1
+        self.file_name = ""
+
+    def GetPlotOptions(self) -> PCB_PLOT_PARAMS:
+        return self.options
+
+    def SetLayer(self, layer_id: int) -> None:
+        self.layer = layer_id
+
+    def OpenPlotfile(self, suffix: str, plot_format: int, sheet_desc: str) -> bool:
+        stem = Path(self.board.GetFileName()).stem
+        name = f"{stem}-{suffix.replace('.', '_')}.gbr"
+        self.file_name = os.path.join(self.options.values["OutputDirectory"], name)
+        return True
+
+    def PlotLayer(self) -> bool:
+        time.sleep(float(os.environ.get("PCBNEW_STUB_PLOT_DELAY", 0)))
+        name = LAYER_NAMES[self.layer]
+        count = self.board.text.count(f'"{name}"')
+        with open(self.file_name, "w") as f:
+            f.write(f"G04 plotted by pid {os.getpid()}, load {self.board.load}*\n")
+            f.write(f"%TF.CreationDate,{datetime.now().astimezone().isoformat()}*%\n")
+            f.write(f"%TF.FileFunction,{name}*%\n")
+            f.write(f"G04 {count} items*\n")
+            f.write(f"G04 board {len(self.board.text)} bytes*\n")
+            f.write("M02*\n")
+        return True
+
+    def ClosePlot(self) -> None:
+        pass
+
+    def GetPlotFileName(self) -> str:
+        return self.file_name
+
+
+class GERBER_JOBFILE_WRITER:
+    def __init__(self, board: BOARD):
+        self.board = board
+        self.files = []
+
+    def AddGbrFile(self, layer_id: int, name: str) -> None:
+        self.files.append({"Path": name, "FileFunction": LAYER_NAMES[layer_id]})
+
+    def CreateJobFile(self, path: str) -> bool:
+        header = {"GenerationSoftware": {"Application": "pcbnew stand-in"},
+                  "CreationDate": datetime.now().astimezone().isoformat()}
+        Path(path).write_text(json.dumps({"Header": header, "FilesAttributes": self.files}, indent=2))
+        return True
+
+
+class EXCELLON_WRITER:
+    """Writes <board>-PTH.drl and <board>-NPTH.drl listing the plated and unplated holes"""
+
+    def __init__(self, board: BOARD):
+        self.board = board
+
+    def SetOptions(self, mirror: bool, minimal_header: bool, offset: VECTOR2I, merge_pth_npth: bool) -> None:
+        self.merge = merge_pth_npth
+
+    def SetFormat(self, metric: bool) -> None:
+        pass
+
+    def CreateDrillandMapFilesSet(self, directory: str, gen_drill: bool, gen_map: bool) -> None:
+        model = parse_kicad_pcb(io.StringIO(self.board.text), self.board.GetFileName())
+        plated = [(via.x_mm, via.y_mm, via.drill_mm) for via in model.vias]
+        unplated = []
+        for fp in model.footprints:
+            for pad in fp.pads:
+                if pad.drill_mm:
+                    (unplated if pad.pad_type == "np_thru_hole" else plated).append((pad.x_mm, pad.y_mm, pad.drill_mm))
+        stem = Path(self.board.GetFileName()).stem
+        files = {"": plated + unplated} if self.merge else {"-PTH": plated, "-NPTH": unplated}
+        for suffix, holes in files.items():
+            with open(os.path.join(directory, f"{stem}{suffix}.drl"), "w") as f:
+                f.write(f"; plotted by pid {os.getpid()}\n")
+                f.writelines(f"X{x:.3f}Y{y:.3f} T{drill:.2f}\n" for x, y, drill in sorted(holes))
+                f.write("M30\n")
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Test script for the Python DRC engine
+Clearance, track width, drill and annular ring checks on small hand-built boards
+"""
+
+import asyncio
+import copy
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+from kicad_board_model import BoardModel, Footprint, Net, Pad, Track, Via
+from kicad_drc import DesignRules, DrcEngine, filter_by_severity, pad_core
+from kicad_drc_parallel import run_parallel
+from kicad_geometry import shape_distance
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_synthetic_board import synthetic_board
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def make_board() -> BoardModel:
+    nets = {0: Net(0, ""), 1: Net(1, "GND"), 2: Net(2, "VCC")}
+    return BoardModel(file_name="drc.kicad_pcb", nets=nets)
+
+
+def test_rules():
+    """Test each rule on a minimal board"""
+    print("=" * 70)
+    print("Testing DRC rules")
+    print("=" * 70)
+
+    print("\n1. Testing track-to-track clearance...")
+    board = make_board()
+    board.tracks = [
+        Track((0, 0), (10, 0), 0.25, "F.Cu", 1, "GND"),
+        Track((0, 0.35), (10, 0.35), 0.25, "F.Cu", 2, "VCC"),   # 0.1 mm gap
+        Track((0, 0.35), (10, 0.35), 0.25, "B.Cu", 2, "VCC"),   # Other layer
+        Track((0, 0.7), (10, 0.7), 0.25, "F.Cu", 2, "VCC"),     # Same net as its neighbour
+    ]
+    violations = DrcEngine(board).run()
+    assert [v["type"] for v in violations] == ["clearance"]
+    assert violations[0]["kind"] == "track-track" and violations[0]["actual_mm"] == 0.1
+    assert violations[0]["layer"] == "F.Cu"
+    print("✓ Gap measured between track edges, other layers and same-net items ignored")
+
+    print("\n2. Testing pads...")
+    board = make_board()
+    board.footprints = [
+        Footprint("R1", "10k", "R:R_0603", 5, 5, pads=[
+            Pad("1", 4.2, 5, 0.8, 0.95, "roundrect", layers=["F.Cu"], net_code=1, net_name="GND",
+                roundrect_rratio=0.25),
+            Pad("2", 5.8, 5, 0.8, 0.95, "roundrect", layers=["F.Cu"], net_code=2, net_name="VCC",
+                roundrect_rratio=0.25),
+        ]),
+        Footprint("J1", "CONN", "J:J_1x01", 5.8, 6.5, pads=[
+            Pad("1", 5.8, 6.5, 1.7, 1.7, "circle", "thru_hole", ["*.Cu"], drill_mm=1.0, net_code=1, net_name="GND"),
+        ]),
+    ]
+    board.tracks = [Track((3, 7.55), (7, 7.55), 0.2, "F.Cu", 2, "VCC")]
+    violations = DrcEngine(board).run()
+    kinds = sorted(v["kind"] for v in violations)
+    assert kinds == ["pad-pad", "pad-track"], kinds
+    pad_track = next(v for v in violations if v["kind"] == "pad-track")
+    assert "pad J1-1 [GND]" in pad_track["items"] and pad_track["actual_mm"] == 0.1
+    pad_pad = next(v for v in violations if v["kind"] == "pad-pad")
+    assert pad_pad["items"] == ["pad J1-1 [GND]", "pad R1-2 [VCC]"] and pad_pad["actual_mm"] == 0.175
+    print("✓ Track-to-pad and pad-to-pad clearance found; same-net pad and track pass")
+    pads_board = board
+
+    print("\n3. Testing track width, drill and annular ring...")
+    board = make_board()
+    board.tracks = [Track((0, 0), (5, 0), 0.1, "F.Cu", 1, "GND")]
+    board.vias = [Via(10, 10, 0.45, 0.25, net_code=1, net_name="GND")]
+    rules = DesignRules(min_track_width_mm=0.15, min_drill_mm=0.3, min_annular_ring_mm=0.13)
+    violations = DrcEngine(board, rules).run()
+    assert {v["type"] for v in violations} == {"track_width", "drill_size", "annular_ring"}
+    assert [v["type"] for v in filter_by_severity(violations, "error")] == ["drill_size", "track_width"]
+    assert len(filter_by_severity(violations, "all")) == 3
+    print("✓ Single-item rules report and severity filtering drops warnings")
+
+    print("\n4. Testing pad shapes...")
+    core, radius = pad_core(Pad("1", 0, 0, 2.0, 1.0, "oval", rotation_deg=90))
+    assert radius == 0.5 and all(abs(x) < 1e-12 for x, _ in core)
+    core, radius = pad_core(Pad("1", 0, 0, 1.0, 1.0, "roundrect", roundrect_rratio=0.25))
+    assert radius == 0.25 and max(abs(x) for x, _ in core) == 0.25
+    print("✓ Rotated ovals become segments and rounded rectangles shrink by their radius")
+
+    print("\n5. Testing parts sharing a reference...")
+    far = copy.deepcopy(pads_board.footprints[0])
+    far.move_to(50, 50, 0)
+    pads_board.footprints.append(far)
+    violations = DrcEngine(pads_board).run()
+    assert sorted(v["kind"] for v in violations) == ["pad-pad", "pad-track"]
+    print("✓ A second R1 far away leaves the first one's violations in place")
+    print()
+
+
+def test_against_brute_force():
+    """The spatial hash must find exactly the pairs an all-pairs scan finds"""
+    print("=" * 70)
+    print("Testing DRC broad phase against all pairs")
+    print("=" * 70)
+
+    rng = random.Random(11)
+    board = make_board()
+    for _ in range(300):
+        x, y = rng.uniform(0, 40), rng.uniform(0, 40)
+        net = rng.choice([0, 1, 2])
+        board.tracks.append(Track((x, y), (x + rng.uniform(-3, 3), y + rng.uniform(-3, 3)), 0.2, "F.Cu",
+                                  net, board.net_name(net)))
+    rules = DesignRules(clearance_mm=0.3)
+    engine = DrcEngine(board, rules)
+    found = engine.run()
+
+    expected = 0
+    items = list(engine.items.values())
+    for i, a in enumerate(items):
+        for b in items[i + 1:]:
+            if a.net_code and a.net_code == b.net_code:
+                continue
+            if shape_distance(a.core, b.core)[0] - a.radius - b.radius < rules.clearance_mm - 1e-9:
+                expected += 1
+    print(f"\n1. {expected} violating pairs expected...")
+    assert len(found) == expected
+    print("✓ Spatial hash misses no pairs")
+    print()
+
+
+def test_incremental():
+    """Re-checking moved footprints must give the same violations as a full run"""
+    print("=" * 70)
+    print("Testing incremental DRC")
+    print("=" * 70)
+
+    rng = random.Random(5)
+    board = synthetic_board(components=400, seed=5)
+    engine = DrcEngine(board)
+    baseline = engine.run()
+
+    print("\n1. Testing random moves...")
+    for _ in range(5):
+        moved = rng.sample(board.footprints, 6)
+        for fp in moved:
+            fp.move_to(rng.uniform(0, 80), rng.uniform(0, 80), rng.choice([0, 90]))
+        before = {(v["type"], *v["items"]) for v in engine.violations()}
+        added, cleared = engine.update_footprints(moved)
+        after = {(v["type"], *v["items"]) for v in engine.violations()}
+        assert after == {(v["type"], *v["items"]) for v in DrcEngine(board).run()}
+        assert {(v["type"], *v["items"]) for v in added} == after - before
+        assert {(v["type"], *v["items"]) for v in cleared} == before - after
+    print(f"✓ {len(baseline)} -> {len(engine.violations())} violations, identical to a full run")
+
+    print("\n2. Testing copies of parts sharing a reference...")
+    first, second = board.footprints[0], board.footprints[1]
+    second.reference = first.reference
+    engine = DrcEngine(board)
+    engine.run()
+    for _ in range(5):
+        copies = [copy.deepcopy(first), copy.deepcopy(second)]
+        copies[1].move_to(rng.uniform(0, 80), rng.uniform(0, 80), 0)
+        board.footprints[:2] = first, second = copies
+        engine.update_footprints(copies)
+        assert engine.violations() == DrcEngine(board).run()
+    assert engine.footprints.shared() == {first.reference} and len(engine.footprints) == len(board.footprints)
+    print(f"✓ Fresh copies of both {first.reference} parts land on their own slots, identical to a full run")
+    print()
+
+
+def test_parallel():
+    """Tile-parallel clearance must match the serial engine, with no duplicates at seams"""
+    print("=" * 70)
+    print("Testing parallel DRC")
+    print("=" * 70)
+
+    rng = random.Random(7)
+    board = synthetic_board(400, seed=7, layers=6)
+    for fp in rng.sample(board.footprints, 60):
+        fp.move_to(fp.x_mm + rng.uniform(-3, 3), fp.y_mm + rng.uniform(-3, 3), rng.choice([0, 90]))
+    for _ in range(200):
+        x, y = rng.uniform(0, 80), rng.uniform(0, 80)
+        net = rng.randrange(len(board.nets))
+        board.tracks.append(Track((x, y), (x + rng.uniform(-8, 8), y + rng.uniform(-8, 8)), 0.2,
+                                  rng.choice(board.copper_layers), net, board.net_name(net)))
+    expected = DrcEngine(board).run()
+
+    print("\n1. Testing tilings...")
+    for workers, tiles in ((1, 1), (2, 3), (3, 7)):
+        found = run_parallel(DrcEngine(board), workers, tiles)
+        assert found == expected, (workers, tiles)
+    print(f"✓ {len(expected)} violations from 1, 9 and 49 tiles per layer match the serial run")
+    print()
+
+
+async def test_server_drc():
+    """Test run_drc on the file backend"""
+    print("=" * 70)
+    print("Testing run_drc headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_drc_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+        print("\n1. Testing a clean board...")
+        result = await server._run_drc()
+        assert result["status"] == "success" and result["violations"] == []
+        print("✓ Fixture board passes the default rules")
+
+        print("\n2. Testing rule overrides and severity filter...")
+        result = await server._run_drc(min_annular_ring_mm=0.2)
+        assert [v["type"] for v in result["violations"]] == ["annular_ring"] and result["warning_count"] == 1
+        result = await server._run_drc("error", min_annular_ring_mm=0.2)
+        assert result["violations"] == [] and result["rules"]["min_annular_ring_mm"] == 0.2
+        print("✓ Via annular ring reported as a warning and filtered at error level")
+
+        print("\n3. Testing a move that breaks clearance...")
+        await server._place_component("R1", 25.0, 21.2)
+        result = await server._run_drc()
+        assert result["error_count"] > 0
+        assert all(v["type"] == "clearance" for v in result["violations"])
+        print("✓ Violations follow the in-memory board")
+
+        print("\n4. Testing incremental runs...")
+        await server._place_component("R1", 20.0, 20.0)
+        result = await server._run_drc(incremental=True)
+        assert result["incremental"] is True and result["rechecked_components"] == 1
+        assert result["new_violations"] == [] and result["cleared_violations"] and result["error_count"] == 0
+        await server._place_component("R1", 25.0, 21.2)
+        result = await server._run_drc(incremental=True)
+        assert result["new_violations"] and result["error_count"] == len(result["new_violations"])
+        await server._place_component("R1", 20.0, 20.0)
+        moved_back = await server._run_drc(incremental=True)
+        assert moved_back["new_violations"] == [] and moved_back["error_count"] == 0
+        assert len(moved_back["cleared_violations"]) == len(result["new_violations"])
+        result = await server._run_drc(incremental=True, clearance_mm=0.25)
+        assert result["incremental"] is False and result["rechecked_components"] == 4
+        print("✓ Only moved components re-checked; changed rules force a full run")
+
+        print("\n5. Testing worker processes...")
+        await server._place_component("R1", 25.0, 21.2)
+        serial = await server._run_drc()
+        parallel = await server._run_drc(workers=2)
+        assert parallel["violations"] == serial["violations"] and parallel["error_count"] > 0
+        print("✓ Process pool gives the serial result")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_rules()
+    test_against_brute_force()
+    test_incremental()
+    test_parallel()
+    asyncio.run(test_server_drc())
+    print("✅ DRC engine tested and working!\n")
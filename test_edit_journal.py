@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for edit sessions and the undo/redo journal
+Journal bookkeeping, begin/commit/rollback_edit, undo_edit/redo_edit and deferred index updates
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from kicad_edit_journal import EditJournal
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def test_journal():
+    """Test diff coalescing, sealing and the undo/redo stacks"""
+    print("=" * 70)
+    print("Testing the edit journal")
+    print("=" * 70)
+
+    journal = EditJournal(max_steps=3)
+    a, b, c = (0, 0, 0, "F.Cu"), (1, 0, 0, "F.Cu"), (2, 0, 90, "B.Cu")
+
+    print("\n1. Testing coalescing...")
+    journal.record("R1", a, b)
+    journal.record("R1", b, c)
+    journal.record("R2", a, b)
+    journal.record("R2", b, a)
+    assert journal.pending() == [("R1", a, c)]
+    step = journal.seal("move")
+    assert step.changes == [("R1", a, c)] and journal.seal("nothing") is None
+    print("✓ One diff per footprint; moves that end where they started are dropped")
+
+    print("\n2. Testing undo and redo...")
+    assert journal.undo().label == "move" and journal.undo() is None
+    assert journal.redo().label == "move" and journal.redo() is None
+    journal.undo()
+    journal.record("R3", a, b)
+    journal.seal("other")
+    assert not journal.redo_steps and [s.label for s in journal.undo_steps] == ["other"]
+    for i in range(5):
+        journal.record("R4", (i, 0, 0, "F.Cu"), (i + 1, 0, 0, "F.Cu"))
+        journal.seal(f"step{i}")
+    assert [s.label for s in journal.undo_steps] == ["step2", "step3", "step4"]
+    print("✓ A new step clears the redo stack; only the last 3 steps are kept")
+    print()
+
+
+def poses(server):
+    return {fp.reference: (fp.x_mm, fp.y_mm, fp.rotation_deg, fp.layer) for fp in server._get_model().footprints}
+
+
+async def test_server_sessions():
+    """Test edit sessions and undo/redo on the file backend"""
+    print("=" * 70)
+    print("Testing edit sessions headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_journal_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+        original = poses(server)
+        length = (await server._get_ratsnest())["total_length_mm"]
+        hpwl = (await server._score_placement())["current_hpwl_mm"]
+        overlap_count = (await server._check_overlaps())["count"]
+
+        print("\n1. Testing undo and redo of single calls...")
+        await server._place_component("R1", 30, 30, 90)
+        await server._place_components([{"reference": "D1", "x_mm": 12, "y_mm": 14}])
+        assert len(server._journal.undo_steps) == 2
+        result = await server._undo_edit(2)
+        assert result["undone"] == ["place_components", "place_component R1"] and result["redo_depth"] == 2
+        assert poses(server) == original
+        assert abs((await server._get_ratsnest())["total_length_mm"] - length) < 1e-3
+        result = await server._redo_edit()
+        assert result["redone"] == ["place_component R1"] and poses(server)["R1"][:3] == (30, 30, 90)
+        await server._undo_edit()
+        print("✓ Two calls undone newest first, ratsnest restored, one redone and undone again")
+
+        print("\n2. Testing a rolled-back session...")
+        await server._begin_edit("try")
+        result = await server._place_component("R1", 21, 22, 0)
+        assert result["edit_session"] == "try" and "R1" in server._deferred_index
+        await server._place_component("R1", 25, 22, 0)
+        await server._mirror_components(["D1"])
+        assert poses(server)["D1"][3] == "B.Cu"
+        overlaps = await server._check_overlaps()  # Queries catch the index up first
+        assert "status" in overlaps and not server._deferred_index
+        trial = (await server._score_placement())["current_hpwl_mm"]
+        result = await server._rollback_edit()
+        assert result["reverted"] == 2 and poses(server) == original and server._session is None
+        assert abs((await server._score_placement())["current_hpwl_mm"] - hpwl) < 1e-3
+        assert (await server._check_overlaps())["count"] == overlap_count
+        assert not server._journal.undo_steps and len(server._journal.redo_steps) == 2
+        print(f"✓ Trial HPWL {trial} mm measured, then two parts (one flipped) put back; HPWL {hpwl} mm again")
+
+        print("\n3. Testing a committed session...")
+        await server._begin_edit("row")
+        await server._arrange_components(["R1", "D1", "J1"], layout="row", pitch_x_mm=6, x_mm=10, y_mm=28)
+        await server._place_component("J1", 10, 30, 0)
+        result = await server._commit_edit()
+        assert result["changes"] == 3 and result["undo_depth"] == 1
+        assert not server._deferred_index and poses(server)["J1"][:2] == (10, 30)
+        index = server._spatial_index()
+        assert index.bbox("J1") == server._find_footprint("J1")[0].bbox()
+        await server._undo_edit()
+        assert poses(server) == original
+        print("✓ Arrange plus a move committed as one 3-part step, indexes caught up, undone in one go")
+
+        print("\n4. Testing errors...")
+        assert "error" in await server._commit_edit()
+        assert "error" in await server._rollback_edit()
+        await server._begin_edit()
+        assert "error" in await server._begin_edit()
+        assert "error" in await server._undo_edit()
+        await server._rollback_edit()
+        await server._reload_board()
+        assert "error" in await server._undo_edit() and "error" in await server._redo_edit()
+        print("✓ Unbalanced sessions, undo inside a session and undo after reload_board rejected")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_journal()
+    asyncio.run(test_server_sessions())
+    print("✅ Edit sessions and undo/redo tested and working!\n")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental fabrication export
+Per-output keys from board items, the content-addressed store, and export_fabrication_package reusing
+unchanged Gerber, drill, BOM and position files against the pcbnew stand-in in test_data/pcbnew_stub
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+TEST_DATA = Path(__file__).parent / "test_data"
+sys.path.insert(0, str(TEST_DATA / "pcbnew_stub"))
+
+import pcbnew  # noqa: E402  (the stand-in)
+
+from kicad_fab_artifacts import ArtifactStore, BoardItems  # noqa: E402
+from kicad_gerber_parallel import DEFAULT_LAYERS  # noqa: E402
+from kicad_mcp_server_extended import KiCadMCPServerExtended  # noqa: E402
+
+BOARD_PATH = TEST_DATA / "led_blinker.kicad_pcb"
+BOARD_TEXT = BOARD_PATH.read_text()
+
+MOVE_R1 = ("(at 20 20)\n\t\t(property \"Reference\" \"R1\"", "(at 21 20)\n\t\t(property \"Reference\" \"R1\"")
+MOVE_J1 = ("(at 10 20)\n\t\t(property \"Reference\" \"J1\"", "(at 11 20)\n\t\t(property \"Reference\" \"J1\"")
+VALUE_R1 = ('"Value" "330"', '"Value" "470"')
+MOVE_TRACK = ("(end 28 23) (width 0.25)", "(end 28 23.5) (width 0.25)")
+
+
+def write_board(directory: str, *edits) -> str:
+    """The fixture board with text edits applied, saved as led_blinker.kicad_pcb in a directory"""
+    text = BOARD_TEXT
+    for old, new in edits:
+        assert old in text
+        text = text.replace(old, new)
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    path = os.path.join(directory, BOARD_PATH.name)
+    Path(path).write_text(text)
+    return path
+
+
+def edit_board(board, *edits) -> None:
+    """Apply text edits to the open stand-in board in place, as KiCad GUI edits would be"""
+    text = BOARD_TEXT
+    for old, new in edits:
+        assert old in text
+        text = text.replace(old, new)
+    board.text = text
+
+
+def keys(path: str) -> dict:
+    items = BoardItems.from_file(path)
+    result = {layer: items.gerber_key(layer, "led_blinker") for layer in DEFAULT_LAYERS}
+    result.update(drill=items.drill_key("led_blinker"), bom=items.bom_key(), position=items.position_key())
+    return result
+
+
+def changed(before: dict, after: dict) -> set:
+    return {name for name in before if before[name] != after[name]}
+
+
+def test_keys():
+    """Each edit changes only the keys of the outputs that read the edited items"""
+    print("=" * 70)
+    print("Testing artifact keys")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_keys_")
+    try:
+        base = keys(write_board(os.path.join(temp_dir, "base")))
+        assert keys(write_board(os.path.join(temp_dir, "same"))) == base
+
+        print("\n1. Testing a track and a value...")
+        assert changed(base, keys(write_board(os.path.join(temp_dir, "track"), MOVE_TRACK))) == {"F.Cu"}
+        assert changed(base, keys(write_board(os.path.join(temp_dir, "value"), VALUE_R1))) == {"bom", "position"}
+        print("✓ A track touches F.Cu only; a value (on F.Fab) touches the BOM and position file only")
+
+        print("\n2. Testing moved parts...")
+        moved = changed(base, keys(write_board(os.path.join(temp_dir, "r1"), MOVE_R1)))
+        assert moved == {"F.Cu", "F.Mask", "F.Paste", "F.SilkS", "position"}
+        moved = changed(base, keys(write_board(os.path.join(temp_dir, "j1"), MOVE_J1)))
+        assert moved == {"F.Cu", "B.Cu", "F.Mask", "B.Mask", "F.SilkS", "B.SilkS", "drill", "position"}
+        print("✓ SMD R1 touches its front layers; through-hole J1 touches both sides and the drill file")
+        print()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_store():
+    """Stored files come back under their names; the oldest entries go past the size cap"""
+    print("=" * 70)
+    print("Testing the artifact store")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_store_")
+    try:
+        print("\n1. Testing put and restore...")
+        store = ArtifactStore(os.path.join(temp_dir, "store"), max_bytes=250)
+        source = Path(temp_dir) / "board-F_Cu.gbr"
+        source.write_text("x" * 100)
+        assert store.restore("ab" * 32, os.path.join(temp_dir, "out")) is None
+        store.put("ab" * 32, [str(source)])
+        assert store.restore("ab" * 32, os.path.join(temp_dir, "out")) == ["board-F_Cu.gbr"]
+        assert (Path(temp_dir) / "out" / "board-F_Cu.gbr").read_text() == "x" * 100
+        print("✓ Miss, then a hit restoring the file under its own name")
+
+        print("\n2. Testing the size cap...")
+        for i, key in enumerate(("cd" * 32, "ef" * 32)):
+            store.put(key, [str(source)])
+            os.utime(store.root / key[:2] / key, (1000 + i, 1000 + i))
+        os.utime(store.root / "ab" / ("ab" * 32), (2000, 2000))
+        store.prune()
+        assert store.restore("cd" * 32, temp_dir) is None
+        assert store.restore("ab" * 32, temp_dir) is not None and store.restore("ef" * 32, temp_dir) is not None
+        print("✓ Least recently used entry dropped to fit 250 bytes")
+        print()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+async def test_server_package():
+    """Test export_fabrication_package reusing unchanged outputs on the pcbnew backend"""
+    print("=" * 70)
+    print("Testing incremental export_fabrication_package")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_fab_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    os.environ["KICAD_MCP_ARTIFACTS"] = str(Path(temp_dir) / "store")
+    try:
+        server = KiCadMCPServerExtended()
+        server.board = pcbnew.LoadBoard(write_board(os.path.join(temp_dir, "v1")))
+
+        print("\n1. Testing a first and a repeated export...")
+        first = await server._export_fabrication_package(os.path.join(temp_dir, "out1"))
+        assert first["status"] == "success" and not first["reused"] and len(first["regenerated"]) == 14
+        assert len(first["contents"]["gerber_files"]) == 9
+        second = await server._export_fabrication_package(os.path.join(temp_dir, "out2"))
+        assert not second["regenerated"] and sorted(second["reused"]) == sorted(first["regenerated"])
+        with zipfile.ZipFile(first["zip_file"]) as a, zipfile.ZipFile(second["zip_file"]) as b:
+            assert sorted(a.namelist()) == sorted(b.namelist())
+            assert "gerber/led_blinker-job.gbrjob" in a.namelist()
+            assert all(a.read(name) == b.read(name) for name in a.namelist())
+        print(f"✓ {len(first['regenerated'])} outputs generated, then all reused into an identical ZIP")
+
+        print("\n2. Testing a one-resistor tweak...")
+        edit_board(server.board, MOVE_R1)  # The same board, edited in place
+        result = await server._export_fabrication_package(os.path.join(temp_dir, "out3"))
+        assert sorted(result["regenerated"]) == sorted([
+            "gerber/led_blinker-F_Cu.gbr", "gerber/led_blinker-F_Mask.gbr", "gerber/led_blinker-F_Paste.gbr",
+            "gerber/led_blinker-F_SilkS.gbr", "gerber/led_blinker-job.gbrjob", "position.csv"])
+        assert "drill/led_blinker-PTH.drl" in result["reused"] and "bom.csv" in result["reused"]
+        with zipfile.ZipFile(result["zip_file"]) as package:
+            assert '"R1","330","R_0603_1608Metric",21.0000,20.0000' in package.read("position.csv").decode()
+        print(f"✓ Moving R1 re-plots {len(result['regenerated']) - 2} front layers, the job file and the position file; "
+              f"{len(result['reused'])} outputs reused")
+
+        print("\n3. Testing a value, a track tweak and a full export...")
+        edit_board(server.board, MOVE_R1, VALUE_R1)
+        result = await server._export_fabrication_package(os.path.join(temp_dir, "out4"))
+        assert sorted(result["regenerated"]) == ["bom.csv", "position.csv"]
+        with zipfile.ZipFile(result["zip_file"]) as package:
+            assert '"R1","470",' in package.read("bom.csv").decode()
+            assert '"R1","470","R_0603_1608Metric",21.0000' in package.read("position.csv").decode()
+        edit_board(server.board, MOVE_R1, VALUE_R1, MOVE_TRACK)
+        result = await server._export_fabrication_package(os.path.join(temp_dir, "out5"))
+        assert result["regenerated"] == ["gerber/led_blinker-F_Cu.gbr", "gerber/led_blinker-job.gbrjob"]
+        result = await server._export_fabrication_package(os.path.join(temp_dir, "out6"), incremental=False)
+        assert result["status"] == "success" and "reused" not in result
+        assert len(result["contents"]["gerber_files"]) == 9
+        print("✓ A value rewrites the BOM and position file from the edited board; a moved track re-plots "
+              "F.Cu and the job file; incremental=False regenerates everything")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        os.environ.pop("KICAD_MCP_ARTIFACTS", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_keys()
+    test_store()
+    asyncio.run(test_server_package())
+    print("✅ Incremental fabrication export tested and working!\n")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for deterministic fabrication ZIPs
+Byte-identical archives, parallel member compression and export_fabrication_package against the pcbnew
+stand-in in test_data/pcbnew_stub
+"""
+
+import asyncio
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+TEST_DATA = Path(__file__).parent / "test_data"
+sys.path.insert(0, str(TEST_DATA / "pcbnew_stub"))
+
+import pcbnew  # noqa: E402  (the stand-in)
+
+from kicad_fab_zip import ZIP_DEFLATED, ZIP_STORED, DeterministicZip, deflate_member  # noqa: E402
+from kicad_mcp_server_extended import KiCadMCPServerExtended  # noqa: E402
+
+BOARD_PATH = str(TEST_DATA / "led_blinker.kicad_pcb")
+
+
+def gerber_like(seed: int, lines: int) -> bytes:
+    """Coordinate lines in the style of a copper layer: compressible, but not trivially"""
+    rng = random.Random(seed)
+    return "".join(f"X{rng.randrange(10**7)}Y{rng.randrange(10**7)}D0{rng.choice('123')}*\n"
+                   for _ in range(lines)).encode()
+
+
+def test_determinism():
+    """Same members in any order give the same bytes, readable by zipfile"""
+    print("=" * 70)
+    print("Testing deterministic archives")
+    print("=" * 70)
+
+    members = {
+        "gerber/board-F_Cu.gbr": gerber_like(1, 20000),
+        "gerber/board-B_Cu.gbr": gerber_like(2, 20000),
+        "gerber/board-Edge_Cuts.gbr": b"G04 outline*\nM02*\n",
+        "drill/board-PTH.drl": os.urandom(2000),
+        "bom.csv": "Reference,Value\n\"R1\",\"330 Ω\"\n".encode(),
+    }
+
+    print("\n1. Testing member order...")
+    archives = []
+    for order in (sorted(members), sorted(members, reverse=True)):
+        with DeterministicZip(workers=4) as package:
+            for name in order:
+                package.add(name, members[name])
+            archives.append(package.getvalue())
+    assert archives[0] == archives[1]
+    print(f"✓ {len(archives[0])} identical bytes whatever the order members were added in")
+
+    print("\n2. Testing the archive...")
+    with zipfile.ZipFile(io.BytesIO(archives[0])) as archive:
+        assert archive.testzip() is None and archive.namelist() == sorted(members)
+        assert all(archive.read(name) == data for name, data in members.items())
+        infos = {info.filename: info for info in archive.infolist()}
+        assert {info.date_time for info in infos.values()} == {(1980, 1, 1, 0, 0, 0)}
+        assert infos["gerber/board-F_Cu.gbr"].compress_type == zipfile.ZIP_DEFLATED
+        assert infos["drill/board-PTH.drl"].compress_type == zipfile.ZIP_STORED
+    assert deflate_member(os.urandom(100))[0] == ZIP_STORED and deflate_member(b"a" * 100)[0] == ZIP_DEFLATED
+    print("✓ Sorted, dated 1980-01-01, deflated where it helps and stored where it does not")
+
+    print("\n3. Testing duplicates...")
+    with DeterministicZip() as package:
+        package.add("bom.csv", b"")
+        try:
+            package.add("bom.csv", b"")
+            assert False, "duplicate accepted"
+        except ValueError:
+            pass
+    print("✓ A member name can only be added once")
+    print()
+
+
+async def test_server_package():
+    """Two exports of the same board give the same ZIP"""
+    print("=" * 70)
+    print("Testing export_fabrication_package ZIPs")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_zip_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    os.environ["KICAD_MCP_ARTIFACTS"] = str(Path(temp_dir) / "store")
+    try:
+        server = KiCadMCPServerExtended()
+        server.board = pcbnew.LoadBoard(BOARD_PATH)
+
+        print("\n1. Testing repeated exports...")
+        results = []
+        for incremental in (False, False, True, True, True):
+            result = await server._export_fabrication_package(os.path.join(temp_dir, f"out{len(results)}"),
+                                                               incremental=incremental)
+            assert result["status"] == "success"
+            results.append(result)
+        # KiCad dates every Gerber and the job file, so only reused outputs repeat byte for byte
+        assert results[0]["zip_sha256"] != results[1]["zip_sha256"]
+        assert len({result["zip_sha256"] for result in results[2:]}) == 1
+        assert len({Path(result["zip_file"]).read_bytes() for result in results[2:]}) == 1
+        assert not results[3]["regenerated"] and "gerber/led_blinker-job.gbrjob" in results[3]["reused"]
+        print(f"✓ Full exports differ by creation date; incremental exports all give ZIP "
+              f"{results[2]['zip_sha256'][:12]}…")
+
+        print("\n2. Testing the contents...")
+        with zipfile.ZipFile(results[0]["zip_file"]) as archive:
+            names = archive.namelist()
+            fab_dir = next(path for path in Path(temp_dir, "out0").glob("fabrication_*") if path.is_dir())
+            assert names == sorted(names) and "bom.csv" in names and "gerber/led_blinker-job.gbrjob" in names
+            assert all(archive.read(name) == (fab_dir / name).read_bytes() for name in names)
+        print(f"✓ {len(names)} members matching the files in the package directory")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        os.environ.pop("KICAD_MCP_ARTIFACTS", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_determinism()
+    asyncio.run(test_server_package())
+    print("✅ Deterministic fabrication ZIPs tested and working!\n")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for force-directed draft placement
+Net clustering, the force layout on a stacked 1000-part board and the draft_placement tool
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from kicad_board_model import Footprint, Pad
+from kicad_force_place import ForceLayout, component_graph, detect_communities
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_placement import PlacementNetlist
+from kicad_synthetic_board import synthetic_board
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def part(reference: str, *nets: int) -> Footprint:
+    pads = [Pad(str(i + 1), 0.5 * i, 0, 0.5, 0.5, net_code=code, net_name=f"N{code}") for i, code in enumerate(nets)]
+    return Footprint(reference, "", "", 0, 0, pads=pads, courtyard=[(-0.5, -0.5), (2, -0.5), (2, 0.5), (-0.5, 0.5)])
+
+
+def test_clustering():
+    """Two tightly knit groups joined by one net, plus a ground net on everything"""
+    print("=" * 70)
+    print("Testing net clustering")
+    print("=" * 70)
+
+    footprints = [
+        part("U1", 1, 2, 3, 99), part("C1", 1, 2, 99), part("C2", 2, 3, 99), part("R1", 1, 3, 10, 99),
+        part("U2", 4, 5, 6, 99), part("C3", 4, 5, 99), part("C4", 5, 6, 99), part("R2", 4, 6, 10, 99),
+    ]
+    footprints += [part(f"TP{i}", 99) for i in range(20)]  # Ground spans 28 parts
+    netlist = PlacementNetlist(footprints)
+
+    print("\n1. Testing the clique graph...")
+    u, v, w = component_graph(netlist)
+    weights = {(netlist.references[a], netlist.references[b]): c for a, b, c in zip(u.tolist(), v.tolist(), w.tolist())}
+    assert weights[("U1", "C1")] == 1.0 and weights[("U1", "R1")] == 1.0 and weights[("R1", "R2")] == 1.0
+    assert not any("TP0" in pair for pair in weights)
+    print(f"✓ {len(weights)} weighted pairs; the 28-part ground net is left out")
+
+    print("\n2. Testing label propagation...")
+    labels = detect_communities(len(footprints), (u, v, w))
+    group = {ref: int(label) for ref, label in zip(netlist.references, labels.tolist())}
+    assert group["U1"] == group["C1"] == group["C2"] == group["R1"]
+    assert group["U2"] == group["C3"] == group["C4"] == group["R2"] != group["U1"]
+    print("✓ U1 and U2 each gather their own capacitors and resistor")
+    print()
+
+
+def test_layout():
+    """A 1000-part board stacked at one point must come out spread, connected and nearly overlap-free"""
+    print("=" * 70)
+    print("Testing force-directed layout")
+    print("=" * 70)
+
+    board = synthetic_board(1000, seed=2)
+    for fp in board.footprints:
+        fp.move_to(0.0, 0.0, fp.rotation_deg)
+    fixed = board.footprints[500]
+    fixed.move_to(60.0, 60.0, 0.0)
+    netlist = PlacementNetlist(board.footprints)
+    movable = [i for i in range(len(board.footprints)) if i != 500]
+
+    print("\n1. Testing a stacked netlist...")
+    start = time.perf_counter()
+    layout = ForceLayout(netlist, board.footprints, movable, outline=board.outline_bbox())
+    layout.run()
+    elapsed = time.perf_counter() - start
+    hpwl = netlist.hpwl(layout.x, layout.y, netlist.rotation).sum()
+    scattered = netlist.hpwl(np.random.default_rng(0).uniform(0, 130, 1000),
+                             np.random.default_rng(1).uniform(0, 130, 1000), netlist.rotation).sum()
+    courtyards = float((4 * layout.hw * layout.hh).sum())
+    assert hpwl < 0.2 * scattered and layout.overlap_area() < 0.02 * courtyards
+    print(f"✓ {layout.cluster_count} clusters, HPWL {hpwl:.0f} mm (random {scattered:.0f} mm), "
+          f"overlap {layout.overlap_area():.1f} of {courtyards:.0f} mm² in {elapsed:.2f} s")
+
+    print("\n2. Testing the outline and fixed parts...")
+    x1, y1, x2, y2 = board.outline_bbox()
+    cx, cy = layout.x + layout.offset_x, layout.y + layout.offset_y
+    assert np.all(cx - layout.hw >= x1 - 1e-9) and np.all(cx + layout.hw <= x2 + 1e-9)
+    assert np.all(cy - layout.hh >= y1 - 1e-9) and np.all(cy + layout.hh <= y2 + 1e-9)
+    assert (layout.x[500], layout.y[500]) == (60.0, 60.0)
+    print("✓ Every courtyard inside the outline; the fixed part stays put")
+
+    print("\n3. Testing 10,000 unconnected parts...")
+    footprints = [part(f"R{i}") for i in range(10000)]
+    netlist = PlacementNetlist(footprints)
+    layout = ForceLayout(netlist, footprints, range(len(footprints)), outline=(0, 0, 300, 300))
+    tracemalloc.start()
+    start = time.perf_counter()
+    layout._seed_clusters()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert layout.cluster_count == 10000 and peak < 100 * 2 ** 20
+    assert np.isfinite(layout.x).all() and np.isfinite(layout.y).all()
+    print(f"✓ {layout.cluster_count} single-part clusters seeded in {elapsed:.2f} s, peak {peak / 2 ** 20:.0f} MB")
+    print()
+
+
+async def test_server_draft():
+    """Test draft_placement and the simple_circuit groups on the file backend"""
+    print("=" * 70)
+    print("Testing draft_placement headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_draft_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+        print("\n1. Testing the fixture board...")
+        result = await server._draft_placement()
+        assert result["status"] == "success" and result["skipped_locked"] == ["C1"]
+        assert {p["reference"] for p in result["placements"]} <= {"R1", "D1", "J1"}
+        assert sorted(ref for cluster in result["clusters"] for ref in cluster) == ["D1", "J1", "R1"]
+        footprints = {fp.reference: fp for fp in server._get_model().footprints}
+        assert (footprints["C1"].x_mm, footprints["C1"].y_mm) == (20.0, 26.0)
+        assert abs((await server._score_placement())["current_hpwl_mm"] - result["hpwl_after_mm"]) < 1e-3
+        print(f"✓ {result['moved']} parts drafted in {result['cluster_count']} cluster(s), locked C1 kept")
+
+        print("\n2. Testing the simple_circuit groups...")
+        groups = server._component_groups()
+        guidance = server._get_circuit_guidance("LED", await server._list_components(), groups)
+        assert groups and "Component groups" in guidance and "draft_placement" in guidance
+        print(f"✓ Guidance lists {len(groups)} group(s) sharing nets")
+
+        print("\n3. Testing errors...")
+        unknown = await server._draft_placement(["R9"])
+        assert unknown["error"] == "Component 'R9' not found" and "R1" in unknown["suggestions"]
+        assert "error" in await server._draft_placement(["C1"])
+        print("✓ Unknown and only-locked selections rejected")
+
+        print("\n4. Testing a board without nets...")
+        text = re.sub(r'\n\t\t\t\(net \d+ "[^"]*"\)', "", Path(BOARD_PATH).read_text())  # Pad nets only
+        unconnected = Path(temp_dir) / "unconnected.kicad_pcb"
+        unconnected.write_text(text)
+        server = KiCadMCPServerExtended(backend="file", board_path=str(unconnected))
+        result = await server._draft_placement()
+        assert result["status"] == "success" and result["cluster_count"] == 3
+        assert result["hpwl_before_mm"] == result["hpwl_after_mm"] == 0
+        print(f"✓ {result['moved']} unconnected parts drafted as {result['cluster_count']} single-part clusters")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_clustering()
+    test_layout()
+    asyncio.run(test_server_draft())
+    print("✅ Force-directed placement tested and working!\n")
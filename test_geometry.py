@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the geometry helpers and courtyard overlap engine
+Exact polygon overlap and incremental pair tracking
+"""
+
+import random
+
+from kicad_geometry import is_convex, overlap_area, polygon_area, rectangle
+from kicad_overlaps import CourtyardOverlaps
+from kicad_spatial_index import SpatialGrid
+
+
+def test_polygon_overlap():
+    """Test exact intersection areas, including concave and touching shapes"""
+    print("=" * 70)
+    print("Testing polygon overlap")
+    print("=" * 70)
+
+    square = rectangle((0, 0, 2, 2))
+    ell = [(0, 0), (3, 0), (3, 1), (1, 1), (1, 3), (0, 3)]
+
+    print("\n1. Testing convex shapes...")
+    assert abs(polygon_area(square)) == 4
+    assert is_convex(square) and not is_convex(ell)
+    assert overlap_area(square, rectangle((1, 1, 3, 3))) == 1
+    assert overlap_area(square, rectangle((0, 0, 2, 2))) == 4
+    assert overlap_area(rectangle((0, 0, 2, 1)), rectangle((1, 0, 3, 1))) == 1
+    assert overlap_area(square, rectangle((2, 0, 4, 2))) == 0
+    print("✓ Overlapping, identical, collinear and touching rectangles")
+
+    print("\n2. Testing concave shapes...")
+    assert abs(overlap_area(ell, rectangle((1.5, 1.5, 3, 3)))) < 1e-12
+    assert abs(overlap_area(ell, rectangle((0.5, 0.5, 2, 2))) - 1.25) < 1e-12
+    assert abs(overlap_area(ell, list(reversed(ell))) - 5) < 1e-12
+    print("✓ L-shaped courtyards measured exactly")
+    print()
+
+
+def test_courtyard_overlaps():
+    """Test broad phase + exact pairs against a brute-force scan, and incremental updates"""
+    print("=" * 70)
+    print("Testing courtyard overlap engine")
+    print("=" * 70)
+
+    rng = random.Random(3)
+    courtyards = {}
+    for i in range(400):
+        x, y = rng.uniform(0, 60), rng.uniform(0, 60)
+        courtyards[f"R{i}"] = ("B.Cu" if i % 5 == 0 else "F.Cu", rectangle((x, y, x + 3, y + 1.5)))
+    grid = SpatialGrid.build((ref, (p[0][0], p[0][1], p[2][0], p[2][1])) for ref, (_, p) in courtyards.items())
+
+    def brute():
+        refs = sorted(courtyards)
+        return {
+            (a, b) for i, a in enumerate(refs) for b in refs[i + 1:]
+            if courtyards[a][0] == courtyards[b][0] and overlap_area(courtyards[a][1], courtyards[b][1]) > 1e-6
+        }
+
+    print("\n1. Testing full check...")
+    engine = CourtyardOverlaps(grid, courtyards)
+    assert {(a, b) for a, b, _, _ in engine.pairs()} == brute()
+    assert all(courtyards[a][0] == side for a, _, side, _ in engine.pairs())
+    print(f"✓ {len(engine.pairs())} overlapping pairs match an all-pairs scan")
+
+    print("\n2. Testing incremental re-check...")
+    for _ in range(30):
+        ref = f"R{rng.randrange(400)}"
+        x, y = rng.uniform(0, 60), rng.uniform(0, 60)
+        courtyards[ref] = (courtyards[ref][0], rectangle((x, y, x + 3, y + 1.5)))
+        grid.update(ref, (x, y, x + 3, y + 1.5))
+        engine.update(ref, *courtyards[ref])
+    assert {(a, b) for a, b, _, _ in engine.pairs()} == brute()
+    print("✓ Moves update only the moved footprint's pairs")
+    print()
+
+
+if __name__ == "__main__":
+    test_polygon_overlap()
+    test_courtyard_overlaps()
+    print("✅ Geometry tests passed!\n")
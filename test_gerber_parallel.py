@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel Gerber plotting
+Layer shares, worker processes and the merged job file, against the pcbnew stand-in in test_data/pcbnew_stub
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+TEST_DATA = Path(__file__).parent / "test_data"
+sys.path.insert(0, str(TEST_DATA / "pcbnew_stub"))
+
+import pcbnew  # noqa: E402  (the stand-in)
+
+from kicad_gerber_parallel import DEFAULT_LAYERS, plot_layers, plot_parallel  # noqa: E402
+from kicad_mcp_server_extended import KiCadMCPServerExtended  # noqa: E402
+
+BOARD_PATH = str(TEST_DATA / "led_blinker.kicad_pcb")
+
+
+def plots(directory: str) -> dict:
+    """Plotted files by name, without the first line naming the process that wrote them or the creation date"""
+    return {path.name: path.read_text().split("\n", 2)[2] for path in Path(directory).glob("*.gbr")}
+
+
+def origins(directory: str) -> set:
+    """(pid, board load) pairs from the plotted files"""
+    return {path.read_text().split("\n", 1)[0] for path in Path(directory).glob("*.gbr")}
+
+
+def test_parallel_plot():
+    """Layers plotted on three workers match a serial plot"""
+    print("=" * 70)
+    print("Testing parallel plotting")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_gerber_")
+    os.environ["PCBNEW_STUB_PLOT_DELAY"] = "0.3"
+    try:
+        print("\n1. Testing serial and parallel output...")
+        for name in ("serial", "parallel"):
+            os.makedirs(os.path.join(temp_dir, name))
+        serial = plot_layers(pcbnew.LoadBoard(BOARD_PATH), os.path.join(temp_dir, "serial"), DEFAULT_LAYERS)
+        parallel = plot_parallel(BOARD_PATH, os.path.join(temp_dir, "parallel"), DEFAULT_LAYERS + ("Eco9.User",), 3)
+        assert [entry[0] for entry in parallel] == list(DEFAULT_LAYERS)
+        assert [Path(entry[2]).name for entry in parallel] == [Path(entry[2]).name for entry in serial]
+        assert plots(os.path.join(temp_dir, "parallel")) == plots(os.path.join(temp_dir, "serial"))
+        print(f"✓ {len(parallel)} identical files in the requested layer order; unknown layer skipped")
+
+        print("\n2. Testing the workers...")
+        lines = origins(os.path.join(temp_dir, "parallel"))
+        pids = {line.split(",")[0] for line in lines}
+        assert len(pids) == len(lines) >= 2 and all(line.endswith("load 1*") for line in lines)
+        assert f"G04 plotted by pid {os.getpid()}" not in pids
+        print(f"✓ Layers spread over {len(pids)} worker processes, each loading the board once")
+        print()
+    finally:
+        os.environ.pop("PCBNEW_STUB_PLOT_DELAY", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+async def test_server_export():
+    """Test export_gerber with workers on the pcbnew backend"""
+    print("=" * 70)
+    print("Testing export_gerber with workers")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_gerber_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended()
+        assert server.backend == "pcbnew"
+        server.board = pcbnew.LoadBoard(BOARD_PATH)
+        server.board.text += "\n"  # An edit not saved to disk yet
+
+        print("\n1. Testing a parallel export...")
+        result = await server._export_gerber(os.path.join(temp_dir, "parallel"), workers=4)
+        assert result["status"] == "success" and result["count"] == 9 and result["workers"] == 4
+        assert result["files"][0] == "led_blinker-F_Cu.gbr" and result["job_file"] == "led_blinker-job.gbrjob"
+        job = json.loads((Path(temp_dir) / "parallel" / result["job_file"]).read_text())
+        assert [entry["Path"] for entry in job["FilesAttributes"]] == result["files"]
+        print(f"✓ {result['count']} files from {result['workers']} workers, one job file listing them in order")
+
+        print("\n2. Testing against a serial export...")
+        serial = await server._export_gerber(os.path.join(temp_dir, "serial"))
+        assert serial["files"] == result["files"] and serial["workers"] == 1
+        assert plots(os.path.join(temp_dir, "parallel")) == plots(os.path.join(temp_dir, "serial"))
+        size = os.path.getsize(BOARD_PATH) + 1
+        assert f"G04 board {size} bytes*" in plots(os.path.join(temp_dir, "parallel"))["led_blinker-B_Cu.gbr"]
+        print("✓ Same files as the serial plot, from a snapshot holding the unsaved edit")
+
+        print("\n3. Testing options...")
+        result = await server._export_gerber(os.path.join(temp_dir, "copper"), ["F.Cu", "B.Cu"], False, workers=2)
+        assert result["files"] == ["led_blinker-F_Cu.gbr", "led_blinker-B_Cu.gbr"] and result["job_file"] is None
+        assert not list((Path(temp_dir) / "copper").glob("*.gbrjob"))
+        print("✓ Requested layers only, no job file when it is turned off")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_parallel_plot()
+    asyncio.run(test_server_export())
+    print("✅ Parallel Gerber plotting tested and working!\n")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless .kicad_pcb backend
+Runs the server tools against test_data/led_blinker.kicad_pcb without pcbnew
+"""
+
+import asyncio
+import io
+import json
+import os
+import pickle
+import tempfile
+import shutil
+import zlib
+from pathlib import Path
+
+from kicad_board_cache import BoardSnapshotCache, file_digest
+from kicad_pcb_parser import iter_sexpr, load_kicad_pcb
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def test_parser():
+    """Test the S-expression reader and board model"""
+    print("=" * 70)
+    print("Testing headless .kicad_pcb parser")
+    print("=" * 70)
+
+    print("\n1. Testing chunked S-expression reader...")
+    text = '(root (a "quoted \\"text\\" (with parens)") (b 1 2) (c (d 3)))'
+    nodes = list(iter_sexpr(io.StringIO(text), chunk_size=4))
+    assert nodes[0][0] == "root"
+    assert nodes[1] == ["a", 'quoted "text" (with parens)']
+    assert nodes[2] == ["b", "1", "2"]
+    assert nodes[3] == ["c", ["d", "3"]]
+    print("✓ Tokens split across chunks are reassembled")
+
+    print("\n2. Testing board model...")
+    model = load_kicad_pcb(BOARD_PATH)
+    refs = {fp.reference: fp for fp in model.footprints}
+    assert sorted(refs) == ["C1", "D1", "J1", "R1"]
+    assert model.copper_layers == ["F.Cu", "B.Cu"]
+    assert model.outline_bbox() == (5.0, 12.0, 35.0, 32.0)
+    assert len(model.tracks) == 4 and len(model.vias) == 1 and len(model.zones) == 1
+    assert refs["C1"].locked and refs["C1"].layer == "B.Cu"
+    print("✓ Footprints, tracks, vias, zones and outline parsed")
+
+    print("\n3. Testing pad and courtyard transforms...")
+    d1_pads = {pad.number: pad for pad in refs["D1"].pads}
+    assert abs(d1_pads["1"].x_mm - 26.0) < 1e-9 and abs(d1_pads["1"].y_mm - 20.7875) < 1e-9
+    assert d1_pads["1"].net_name == "GND"
+    min_x, min_y, max_x, max_y = refs["D1"].bbox()
+    assert abs((max_x - min_x) - 1.46) < 1e-9 and abs((max_y - min_y) - 2.96) < 1e-9
+    print("✓ Rotated footprint pads and courtyard land in board coordinates")
+
+    print("\n4. Testing footprint move...")
+    refs["R1"].move_to(30.0, 25.0, 90.0)
+    r1_pads = {pad.number: pad for pad in refs["R1"].pads}
+    assert abs(r1_pads["1"].x_mm - 30.0) < 1e-9 and abs(r1_pads["1"].y_mm - 25.825) < 1e-9
+    print("✓ Pads follow the footprint")
+    print()
+
+
+def test_snapshot_cache():
+    """Test the persistent parsed-board snapshot cache"""
+    print("=" * 70)
+    print("Testing board snapshot cache")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_cache_")
+    try:
+        board = Path(temp_dir) / "board.kicad_pcb"
+        shutil.copy(BOARD_PATH, board)
+        cache = BoardSnapshotCache(str(Path(temp_dir) / "cache.sqlite"))
+
+        print("\n1. Testing cold and warm loads...")
+        assert cache.load(str(board)) is None
+        cold = cache.load_or_parse(str(board))
+        warm = cache.load(str(board))
+        assert warm is not None and warm is not cold
+        assert warm == cold
+        print("✓ Second load is served from the snapshot, equal to the parsed model")
+
+        print("\n2. Testing stale-entry eviction...")
+        board.write_text(board.read_text().replace('"330"', '"470"'))
+        assert cache.load(str(board)) is None
+        model = cache.load_or_parse(str(board))
+        assert any(fp.value == "470" for fp in model.footprints)
+        with cache._connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 1
+        print("✓ Editing the board invalidates and replaces its snapshot")
+
+        print("\n3. Testing size cap...")
+        other = Path(temp_dir) / "other.kicad_pcb"
+        shutil.copy(BOARD_PATH, other)
+        cache.max_bytes = 1
+        cache.load_or_parse(str(other))
+        with cache._connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 0
+        print("✓ Least recently used snapshots are evicted over the cap")
+
+        print("\n4. Testing a planted cache entry...")
+        marker = Path(temp_dir) / "pwned"
+
+        class Payload:
+            def __reduce__(self):
+                return (open, (str(marker), "w"))
+
+        key = cache.snapshot_key(file_digest(str(board)))
+        with cache._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO snapshots (key, board_path, size, last_used, data) "
+                         "VALUES (?, ?, 1, 0, ?)", (key, str(board), zlib.compress(pickle.dumps(Payload()))))
+        model = cache.load_or_parse(str(board))
+        assert not marker.exists() and any(fp.value == "470" for fp in model.footprints)
+        print("✓ A pickle planted in the cache file is rejected, never unpickled, and the board re-parsed")
+        print()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+async def test_headless_server():
+    """Test the server tools on the file backend"""
+    print("=" * 70)
+    print("Testing server tools on the file backend")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_headless_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+    try:
+        print("\n1. Testing list_components...")
+        result = await server._list_components()
+        print(json.dumps(result, indent=2))
+        assert result["status"] == "success"
+        assert result["count"] == 4
+        print("✓ list_components works headless")
+
+        print("\n1b. Testing list_components filters and pagination...")
+        result = await server._list_components(fields=["reference", "layer"], layer="F.Cu", limit=2)
+        assert result["total"] == 3 and result["count"] == 2
+        assert result["components"][0] == {"reference": "R1", "layer": "F.Cu"}
+        result = await server._list_components(fields=["reference"], layer="F.Cu", cursor=result["next_cursor"])
+        assert result["components"] == [{"reference": "J1"}] and "next_cursor" not in result
+        result = await server._list_components(reference_glob="[DR]*", value="RED")
+        assert [c["reference"] for c in result["components"]] == ["D1"]
+        result = await server._list_components(fields=["pads"])
+        assert "Unknown fields" in result["error"]
+        print("✓ Filters, projection and cursors applied server-side")
+
+        print("\n2. Testing get_board_info...")
+        result = await server._get_board_info()
+        print(json.dumps(result, indent=2))
+        assert result["size"] == {"width_mm": 30.0, "height_mm": 20.0}
+        assert result["layer_count"] == 2
+        print("✓ get_board_info works headless")
+
+        print("\n3. Testing read_netlist...")
+        result = await server._read_netlist()
+        assert {net["name"] for net in result["nets"]} == {"GND", "+5V", "Net-(D1-A)"}
+        print("✓ read_netlist works headless")
+
+        print("\n4. Testing get_track_info...")
+        result = await server._get_track_info(net_name="GND")
+        assert result["count"] == 2
+        print("✓ get_track_info works headless")
+        result = await server._get_track_info(layer="F.Cu", fields=["net"], limit=1, cursor="1")
+        assert result == {"status": "success", "tracks": [{"net": "Net-(D1-A)"}], "count": 1, "total": 3,
+                          "next_cursor": "2"}
+        result = await server._get_track_info(cursor="abc")
+        assert "Invalid cursor" in result["error"]
+
+        print("\n4b. Testing spatial queries...")
+        result = await server._query_region(x_min=18, y_min=18, x_max=27, y_max=22, fields=["reference"])
+        assert [c["reference"] for c in result["components"]] == ["R1", "D1"]
+        result = await server._query_region(x_mm=20, y_mm=26, radius_mm=1, fields=["reference"])
+        assert result["components"] == [{"reference": "C1", "distance_mm": 0.0}]
+        result = await server._nearest_components(9, 20, count=2, layer="F.Cu", fields=["reference"])
+        assert [c["reference"] for c in result["components"]] == ["J1", "R1"]
+        result = await server._query_region(x_mm=1, y_mm=1)
+        assert "error" in result
+        print("✓ query_region and nearest_components served from the spatial index")
+
+        print("\n5. Testing place_component...")
+        result = await server._place_component("R1", 15.0, 15.0, 90)
+        assert result["status"] == "success"
+        result = await server._place_component("R99", 0, 0)
+        assert "error" in result and result["suggestions"] == ["R1"]
+        result = await server._place_component("r1", 15.0, 15.0, 90)
+        assert result["suggestions"] == ["R1"]
+        result = await server._query_region(x_mm=15, y_mm=15, radius_mm=0.5, fields=["reference"])
+        assert [c["reference"] for c in result["components"]] == ["R1"]
+        print("✓ place_component updates the in-memory model and spatial index")
+
+        print("\n5b. Testing place_components batch...")
+        result = await server._place_components([
+            {"reference": "R1", "x_mm": 12.0, "y_mm": 14.0},
+            {"reference": "D1", "x_mm": 16.0, "y_mm": 14.0, "rotation_deg": 180},
+            {"reference": "D9", "x_mm": 0, "y_mm": 0},
+            {"reference": "C1", "x_mm": "left"},
+        ])
+        print(json.dumps(result, indent=2))
+        assert result["placed"] == 2 and result["failed"] == 2
+        assert [item["status"] for item in result["results"]] == ["success", "success", "error", "error"]
+        assert result["results"][2]["suggestions"] == ["D1"]
+        await server._place_component("R1", 15.0, 15.0, 90)
+        print("✓ place_components reports per-item results")
+
+        print("\n5c. Testing check_overlaps...")
+        result = await server._check_overlaps()
+        assert [(o["reference_a"], o["reference_b"]) for o in result["overlaps"]] == [("D1", "R1")]
+        await server._place_component("D1", 26.0, 20.0, 90)
+        assert (await server._check_overlaps())["count"] == 0
+        await server._place_component("R1", 25.5, 20.0, 90)
+        result = await server._check_overlaps()
+        assert [(o["reference_a"], o["reference_b"], o["layer"]) for o in result["overlaps"]] == [("D1", "R1", "F.Cu")]
+        assert (await server._check_overlaps(layer="B.Cu"))["count"] == 0
+        await server._place_component("R1", 15.0, 15.0, 90)
+        assert (await server._check_overlaps())["count"] == 0
+        print("✓ Courtyard overlaps appear and clear as parts move")
+
+        print("\n6. Testing BOM and position export...")
+        result = await server._export_bom(str(Path(temp_dir) / "bom.csv"))
+        assert result["unique_parts"] == 4
+        result = await server._export_position_file(str(Path(temp_dir) / "position.csv"))
+        assert result["component_count"] == 4
+        assert '"R1","330","R_0603_1608Metric",15.0000,15.0000,90.00,Top' in \
+            (Path(temp_dir) / "position.csv").read_text()
+        print("✓ BOM and position files written headless")
+
+        print("\n7. Testing pcbnew-only tools...")
+        result = await server._export_gerber(str(Path(temp_dir) / "gerber"))
+        assert "requires the pcbnew backend" in result["error"]
+        print("✓ Gerber export reports that it needs pcbnew")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_parser()
+    test_snapshot_cache()
+    asyncio.run(test_headless_server())
+    print("✅ Headless backend tested and working!\n")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the board lookup indexes
+Reference designator index, suggestions and the spatial grid, and reference lookups on a live board edited
+in place (the pcbnew stand-in in test_data/pcbnew_stub)
+"""
+
+import random
+import sys
+from pathlib import Path
+
+TEST_DATA = Path(__file__).parent / "test_data"
+sys.path.insert(0, str(TEST_DATA / "pcbnew_stub"))
+
+import pcbnew  # noqa: E402  (the stand-in)
+
+from kicad_mcp_server import KiCadMCPServer  # noqa: E402
+from kicad_mcp_server_extended import KiCadMCPServerExtended  # noqa: E402
+from kicad_reference_index import ReferenceIndex, split_reference  # noqa: E402
+from kicad_spatial_index import SpatialGrid, bbox_distance, bboxes_overlap  # noqa: E402
+
+
+def test_reference_index():
+    """Test O(1) reference lookups and 'did you mean' suggestions"""
+    print("=" * 70)
+    print("Testing reference designator index")
+    print("=" * 70)
+
+    refs = [f"R{i}" for i in range(1, 2001)] + [f"C{i}" for i in range(1, 500)] + ["U1", "U2A", "TP"]
+    index = ReferenceIndex(refs, lambda ref: ref)
+
+    print("\n1. Testing lookups...")
+    assert len(index) == len(refs)
+    assert index.get("R1500") == "R1500"
+    assert index.get("R2001") is None
+    assert "U2A" in index
+    print("✓ References resolve through the index")
+
+    print("\n2. Testing reference splitting...")
+    assert split_reference("R12") == ("R", 12, "")
+    assert split_reference("u3A") == ("U", 3, "A")
+    assert split_reference("TP") == ("TP", None, "")
+    print("✓ Prefix, number and suffix extracted")
+
+    print("\n3. Testing suggestions...")
+    assert index.suggest("r15") == ["R15"]
+    assert index.suggest("R2005", limit=3) == ["R2000", "R1999", "R1998"]
+    assert index.suggest("C0", limit=2) == ["C1", "C2"]
+    assert index.suggest("CC10", limit=1) == ["C10"]
+    assert index.suggest("Q7") == []
+    print("✓ Nearest references suggested without a rescan")
+    print()
+
+
+def test_spatial_grid():
+    """Test rectangle, radius and nearest queries against a brute-force scan"""
+    print("=" * 70)
+    print("Testing spatial grid")
+    print("=" * 70)
+
+    rng = random.Random(7)
+    boxes = {}
+    for i in range(500):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        boxes[f"U{i}"] = (x, y, x + rng.uniform(0.5, 8), y + rng.uniform(0.5, 3))
+    grid = SpatialGrid.build(boxes.items())
+
+    print("\n1. Testing rectangle and radius queries...")
+    for _ in range(50):
+        x, y = rng.uniform(-10, 110), rng.uniform(-10, 110)
+        box = (x, y, x + 15, y + 10)
+        assert sorted(grid.query(box)) == sorted(k for k, b in boxes.items() if bboxes_overlap(b, box))
+        hits = grid.query_radius(x, y, 6.0)
+        assert sorted(k for k, _ in hits) == sorted(k for k, b in boxes.items() if bbox_distance(b, x, y) <= 6.0)
+        assert [d for _, d in hits] == sorted(d for _, d in hits)
+    print("✓ Queries match a full scan")
+
+    print("\n2. Testing nearest neighbours...")
+    for _ in range(50):
+        x, y = rng.uniform(-50, 150), rng.uniform(-50, 150)
+        expected = sorted(bbox_distance(b, x, y) for b in boxes.values())[:4]
+        assert [d for _, d in grid.nearest(x, y, 4)] == expected
+    even = grid.nearest(50, 50, 3, accept=lambda key: int(key[1:]) % 2 == 0)
+    assert len(even) == 3 and all(int(key[1:]) % 2 == 0 for key, _ in even)
+    print("✓ Ring search returns the closest boxes")
+
+    print("\n3. Testing incremental updates...")
+    grid.update("U0", (200.0, 200.0, 201.0, 201.0))
+    grid.remove("U1")
+    assert grid.query((199, 199, 202, 202)) == ["U0"]
+    assert "U1" not in grid and len(grid) == 499
+    assert grid.nearest(300, 300, 1) == [("U0", bbox_distance((200.0, 200.0, 201.0, 201.0), 300, 300))]
+    print("✓ Moved and removed items are re-bucketed")
+    print()
+
+
+def test_live_board_lookups():
+    """Parts added, renamed or deleted in the KiCad GUI are seen without reloading the board"""
+    print("=" * 70)
+    print("Testing reference lookups on a live board")
+    print("=" * 70)
+
+    for step, server_class in enumerate((KiCadMCPServerExtended, KiCadMCPServer)):
+        server = server_class()
+        server.board = board = pcbnew.LoadBoard(str(TEST_DATA / "led_blinker.kicad_pcb"))
+        assert server.backend == "pcbnew"
+
+        print(f"\n{2 * step + 1}. Testing {server_class.__name__} lookups...")
+        footprint, _ = server._find_footprint("R1")
+        assert footprint.GetReference() == "R1"
+        assert server._find_footprint("R2") == (None, ["R1"])
+        print("✓ R1 found; R2 suggests R1")
+
+        print(f"\n{2 * step + 2}. Testing GUI edits on the same board object...")
+        board.text = board.text.replace('"Reference" "R1"', '"Reference" "R2"')  # R1 deleted, R2 added
+        footprint, _ = server._find_footprint("R2")
+        assert footprint is not None and footprint.GetReference() == "R2"
+        assert server._find_footprint("R1") == (None, ["R2"])
+        print("✓ The added part is found and the deleted one is gone, suggestions included")
+    print()
+
+
+if __name__ == "__main__":
+    test_reference_index()
+    test_spatial_grid()
+    test_live_board_lookups()
+    print("✅ Index tests passed!\n")
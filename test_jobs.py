@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test script for background jobs
+The job queue, and background export_fabrication_package / export_gerber calls through call_tool against the
+pcbnew stand-in in test_data/pcbnew_stub, with progress notifications and cancellation
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+TEST_DATA = Path(__file__).parent / "test_data"
+sys.path.insert(0, str(TEST_DATA / "pcbnew_stub"))
+
+import pcbnew  # noqa: E402  (the stand-in)
+from mcp.server.lowlevel.server import request_ctx  # noqa: E402
+from mcp.shared.context import RequestContext  # noqa: E402
+from mcp.types import CallToolRequest, CallToolRequestParams, RequestParams  # noqa: E402
+
+from kicad_jobs import JobQueue  # noqa: E402
+from kicad_mcp_server_extended import KiCadMCPServerExtended  # noqa: E402
+
+BOARD_PATH = str(TEST_DATA / "led_blinker.kicad_pcb")
+
+
+def wait_for(job, states=("completed", "failed", "cancelled"), timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while job.state not in states:
+        assert time.monotonic() < deadline, f"job still {job.state}"
+        time.sleep(0.01)
+    return job
+
+
+def test_queue():
+    """Jobs run one at a time, report progress, fail and cancel"""
+    print("=" * 70)
+    print("Testing the job queue")
+    print("=" * 70)
+
+    queue = JobQueue()
+    try:
+        async def steps(progress, count=5, delay=0.05):
+            progress.expect(count)
+            for i in range(count):
+                await asyncio.sleep(delay)
+                progress.advance(f"step {i + 1}")
+            return {"status": "success", "steps": count}
+
+        print("\n1. Testing a job to completion...")
+        seen = []
+        job = queue.submit("steps", steps, on_progress=lambda j: seen.append(j.progress.done))
+        status = wait_for(job).status()
+        assert status["state"] == "completed" and status["result"] == {"status": "success", "steps": 5}
+        assert seen == [1, 2, 3, 4, 5] and (status["progress"], status["total"]) == (5, 5)
+        print(f"✓ Completed with progress {seen}")
+
+        print("\n2. Testing failures...")
+        async def fails(progress):
+            return {"error": "Failed to plot: disk full"}
+        async def raises(progress):
+            raise RuntimeError("boom")
+        assert wait_for(queue.submit("fails", fails)).status()["error"] == "Failed to plot: disk full"
+        assert wait_for(queue.submit("raises", raises)).state == "failed"
+        print("✓ Error results and exceptions both mark the job failed")
+
+        print("\n3. Testing cancellation...")
+        running = queue.submit("slow", lambda progress: steps(progress, count=50, delay=0.02))
+        queued = queue.submit("queued", steps)
+        wait_for(running, states=("running",))
+        assert queue.cancel(queued.job_id).state == "cancelled"
+        queue.cancel(running.job_id)
+        assert wait_for(running).state == "cancelled" and running.progress.done < 50
+        assert queued.started is None and queue.pending() == 0
+        print(f"✓ Queued job dropped at once; running job stopped after {running.progress.done} of 50 steps")
+
+        print("\n4. Testing a cancel after the board changed...")
+        changed = threading.Event()
+        release = threading.Event()
+
+        async def edits(progress):
+            progress.expect(2)
+            progress.advance("Filling")
+            changed.set()  # The board is modified from here on
+            release.wait(5)
+            progress.advance("Filled", checkpoint=False)
+            return {"status": "success"}
+
+        job = queue.submit("edits", edits)
+        changed.wait(5)
+        queue.cancel(job.job_id)
+        release.set()
+        status = wait_for(job).status()
+        assert status["state"] == "completed" and status["result"] == {"status": "success"}
+        print("✓ A step reported after the change is no checkpoint, so the job completes with its result")
+        print()
+    finally:
+        queue.shutdown()
+
+
+class RecordingSession:
+    """Stands in for the MCP session, keeping the progress notifications sent to it"""
+
+    def __init__(self):
+        self.notifications = []
+
+    async def send_progress_notification(self, progress_token, progress, total=None, message=None,
+                                         related_request_id=None):
+        self.notifications.append((progress_token, progress, total, message))
+
+
+async def test_server_jobs():
+    """Background exports return a job id at once while read tools keep answering"""
+    print("=" * 70)
+    print("Testing background tools in call_tool")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_jobs_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    os.environ["KICAD_MCP_ARTIFACTS"] = "off"
+    os.environ["PCBNEW_STUB_PLOT_DELAY"] = "0.2"
+    server = KiCadMCPServerExtended()
+    server.board = pcbnew.LoadBoard(BOARD_PATH)
+    handler = server.server.request_handlers[CallToolRequest]
+    session = RecordingSession()
+
+    async def call(name, arguments, progress_token=None):
+        request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments))
+        meta = RequestParams.Meta(progressToken=progress_token) if progress_token else None
+        token = request_ctx.set(RequestContext(request_id=1, meta=meta, session=session, lifespan_context=None))
+        try:
+            return json.loads((await handler(request)).root.content[0].text)
+        finally:
+            request_ctx.reset(token)
+
+    readers = set()
+    overlaps = []
+    board_class = type(server.board)
+    original = board_class.GetFootprints
+
+    def exclusive(board):
+        # pcbnew is not thread-safe: flag any read that starts while another thread is inside one
+        if readers:
+            overlaps.append(threading.current_thread().name)
+        readers.add(threading.current_thread().name)
+        try:
+            time.sleep(0.002)
+            return original(board)
+        finally:
+            readers.discard(threading.current_thread().name)
+
+    async def poll(job_id, states=("completed", "failed", "cancelled")):
+        while True:
+            status = await call("get_job_status", {"job_id": job_id})
+            if status["state"] in states:
+                return status
+            await asyncio.sleep(0.02)
+
+    board_class.GetFootprints = exclusive
+    try:
+        print("\n1. Testing a background fabrication package...")
+        start = time.monotonic()
+        queued = await call("export_fabrication_package",
+                            {"output_dir": os.path.join(temp_dir, "out"), "background": True}, progress_token="fab")
+        returned = time.monotonic() - start
+        assert queued["status"] == "queued" and returned < 0.5
+        listed = await call("list_components", {"fields": ["reference"]})
+        assert listed["status"] == "success" and listed["total"] > 0
+        assert (await call("get_job_status", {"job_id": queued["job_id"]}))["state"] in ("queued", "running")
+        while (await call("get_job_status", {"job_id": queued["job_id"]}))["progress"] < 4:
+            await asyncio.sleep(0.02)
+        server._components = None  # Make the read go back to the board while the job plots
+        assert (await call("list_components", {"fields": ["reference"]}))["status"] == "success"
+        status = await poll(queued["job_id"])
+        assert not overlaps
+        assert status["state"] == "completed" and Path(status["result"]["zip_file"]).exists()
+        assert status["progress"] == status["total"] == 14 and status["message"] == "Wrote ZIP"
+        await asyncio.sleep(0.05)  # Let the last notification land on the loop
+        assert [n[1] for n in session.notifications] == list(range(1, 15))
+        assert {n[0] for n in session.notifications} == {"fab"} and session.notifications[-1][2] == 14
+        print(f"✓ Job id returned in {returned:.2f}s of a {status['elapsed_s']:.1f}s export; "
+              f"list_components answered meanwhile, never alongside the job; "
+              f"{len(session.notifications)} progress notifications")
+
+        print("\n2. Testing cancellation...")
+        queued = await call("export_gerber", {"output_dir": os.path.join(temp_dir, "cancelled"), "background": True})
+        await poll(queued["job_id"], states=("running",))
+        cancelled = await call("cancel_job", {"job_id": queued["job_id"]})
+        assert cancelled["status"] == "success"
+        status = await poll(queued["job_id"])
+        assert status["state"] == "cancelled" and status["progress"] < status["total"]
+        assert not list(Path(temp_dir, "cancelled").glob("*.gbrjob"))
+        again = await call("cancel_job", {"job_id": queued["job_id"]})
+        assert "already cancelled" in again["error"]
+        print(f"✓ Stopped after {status['progress']} of {status['total']} steps, before the job file")
+
+        print("\n3. Testing the job list and foreground calls...")
+        listing = await call("get_job_status", {})
+        assert listing["count"] == 2 and all("result" not in job for job in listing["jobs"])
+        assert "Unknown job" in (await call("get_job_status", {"job_id": "nope"}))["error"]
+        os.environ["PCBNEW_STUB_PLOT_DELAY"] = "0"
+        result = await call("export_gerber", {"output_dir": os.path.join(temp_dir, "now")})
+        assert result["status"] == "success" and result["count"] == 9
+        print("✓ Finished jobs listed without results; calls without background run as before")
+        print()
+    finally:
+        board_class.GetFootprints = original
+        server.jobs.shutdown()
+        for name in ("KICAD_MCP_CACHE", "KICAD_MCP_ARTIFACTS", "PCBNEW_STUB_PLOT_DELAY"):
+            os.environ.pop(name, None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_queue()
+    asyncio.run(test_server_jobs())
+    print("✅ Background jobs tested and working!\n")
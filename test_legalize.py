@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for placement legalization
+Grid snapping, minimal displacement, obstacles on a jittered 1000-part board and the legalize_placement tool
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from kicad_board_model import Footprint
+from kicad_force_place import candidate_pairs
+from kicad_legalize import Legalizer
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_placement import PlacementNetlist
+from kicad_synthetic_board import synthetic_board
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def square(reference: str, x: float, y: float, half: float = 1.0, layer: str = "F.Cu") -> Footprint:
+    courtyard = [(x - half, y - half), (x + half, y - half), (x + half, y + half), (x - half, y + half)]
+    return Footprint(reference, "", "", x, y, layer=layer, courtyard=courtyard)
+
+
+def box_overlaps(legalizer: Legalizer) -> int:
+    cx, cy = legalizer.x + legalizer.offset_x, legalizer.y + legalizer.offset_y
+    i, j = candidate_pairs(cx, cy, np.hypot(legalizer.hw, legalizer.hh))
+    hit = ((legalizer.side[i] == legalizer.side[j]) &
+           (legalizer.hw[i] + legalizer.hw[j] - np.abs(cx[j] - cx[i]) > 1e-6) &
+           (legalizer.hh[i] + legalizer.hh[j] - np.abs(cy[j] - cy[i]) > 1e-6))
+    return int(hit.sum())
+
+
+def test_minimal_displacement():
+    """A part overlapping a fixed one moves just clear of it, onto the grid"""
+    print("=" * 70)
+    print("Testing minimal displacement")
+    print("=" * 70)
+
+    print("\n1. Testing a single overlap...")
+    footprints = [square("U1", 10.0, 10.0, half=2.0), square("R1", 12.3, 10.52)]
+    legalizer = Legalizer(PlacementNetlist(footprints), footprints, [1], grid_mm=0.5)
+    legalizer.run()
+    assert (legalizer.x[0], legalizer.y[0]) == (10.0, 10.0)
+    assert (legalizer.x[1], legalizer.y[1]) == (13.0, 10.5)
+    print("✓ R1 snapped to (12.5, 10.5), then pushed right to x = 13.0, the first grid line clear of U1")
+
+    print("\n2. Testing without a grid and on the other side...")
+    footprints.append(square("C1", 12.3, 10.52, layer="B.Cu"))
+    legalizer = Legalizer(PlacementNetlist(footprints), footprints, [1, 2], grid_mm=0)
+    legalizer.run()
+    assert abs(legalizer.x[1] - 13.0) < 0.01 and legalizer.y[1] == 10.52
+    assert (legalizer.x[2], legalizer.y[2]) == (12.3, 10.52)
+    print("✓ Off-grid R1 abuts U1; C1 on the bottom side does not move")
+
+    print("\n3. Testing the outline and keepouts...")
+    keepout = ((12.5, 8.0, 16.0, 12.0), (True, False))
+    legalizer = Legalizer(PlacementNetlist(footprints[:2]), footprints[:2], [1], outline=(7.0, 7.0, 16.0, 15.0),
+                          keepouts=[keepout], grid_mm=0.5)
+    legalizer.run()
+    assert (legalizer.x[1], legalizer.y[1]) == (12.5, 13.0) and not legalizer.unresolved
+    print("✓ With a keepout on the right and the outline on the left, R1 drops below them to (12.5, 13.0)")
+    print()
+
+
+def test_jittered_board():
+    """1000 parts nudged off their legal spots come back overlap-free on the grid, barely moved"""
+    print("=" * 70)
+    print("Testing a jittered 1000-part board")
+    print("=" * 70)
+
+    board = synthetic_board(1000, seed=1)
+    rng = random.Random(0)
+    for fp in board.footprints:
+        fp.move_to(fp.x_mm + rng.uniform(-1.5, 1.5), fp.y_mm + rng.uniform(-1.5, 1.5), fp.rotation_deg)
+    netlist = PlacementNetlist(board.footprints)
+    fixed = set(range(0, 1000, 10))
+    movable = [i for i in range(1000) if i not in fixed]
+
+    print("\n1. Testing legalization...")
+    legalizer = Legalizer(netlist, board.footprints, movable, outline=board.outline_bbox(), grid_mm=0.1)
+    conflicts = int(legalizer._conflicts().sum())
+    start = time.perf_counter()
+    legalizer.run()
+    elapsed = time.perf_counter() - start
+    displacement = legalizer.displacement()
+    assert conflicts > 100 and box_overlaps(legalizer) == 0 and not legalizer.unresolved
+    assert displacement.mean() < 0.5
+    print(f"✓ {conflicts} parts in conflict, none after {elapsed:.2f} s; "
+          f"mean displacement {displacement.mean():.2f} mm, max {displacement.max():.2f} mm")
+
+    print("\n2. Testing the grid and fixed parts...")
+    m = np.array(movable)
+    assert np.allclose(np.round(legalizer.x[m] / 0.1) * 0.1, legalizer.x[m])
+    assert np.allclose(np.round(legalizer.y[m] / 0.1) * 0.1, legalizer.y[m])
+    f = np.array(sorted(fixed))
+    assert np.array_equal(legalizer.x[f], netlist.x[f]) and np.array_equal(legalizer.y[f], netlist.y[f])
+    print("✓ Movable parts on the 0.1 mm grid, fixed parts untouched")
+    print()
+
+
+async def test_server_legalize():
+    """Test legalize_placement on the file backend"""
+    print("=" * 70)
+    print("Testing legalize_placement headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_legalize_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+        print("\n1. Testing an overlapping placement...")
+        await server._place_component("D1", 21.03, 20.48, 90)
+        assert (await server._check_overlaps())["count"] >= 1
+        result = await server._legalize_placement(grid_mm=0.5)
+        assert result["status"] == "success" and result["skipped_locked"] == ["C1"]
+        assert result["overlaps_before"] >= 1 and result["overlaps_after"] == 0 and not result["unresolved"]
+        assert (await server._check_overlaps())["count"] == 0
+        print(f"✓ {result['overlaps_before']} overlap(s) cleared, {result['moved']} part(s) moved "
+              f"{result['total_displacement_mm']} mm in total")
+
+        print("\n2. Testing the grid and the caches...")
+        footprints = {fp.reference: fp for fp in server._get_model().footprints}
+        for reference in ("R1", "D1", "J1"):
+            assert footprints[reference].x_mm % 0.5 == 0 and footprints[reference].y_mm % 0.5 == 0
+        assert (footprints["C1"].x_mm, footprints["C1"].y_mm) == (20.0, 26.0)
+        score = await server._score_placement()
+        assert abs(score["current_hpwl_mm"] - result["hpwl_after_mm"]) < 1e-3
+        print("✓ Every unlocked part on the 0.5 mm grid, locked C1 kept, scores follow")
+
+        print("\n3. Testing a legal board and errors...")
+        again = await server._legalize_placement(grid_mm=0.5)
+        assert again["moved"] == 0 and again["total_displacement_mm"] == 0
+        assert "error" in await server._legalize_placement(["R9"])
+        assert "error" in await server._legalize_placement(["C1"])
+        print("✓ A legal board is left alone; unknown and only-locked selections rejected")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_minimal_displacement()
+    test_jittered_board()
+    asyncio.run(test_server_legalize())
+    print("✅ Placement legalization tested and working!\n")
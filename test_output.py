@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for tool result encodings
+Checks pretty, compact and table output and the per-call override
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from kicad_output import encode_result, select_output_mode, tabulate
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def test_encodings():
+    """Test the encoders directly"""
+    print("=" * 70)
+    print("Testing output encodings")
+    print("=" * 70)
+
+    result = {
+        "status": "success",
+        "components": [
+            {"reference": "R1", "x_mm": 1.0, "pads": [{"number": "1"}, {"number": "2"}]},
+            {"reference": "C1", "layer": "B.Cu"},
+        ],
+        "tags": ["a", "b"],
+    }
+
+    print("\n1. Testing table encoding...")
+    table = tabulate(result)
+    assert table["status"] == "success" and table["tags"] == ["a", "b"]
+    assert table["components"]["columns"] == ["reference", "x_mm", "pads", "layer"]
+    assert table["components"]["rows"][0] == ["R1", 1.0, {"columns": ["number"], "rows": [["1"], ["2"]]}, None]
+    assert table["components"]["rows"][1] == ["C1", None, None, "B.Cu"]
+    assert tabulate({"items": []}) == {"items": []}
+    print("✓ Lists of records become columns + rows, recursively")
+
+    print("\n2. Testing compact and pretty modes...")
+    assert json.loads(encode_result(result, "compact")) == result
+    assert json.loads(encode_result(result, "pretty")) == result
+    assert "\n" not in encode_result(result, "compact")
+    print("✓ Compact JSON round-trips without whitespace")
+
+    print("\n3. Testing mode validation...")
+    assert select_output_mode(None) == "pretty"
+    try:
+        select_output_mode("yaml")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "Unknown output mode" in str(e)
+    print("✓ Unknown modes are rejected")
+    print()
+
+
+async def test_call_tool_override():
+    """Test the server-wide mode and per-call override through the MCP handler"""
+    print("=" * 70)
+    print("Testing output mode selection in call_tool")
+    print("=" * 70)
+
+    server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH, output_mode="compact")
+    handler = server.server.request_handlers[CallToolRequest]
+
+    async def call(name, arguments):
+        request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments))
+        return (await handler(request)).root.content[0].text
+
+    print("\n1. Testing server-wide compact mode...")
+    text = await call("list_components", {"fields": ["reference"]})
+    assert text.startswith('{"status":"success"')
+    print("✓ Results are compact by default")
+
+    print("\n2. Testing per-call table override...")
+    text = await call("list_components", {"fields": ["reference", "layer"], "layer": "B.Cu", "output": "table"})
+    result = json.loads(text)
+    assert result["components"] == {"columns": ["reference", "layer"], "rows": [["C1", "B.Cu"]]}
+    text = await call("get_board_info", {"output": "pretty"})
+    assert text.startswith("{\n")
+    print("✓ The output argument overrides the server setting")
+
+    print("\n3. Testing invalid override...")
+    text = await call("get_board_info", {"output": "xml"})
+    assert "'xml'" in text and "error" in text.lower()
+    print("✓ Invalid modes are reported as errors")
+    print()
+
+
+if __name__ == "__main__":
+    test_encodings()
+    asyncio.run(test_call_tool_override())
+    print("✅ Output encodings tested and working!\n")
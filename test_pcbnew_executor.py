@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test script for the pcbnew executor thread
+Coroutines on the dedicated thread, cancellation, call_tool keeping every board access on that thread against
+the pcbnew stand-in in test_data/pcbnew_stub, and the file backend leaving it alone
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+TEST_DATA = Path(__file__).parent / "test_data"
+sys.path.insert(0, str(TEST_DATA / "pcbnew_stub"))
+
+import pcbnew  # noqa: E402  (the stand-in)
+from mcp.types import CallToolRequest, CallToolRequestParams  # noqa: E402
+
+from kicad_autoplace import Annealer  # noqa: E402
+from kicad_mcp_server_extended import KiCadMCPServerExtended  # noqa: E402
+from kicad_pcbnew_executor import PcbnewExecutor  # noqa: E402
+from kicad_synthetic_board import synthetic_board  # noqa: E402
+
+BOARD_PATH = str(TEST_DATA / "led_blinker.kicad_pcb")
+
+
+async def test_executor():
+    """Coroutines run on one named thread, nest without deadlock and cancel from the caller"""
+    print("=" * 70)
+    print("Testing the pcbnew executor")
+    print("=" * 70)
+
+    executor = PcbnewExecutor()
+    try:
+        print("\n1. Testing the thread...")
+        async def where():
+            await asyncio.sleep(0)
+            return threading.current_thread().name
+
+        async def nested():
+            return [await executor.run(where()), executor.in_thread()]
+
+        names = await asyncio.gather(*(executor.run(where()) for _ in range(5)))
+        assert set(names) == {"pcbnew"} and not executor.in_thread()
+        assert await executor.run(nested()) == ["pcbnew", True]
+        assert await asyncio.to_thread(executor.run_sync, where()) == "pcbnew"
+        print("✓ Every coroutine ran on the 'pcbnew' thread, nested calls included")
+
+        print("\n2. Testing cancellation...")
+        finished = []
+
+        async def slow():
+            await asyncio.sleep(5)
+            finished.append(True)
+
+        task = asyncio.create_task(executor.run(slow()))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+            assert False, "not cancelled"
+        except asyncio.CancelledError:
+            pass
+        assert await executor.run(where()) == "pcbnew" and not finished
+        print("✓ Cancelling the caller cancels the coroutine on the pcbnew thread, which keeps serving")
+        print()
+    finally:
+        executor.shutdown()
+
+
+async def test_server_threads():
+    """Every tool touches the board from the pcbnew thread, and reads answer while a job plots"""
+    print("=" * 70)
+    print("Testing call_tool on the pcbnew thread")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_executor_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    os.environ["KICAD_MCP_ARTIFACTS"] = "off"
+    server = KiCadMCPServerExtended()
+    server.board = pcbnew.LoadBoard(BOARD_PATH)
+    handler = server.server.request_handlers[CallToolRequest]
+
+    threads = set()
+    board_class = type(server.board)
+    original = board_class.GetFootprints
+
+    def recording(board):
+        threads.add(threading.current_thread().name)
+        return original(board)
+
+    async def call(name, arguments):
+        request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments))
+        return json.loads((await handler(request)).root.content[0].text)
+
+    board_class.GetFootprints = recording
+    try:
+        print("\n1. Testing concurrent calls...")
+        results = await asyncio.gather(
+            call("list_components", {"fields": ["reference"]}),
+            call("list_components", {"fields": ["value"], "layer": "F.Cu"}),
+            call("export_fabrication_package", {"output_dir": os.path.join(temp_dir, "now")}),
+        )
+        assert all(result["status"] == "success" for result in results)
+        assert threads == {"pcbnew"}
+        print(f"✓ {len(results)} concurrent calls; board read only from {sorted(threads)}")
+
+        print("\n2. Testing reads during a background export...")
+        os.environ["PCBNEW_STUB_PLOT_DELAY"] = "0.3"
+        queued = await call("export_gerber", {"output_dir": os.path.join(temp_dir, "job"), "background": True})
+        while (await call("get_job_status", {"job_id": queued["job_id"]}))["progress"] < 1:
+            await asyncio.sleep(0.02)
+        server._components = None  # Make the read go back to the board
+        start = time.monotonic()
+        listed = await call("list_components", {"fields": ["reference"]})
+        read_s = time.monotonic() - start
+        assert listed["status"] == "success"
+        status = await call("get_job_status", {"job_id": queued["job_id"]})
+        assert status["state"] == "running" and read_s < 0.3
+        while status["state"] == "running":
+            await asyncio.sleep(0.05)
+            status = await call("get_job_status", {"job_id": queued["job_id"]})
+        assert status["state"] == "completed" and status["result"]["count"] == 9
+        assert threads == {"pcbnew"}
+        print(f"✓ list_components answered in {read_s * 1000:.0f} ms while the job plotted its snapshot "
+              f"in a worker process ({status['elapsed_s']:.1f}s)")
+        print()
+    finally:
+        board_class.GetFootprints = original
+        server.jobs.shutdown()
+        server.pcbnew_executor.shutdown()
+        for name in ("KICAD_MCP_CACHE", "KICAD_MCP_ARTIFACTS", "PCBNEW_STUB_PLOT_DELAY"):
+            os.environ.pop(name, None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+async def test_file_backend():
+    """File boards stay on the MCP loop, and annealing runs in a worker that an edit meanwhile makes stale"""
+    print("=" * 70)
+    print("Testing the file backend off the pcbnew thread")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_executor_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+    server.model = synthetic_board(1500, seed=1)
+    handler = server.server.request_handlers[CallToolRequest]
+
+    threads = []
+    original = Annealer.anneal
+
+    def recording(annealer, moves=None):
+        threads.append(threading.current_thread().name)
+        return original(annealer, moves)
+
+    async def call(name, arguments):
+        request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments))
+        return json.loads((await handler(request)).root.content[0].text)
+
+    Annealer.anneal = recording
+    try:
+        print("\n1. Testing a placement run...")
+        result = await call("auto_place", {"moves": 20000, "seed": 1})
+        assert result["status"] == "success" and result["hpwl_after_mm"] <= result["hpwl_before_mm"]
+        assert threads and not set(threads) & {"pcbnew", threading.current_thread().name}
+        assert server.pcbnew_executor._thread is None
+        print(f"✓ Annealed on {threads[0]}; the pcbnew thread was never started")
+
+        print("\n2. Testing calls while annealing...")
+        task = asyncio.create_task(call("auto_place", {"moves": 400000, "seed": 2}))
+        while len(threads) < 2:
+            await asyncio.sleep(0.01)
+        start = time.monotonic()
+        listed = await call("list_components", {"fields": ["reference"]})
+        read_s = time.monotonic() - start
+        assert listed["status"] == "success" and not task.done()
+        moved = await call("place_component", {"reference": "R1", "x_mm": 1.0, "y_mm": 1.0})
+        assert moved["status"] == "success"
+        refused = await task
+        assert "edited while" in refused["error"]
+        footprints = {fp.reference: fp for fp in server._get_model().footprints}
+        assert (footprints["R1"].x_mm, footprints["R1"].y_mm) == (1.0, 1.0)
+        print(f"✓ list_components answered in {read_s * 1000:.0f} ms mid-anneal; "
+              f"the edit made meanwhile stands and the stale placement was refused")
+        print()
+    finally:
+        Annealer.anneal = original
+        server.jobs.shutdown()
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_executor())
+    asyncio.run(test_server_threads())
+    asyncio.run(test_file_backend())
+    print("✅ pcbnew executor thread tested and working!\n")
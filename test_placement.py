@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for placement scoring
+Vectorized HPWL against a per-pad scan, hypothetical poses and the score_placement tool
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_placement import PlacementNetlist
+from kicad_synthetic_board import synthetic_board
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def scan_hpwl(footprints) -> float:
+    """Reference HPWL from the pads' absolute positions"""
+    nets = {}
+    for fp in footprints:
+        for pad in fp.pads:
+            if pad.net_code:
+                nets.setdefault(pad.net_code, []).append((pad.x_mm, pad.y_mm))
+    return sum(max(x for x, _ in pads) - min(x for x, _ in pads) + max(y for _, y in pads) - min(y for _, y in pads)
+               for pads in nets.values() if len(pads) > 1)
+
+
+def test_hpwl():
+    """Test full, hypothetical and batched HPWL"""
+    print("=" * 70)
+    print("Testing HPWL scoring")
+    print("=" * 70)
+
+    rng = random.Random(21)
+    board = synthetic_board(600, seed=21)
+    for fp in rng.sample(board.footprints, 50):
+        fp.move_to(fp.x_mm, fp.y_mm, rng.choice([90, 180, 270, 30]))
+    netlist = PlacementNetlist(board.footprints)
+
+    print("\n1. Testing the current placement...")
+    assert abs(netlist.total - scan_hpwl(board.footprints)) < 1e-6
+    print(f"✓ {netlist.total:.3f} mm over {len(netlist.net_codes)} nets matches a per-pad scan")
+
+    print("\n2. Testing hypothetical poses...")
+    for _ in range(10):
+        moves = {fp.reference: (rng.uniform(0, 100), rng.uniform(0, 100), rng.choice([0, 45, 90]))
+                 for fp in rng.sample(board.footprints, 4)}
+        total, _, _ = netlist.score(moves)
+        for fp in board.footprints:
+            if fp.reference in moves:
+                fp.move_to(*moves[fp.reference])
+        assert abs(total - scan_hpwl(board.footprints)) < 1e-6
+        for reference, pose in moves.items():
+            netlist.move(reference, *pose)
+        assert abs(netlist.total - total) < 1e-6
+    print("✓ Scores of moved subsets match the board after the move")
+
+    print("\n3. Testing batched placements...")
+    x = np.stack([netlist.x, netlist.x + 1.0, netlist.x * 1.1])
+    y = np.stack([netlist.y] * 3)
+    batch = netlist.hpwl(x, y, np.stack([netlist.rotation] * 3)).sum(axis=1)
+    assert abs(batch[0] - netlist.total) < 1e-6 and abs(batch[1] - batch[0]) < 1e-6 and batch[2] > batch[0]
+    print("✓ Candidate placements scored in one call")
+    print()
+
+
+async def test_server_scoring():
+    """Test score_placement on the file backend"""
+    print("=" * 70)
+    print("Testing score_placement headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_score_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+        print("\n1. Testing hypothetical positions...")
+        current = (await server._score_placement())["current_hpwl_mm"]
+        result = await server._score_placement([{"reference": "R1", "x_mm": 15.0, "y_mm": 20.0}], include_nets=True)
+        assert result["delta_mm"] == 5.0 and {n["net_name"] for n in result["nets"]} == {"+5V", "Net-(D1-A)"}
+        r1 = server._get_model().footprints[0]
+        assert (r1.reference, r1.x_mm, r1.y_mm) == ("R1", 20.0, 20.0)
+        print(f"✓ Moving R1 would add 5 mm to {current} mm; the board is untouched")
+
+        print("\n2. Testing candidates...")
+        result = await server._score_placement(candidates=[
+            [{"reference": "R1", "x_mm": 15.0, "y_mm": 20.0}],
+            [{"reference": "C1", "x_mm": 20.0, "y_mm": 22.0, "rotation_deg": 180}],
+        ])
+        assert [c["index"] for c in result["candidates"]] == [0, 1] and result["best_candidate"] == 1
+        assert "error" in await server._score_placement([{"reference": "R9", "x_mm": 0, "y_mm": 0}])
+        print("✓ Each candidate scored, best one reported, unknown references rejected")
+
+        print("\n3. Testing real moves...")
+        await server._place_component("R1", 15.0, 20.0)
+        assert abs((await server._score_placement())["current_hpwl_mm"] - current - 5.0) < 1e-6
+        print("✓ Scores follow place_component")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_hpwl()
+    asyncio.run(test_server_scoring())
+    print("✅ Placement scoring tested and working!\n")
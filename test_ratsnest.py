@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for the ratsnest engine
+Minimum spanning trees per net and wirelength deltas after moves
+"""
+
+import asyncio
+import copy
+import itertools
+import math
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from kicad_mcp_server_extended import KiCadMCPServerExtended
+from kicad_ratsnest import Ratsnest, minimum_spanning_tree
+from kicad_synthetic_board import synthetic_board
+
+BOARD_PATH = str(Path(__file__).parent / "test_data" / "led_blinker.kicad_pcb")
+
+
+def kruskal_length(points: np.ndarray) -> float:
+    """Reference MST length over all pairs"""
+    parent = list(range(len(points)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    total = 0.0
+    pairs = sorted((math.dist(points[i], points[j]), i, j) for i, j in itertools.combinations(range(len(points)), 2))
+    for length, i, j in pairs:
+        a, b = find(i), find(j)
+        if a != b:
+            parent[a] = b
+            total += length
+    return total
+
+
+def test_spanning_tree():
+    """Test Prim's tree against Kruskal on random point sets"""
+    print("=" * 70)
+    print("Testing minimum spanning tree")
+    print("=" * 70)
+
+    rng = np.random.default_rng(4)
+    print("\n1. Testing random nets...")
+    for n in (0, 1, 2, 3, 8, 60):
+        points = rng.uniform(0, 50, (n, 2))
+        length, airwires = minimum_spanning_tree(points)
+        assert len(airwires) == max(n - 1, 0)
+        assert abs(length - (kruskal_length(points) if n > 1 else 0.0)) < 1e-9
+        assert abs(sum(math.dist(points[a], points[b]) for a, b, _ in airwires) - length) < 1e-9
+    print("✓ Tree lengths match Kruskal for 0 to 60 pads")
+    print()
+
+
+def test_incremental():
+    """Moves must re-solve only the touched nets and keep the board total exact"""
+    print("=" * 70)
+    print("Testing incremental ratsnest")
+    print("=" * 70)
+
+    rng = random.Random(9)
+    board = synthetic_board(900, seed=9)
+    names = {code: net.name for code, net in board.nets.items()}
+    ratsnest = Ratsnest(board.footprints, names)
+
+    print("\n1. Testing random moves...")
+    for _ in range(20):
+        fp = rng.choice(board.footprints)
+        before = ratsnest.total_mm
+        fp.move_to(rng.uniform(0, 120), rng.uniform(0, 120), rng.choice([0, 90, 180]))
+        deltas = ratsnest.update_footprints([fp])
+        assert set(deltas) == {pad.net_code for pad in fp.pads if pad.net_code}
+        assert abs(ratsnest.total_mm - before - sum(deltas.values())) < 1e-9
+    fresh = Ratsnest(board.footprints, names)
+    assert abs(ratsnest.total_mm - fresh.total_mm) < 1e-6
+    print("✓ Per-net deltas add up to a full recomputation")
+
+    print("\n2. Testing parts sharing a reference...")
+    first, second = board.footprints[0], board.footprints[1]
+    expected = Ratsnest(board.footprints, names).lengths
+    second.reference = first.reference
+    ratsnest = Ratsnest(board.footprints, names)
+    assert ratsnest.lengths == expected
+    for _ in range(5):
+        copies = [copy.deepcopy(first), copy.deepcopy(second)]
+        copies[1].move_to(rng.uniform(0, 120), rng.uniform(0, 120), 0)
+        board.footprints[:2] = first, second = copies
+        ratsnest.update_footprints(copies)
+        assert ratsnest.lengths == Ratsnest(board.footprints, names).lengths
+    print(f"✓ Both {first.reference} parts keep their own pads, before and after moving fresh copies")
+    print()
+
+
+async def test_server_ratsnest():
+    """Test get_ratsnest and place_component deltas on the file backend"""
+    print("=" * 70)
+    print("Testing get_ratsnest headless")
+    print("=" * 70)
+
+    temp_dir = tempfile.mkdtemp(prefix="kicad_mcp_rats_")
+    os.environ["KICAD_MCP_CACHE"] = str(Path(temp_dir) / "cache.sqlite")
+    try:
+        server = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+
+        print("\n1. Testing the fixture board...")
+        result = await server._get_ratsnest("+5V", include_airwires=True)
+        net = result["nets"][0]
+        assert net["pad_count"] == 3 and abs(net["length_mm"] - (9.175 + math.hypot(1.6, 6))) < 1e-3
+        assert {frozenset((w["from"], w["to"])) for w in net["airwires"]} == \
+            {frozenset(("J1-1", "R1-1")), frozenset(("R1-1", "C1-1"))}
+        result = await server._get_ratsnest(limit=1)
+        assert result["count"] == 1 and result["next_cursor"] == "1" and result["net_count"] == 3
+        total = result["total_length_mm"]
+        print(f"✓ +5V tree J1-1 → R1-1 → C1-1, board total {total} mm")
+
+        print("\n2. Testing move deltas...")
+        moved = await server._place_component("R1", 15.0, 20.0)
+        after = (await server._get_ratsnest())["total_length_mm"]
+        assert abs(moved["ratsnest_length_mm"] - after) < 1e-3
+        assert abs(after - total - moved["ratsnest_delta_mm"]) < 1e-3
+        batch = await server._place_components([{"reference": "R1", "x_mm": 20.0, "y_mm": 20.0}])
+        assert abs(batch["ratsnest_delta_mm"] + moved["ratsnest_delta_mm"]) < 1e-3
+        assert abs(batch["ratsnest_length_mm"] - total) < 1e-3
+        print(f"✓ Moving R1 changes the airwires by {moved['ratsnest_delta_mm']} mm and back again")
+
+        print("\n3. Testing a move before the ratsnest is built...")
+        fresh = KiCadMCPServerExtended(backend="file", board_path=BOARD_PATH)
+        moved = await fresh._place_component("R1", 15.0, 20.0)
+        assert moved["status"] == "success" and "ratsnest_delta_mm" not in moved and fresh._ratsnest is None
+        print("✓ Moves leave the ratsnest unbuilt and report no airwire change until get_ratsnest builds it")
+        print()
+    finally:
+        os.environ.pop("KICAD_MCP_CACHE", None)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_spanning_tree()
+    test_incremental()
+    asyncio.run(test_server_ratsnest())
+    print("✅ Ratsnest engine tested and working!\n")